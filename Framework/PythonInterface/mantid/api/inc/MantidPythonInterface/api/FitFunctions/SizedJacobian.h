@@ -0,0 +1,44 @@
+// Mantid Repository : https://github.com/mantidproject/mantid
+//
+// Copyright &copy; 2021 ISIS Rutherford Appleton Laboratory UKRI,
+//   NScD Oak Ridge National Laboratory, European Spallation Source,
+//   Institut Laue - Langevin & CSNS, Institute of High Energy Physics, CAS
+// SPDX - License - Identifier: GPL - 3.0 +
+#pragma once
+
+#include "MantidAPI/Jacobian.h"
+
+namespace Mantid {
+namespace PythonInterface {
+/**
+ * Forwards to the Jacobian passed to a Python fit function and records the
+ * number of data points and parameters it was called with, so that the
+ * shape of an array of derivatives can be checked before it is set
+ */
+class SizedJacobian : public API::Jacobian {
+public:
+  SizedJacobian(API::Jacobian &jacobian, size_t nData, size_t nParams)
+      : m_jacobian(jacobian), m_nData(nData), m_nParams(nParams) {}
+
+  void set(size_t iY, size_t iP, double value) override { m_jacobian.set(iY, iP, value); }
+  double get(size_t iY, size_t iP) override { return m_jacobian.get(iY, iP); }
+  void zero() override { m_jacobian.zero(); }
+  void addNumberToColumn(const double &value, const size_t &iActiveP) override {
+    m_jacobian.addNumberToColumn(value, iActiveP);
+  }
+
+  /// @returns The number of data points the derivatives are calculated at
+  size_t nData() const { return m_nData; }
+  /// @returns The number of parameters of the function
+  size_t nParams() const { return m_nParams; }
+
+private:
+  /// The Jacobian of the fit
+  API::Jacobian &m_jacobian;
+  /// The number of data points
+  size_t m_nData;
+  /// The number of parameters
+  size_t m_nParams;
+};
+} // namespace PythonInterface
+} // namespace Mantid
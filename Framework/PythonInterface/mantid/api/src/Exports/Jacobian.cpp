@@ -5,15 +5,60 @@
 //   Institut Laue - Langevin & CSNS, Institute of High Energy Physics, CAS
 // SPDX - License - Identifier: GPL - 3.0 +
 #include "MantidAPI/Jacobian.h"
+#include "MantidPythonInterface/api/FitFunctions/SizedJacobian.h"
+#include "MantidPythonInterface/core/Converters/NDArrayToVector.h"
 #include "MantidPythonInterface/core/GetPointer.h"
+#include "MantidPythonInterface/core/NDArray.h"
 #include <boost/python/class.hpp>
 #include <boost/python/register_ptr_to_python.hpp>
 
+#include <sstream>
+#include <stdexcept>
+
 using Mantid::API::Jacobian;
+using Mantid::PythonInterface::NDArray;
+using Mantid::PythonInterface::SizedJacobian;
+using Mantid::PythonInterface::Converters::NDArrayToVector;
 using namespace boost::python;
 
 GET_POINTER_SPECIALIZATION(Jacobian)
 
+namespace {
+/**
+ * Set every element of the Jacobian matrix from a 2D array, so that a Python
+ * fit function can pass all of its derivatives in one call
+ * @param self :: A reference to the calling object
+ * @param values :: An array of shape (number of data points, number of
+ * parameters)
+ * @throws std::invalid_argument if the array does not have that shape
+ */
+void setFromArray(Jacobian &self, const NDArray &values) {
+  if (values.get_nd() != 2) {
+    throw std::invalid_argument("Jacobian.setFromArray expects a 2D array with one row per data point and one "
+                                "column per parameter.");
+  }
+  const auto shape = values.get_shape();
+  const auto nData = static_cast<size_t>(shape[0]);
+  const auto nParams = static_cast<size_t>(shape[1]);
+  // The Jacobian passed to a Python fit function knows the shape it expects
+  if (const auto *sized = dynamic_cast<const SizedJacobian *>(&self)) {
+    if (nData != sized->nData() || nParams != sized->nParams()) {
+      std::ostringstream msg;
+      msg << "Jacobian.setFromArray expects an array of shape (" << sized->nData() << ", " << sized->nParams()
+          << ") but was given one of shape (" << nData << ", " << nParams << ").";
+      throw std::invalid_argument(msg.str());
+    }
+  }
+  const auto elements = NDArrayToVector<double>(values)();
+  auto element = elements.cbegin();
+  for (size_t iy = 0; iy < nData; ++iy) {
+    for (size_t ip = 0; ip < nParams; ++ip) {
+      self.set(iy, ip, *element++);
+    }
+  }
+}
+} // namespace
+
 void export_Jacobian() {
   register_ptr_to_python<Jacobian *>();
 
@@ -22,6 +67,10 @@ void export_Jacobian() {
            "Set an element of the Jacobian matrix where iy=index of data "
            "point, ip=index of parameter.")
 
+      .def("setFromArray", &setFromArray, (arg("self"), arg("values")),
+           "Set all the elements of the Jacobian matrix from a 2D numpy array "
+           "with one row per data point and one column per parameter.")
+
       .def("get", &Jacobian::get, (arg("self"), arg("iy"), arg("ip")),
            "Return the given element of the Jacobian matrix where iy=index of "
            "data point, ip=index of parameter.");
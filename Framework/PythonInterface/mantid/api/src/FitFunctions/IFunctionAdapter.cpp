@@ -5,6 +5,7 @@
 //   Institut Laue - Langevin & CSNS, Institute of High Energy Physics, CAS
 // SPDX - License - Identifier: GPL - 3.0 +
 #include "MantidPythonInterface/api/FitFunctions/IFunctionAdapter.h"
+#include "MantidPythonInterface/api/FitFunctions/SizedJacobian.h"
 #include "MantidPythonInterface/core/CallMethod.h"
 #include "MantidPythonInterface/core/Converters/WrapWithNDArray.h"
 
@@ -295,7 +296,9 @@ void IFunctionAdapter::evaluateDerivative(API::Jacobian *out, const double *xVal
 
   Py_intptr_t dims[1] = {static_cast<Py_intptr_t>(nData)};
   PyObject *xvals = WrapReadOnly::apply<double>::createFromArray(xValues, 1, dims);
-  PyObject *jacobian = boost::python::to_python_value<API::Jacobian *>()(out);
+  // The sizes let Jacobian.setFromArray check the shape of the derivatives
+  SizedJacobian sizedJacobian(*out, nData, nParams());
+  PyObject *jacobian = boost::python::to_python_value<API::Jacobian *>()(&sizedJacobian);
 
   // Deliberately avoids using the CallMethod wrappers. They lock the GIL
   // again and
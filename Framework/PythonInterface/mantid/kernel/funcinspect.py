@@ -13,9 +13,15 @@
                    return
 """
 
+from functools import lru_cache
 import inspect
 import dis
 
+# Number of code objects to keep the disassembly of
+DECOMPILE_CACHE_SIZE = 128
+# Number of (code object, instruction offset) pairs to keep the lhs information of
+LHS_INFO_CACHE_SIZE = 4096
+
 
 def replace_signature(func, signature):
     """
@@ -181,10 +187,17 @@ def decompile(code_object):
     i = f.f_lasti  # index of the last attempted instruction in byte code
     ins = decompile(f.f_code)
     """
-    instructions = []
-    for ins in dis.get_instructions(code_object):
-        instructions.append( (ins.offset, ins.opcode, ins.opname, ins.arg, ins.argval) )
-    return instructions
+    return list(_decompile(code_object))
+
+
+@lru_cache(maxsize=DECOMPILE_CACHE_SIZE)
+def _decompile(code_object):
+    """
+    Cached disassembly of a code object as a tuple of instructions. Code objects
+    are immutable, so the disassembly never changes.
+    """
+    return tuple((ins.offset, ins.opcode, ins.opname, ins.arg, ins.argval)
+                 for ins in dis.get_instructions(code_object))
 
 
 # A must list all of the operators that behave like a function calls in byte-code
@@ -213,9 +226,20 @@ def process_frame(frame):
     =========
     Returns the a tuple with the number of arguments and their names
     """
-    # Index of the last attempted instruction in byte code
-    last_i = frame.f_lasti
-    ins_stack = decompile(frame.f_code)
+    # The result only depends on the code and the last attempted instruction, so
+    # calls made in a loop only analyse the byte code once
+    max_returns, output_var_names = _process_code(frame.f_code, frame.f_lasti)
+    # Copy any nested lists so the cached result cannot be modified
+    return (max_returns, tuple(list(name) if isinstance(name, list) else name for name in output_var_names))
+
+
+@lru_cache(maxsize=LHS_INFO_CACHE_SIZE)
+def _process_code(code_object, last_i):
+    """Returns the number of arguments on the left of assignment along
+    with the names of the variables for the call at the instruction offset
+    last_i in the given code object. See process_frame.
+    """
+    ins_stack = _decompile(code_object)
 
     call_function_locs = {}
     start_index = 0
@@ -470,7 +470,12 @@ def common_x(arr):
 
 
 def get_matrix_2d_ragged(workspace, normalize_by_bin_width, histogram2D=False, transpose=False,
-                         extent=None, xbins=100, ybins=100, spec_info=None, maxpooling=False):
+                         extent=None, xbins=100, ybins=100, spec_info=None, maxpooling=False, pyramid=None):
+    """
+    Sample a workspace with spectra of different x values onto a regular grid
+    :param pyramid: An optional mantid.plots.resampling_image.pyramid.SpectrumPyramid of the workspace,
+                    used to reuse the integrated counts and spectra between calls
+    """
     if spec_info is None:
         try:
             spec_info = workspace.spectrumInfo()
@@ -518,7 +523,7 @@ def get_matrix_2d_ragged(workspace, normalize_by_bin_width, histogram2D=False, t
         y = np.linspace(y_low, y_high, int(ybins))
 
     counts = interpolate_y_data(workspace, x_centers, y, normalize_by_bin_width, spectrum_info=spec_info,
-                                maxpooling=maxpooling)
+                                maxpooling=maxpooling, pyramid=pyramid)
 
     if histogram2D and extent is not None:
         x = x_edges
@@ -550,15 +555,19 @@ def _workspace_indices(y_bins, workspace):
     return workspace_indices
 
 
-def _workspace_indices_maxpooling(y_bins, workspace):
-    summed_spectra_workspace = _integrate_workspace(workspace)
-    summed_spectra = summed_spectra_workspace.extractY()
+def _workspace_indices_maxpooling(y_bins, workspace, pyramid=None):
+    if pyramid is None:
+        summed_spectra_workspace = _integrate_workspace(workspace)
+        summed_spectra = summed_spectra_workspace.extractY()
     workspace_indices = []
     for y_range in pairwise(y_bins):
         try:
             workspace_range = range(workspace.getAxis(1).indexOfValue(np.math.floor(y_range[0])),
                                     workspace.getAxis(1).indexOfValue(np.math.ceil(y_range[1])))
-            workspace_index = workspace_range[np.argmax(summed_spectra[workspace_range])]
+            if pyramid is None:
+                workspace_index = workspace_range[np.argmax(summed_spectra[workspace_range])]
+            else:
+                workspace_index = pyramid.max_pooled_index(workspace_range.start, workspace_range.stop)
             workspace_indices.append(workspace_index)
         except IndexError:
             workspace_indices.append(-1)
@@ -578,8 +587,9 @@ def _integrate_workspace(workspace):
     return integration.getProperty("OutputWorkspace").value
 
 
-def interpolate_y_data(workspace, x, y, normalize_by_bin_width, spectrum_info=None, maxpooling=False):
-    workspace_indices = _workspace_indices_maxpooling(y, workspace) \
+def interpolate_y_data(workspace, x, y, normalize_by_bin_width, spectrum_info=None, maxpooling=False,
+                       pyramid=None):
+    workspace_indices = _workspace_indices_maxpooling(y, workspace, pyramid) \
         if maxpooling else _workspace_indices(y, workspace)
     counts = np.full([len(workspace_indices), x.size], np.nan, dtype=np.float64)
     previous_index = -1
@@ -596,6 +606,9 @@ def interpolate_y_data(workspace, x, y, normalize_by_bin_width, spectrum_info=No
         previous_index = workspace_index
         if not (spectrum_info and spectrum_info.hasDetectors(workspace_index) and spectrum_info.isMonitor(
                 workspace_index)):
+            if pyramid is not None:
+                counts[index, :] = pyramid.sample_row(workspace_index, x, normalize_by_bin_width)
+                continue
             centers, ztmp, _, _ = get_spectrum(workspace, workspace_index,
                                                normalize_by_bin_width=normalize_by_bin_width,
                                                withDy=False, withDx=False)
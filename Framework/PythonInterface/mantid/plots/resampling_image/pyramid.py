@@ -0,0 +1,197 @@
+# Mantid Repository : https://github.com/mantidproject/mantid
+#
+# Copyright &copy; 2021 ISIS Rutherford Appleton Laboratory UKRI,
+#   NScD Oak Ridge National Laboratory, European Spallation Source,
+#   Institut Laue - Langevin & CSNS, Institute of High Energy Physics, CAS
+# SPDX - License - Identifier: GPL - 3.0 +
+"""
+Caches the data a resampling image needs between pans, zooms and resizes of the plot.
+
+For each workspace a SpectrumPyramid holds
+  * a max-pooled pyramid over the integrated counts of the spectra, so the
+    spectrum with the most counts in any range of spectra is found without
+    integrating the workspace again
+  * the full resolution rows that have been drawn, ready for nearest neighbour
+    sampling onto the image grid
+
+Pyramids of workspaces in the ADS are shared between images and dropped when
+the workspace is replaced, renamed or deleted.
+"""
+from collections import OrderedDict
+from threading import Lock
+
+import numpy as np
+
+from mantid.api import AnalysisDataServiceObserver
+
+# Number of workspaces to keep pyramids for
+MAX_CACHED_WORKSPACES = 8
+# Total number of x and y values to keep in the rows of a single pyramid
+MAX_CACHED_ROW_VALUES = 2 ** 23
+
+
+class SpectrumPyramid:
+    """Lazily filled multi-resolution cache over the spectra of a MatrixWorkspace"""
+
+    def __init__(self, workspace):
+        self._workspace = workspace
+        self._integrated_counts = None
+        self._max_pooled_levels = None
+        self._rows = OrderedDict()
+        self._cached_row_values = 0
+
+    def max_pooled_index(self, start, stop):
+        """
+        Return the index of the spectrum with the most integrated counts in the range [start, stop).
+        Ties go to the lowest index, as in numpy.argmax.
+        """
+        if stop <= start:
+            return start
+        levels = self._get_max_pooled_levels()
+        counts = self._integrated_counts
+        best_index, best_value = -1, -np.inf
+
+        level = 0
+        while start < stop:
+            candidates = []
+            if start & 1:
+                candidates.append(levels[level][start])
+                start += 1
+            if stop & 1:
+                stop -= 1
+                candidates.append(levels[level][stop])
+            for index in candidates:
+                value = counts[index]
+                if value > best_value or (value == best_value and index < best_index) or best_index == -1:
+                    best_index, best_value = index, value
+            start >>= 1
+            stop >>= 1
+            level += 1
+        return int(best_index)
+
+    def sample_row(self, workspace_index, x, normalize_by_bin_width):
+        """
+        Sample a spectrum at the points x by nearest neighbour interpolation.
+        Points outside the x range of the spectrum are returned as nan.
+        """
+        centers, values, x_first, x_last = self._get_row(workspace_index, normalize_by_bin_width)
+        sampled = np.full(x.size, np.nan, dtype=np.float64)
+        in_range = (x >= x_first) & (x <= x_last)
+        sampled[in_range] = _sample_nearest(centers, values, x[in_range])
+        return sampled
+
+    def _get_max_pooled_levels(self):
+        """
+        Level k holds, for each block of 2**k spectra, the index of the spectrum with the most counts
+        """
+        if self._max_pooled_levels is None:
+            from mantid.plots.datafunctions import _integrate_workspace
+            counts = _integrate_workspace(self._workspace).extractY().ravel()
+            # numpy.argmax treats nan as the maximum
+            counts = np.where(np.isnan(counts), np.inf, counts)
+
+            indices = np.arange(counts.size)
+            levels = [indices]
+            while indices.size > 1:
+                pairs = indices.size // 2
+                left, right = indices[0:2 * pairs:2], indices[1:2 * pairs:2]
+                indices = np.where(counts[right] > counts[left], right, left)
+                levels.append(indices)
+            self._integrated_counts = counts
+            self._max_pooled_levels = levels
+        return self._max_pooled_levels
+
+    def _get_row(self, workspace_index, normalize_by_bin_width):
+        key = (workspace_index, normalize_by_bin_width)
+        row = self._rows.get(key)
+        if row is not None:
+            self._rows.move_to_end(key)
+            return row
+
+        from mantid.plots.datafunctions import get_spectrum
+        centers, values, _, _ = get_spectrum(self._workspace, workspace_index,
+                                             normalize_by_bin_width=normalize_by_bin_width,
+                                             withDy=False, withDx=False)
+        order = np.argsort(centers, kind='mergesort')
+        x = self._workspace.readX(workspace_index)
+        row = (centers[order], values[order], x[0], x[-1])
+
+        self._rows[key] = row
+        self._cached_row_values += 2 * centers.size
+        while self._cached_row_values > MAX_CACHED_ROW_VALUES and len(self._rows) > 1:
+            _, (old_centers, _, _, _) = self._rows.popitem(last=False)
+            self._cached_row_values -= 2 * old_centers.size
+        return row
+
+
+def _sample_nearest(centers, values, x):
+    """Equivalent to scipy.interpolate.interp1d(kind='nearest', fill_value='extrapolate') for sorted centers"""
+    if centers.size == 1:
+        return np.full(x.size, values[0])
+    midpoints = (centers[1:] + centers[:-1]) / 2.0
+    return values[np.searchsorted(midpoints, x, side='left')]
+
+
+class _PyramidCacheObserver(AnalysisDataServiceObserver):
+    """Drops the cached pyramid of a workspace when it changes in the ADS"""
+
+    def __init__(self):
+        super().__init__()
+        self.observeDelete(True)
+        self.observeReplace(True)
+        self.observeRename(True)
+        self.observeClear(True)
+
+    def deleteHandle(self, ws_name, ws):
+        invalidate(ws_name)
+
+    def replaceHandle(self, ws_name, ws):
+        invalidate(ws_name)
+
+    def renameHandle(self, old_name, new_name):
+        invalidate(old_name)
+        invalidate(new_name)
+
+    def clearHandle(self):
+        clear()
+
+
+_pyramids = OrderedDict()
+_pyramids_lock = Lock()
+_observer = None
+
+
+def get_spectrum_pyramid(workspace):
+    """
+    Return the SpectrumPyramid for a workspace, shared between all images of the workspace if it is in the ADS
+    :param workspace: A MatrixWorkspace
+    """
+    global _observer
+    name = workspace.name()
+    if not name:
+        return SpectrumPyramid(workspace)
+
+    with _pyramids_lock:
+        pyramid = _pyramids.get(name)
+        if pyramid is None:
+            if _observer is None:
+                _observer = _PyramidCacheObserver()
+            pyramid = SpectrumPyramid(workspace)
+            _pyramids[name] = pyramid
+            while len(_pyramids) > MAX_CACHED_WORKSPACES:
+                _pyramids.popitem(last=False)
+        else:
+            _pyramids.move_to_end(name)
+    return pyramid
+
+
+def invalidate(ws_name):
+    """Drop the cached pyramid of the named workspace"""
+    with _pyramids_lock:
+        _pyramids.pop(ws_name, None)
+
+
+def clear():
+    """Drop all cached pyramids"""
+    with _pyramids_lock:
+        _pyramids.clear()
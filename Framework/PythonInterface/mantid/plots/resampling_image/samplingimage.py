@@ -9,6 +9,7 @@ import numpy as np
 
 from mantid.plots.datafunctions import get_matrix_2d_ragged, get_normalize_by_bin_width
 from mantid.plots.mantidimage import MantidImage
+from mantid.plots.resampling_image.pyramid import get_spectrum_pyramid
 from mantid.api import MatrixWorkspace
 
 MAX_HISTOGRAMS = 5000
@@ -114,7 +115,8 @@ class SamplingImage(MantidImage):
                                               xbins=xbins,
                                               ybins=ybins,
                                               spec_info=self.spectrum_info,
-                                              maxpooling=self._maxpooling)
+                                              maxpooling=self._maxpooling,
+                                              pyramid=self._get_pyramid())
 
             # Data is an MxN matrix.
             # If origin = upper extent is set as [xmin, xmax, ymax, ymin].
@@ -128,6 +130,14 @@ class SamplingImage(MantidImage):
             self._xbins = xbins
             self._ybins = ybins
 
+    def _get_pyramid(self):
+        """
+        The cached integrated counts and spectra of a MatrixWorkspace, reused between resamples
+        """
+        if isinstance(self.ws, MatrixWorkspace):
+            return get_spectrum_pyramid(self.ws)
+        return None
+
     def _update_extent(self):
         """
         Update the extent base on xlim and ylim, should be called after pan or zoom action,
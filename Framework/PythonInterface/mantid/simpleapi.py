@@ -29,6 +29,7 @@ Importing this module starts the FrameworkManager instance.
 # std libs
 from collections import OrderedDict, namedtuple
 from contextlib import contextmanager
+from functools import lru_cache
 import os
 import sys
 
@@ -63,6 +64,18 @@ __LOGGING_KEYWORD__ = "EnableLogging"
 __STORE_KEYWORD__ = "StoreInADS"
 # This is the default value for __STORE_KEYWORD__
 __STORE_ADS_DEFAULT__ = True
+# The configuration key that switches on lazy creation of the algorithm functions
+__LAZY_LOAD_KEY__ = "python.simpleapi.lazyload"
+# The file, within the application data directory, caching the information required to create functions lazily
+__ALGORITHM_INDEX_FILENAME__ = "simpleapi_algorithm_index.json"
+
+# Names of algorithm functions (and their aliases) that have been registered but not yet created,
+# mapped to the _IndexedAlgorithm used to create them on first access
+_lazy_algorithms = {}
+
+# Output properties of newly created algorithms, keyed by (name, version). See _get_output_properties
+_output_properties = {}
+_output_properties_observer = None
 
 
 def specialization_exists(name):
@@ -729,7 +742,7 @@ def _is_function_property(prop):
     return isinstance(prop, _api.FunctionProperty)
 
 
-def _get_args_from_lhs(lhs, algm_obj):
+def _get_args_from_lhs(lhs, algm_obj, output_props=None):
     """
         Return the extra arguments that are to be passed to the algorithm
         from the information in the lhs tuple. These are basically the names
@@ -742,34 +755,78 @@ def _get_args_from_lhs(lhs, algm_obj):
         :param lhs: A 2-tuple that contains the number of variables supplied on the lhs of the
         function call and the names of these variables
         :param algm_obj: An initialised algorithm object
+        :param output_props: The output properties of the algorithm as (name, is workspace property)
+        pairs. They are looked up on algm_obj if None
         :returns: A dictionary mapping property names to the values extracted from the lhs variables
     """
 
     ret_names = lhs[1]
     extra_args = {}
 
-    output_props = [algm_obj.getProperty(p) for p in algm_obj.outputProperties()]
+    if output_props is None:
+        output_props = [(p, _is_workspace_property(algm_obj.getProperty(p))) for p in algm_obj.outputProperties()]
 
     nprops = len(output_props)
     nnames = len(ret_names)
 
     name = 0
 
-    for p in output_props:
-        if _is_workspace_property(p):
+    for prop_name, is_workspace_property in output_props:
+        if is_workspace_property:
             # Check nnames is greater than 0 and less than nprops
             if 0 < nnames < nprops:
-                extra_args[p.name] = ret_names[0]  # match argument to property name
+                extra_args[prop_name] = ret_names[0]  # match argument to property name
                 ret_names = ret_names[1:]
                 nnames -= 1
             elif nnames > 0:
-                extra_args[p.name] = ret_names[name]
+                extra_args[prop_name] = ret_names[name]
 
         name += 1
 
     return extra_args
 
 
+def _get_output_properties(algm_obj):
+    """
+        Return the output properties of a newly created algorithm as (name, is workspace property)
+        pairs. These are the same for every new instance of an algorithm version so they are only
+        looked up once, until the AlgorithmFactory is next updated or the function for the algorithm
+        is created again. Setting some properties declares
+        others, so this must be called before any properties have been set.
+
+        :param algm_obj: An initialised algorithm object with no properties set
+        :returns: A tuple of (property name, is workspace property) pairs
+    """
+    global _output_properties_observer
+    key = (algm_obj.name(), algm_obj.version())
+    output_props = _output_properties.get(key)
+    if output_props is None:
+        if _output_properties_observer is None:
+            _output_properties_observer = _OutputPropertiesObserver()
+        output_props = tuple((p, _is_workspace_property(algm_obj.getProperty(p))) for p in algm_obj.outputProperties())
+        _output_properties[key] = output_props
+    return output_props
+
+
+class _OutputPropertiesObserver(_api.AlgorithmFactoryObserver):
+    """
+        Clears the cached output properties when algorithms are subscribed or unsubscribed, as a
+        re-registered Python algorithm can declare different properties with the same name and version
+    """
+    def __init__(self):
+        super().__init__()
+        self.observeUpdate(True)
+
+    def updateHandle(self):
+        _output_properties.clear()
+
+
+@lru_cache(maxsize=1024)
+def _returns_type(func_name, names):
+    """Return the named tuple type returned by the simple function call with the given output names"""
+    return namedtuple(func_name + "_returns", names)
+
+
 def _merge_keywords_with_lhs(keywords, lhs_args):
     """
         Merges the arguments from the two dictionaries specified
@@ -866,7 +923,7 @@ def _gather_returns(func_name, lhs, algm_obj, ignore_regex=None, inout=False):
                            "These numbers must match." % (func_name,
                                                           number_of_returned_values, number_of_values_on_lhs))
     if number_of_returned_values > 0:
-        ret_type = namedtuple(func_name + "_returns", retvals.keys())
+        ret_type = _returns_type(func_name, tuple(retvals.keys()))
         ret_value = ret_type(**retvals)
         if number_of_returned_values == 1:
             return ret_value[0]
@@ -955,6 +1012,9 @@ def _create_algorithm_function(name, version, algm_object):
         :param version: The version of the algorithm
         :param algm_object: the created algorithm object.
     """
+    # The algorithm may have been subscribed again with different properties
+    for key in [key for key in _output_properties if key[0] == name]:
+        del _output_properties[key]
 
     def algorithm_wrapper():
         """
@@ -1018,7 +1078,7 @@ def _create_algorithm_function(name, version, algm_object):
                 frame = kwargs.pop("__LHS_FRAME_OBJECT__", None)
 
                 lhs = _kernel.funcinspect.lhs_info(frame=frame)
-                lhs_args = _get_args_from_lhs(lhs, algm)
+                lhs_args = _get_args_from_lhs(lhs, algm, _get_output_properties(algm))
                 final_keywords = _merge_keywords_with_lhs(kwargs, lhs_args)
                 set_properties(algm, *args, **final_keywords)
                 try:
@@ -1175,8 +1235,9 @@ def _mockup(plugins):
 def _translate():
     """
         Loop through the algorithms and register a function call
-        for each of them
-        :returns: a list of the name of new function calls
+        for each of them. If lazy loading is enabled the functions are only
+        created when first accessed, see __getattr__.
+        :returns: a list of the name of new function calls that have been created
     """
     from mantid.api import AlgorithmFactory, AlgorithmManager
 
@@ -1187,18 +1248,32 @@ def _translate():
 
     algs = AlgorithmFactory.getRegisteredAlgorithms(True)
     algorithm_mgr = AlgorithmManager
+    indexed_algorithms = _load_algorithm_index(algs) if _lazy_load_enabled() else None
+    module_attrs = globals()
     for name, versions in algs.items():
         if specialization_exists(name):
             continue
-        try:
-            # Create the algorithm object
-            algm_object = algorithm_mgr.createUnmanaged(name, max(versions))
-        except Exception as exc:
-            logger.warning("Error initializing {0} on registration: '{1}'".format(name, str(exc)))
-            continue
+        if indexed_algorithms is None:
+            try:
+                # Create the algorithm object
+                algm_object = algorithm_mgr.createUnmanaged(name, max(versions))
+            except Exception as exc:
+                logger.warning("Error initializing {0} on registration: '{1}'".format(name, str(exc)))
+                continue
+        else:
+            algm_object = indexed_algorithms.get(name)
+            if algm_object is None:
+                continue
 
-        algorithm_wrapper = _create_algorithm_function(name, max(versions), algm_object)
         method_name = algm_object.workspaceMethodName()
+        # Workspace methods need the function now. Existing module attributes are the mock
+        # functions created for the Python plugins and must be replaced immediately.
+        if indexed_algorithms is None or len(method_name) > 0 or name in module_attrs:
+            algorithm_wrapper = _create_algorithm_function(name, max(versions), algm_object)
+        else:
+            # Not yet in the module dictionary so it cannot be synced to the plugin modules
+            _register_lazy_algorithm_function(algm_object)
+            continue
         if len(method_name) > 0:
             if method_name in new_methods:
                 other_alg = new_methods[method_name]
@@ -1217,6 +1292,156 @@ def _translate():
 # -------------------------------------------------------------------------------------------------------------
 
 
+def _lazy_load_enabled():
+    """
+    Returns True if the algorithm functions should only be created when they are first accessed
+    """
+    return ConfigService.Instance()[__LAZY_LOAD_KEY__].strip().lower() in ("1", "on", "true")
+
+
+class _IndexedAlgorithm(object):
+    """
+    Stands in for an unmanaged algorithm object using the information stored in
+    the algorithm index. The real algorithm is only created when its documentation
+    is requested.
+    """
+    __slots__ = ("_name", "_entry", "_algm")
+
+    def __init__(self, name, entry):
+        self._name = name
+        self._entry = entry
+        self._algm = None
+
+    @classmethod
+    def entry_from_algorithm(cls, algm_object):
+        """
+        Create the index entry describing the given algorithm
+        :param algm_object: An unmanaged algorithm object
+        :returns: A dict suitable for storing in the index file
+        """
+        return {"version": algm_object.version(), "alias": algm_object.alias(),
+                "method_name": algm_object.workspaceMethodName(),
+                "method_input_property": algm_object.workspaceMethodInputProperty(),
+                "method_on": list(algm_object.workspaceMethodOn())}
+
+    def name(self):
+        return self._name
+
+    def version(self):
+        return self._entry["version"]
+
+    def alias(self):
+        return self._entry["alias"]
+
+    def workspaceMethodName(self):
+        return self._entry["method_name"]
+
+    def workspaceMethodInputProperty(self):
+        return self._entry["method_input_property"]
+
+    def workspaceMethodOn(self):
+        return self._entry["method_on"]
+
+    def initialize(self):
+        if self._algm is None:
+            from mantid.api import AlgorithmManager
+            self._algm = AlgorithmManager.createUnmanaged(self._name, self.version())
+        self._algm.initialize()
+
+    def docString(self):
+        self.initialize()
+        return self._algm.docString()
+
+
+def _load_algorithm_index(algs):
+    """
+    Load the cached description of each algorithm needed to register its function without
+    creating it. Entries that are missing, or are for a different version, are created from
+    the algorithm itself and the index file is rewritten. The whole index is discarded
+    if it was written by a different revision of Mantid.
+    :param algs: A dict of algorithm name to registered versions
+    :returns: A dict of algorithm name to _IndexedAlgorithm
+    """
+    import json
+    from mantid.api import AlgorithmManager
+
+    revision = _kernel.revision_full()
+    index_path = os.path.join(ConfigService.Instance().getAppDataDirectory(), __ALGORITHM_INDEX_FILENAME__)
+    entries = {}
+    try:
+        with open(index_path, "r") as index_file:
+            index = json.load(index_file)
+        if index.get("revision") == revision:
+            entries = index["algorithms"]
+    except (IOError, OSError, ValueError, KeyError):
+        pass
+
+    index_changed = False
+    indexed_algorithms = {}
+    for name, versions in algs.items():
+        if specialization_exists(name):
+            continue
+        entry = entries.get(name)
+        if entry is None or entry["version"] != max(versions):
+            try:
+                algm_object = AlgorithmManager.createUnmanaged(name, max(versions))
+            except Exception as exc:
+                logger.warning("Error initializing {0} on registration: '{1}'".format(name, str(exc)))
+                continue
+            entry = _IndexedAlgorithm.entry_from_algorithm(algm_object)
+            entries[name] = entry
+            index_changed = True
+        indexed_algorithms[name] = _IndexedAlgorithm(name, entry)
+
+    if index_changed:
+        # Write to a temporary file first so that concurrent imports never see a partial index
+        tmp_path = "{}.{}.tmp".format(index_path, os.getpid())
+        try:
+            with open(tmp_path, "w") as index_file:
+                json.dump({"revision": revision, "algorithms": entries}, index_file)
+            os.replace(tmp_path, index_path)
+        except (IOError, OSError) as exc:
+            logger.debug("Unable to write simpleapi algorithm index '{0}': {1}".format(index_path, str(exc)))
+    return indexed_algorithms
+
+
+def _register_lazy_algorithm_function(algm_object):
+    """
+    Register the function for an algorithm, and its aliases, to be created on first access
+    :param algm_object: An _IndexedAlgorithm describing the algorithm
+    """
+    _lazy_algorithms[algm_object.name()] = algm_object
+    for alias in algm_object.alias().strip().split():
+        _lazy_algorithms[alias] = algm_object
+
+
+def __getattr__(name):
+    """
+    Create the function for an algorithm registered for lazy creation. This is
+    only called by Python if the name is not already defined on the module.
+    :param name: The name of the requested attribute
+    """
+    try:
+        algm_object = _lazy_algorithms[name]
+    except KeyError:
+        raise AttributeError("module '{}' has no attribute '{}'".format(__name__, name)) from None
+    _lazy_algorithms.pop(algm_object.name(), None)
+    for alias in algm_object.alias().strip().split():
+        _lazy_algorithms.pop(alias, None)
+    return _create_algorithm_function(algm_object.name(), algm_object.version(), algm_object)
+
+
+def __dir__():
+    """
+    Include the algorithm functions that have not yet been created so that
+    dir() and tab completion see the full module
+    """
+    return sorted(set(globals()) | set(_lazy_algorithms))
+
+
+# -------------------------------------------------------------------------------------------------------------
+
+
 def _attach_algorithm_func_as_method(method_name, algorithm_wrapper, algm_object):
     """
         Attachs the given algorithm free function to those types specified by the algorithm
@@ -1325,6 +1550,11 @@ try:
 
     _globals = globals()
     _globals.update(_wrappers())
+
+    # The lazily created functions are not in the module dictionary so must be listed
+    # explicitly for 'from mantid.simpleapi import *'
+    if _lazy_algorithms:
+        __all__ = [_name for _name in __dir__() if not _name.startswith('_')]
 except Exception:
     # If an error gets raised remove the attribute to be consistent
     # with standard python behaviour and reraise the exception
@@ -10,6 +10,7 @@ from mantid.simpleapi import (AbsorptionCorrection, DeleteWorkspace, Divide, Loa
                               PaalmanPingsAbsorptionCorrection, PreprocessDetectorsToMD,
                               RenameWorkspace, SetSample, SaveNexusProcessed, UnGroupWorkspace, mtd)
 import mantid.simpleapi
+from mantid.utils.cache import FileCache
 import numpy as np
 import os
 from functools import wraps
@@ -99,13 +100,14 @@ def __get_cache_name(meta_wksp_name, abs_method, cache_dirs=[], prefix_name=""):
     return cache_filenames,  ascii_hash
 
 
-def __load_cached_data(cache_files, sha1, abs_method="", prefix_name=""):
+def __load_cached_data(cache_files, sha1, abs_method="", prefix_name="", caches=None):
     """try to load cached data from memory and disk
 
     :param abs_method: absorption calculation method
     :param sha1: SHA1 that identify cached workspace
     :param cache_files: list of cache file names to search
     :param prefix_name: prefix to add to wkspname for caching
+    :param caches: FileCache of the directory of each cache file, which record the lookups
 
     return  found_abs_wksp_sample, found_abs_wksp_container
             abs_wksp_sample, abs_wksp_container, cache_files[ 0 ]
@@ -135,8 +137,10 @@ def __load_cached_data(cache_files, sha1, abs_method="", prefix_name=""):
 
     # step_2: load from disk if either is not found in memory
     if (not found_abs_wksp_sample) or (not found_abs_wksp_container):
-        for candidate in cache_files :
-            if os.path.exists(candidate):
+        if caches is None:
+            caches = [FileCache(os.path.dirname(candidate)) for candidate in cache_files]
+        for candidate, cache in zip(cache_files, caches):
+            if cache.contains(candidate):
                 wsntmp = "tmpwsg"
                 Load(Filename=candidate, OutputWorkspace=wsntmp)
                 wstype = mtd[wsntmp].id()
@@ -191,6 +195,8 @@ def abs_cache(func):
         abs_method = args[1]
         cache_dirs = kwargs.get("cache_dirs", [])
         prefix_name = kwargs.get("prefix_name", "")
+        cache_max_size = kwargs.get("cache_max_size", 0.)
+        cache_max_age = kwargs.get("cache_max_age", 0.)
 
         # prompt return if no cache_dirs specified
         if len(cache_dirs) == 0:
@@ -207,42 +213,50 @@ def abs_cache(func):
             prefix_name=cache_prefix)
 
         # step_2: try load the cached data from disk
+        log = Logger('calc_absorption_corr_using_wksp')
+        caches = [FileCache(os.path.dirname(filename), max_size=cache_max_size, max_age=cache_max_age, log=log)
+                  for filename in cache_filenames]
         found_sample, found_container, abs_wksp_sample, abs_wksp_container, cache_filename = __load_cached_data(
             cache_filenames,
             ascii_hash,
             abs_method=abs_method,
             prefix_name=prefix_name,
+            caches=caches,
         )
 
         # step_3: calculation
-        if (abs_method == "SampleOnly") and found_sample:
-            # Chen: why is this blowing things up?
-            return abs_wksp_sample, ""
-        else:
-            if found_sample and found_container:
-                # cache is available in memory now, skip calculation
-                return abs_wksp_sample, abs_wksp_container
+        try:
+            if (abs_method == "SampleOnly") and found_sample:
+                # Chen: why is this blowing things up?
+                return abs_wksp_sample, ""
             else:
-                # no cache found, need calculation
-                log = Logger('calc_absorption_corr_using_wksp')
-                if cache_filename:
-                    log.information(f"Storing cached data in {cache_filename}")
-
-                abs_wksp_sample, abs_wksp_container = func(*args, **kwargs)
-
-                # set SHA1 to workspace
-                mtd[abs_wksp_sample].mutableRun()["absSHA1"] = ascii_hash
-                if abs_wksp_container != "":
-                    mtd[abs_wksp_container].mutableRun()["absSHA1"] = ascii_hash
-
-                # save to disk
-                SaveNexusProcessed(InputWorkspace=abs_wksp_sample, Filename=cache_filename)
-                if abs_wksp_container != "":
-                    SaveNexusProcessed(InputWorkspace=abs_wksp_container,
-                                       Filename=cache_filename,
-                                       Append=True)
-
-                return abs_wksp_sample, abs_wksp_container
+                if found_sample and found_container:
+                    # cache is available in memory now, skip calculation
+                    return abs_wksp_sample, abs_wksp_container
+                else:
+                    # no cache found, need calculation
+                    if cache_filename:
+                        log.information(f"Storing cached data in {cache_filename}")
+
+                    abs_wksp_sample, abs_wksp_container = func(*args, **kwargs)
+
+                    # set SHA1 to workspace
+                    mtd[abs_wksp_sample].mutableRun()["absSHA1"] = ascii_hash
+                    if abs_wksp_container != "":
+                        mtd[abs_wksp_container].mutableRun()["absSHA1"] = ascii_hash
+
+                    # save to disk
+                    with caches[0].saving(cache_filename) as filename:
+                        SaveNexusProcessed(InputWorkspace=abs_wksp_sample, Filename=filename)
+                        if abs_wksp_container != "":
+                            SaveNexusProcessed(InputWorkspace=abs_wksp_container,
+                                               Filename=filename,
+                                               Append=True)
+
+                    return abs_wksp_sample, abs_wksp_container
+        finally:
+            for cache in caches:
+                cache.report()
 
     return inner
 
@@ -262,6 +276,8 @@ def calculate_absorption_correction(
     element_size=1,
     metaws=None,
     cache_dirs=[],
+    cache_max_size=0.,
+    cache_max_age=0.,
 ):
     """The absorption correction is applied by (I_s - I_c*k*A_csc/A_cc)/A_ssc for pull Paalman-Ping
 
@@ -299,6 +315,8 @@ def calculate_absorption_correction(
     :param element_size: Size of one side of the integration element cube in mm
     :param metaws: Optional workspace containing metadata to use instead of reading from filename
     :param cache_dirs: list of cache directories for storing cached absorption correction workspace
+    :param cache_max_size: maximum size of the cache files in GiB in the first cache directory, 0 for no limit
+    :param cache_max_age: maximum number of days since the cache files were last used, 0 for no limit
     :param prefix: How the prefix of cache file is determined - FILENAME to use file, or SHA prefix
 
     :return:
@@ -350,7 +368,9 @@ def calculate_absorption_correction(
                                            abs_method,
                                            element_size,
                                            prefix_name=absName,
-                                           cache_dirs=cache_dirs)
+                                           cache_dirs=cache_dirs,
+                                           cache_max_size=cache_max_size,
+                                           cache_max_age=cache_max_age)
 
 
 @abs_cache
@@ -360,6 +380,8 @@ def calc_absorption_corr_using_wksp(
     element_size=1,
     prefix_name="",
     cache_dirs=[],
+    cache_max_size=0.,
+    cache_max_age=0.,
 ):
     """
     Calculates absorption correction on the specified donor workspace. See the documentation
@@ -370,6 +392,8 @@ def calc_absorption_corr_using_wksp(
     :param element_size: Size of one side of the integration element cube in mm
     :param prefix_name: Optional prefix of the output workspaces, default is the donor_wksp name.
     :param cache_dirs: List of candidate cache directories to store cached abs workspace.
+    :param cache_max_size: Maximum size of the cache files in GiB in the first cache directory, 0 for no limit.
+    :param cache_max_age: Maximum number of days since the cache files were last used, 0 for no limit.
 
     :return: Two workspaces (A_s, A_c), the first for the sample and the second for the container
     """
@@ -0,0 +1,220 @@
+# Mantid Repository : https://github.com/mantidproject/mantid
+#
+# Copyright &copy; 2021 ISIS Rutherford Appleton Laboratory UKRI,
+#   NScD Oak Ridge National Laboratory, European Spallation Source,
+#   Institut Laue - Langevin & CSNS, Institute of High Energy Physics, CAS
+# SPDX - License - Identifier: GPL - 3.0 +
+from mantid.kernel import Logger
+
+from contextlib import contextmanager
+import json
+import os
+import re
+import socket
+import threading
+import time
+import uuid
+
+# names given by CreateCacheFilename
+CACHE_FILE = re.compile(r'(.+_)?[0-9a-f]{40}\.nxs')
+TEMPORARY_FILE = re.compile(r'.+\.[0-9]+-[0-9]+\.tmp\.nxs')
+INDEX_NAME = 'cache_index.json'
+LOCK_NAME = 'cache_index.lock'
+LOCK_TIMEOUT = 60.  # seconds to wait for the lock on the index
+STALE_LOCK_AGE = 30.  # seconds after which a lock is assumed to be left by a writer that died
+STALE_TEMPORARY_AGE = 24. * 60. * 60.  # seconds after which an unfinished cache file is removed
+SECONDS_PER_DAY = 24. * 60. * 60.
+BYTES_PER_GIB = 1024. * 1024. * 1024.
+
+
+class FileCache(object):
+    """
+    Manages the cache files written by CreateCacheFilename into a directory that may be shared between processes.
+
+    The time each file was last used is kept in an index in the directory. Files are written to a temporary name and
+    renamed when complete, so readers never see partial files. After each write the least recently used files are
+    evicted until the cache is within its size and age budget.
+    """
+
+    def __init__(self, cache_dir: str, max_size: float = 0., max_age: float = 0., log=None):
+        """
+        :param cache_dir: The directory of the cache files
+        :param max_size: The maximum total size of the cache files in GiB, 0 for no limit
+        :param max_age: The maximum number of days since a cache file was last used, 0 for no limit
+        :param log: The logger to report the cache statistics to, such as the log of an algorithm
+        """
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        self.evicted_size = 0
+        self._log = log if log is not None else Logger('FileCache')
+        self._statistics_lock = threading.Lock()
+
+    def contains(self, filename: str) -> bool:
+        """Returns whether the cache file exists, recording a hit or a miss, and marks it as used if possible."""
+        exists = os.path.exists(filename)
+        with self._statistics_lock:
+            if exists:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if exists:
+            self._touch(filename)
+        return exists
+
+    @contextmanager
+    def saving(self, filename: str):
+        """
+        Yields a temporary filename to save the cache file to, which is renamed to the cache file at the end of the
+        block. If the block raises the temporary file is removed and the cache file is not changed.
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        root, extension = os.path.splitext(filename)
+        temporary = f'{root}.{os.getpid()}-{threading.get_ident()}.tmp{extension}'
+        try:
+            yield temporary
+            try:
+                os.replace(temporary, filename)
+            except OSError:
+                # another writer may have the same file open, and its contents are the same
+                if not os.path.exists(filename):
+                    raise
+        finally:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+        self._touch(filename)
+        self.evict()
+
+    def evict(self) -> None:
+        """Removes the least recently used cache files until the cache is within its size and age budget."""
+        now = time.time()
+        with self._locked() as keep_alive:
+            index = self._read_index()
+            files = []
+            for name in os.listdir(self.cache_dir):
+                keep_alive()
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue  # removed by another process
+                if CACHE_FILE.fullmatch(name):
+                    files.append((max(index.get(name, 0.), stat.st_mtime), stat.st_size, name))
+                elif TEMPORARY_FILE.fullmatch(name) and now - stat.st_mtime > STALE_TEMPORARY_AGE:
+                    self._remove(path)
+
+            files.sort()  # least recently used first
+            total_size = sum(size for _, size, _ in files)
+            kept = set(name for _, _, name in files)
+            for last_used, size, name in files:
+                keep_alive()
+                expired = self.max_age > 0. and now - last_used > self.max_age * SECONDS_PER_DAY
+                too_large = self.max_size > 0. and total_size > self.max_size * BYTES_PER_GIB
+                if not (expired or too_large):
+                    break
+                if self._remove(os.path.join(self.cache_dir, name)):
+                    total_size -= size
+                    kept.discard(name)
+                    with self._statistics_lock:
+                        self.evicted += 1
+                        self.evicted_size += size
+
+            self._write_index({name: last_used for name, last_used in index.items() if name in kept})
+
+    def report(self) -> None:
+        """Reports the cache hits, misses and evictions to the log."""
+        with self._statistics_lock:
+            if self.hits or self.misses or self.evicted:
+                self._log.notice(f'Cache "{self.cache_dir}": {self.hits} hits, {self.misses} misses, {self.evicted} '
+                                 f'files evicted ({self.evicted_size / BYTES_PER_GIB:.3f} GiB)')
+
+    def _touch(self, filename: str) -> None:
+        # the cache can still be read from a directory that cannot be written to or whose lock is busy
+        try:
+            with self._locked():
+                index = self._read_index()
+                index[os.path.basename(filename)] = time.time()
+                self._write_index(index)
+        except OSError as e:
+            self._log.debug(f'Failed to mark cache file "{filename}" as used: {e}')
+
+    def _remove(self, path: str) -> bool:
+        try:
+            os.remove(path)
+            return True
+        except OSError as e:
+            # the file may be open by a reader on some platforms
+            self._log.warning(f'Failed to remove cache file "{path}": {e}')
+            return False
+
+    def _read_index(self) -> dict:
+        try:
+            with open(os.path.join(self.cache_dir, INDEX_NAME)) as index_file:
+                return json.load(index_file)
+        except (OSError, ValueError):
+            return {}  # no index yet, or it was left incomplete
+
+    def _write_index(self, index: dict) -> None:
+        path = os.path.join(self.cache_dir, INDEX_NAME)
+        temporary = f'{path}.{os.getpid()}-{threading.get_ident()}'
+        with open(temporary, 'w') as index_file:
+            json.dump(index, index_file)
+        os.replace(temporary, path)
+
+    @contextmanager
+    def _locked(self):
+        """
+        Holds the lock file of the index, which excludes other processes and threads.
+
+        The lock file contains a token unique to the holder, so that a lock broken as stale and taken by another
+        holder is not removed when it is released. Yields a function which long running holders should call
+        regularly to stop the lock from becoming stale.
+
+        :raises TimeoutError: if the lock is not released by its holder in time
+        """
+        path = os.path.join(self.cache_dir, LOCK_NAME)
+        token = f'{socket.gethostname()}-{os.getpid()}-{threading.get_ident()}-{uuid.uuid4().hex}'
+        deadline = time.time() + LOCK_TIMEOUT
+        while True:
+            try:
+                with os.fdopen(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY), 'w') as lock_file:
+                    lock_file.write(token)
+                break
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(path) > STALE_LOCK_AGE:
+                        os.remove(path)
+                        continue
+                except OSError:
+                    continue  # released in the meantime
+                if time.time() > deadline:
+                    raise TimeoutError(f'Timed out waiting for the lock "{path}" of the cache')
+                time.sleep(0.01)
+
+        refreshed = time.time()
+
+        def keep_alive():
+            nonlocal refreshed
+            if time.time() - refreshed > STALE_LOCK_AGE / 3.:
+                if self._read_lock_token(path) == token:
+                    os.utime(path)
+                refreshed = time.time()
+
+        try:
+            yield keep_alive
+        finally:
+            if self._read_lock_token(path) == token:
+                os.remove(path)
+            else:
+                self._log.warning(f'The lock "{path}" of the cache was broken by another process while it was held')
+
+    @staticmethod
+    def _read_lock_token(path: str) -> str:
+        try:
+            with open(path) as lock_file:
+                return lock_file.read()
+        except OSError:
+            return ''
@@ -0,0 +1,41 @@
+# Mantid Repository : https://github.com/mantidproject/mantid
+#
+# Copyright &copy; 2021 ISIS Rutherford Appleton Laboratory UKRI,
+#   NScD Oak Ridge National Laboratory, European Spallation Source,
+#   Institut Laue - Langevin & CSNS, Institute of High Energy Physics, CAS
+# SPDX - License - Identifier: GPL - 3.0 +
+from contextlib import contextmanager
+import multiprocessing
+import sys
+import types
+
+
+def create_pool(processes: int, initializer=None, initargs=()):
+    """
+    Creates a pool of worker processes for running Mantid code.
+
+    The processes are spawned rather than forked, as the threads of the framework do not survive a fork. A spawned
+    process normally runs the script that started Python again, so that an unguarded reduction script would be rerun
+    by every worker. The script is hidden while the processes start, so it is not run again and does not need an
+    ``if __name__ == '__main__'`` guard. The functions sent to the pool must therefore be defined in a module that
+    can be imported, rather than in the script.
+
+    :param processes: The number of worker processes
+    :param initializer: A function called with initargs once by each worker process when it starts
+    :param initargs: The arguments of initializer
+    :returns: A multiprocessing.pool.Pool, which should be used as a context manager
+    """
+    context = multiprocessing.get_context('spawn')
+    with _main_module_hidden():
+        return context.Pool(processes=processes, initializer=initializer, initargs=initargs)
+
+
+@contextmanager
+def _main_module_hidden():
+    """Replaces the __main__ module with an empty one, which the spawned processes have no need to import."""
+    main_module = sys.modules['__main__']
+    sys.modules['__main__'] = types.ModuleType('__main__')
+    try:
+        yield
+    finally:
+        sys.modules['__main__'] = main_module
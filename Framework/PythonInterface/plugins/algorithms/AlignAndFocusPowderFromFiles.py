@@ -6,11 +6,14 @@
 # SPDX - License - Identifier: GPL - 3.0 +
 from mantid.api import mtd, AlgorithmFactory, DistributedDataProcessorAlgorithm, ITableWorkspaceProperty, \
     MatrixWorkspaceProperty, MultipleFileProperty, PropertyMode
-from mantid.kernel import Direction, PropertyManagerDataService
+from mantid.kernel import Direction, FloatBoundedValidator, IntBoundedValidator, PropertyManagerDataService
 from mantid.simpleapi import AlignAndFocusPowder, CompressEvents, ConvertDiffCal, ConvertUnits, CopyLogs, \
     CopySample, CreateCacheFilename, DeleteWorkspace, DetermineChunking, Divide, EditInstrumentGeometry, FilterBadPulses, \
     LoadDiffCal, Load, LoadIDFFromNexus, LoadNexusProcessed, PDDetermineCharacterizations, Plus, \
     RebinToWorkspace, RemoveLogs, RenameWorkspace, SaveNexusProcessed
+from mantid.utils.cache import FileCache
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import os
 import numpy as np
 
@@ -33,7 +36,7 @@ PROPS_FOR_ALIGN.extend(PROPS_FOR_INSTR)
 PROPS_FOR_PD_CHARACTER = ['FrequencyLogNames', 'WaveLengthLogNames']
 
 
-def determineChunking(filename, chunkSize):
+def determineChunking(filename, chunkSize, chunksName='chunks'):
     # chunkSize=0 signifies that the user wants to read the whole file
     if chunkSize == 0.:
         return [{}]
@@ -43,7 +46,7 @@ def determineChunking(filename, chunkSize):
     if 6.*sizeGiB < chunkSize:
         return [{}]
 
-    chunks = DetermineChunking(Filename=filename, MaxChunkSize=chunkSize, OutputWorkspace='chunks')
+    chunks = DetermineChunking(Filename=filename, MaxChunkSize=chunkSize, OutputWorkspace=chunksName)
 
     strategy = []
     for row in chunks:
@@ -55,7 +58,7 @@ def determineChunking(filename, chunkSize):
 
     # delete chunks workspace
     chunks = str(chunks)  # release the handle to the workspace object
-    DeleteWorkspace(Workspace='chunks')
+    DeleteWorkspace(Workspace=chunksName)
 
     return strategy
 
@@ -107,12 +110,24 @@ class AlignAndFocusPowderFromFiles(DistributedDataProcessorAlgorithm):
                              "Specify maximum Gbytes of file to read in one chunk.  Default is whole file.")
         self.declareProperty("FilterBadPulses", 0.,
                              doc="Filter out events measured while proton charge is more than 5% below average")
+        self.declareProperty("PrefetchChunks", False,
+                             doc="Load the next chunk of a file on a background thread while the current one is focused")
+        self.declareProperty("NumberOfThreads", 1, validator=IntBoundedValidator(lower=0),
+                             doc="Number of files to focus at the same time, 0 uses all cores. The focused files are "
+                             "accumulated in order. Without CacheDir the files are focused one at a time if their "
+                             "characterizations differ.")
 
         self.declareProperty(MatrixWorkspaceProperty('AbsorptionWorkspace', '',
                                                      Direction.Input, PropertyMode.Optional),
                              doc='Divide data by this Pixel-by-pixel workspace')
 
         self.copyProperties('CreateCacheFilename', 'CacheDir')
+        self.declareProperty("CacheMaxSize", 0., validator=FloatBoundedValidator(lower=0.),
+                             doc="Maximum Gbytes of cache files to keep in CacheDir, the least recently used are "
+                             "removed first. 0 is no limit.")
+        self.declareProperty("CacheMaxAgeInDays", 0., validator=FloatBoundedValidator(lower=0.),
+                             doc="Remove cache files in CacheDir which have not been used for this many days. "
+                             "0 is no limit.")
 
         self.declareProperty(MatrixWorkspaceProperty('OutputWorkspace', '',
                                                      Direction.Output),
@@ -148,14 +163,15 @@ class AlignAndFocusPowderFromFiles(DistributedDataProcessorAlgorithm):
                 linearizedRuns.append(item)
         return linearizedRuns
 
-    def __createLoader(self, filename, wkspname, progstart=None, progstop=None, skipLoadingLogs=False, **kwargs):
+    def __createLoader(self, filename, wkspname, loaderName, progstart=None, progstop=None, skipLoadingLogs=False,
+                       **kwargs):
         # load a chunk - this is a bit crazy long because we need to get an output property from `Load` when it
         # is run and the algorithm history doesn't exist until the parent algorithm (this) has finished
         # the kwargs are extra things to be supplied to the loader
         if progstart is None or progstop is None:
-            loader = self.createChildAlgorithm(self.__loaderName)
+            loader = self.createChildAlgorithm(loaderName)
         else:
-            loader = self.createChildAlgorithm(self.__loaderName,
+            loader = self.createChildAlgorithm(loaderName,
                                                startProgress=progstart, endProgress=progstop)
         loader.setAlwaysStoreInADS(True)
         loader.setLogging(True)
@@ -163,8 +179,8 @@ class AlignAndFocusPowderFromFiles(DistributedDataProcessorAlgorithm):
         loader.setPropertyValue('Filename', filename)
         loader.setPropertyValue('OutputWorkspace', wkspname)
         if skipLoadingLogs:
-            if self.__loaderName != 'LoadEventNexus':
-                raise RuntimeError('Cannot set LoadLogs=False in {}'.format(self.__loaderName))
+            if loaderName != 'LoadEventNexus':
+                raise RuntimeError('Cannot set LoadLogs=False in {}'.format(loaderName))
             loader.setProperty('LoadLogs', False)
         for key, value in kwargs.items():
             if isinstance(value, str):
@@ -226,7 +242,7 @@ class AlignAndFocusPowderFromFiles(DistributedDataProcessorAlgorithm):
                 # set the loader for this file
                 try:
                     # MetaDataOnly=True is only supported by LoadEventNexus
-                    loader = self.__createLoader(filename, tempname, MetaDataOnly=True)
+                    loader = self.__createLoader(filename, tempname, self.__loaderName, MetaDataOnly=True)
                     loader.execute()
 
                     # get the underlying loader name if we used the generic one
@@ -319,7 +335,7 @@ class AlignAndFocusPowderFromFiles(DistributedDataProcessorAlgorithm):
         # check for a cachefilename
         cachefile = self.__getCacheName(self.__wkspNameFromFile(filename))
         self.log().information('looking for cachefile "{}"'.format(cachefile))
-        if (not createUnfocused) and self.useCaching and os.path.exists(cachefile):
+        if (not createUnfocused) and self.useCaching and self.cache.contains(cachefile):
             try:
                 if self.__loadCacheFile(cachefile, wkspname):
                     return wkspname, ''
@@ -329,109 +345,124 @@ class AlignAndFocusPowderFromFiles(DistributedDataProcessorAlgorithm):
         else:
             self.log().information('not using cache')
 
-        chunks = determineChunking(filename, self.chunkSize)
+        chunks = determineChunking(filename, self.chunkSize, chunksName=wkspname + '_chunks')
         numSteps = 6  # for better progress reporting - 6 steps per chunk
         if createUnfocused:
             numSteps = 7  # one more for accumulating the unfocused workspace
         self.log().information('Processing \'{}\' in {:d} chunks'.format(filename, len(chunks)))
         prog_per_chunk_step = self.prog_per_file * 1./(numSteps*float(len(chunks)))
 
-        unfocusname_chunk = ''
+        loaderName = 'Load'  # set the loader to be generic on first load
         canSkipLoadingLogs = False
+        prefetched = None  # loader of the next chunk running in the background
 
-        # inner loop is over chunks
-        haveAccumulationForFile = False
-        for (j, chunk) in enumerate(chunks):
-            prog_start = file_prog_start + float(j) * float(numSteps - 1) * prog_per_chunk_step
-
+        def getChunkNames(j):
             # if reading all at once, put the data into the final name directly
             if len(chunks) == 1:
-                chunkname = wkspname
-                unfocusname_chunk = unfocusname
-            else:
-                chunkname = '{}_c{:d}'.format(wkspname, j)
-                if unfocusname:  # only create unfocus chunk if needed
-                    unfocusname_chunk = '{}_c{:d}'.format(unfocusname, j)
-
-            # load a chunk - this is a bit crazy long because we need to get an output property from `Load` when it
-            # is run and the algorithm history doesn't exist until the parent algorithm (this) has finished
-            loader = self.__createLoader(filename, chunkname,
-                                         skipLoadingLogs=(len(chunks) > 1 and canSkipLoadingLogs and haveAccumulationForFile),
-                                         progstart=prog_start, progstop=prog_start + prog_per_chunk_step,
-                                         **chunk)
-            loader.execute()
-            if j == 0:
-                self.__setupCalibration(chunkname)
-
-            # copy the necessary logs onto the workspace
-            if len(chunks) > 1 and canSkipLoadingLogs and haveAccumulationForFile:
-                CopyLogs(InputWorkspace=wkspname, OutputWorkspace=chunkname, MergeStrategy='WipeExisting')
-                # re-load instrument so detector positions that depend on logs get initialized
-                try:
-                    LoadIDFFromNexus(Workspace=chunkname, Filename=filename, InstrumentParentPath='/entry')
-                except RuntimeError as e:
-                    self.log().warning('Reloading instrument using "LoadIDFFromNexus" failed: {}'.format(e))
-
-            # get the underlying loader name if we used the generic one
-            if self.__loaderName == 'Load':
-                self.__loaderName = loader.getPropertyValue('LoaderName')
-            # only LoadEventNexus can turn off loading logs, but FilterBadPulses
-            # requires them to be loaded from the file
-            canSkipLoadingLogs = self.__loaderName == 'LoadEventNexus' and self.filterBadPulses <= 0. and haveAccumulationForFile
+                return wkspname, unfocusname
+            # only create unfocus chunk if needed
+            return '{}_c{:d}'.format(wkspname, j), '{}_c{:d}'.format(unfocusname, j) if unfocusname else ''
 
-            if determineCharacterizations and j == 0:
-                self.__determineCharacterizations(filename, chunkname)  # updates instance variable
-                determineCharacterizations = False
-
-            if self.__loaderName == 'LoadEventNexus' and mtd[chunkname].getNumberEvents() == 0:
-                self.log().notice('Chunk {} of {} contained no events. Skipping to next chunk.'.format(j+1,len(chunks)))
-                continue
+        def createChunkLoader(j, skipLoadingLogs):
+            prog_start = file_prog_start + float(j) * float(numSteps - 1) * prog_per_chunk_step
+            return self.__createLoader(filename, getChunkNames(j)[0], loaderName, skipLoadingLogs=skipLoadingLogs,
+                                       progstart=prog_start, progstop=prog_start + prog_per_chunk_step,
+                                       **chunks[j])
 
-            prog_start += prog_per_chunk_step
-            if self.filterBadPulses > 0.:
-                FilterBadPulses(InputWorkspace=chunkname, OutputWorkspace=chunkname,
-                                LowerCutoff=self.filterBadPulses,
-                                startProgress=prog_start, endProgress=prog_start+prog_per_chunk_step)
-                if mtd[chunkname].getNumberEvents() == 0:
-                    msg = 'FilterBadPulses removed all events from '
-                    if len(chunks) == 1:
-                        raise RuntimeError(msg + filename)
-                    else:
-                        raise RuntimeError(msg + 'chunk {} of {} in {}'.format(j, len(chunks), filename))
-
-            prog_start += prog_per_chunk_step
-
-            # absorption correction workspace
-            if self.absorption is not None and len(str(self.absorption)) > 0:
-                ConvertUnits(InputWorkspace=chunkname, OutputWorkspace=chunkname,
-                             Target='Wavelength', EMode='Elastic')
-                # rebin the absorption correction to match the binning of the inputs if in histogram mode
-                # EventWorkspace will compare the wavelength of each individual event
-                absWksp = self.absorption
-                if mtd[chunkname].id() != 'EventWorkspace':
-                    absWksp = '__absWkspRebinned'
-                    RebinToWorkspace(WorkspaceToRebin=self.absorption, WorkspaceToMatch=chunkname, OutputWorkspace=absWksp)
-                Divide(LHSWorkspace=chunkname, RHSWorkspace=absWksp, OutputWorkspace=chunkname,
-                       startProgress=prog_start, endProgress=prog_start+prog_per_chunk_step)
-                if absWksp != self.absorption:  # clean up
-                    DeleteWorkspace(Workspace=absWksp)
-                ConvertUnits(InputWorkspace=chunkname, OutputWorkspace=chunkname,
-                             Target='TOF', EMode='Elastic')
-            prog_start += prog_per_chunk_step
-
-            if self.kwargs is None:
-                raise RuntimeError('Somehow arguments for "AlignAndFocusPowder" aren\'t set')
-
-            AlignAndFocusPowder(InputWorkspace=chunkname,
-                                OutputWorkspace=chunkname, UnfocussedWorkspace=unfocusname_chunk,
-                                startProgress=prog_start, endProgress=prog_start+2.*prog_per_chunk_step,
-                                **self.kwargs)
-            prog_start += 2. * prog_per_chunk_step  # AlignAndFocusPowder counts for two steps
-
-            self.__accumulate(chunkname, wkspname, unfocusname_chunk, unfocusname, not haveAccumulationForFile,
-                              removelogs=canSkipLoadingLogs)
-
-            haveAccumulationForFile = True
+        # inner loop is over chunks
+        haveAccumulationForFile = False
+        with ThreadPoolExecutor(max_workers=1) as prefetcher:
+            for j in range(len(chunks)):
+                prog_start = file_prog_start + float(j) * float(numSteps - 1) * prog_per_chunk_step
+                chunkname, unfocusname_chunk = getChunkNames(j)
+
+                # load a chunk unless it was prefetched while the previous chunk was processed
+                if prefetched is None:
+                    skipLoadingLogs = len(chunks) > 1 and canSkipLoadingLogs and haveAccumulationForFile
+                    loader = createChunkLoader(j, skipLoadingLogs)
+                    loader.execute()
+                else:
+                    loader, skipLoadingLogs, loading = prefetched
+                    prefetched = None
+                    loading.result()
+                if j == 0:
+                    self.__setupCalibration(chunkname)
+
+                # copy the necessary logs onto the workspace
+                if skipLoadingLogs:
+                    CopyLogs(InputWorkspace=wkspname, OutputWorkspace=chunkname, MergeStrategy='WipeExisting')
+                    # re-load instrument so detector positions that depend on logs get initialized
+                    try:
+                        LoadIDFFromNexus(Workspace=chunkname, Filename=filename, InstrumentParentPath='/entry')
+                    except RuntimeError as e:
+                        self.log().warning('Reloading instrument using "LoadIDFFromNexus" failed: {}'.format(e))
+
+                # get the underlying loader name if we used the generic one
+                if loaderName == 'Load':
+                    loaderName = loader.getPropertyValue('LoaderName')
+                # only LoadEventNexus can turn off loading logs, but FilterBadPulses
+                # requires them to be loaded from the file
+                canSkipLoadingLogs = loaderName == 'LoadEventNexus' and self.filterBadPulses <= 0. and haveAccumulationForFile
+
+                if determineCharacterizations and j == 0:
+                    self.__determineCharacterizations(filename, chunkname)  # updates instance variable
+                    determineCharacterizations = False
+
+                # the logs of the next chunk can be skipped if this chunk could skip them
+                if self.prefetchChunks and j + 1 < len(chunks):
+                    skipLoadingLogs = canSkipLoadingLogs and haveAccumulationForFile
+                    nextLoader = createChunkLoader(j + 1, skipLoadingLogs)
+                    prefetched = (nextLoader, skipLoadingLogs, prefetcher.submit(nextLoader.execute))
+
+                if loaderName == 'LoadEventNexus' and mtd[chunkname].getNumberEvents() == 0:
+                    self.log().notice('Chunk {} of {} contained no events. Skipping to next chunk.'.format(j+1,len(chunks)))
+                    continue
+
+                prog_start += prog_per_chunk_step
+                if self.filterBadPulses > 0.:
+                    FilterBadPulses(InputWorkspace=chunkname, OutputWorkspace=chunkname,
+                                    LowerCutoff=self.filterBadPulses,
+                                    startProgress=prog_start, endProgress=prog_start+prog_per_chunk_step)
+                    if mtd[chunkname].getNumberEvents() == 0:
+                        msg = 'FilterBadPulses removed all events from '
+                        if len(chunks) == 1:
+                            raise RuntimeError(msg + filename)
+                        else:
+                            raise RuntimeError(msg + 'chunk {} of {} in {}'.format(j, len(chunks), filename))
+
+                prog_start += prog_per_chunk_step
+
+                # absorption correction workspace
+                if self.absorption is not None and len(str(self.absorption)) > 0:
+                    ConvertUnits(InputWorkspace=chunkname, OutputWorkspace=chunkname,
+                                 Target='Wavelength', EMode='Elastic')
+                    # rebin the absorption correction to match the binning of the inputs if in histogram mode
+                    # EventWorkspace will compare the wavelength of each individual event
+                    absWksp = self.absorption
+                    if mtd[chunkname].id() != 'EventWorkspace':
+                        absWksp = chunkname + '_absWkspRebinned'
+                        RebinToWorkspace(WorkspaceToRebin=self.absorption, WorkspaceToMatch=chunkname, OutputWorkspace=absWksp)
+                    Divide(LHSWorkspace=chunkname, RHSWorkspace=absWksp, OutputWorkspace=chunkname,
+                           startProgress=prog_start, endProgress=prog_start+prog_per_chunk_step)
+                    if absWksp != self.absorption:  # clean up
+                        DeleteWorkspace(Workspace=absWksp)
+                    ConvertUnits(InputWorkspace=chunkname, OutputWorkspace=chunkname,
+                                 Target='TOF', EMode='Elastic')
+                prog_start += prog_per_chunk_step
+
+                if self.kwargs is None:
+                    raise RuntimeError('Somehow arguments for "AlignAndFocusPowder" aren\'t set')
+
+                AlignAndFocusPowder(InputWorkspace=chunkname,
+                                    OutputWorkspace=chunkname, UnfocussedWorkspace=unfocusname_chunk,
+                                    startProgress=prog_start, endProgress=prog_start+2.*prog_per_chunk_step,
+                                    **self.kwargs)
+                prog_start += 2. * prog_per_chunk_step  # AlignAndFocusPowder counts for two steps
+
+                self.__accumulate(chunkname, wkspname, unfocusname_chunk, unfocusname, not haveAccumulationForFile,
+                                  removelogs=canSkipLoadingLogs)
+
+                haveAccumulationForFile = True
         # end of inner loop
         if not mtd.doesExist(wkspname):
             raise RuntimeError('Failed to process any data from file "{}"'.format(filename))
@@ -445,7 +476,8 @@ class AlignAndFocusPowderFromFiles(DistributedDataProcessorAlgorithm):
         # the unfocussed workspace was requested
         if self.useCaching and not os.path.exists(cachefile):
             self.log().information('Saving data to cachefile "{}"'.format(cachefile))
-            SaveNexusProcessed(InputWorkspace=wkspname, Filename=cachefile)
+            with self.cache.saving(cachefile) as filename:
+                SaveNexusProcessed(InputWorkspace=wkspname, Filename=filename)
 
         return wkspname, unfocusname
 
@@ -562,6 +594,12 @@ class AlignAndFocusPowderFromFiles(DistributedDataProcessorAlgorithm):
         self.absorption = self.getProperty('AbsorptionWorkspace').value
         self.charac = self.getProperty('Characterizations').value
         self.useCaching = len(self.getProperty('CacheDir').value) > 0
+        self.cache = FileCache(self.getProperty('CacheDir').value,
+                               max_size=self.getProperty('CacheMaxSize').value,
+                               max_age=self.getProperty('CacheMaxAgeInDays').value,
+                               log=self.log())
+        self.prefetchChunks = self.getProperty('PrefetchChunks').value
+        self.numberOfThreads = self.getProperty('NumberOfThreads').value or os.cpu_count() or 1
         self.__calWksp = ''
         self.__grpWksp = ''
         self.__mskWksp = ''
@@ -610,6 +648,9 @@ class AlignAndFocusPowderFromFiles(DistributedDataProcessorAlgorithm):
         # generically wrong
         mtd[finalname].run().integrateProtonCharge()
 
+        if self.useCaching:
+            self.cache.report()
+
         # set the output workspace
         self.setProperty('OutputWorkspace', mtd[finalname])
         if finalunfocusname:
@@ -657,7 +698,7 @@ class AlignAndFocusPowderFromFiles(DistributedDataProcessorAlgorithm):
                 summed_cache_file = self.__getGroupCacheName(fileSubset)
                 wkspname = self.__getGroupWkspName(fileSubset)
                 try:
-                    if self.__loadCacheFile(summed_cache_file, wkspname):
+                    if self.cache.contains(summed_cache_file) and self.__loadCacheFile(summed_cache_file, wkspname):
                         self.__accumulate(wkspname, finalname, '', '', firstTime)
                         found = True
                         break
@@ -696,10 +737,7 @@ class AlignAndFocusPowderFromFiles(DistributedDataProcessorAlgorithm):
             grain_size = int(math.sqrt(numberFilesToProcess))  # grain size
         else:
             grain_size = numberFilesToProcess
-        for (i, filename) in enumerate(files):
-            self.__loaderName = 'Load'  # reset to generic load with each file
-            wkspname, unfocusname = self.__processFile(filename, self.prog_per_file * float(i), not self.useCaching,
-                                                       bool(finalunfocusname))
+        for (i, (wkspname, unfocusname)) in enumerate(self.__processFilesInOrder(files, bool(finalunfocusname))):
             # accumulate into partial sum
             grain_start = i//grain_size*grain_size
             grain_end = min((i//grain_size+1)*grain_size, numberFilesToProcess)
@@ -720,10 +758,69 @@ class AlignAndFocusPowderFromFiles(DistributedDataProcessorAlgorithm):
                 self.__accumulate(partialsum_wkspname, finalname, partialsum_unfocusname, finalunfocusname,
                                   (not hasAccumulated) or i == 0)
 
+    def __processFilesInOrder(self, files, createUnfocused):
+        """process given files, with up to NumberOfThreads at the same time, and yield their workspaces in order
+        """
+        numberOfThreads = min(self.numberOfThreads, len(files))
+        if len(set(files)) < len(files):
+            numberOfThreads = 1  # the workspaces of a repeated file have the same names
+        determineCharacterizations = not self.useCaching
+        if numberOfThreads > 1 and determineCharacterizations:
+            # the characterizations are shared by the threads, so they can only be determined once if they are the
+            # same for every file
+            if self.__haveSameCharacterizations(files):
+                determineCharacterizations = False
+            else:
+                self.log().notice('The files have different characterizations so they are focused one at a time')
+                numberOfThreads = 1
+
+        def processFile(i):
+            return self.__processFile(files[i], self.prog_per_file * float(i), determineCharacterizations,
+                                      createUnfocused)
+
+        if numberOfThreads <= 1:
+            for i in range(len(files)):
+                yield processFile(i)
+            return
+
+        # at most numberOfThreads focused files wait to be accumulated
+        with ThreadPoolExecutor(max_workers=numberOfThreads) as executor:
+            pending = deque()
+            for i in range(len(files)):
+                pending.append(executor.submit(processFile, i))
+                if len(pending) == numberOfThreads:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def __haveSameCharacterizations(self, files):
+        """determine the characterizations of each file, stopping at the first that differs from the first file
+
+        @returns True if all of the files have the same characterizations, which are then the current ones
+        """
+        characterizations = None
+        for filename in files:
+            self.__determineCharacterizations(filename, self.__wkspNameFromFile(filename))
+            reductionProperties = self.__getReductionProperties()
+            if characterizations is None:
+                characterizations = reductionProperties
+            elif reductionProperties != characterizations:
+                return False
+        return True
+
+    def __getReductionProperties(self):
+        """@returns the values in the ReductionProperties manager as a dict of strings"""
+        name = self.getProperty('ReductionProperties').valueAsStr
+        if not PropertyManagerDataService.doesExist(name):
+            return {}
+        manager = PropertyManagerDataService.retrieve(name)
+        return {key: manager.getPropertyValue(key) for key in manager.keys()}
+
     def __saveSummedGroupToCache(self, group, wkspname):
         cache_file = self.__getGroupCacheName(group)
         if not os.path.exists(cache_file):
-            SaveNexusProcessed(InputWorkspace=wkspname, Filename=cache_file)
+            with self.cache.saving(cache_file) as filename:
+                SaveNexusProcessed(InputWorkspace=wkspname, Filename=filename)
         return
 
 
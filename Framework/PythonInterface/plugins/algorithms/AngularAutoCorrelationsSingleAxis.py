@@ -14,6 +14,8 @@ import numpy as np
 import re
 import time
 
+import trajectory_correlations
+
 
 class AngularAutoCorrelationsSingleAxis(PythonAlgorithm):
 
@@ -122,10 +124,8 @@ class AngularAutoCorrelationsSingleAxis(PythonAlgorithm):
         configuration=trajectory.variables["configuration"]
 
         # Extract useful simulation parameters
-        # Number of species present in the simulation
-        # n_species=len(elements)
         # Number of particles present in the simulation
-        n_particles=len(p_atoms)
+        n_particles=int(configuration.shape[1])
         # Number of molecules present in the simulation
         n_molecules=len(molecules)
         # Number of timesteps in the simulation
@@ -133,94 +133,46 @@ class AngularAutoCorrelationsSingleAxis(PythonAlgorithm):
         # Number of spatial dimensions
         n_dimensions=int(configuration.shape[2])
 
-        logger.information(str(time.time()-start_time) + " s")
-
-        logger.information("Transforming coordinates...")
-        start_time=time.time()
-
-        # Box size for each timestep. Shape: timesteps x (3 consecutive 3-vectors)
-        box_size=trajectory.variables["box_size"]
-
-        # Reshape the paralellepipeds into 3x3 tensors for coordinate transformations.
-        # Shape: (# of timesteps) x (3-vectors) x (# of spatial dimensions)
-        box_size_tensors=10.0*np.array([box_size[j].reshape((3,3)) for j in range(n_timesteps)])
-
-        # Extract box dimensions (assuming orthorhombic simulation cell, diagonal matrix)
-        box_size_x=np.array([box_size_tensors[i,0,0] for i in range(n_timesteps)])
-        box_size_y=np.array([box_size_tensors[i,1,1] for i in range(n_timesteps)])
-        box_size_z=np.array([box_size_tensors[i,2,2] for i in range(n_timesteps)])
+        # Find which constituents of each molecule belong to species one and which belong to species two
+        species_atoms=[[[j for j in molecules_to_atoms[i] if atoms_to_species[j]==species.lower()]
+                        for i in range(n_molecules)] for species in (type1,type2)]
+        for species,molecules_atoms in zip((type1,type2),species_atoms):
+            if not all(molecules_atoms):
+                raise RuntimeError('Species '+species+' is missing from some of the molecules in the trajectory file.')
 
-        # Copy the configuration object into a numpy array
-        configuration_copy=np.array([configuration[i] for i in range(n_timesteps)])
-
-        # Swap the time and particle axes
-        configuration_copy=np.swapaxes(configuration_copy,0,1)
-
-        # Transform particle trajectories (configuration array) to Cartesian coordinates at each time step.
-        cartesian_configuration=np.array([[np.dot(box_size_tensors[j],np.transpose(configuration_copy[i,j]))
-                                           for j in range(n_timesteps)] for i in range(n_particles)])
+        # Sparse matrices averaging the positions of species one and species two in each molecule
+        average_species_one=trajectory_correlations.group_average_matrix(species_atoms[0],n_particles)
+        average_species_two=trajectory_correlations.group_average_matrix(species_atoms[1],n_particles)
 
         logger.information(str(time.time()-start_time) + " s")
 
         logger.information("Calculating orientation vectors...")
         start_time=time.time()
 
+        # Box size for each timestep. Shape: timesteps x (3 consecutive 3-vectors)
+        box_size=trajectory.variables["box_size"]
+
         # Initialise orientation vector array. Shape: (# of molecules) x (# of timesteps) x (# of dimensions)
         orientation_vectors=np.zeros((n_molecules,n_timesteps,n_dimensions))
 
-        for i in range(n_molecules):
-            # Retrieve constituents of the ith molecule
-            temp=molecules_to_atoms[i]
-            # Find which constituents belong to species one and which belong to species two
-            species_one=[]
-            species_two=[]
-            for j in temp:
-                if atoms_to_species[j]==type1.lower():
-                    species_one.append(j)
-                if atoms_to_species[j]==type2.lower():
-                    species_two.append(j)
-            # Find the average positions and the orientation vector
-            sum_position_species_one=np.zeros((n_timesteps,n_dimensions))
-            sum_position_species_two=np.zeros((n_timesteps,n_dimensions))
-
-            for k in species_one:
-                sum_position_species_one+=cartesian_configuration[k]
-            for l in species_two:
-                sum_position_species_two+=cartesian_configuration[l]
-            avg_position_species_one=1.0*sum_position_species_one/len(species_one)
-            avg_position_species_two=1.0*sum_position_species_two/len(species_two)
-
-            # Find the vectors connecting the two atoms
-            vectors=avg_position_species_two-avg_position_species_one
-
-            # Scaled coordinates
-            diffX=np.divide(vectors[:,0],box_size_x)
-            diffY=np.divide(vectors[:,1],box_size_y)
-            diffZ=np.divide(vectors[:,2],box_size_z)
-
-            # Wrapping the vectors
-            vectorX=np.array([(diffX[k]-round(diffX[k]))*box_size_x[k] for k in range(n_timesteps)])
-            vectorY=np.array([(diffY[k]-round(diffY[k]))*box_size_y[k] for k in range(n_timesteps)])
-            vectorZ=np.array([(diffZ[k]-round(diffZ[k]))*box_size_z[k] for k in range(n_timesteps)])
-
-            # Normalisation
-            norm=np.sqrt(vectorX*vectorX+vectorY*vectorY+vectorZ*vectorZ)
-            vectorX=np.divide(vectorX,norm)
-            vectorY=np.divide(vectorY,norm)
-            vectorZ=np.divide(vectorZ,norm)
+        # Transform particle trajectories (configuration array) to Cartesian coordinates, in chunks of timesteps
+        for start,stop,cartesian_configuration,box_lengths in \
+                trajectory_correlations.cartesian_frames(configuration,box_size,box_scale=10.0):
+            avg_position_species_one=trajectory_correlations.group_average(average_species_one,cartesian_configuration)
+            avg_position_species_two=trajectory_correlations.group_average(average_species_two,cartesian_configuration)
+
+            # Find the vectors connecting the two atoms, wrapped and normalised
+            vectors=trajectory_correlations.minimum_image(avg_position_species_two-avg_position_species_one,box_lengths)
 
             # Store calculations in the orientation_vectors array
-            orientation_vectors[i]=np.swapaxes(np.array([vectorX,vectorY,vectorZ]),0,1)
+            orientation_vectors[:,start:stop]=trajectory_correlations.normalise(vectors)
 
         logger.information(str(time.time()-start_time) + " s")
 
         logger.information("Calculating angular auto-correlations...")
         start_time=time.time()
 
-        R_avg=np.zeros(n_timesteps)
-        for i in range(n_molecules):
-            R_avg+=self.auto_correlation(orientation_vectors[i])
-
+        R_avg=trajectory_correlations.auto_correlation_sum(orientation_vectors)/self.correlation_norm(n_timesteps)
         R_avg=1.0*R_avg/n_molecules
 
         logger.information(str(time.time()-start_time)+" s")
@@ -252,20 +204,12 @@ class AngularAutoCorrelationsSingleAxis(PythonAlgorithm):
                                      DataY=yvals,DataE=evals,NSpec=nrows,VerticalAxisUnit="Text",VerticalAxisValues=["FT Axis 1"])
         self.setProperty("OutputWorkspaceFT",FT_output_ws)
 
-    def auto_correlation(self, vector):
-        # Returns angular auto-correlation of a normalised time-dependent 3-vector
-        num=np.shape(vector)[0]
+    def correlation_norm(self,num):
+        # Returns the number of terms summed at each lag of a correlation of length num
         norm=np.arange(np.ceil(num/2.0),num+1)
         norm=np.append(norm,(np.arange(int(num/2)+1,num)[::-1]))
 
-        # x dimension
-        autoCorr=np.divide(np.correlate(vector[:,0],vector[:,0],"same"),norm)
-        # y dimension
-        autoCorr+=np.divide(np.correlate(vector[:,1],vector[:,1],"same"),norm)
-        # z dimension
-        autoCorr+=np.divide(np.correlate(vector[:,2],vector[:,2],"same"),norm)
-
-        return autoCorr
+        return norm
 
     def fold_correlation(self,omega):
         # Folds an array with symmetrical values into half by averaging values around the centre
@@ -14,6 +14,8 @@ import numpy as np
 import re
 import time
 
+import trajectory_correlations
+
 
 class AngularAutoCorrelationsTwoAxes(PythonAlgorithm):
 
@@ -124,10 +126,8 @@ class AngularAutoCorrelationsTwoAxes(PythonAlgorithm):
         configuration=trajectory.variables["configuration"]
 
         # Extract useful simulation parameters
-        # Number of species present in the simulation
-        # n_species=len(elements)
         # Number of particles present in the simulation
-        n_particles=len(p_atoms)
+        n_particles=int(configuration.shape[1])
         # Number of molecules present in the simulation
         n_molecules=len(molecules)
         # Number of timesteps in the simulation
@@ -135,137 +135,69 @@ class AngularAutoCorrelationsTwoAxes(PythonAlgorithm):
         # Number of spatial dimensions
         n_dimensions=int(configuration.shape[2])
 
-        logger.information(str(time.time()-start_time) + " s")
-
-        logger.information("Transforming coordinates...")
-        start_time=time.time()
-
-        # Box size for each timestep. Shape: timesteps x (3 consecutive 3-vectors)
-        box_size=trajectory.variables["box_size"]
+        # Find which constituents of each molecule belong to species one, species two and species three
+        species_atoms=[[[j for j in molecules_to_atoms[i] if atoms_to_species[j]==species] for i in range(n_molecules)]
+                       for species in types]
+        for species,molecules_atoms in zip(types,species_atoms):
+            if not all(molecules_atoms):
+                raise RuntimeError('Species '+species+' is missing from some of the molecules in the trajectory file.')
 
-        # Reshape the paralellepipeds into 3x3 tensors for coordinate transformations.
-        # Shape: (# of timesteps) x (3-vectors) x (# of spatial dimensions)
-        box_size_tensors=10.0*np.array([box_size[j].reshape((3,3)) for j in range(n_timesteps)])
-
-        # Extract box dimensions (assuming orthorhombic simulation cell, diagonal matrix)
-        box_size_x=np.array([box_size_tensors[i,0,0] for i in range(n_timesteps)])
-        box_size_y=np.array([box_size_tensors[i,1,1] for i in range(n_timesteps)])
-        box_size_z=np.array([box_size_tensors[i,2,2] for i in range(n_timesteps)])
-
-        # Copy the configuration object into a numpy array
-        configuration_copy=np.array([configuration[i] for i in range(n_timesteps)])
-
-        # Swap the time and particle axes
-        configuration_copy=np.swapaxes(configuration_copy,0,1)
-
-        # Transform particle trajectories (configuration array) to Cartesian coordinates at each time step.
-        cartesian_configuration=np.array([[np.dot(box_size_tensors[j],np.transpose(configuration_copy[i,j]))
-                                           for j in range(n_timesteps)] for i in range(n_particles)])
+        # Sparse matrices averaging the positions of species one and species two in each molecule,
+        # and choosing the 1st element of species three to build the 2nd vector
+        average_species_one=trajectory_correlations.group_average_matrix(species_atoms[0],n_particles)
+        average_species_two=trajectory_correlations.group_average_matrix(species_atoms[1],n_particles)
+        choose_species_three=trajectory_correlations.group_average_matrix([atoms[:1] for atoms in species_atoms[2]],
+                                                                          n_particles)
 
         logger.information(str(time.time()-start_time) + " s")
 
         logger.information("Calculating orientation vectors...")
         start_time=time.time()
 
+        # Box size for each timestep. Shape: timesteps x (3 consecutive 3-vectors)
+        box_size=trajectory.variables["box_size"]
+
         # Initialise orientation vector array. Shape: (# of molecules) x (# of timesteps) x (# of dimensions)
         orientation_vectors1=np.zeros((n_molecules,n_timesteps,n_dimensions))
         orientation_vectors2=np.zeros((n_molecules,n_timesteps,n_dimensions))
 
-        for i in range(n_molecules):
-            # Retrieve constituents of the ith molecule
-            temp=molecules_to_atoms[i]
-            # Find which constituents belong to species one, species two and species three
-            species_one=[]
-            species_two=[]
-            species_three=[]
-            for j in temp:
-                if atoms_to_species[j]==types[0]:
-                    species_one.append(j)
-                if atoms_to_species[j]==types[1]:
-                    species_two.append(j)
-                if atoms_to_species[j]==types[2]:
-                    species_three.append(j)
-            # Find the average positions of species one and two
-            sum_position_species_one=np.zeros((n_timesteps,n_dimensions))
-            sum_position_species_two=np.zeros((n_timesteps,n_dimensions))
-            for k in species_one:
-                sum_position_species_one+=cartesian_configuration[k]
-            for l in species_two:
-                sum_position_species_two+=cartesian_configuration[l]
-            avg_position_species_one=1.0*sum_position_species_one/float(len(species_one))
-            avg_position_species_two=1.0*sum_position_species_two/float(len(species_two))
-            # Choose the 1st element of species_three to build the 2nd vector
-            position_species_three=1.0*cartesian_configuration[species_three[0]]
+        # Transform particle trajectories (configuration array) to Cartesian coordinates, in chunks of timesteps
+        for start,stop,cartesian_configuration,box_lengths in \
+                trajectory_correlations.cartesian_frames(configuration,box_size,box_scale=10.0):
+            avg_position_species_one=trajectory_correlations.group_average(average_species_one,cartesian_configuration)
+            avg_position_species_two=trajectory_correlations.group_average(average_species_two,cartesian_configuration)
+            position_species_three=trajectory_correlations.group_average(choose_species_three,cartesian_configuration)
 
             # Find the vectors connecting average positions of species one and species two
-            vectors1=avg_position_species_two-avg_position_species_one
-
-            # Find the vector to the third atom
-            vectors2=position_species_three-avg_position_species_two
-
-            diffX1=np.divide(vectors1[:,0],box_size_x)
-            diffY1=np.divide(vectors1[:,1],box_size_y)
-            diffZ1=np.divide(vectors1[:,2],box_size_z)
-
-            diffX2=np.divide(vectors2[:,0],box_size_x)
-            diffY2=np.divide(vectors2[:,1],box_size_y)
-            diffZ2=np.divide(vectors2[:,2],box_size_z)
-
-            # Wrapping the vectors
-            vectorX1=np.array([(diffX1[k]-round(diffX1[k]))*box_size_x[k] for k in range(n_timesteps)])
-            vectorY1=np.array([(diffY1[k]-round(diffY1[k]))*box_size_y[k] for k in range(n_timesteps)])
-            vectorZ1=np.array([(diffZ1[k]-round(diffZ1[k]))*box_size_z[k] for k in range(n_timesteps)])
-
-            vectorX2=np.array([(diffX2[k]-round(diffX2[k]))*box_size_x[k] for k in range(n_timesteps)])
-            vectorY2=np.array([(diffY2[k]-round(diffY2[k]))*box_size_y[k] for k in range(n_timesteps)])
-            vectorZ2=np.array([(diffZ2[k]-round(diffZ2[k]))*box_size_z[k] for k in range(n_timesteps)])
-
-            # Normalisation
-            norm1=np.sqrt(vectorX1*vectorX1+vectorY1*vectorY1+vectorZ1*vectorZ1)
-            vectorX1=np.divide(vectorX1,norm1)
-            vectorY1=np.divide(vectorY1,norm1)
-            vectorZ1=np.divide(vectorZ1,norm1)
-
-            norm2=np.sqrt(vectorX2*vectorX2+vectorY2*vectorY2+vectorZ2*vectorZ2)
-            vectorX2=np.divide(vectorX2,norm2)
-            vectorY2=np.divide(vectorY2,norm2)
-            vectorZ2=np.divide(vectorZ2,norm2)
+            # and the vector to the third atom, wrapped and normalised
+            vectors1=trajectory_correlations.minimum_image(avg_position_species_two-avg_position_species_one,box_lengths)
+            vectors2=trajectory_correlations.minimum_image(position_species_three-avg_position_species_two,box_lengths)
+            vectors1=trajectory_correlations.normalise(vectors1)
+            vectors2=trajectory_correlations.normalise(vectors2)
 
             # Dot product
-            cosine=np.multiply(vectorX1,vectorX2)+np.multiply(vectorY1,vectorY2)+np.multiply(vectorZ1,vectorZ2)
-
-            # Gram-Schmidt orthogonalisation process
-            vectorX2=vectorX2-np.divide(vectorX1,cosine)
-            vectorY2=vectorY2-np.divide(vectorY1,cosine)
-            vectorZ2=vectorZ2-np.divide(vectorZ1,cosine)
+            cosine=np.sum(vectors1*vectors2,axis=2,keepdims=True)
 
-            # Renormalisation of the 2nd vector
-            norm2=np.sqrt(vectorX2*vectorX2+vectorY2*vectorY2+vectorZ2*vectorZ2)
-            vectorX2=np.divide(vectorX2,norm2)
-            vectorY2=np.divide(vectorY2,norm2)
-            vectorZ2=np.divide(vectorZ2,norm2)
+            # Gram-Schmidt orthogonalisation process and renormalisation of the 2nd vector
+            vectors2=trajectory_correlations.normalise(vectors2-np.divide(vectors1,cosine))
 
             # Store calculations in the orientation_vectors1 and orientation_vectors2 arrays
-            orientation_vectors1[i]=np.swapaxes(np.array([vectorX1,vectorY1,vectorZ1]),0,1)
-            orientation_vectors2[i]=np.swapaxes(np.array([vectorX2,vectorY2,vectorZ2]),0,1)
+            orientation_vectors1[:,start:stop]=vectors1
+            orientation_vectors2[:,start:stop]=vectors2
 
         logger.information(str(time.time()-start_time) + " s")
 
         logger.information("Calculating angular auto-correlations...")
         start_time=time.time()
 
-        # First axis
-        R_avg_axis1=np.zeros(n_timesteps)
-        for i in range(n_molecules):
-            R_avg_axis1+=self.auto_correlation(orientation_vectors1[i])
+        norm=self.correlation_norm(n_timesteps)
 
+        # First axis
+        R_avg_axis1=trajectory_correlations.auto_correlation_sum(orientation_vectors1)/norm
         R_avg_axis1=1.0*R_avg_axis1/n_molecules
 
         # Second axis
-        R_avg_axis2=np.zeros(n_timesteps)
-        for i in range(n_molecules):
-            R_avg_axis2+=self.auto_correlation(orientation_vectors2[i])
-
+        R_avg_axis2=trajectory_correlations.auto_correlation_sum(orientation_vectors2)/norm
         R_avg_axis2=1.0*R_avg_axis2/n_molecules
 
         logger.information(str(time.time()-start_time)+" s")
@@ -298,20 +230,12 @@ class AngularAutoCorrelationsTwoAxes(PythonAlgorithm):
                                      DataE=evals,NSpec=nrows,VerticalAxisUnit="Text",VerticalAxisValues=["FT Axis 1","FT Axis 2"])
         self.setProperty("OutputWorkspaceFT",FT_output_ws)
 
-    def auto_correlation(self, vector):
-        # Returns angular auto-correlation of a normalised time-dependent 3-vector
-        num=np.shape(vector)[0]
+    def correlation_norm(self,num):
+        # Returns the number of terms summed at each lag of a correlation of length num
         norm=np.arange(np.ceil(num/2.0),num+1)
         norm=np.append(norm,(np.arange(int(num/2)+1,num)[::-1]))
 
-        # x dimension
-        autoCorr=np.divide(np.correlate(vector[:,0],vector[:,0],"same"),norm)
-        # y dimension
-        autoCorr+=np.divide(np.correlate(vector[:,1],vector[:,1],"same"),norm)
-        # z dimension
-        autoCorr+=np.divide(np.correlate(vector[:,2],vector[:,2],"same"),norm)
-
-        return autoCorr
+        return norm
 
     def fold_correlation(self,omega):
         # Folds an array with symmetrical values into half by averaging values around the centre
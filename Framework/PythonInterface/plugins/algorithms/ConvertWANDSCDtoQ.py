@@ -7,10 +7,17 @@
 from mantid.api import (PythonAlgorithm, AlgorithmFactory,
                         PropertyMode, WorkspaceProperty, Progress,
                         IMDHistoWorkspaceProperty, mtd)
-from mantid.kernel import Direction, FloatArrayProperty, FloatArrayLengthValidator, StringListValidator, FloatBoundedValidator
+from mantid.kernel import (Direction, FloatArrayProperty, FloatArrayLengthValidator, StringListValidator, FloatBoundedValidator,
+                           IntBoundedValidator)
 from mantid import config
 from mantid import logger
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
+import os
+
+# Maximum number of pixel entries binned at a time by each thread
+MAX_CHUNK_ENTRIES = 2**24
 
 
 class ConvertWANDSCDtoQ(PythonAlgorithm):
@@ -68,6 +75,9 @@ class ConvertWANDSCDtoQ(PythonAlgorithm):
                              "If True the normalization and data workspaces in addition to the normalized data will be outputted")
         self.declareProperty("ObliquityParallaxCoefficient", 1.0, validator=FloatBoundedValidator(0.0),
                              doc="Geometrical correction for shift in vertical beam position due to wide beam.")
+        self.declareProperty("NumberOfThreads", 1, validator=IntBoundedValidator(lower=0),
+                             doc="Number of threads to bin the scan points with, 0 uses all cores. With more than one "
+                             "thread chunks of scan points are binned into partial volumes which are summed at the end.")
         self.declareProperty(WorkspaceProperty("OutputWorkspace", "",
                                                optional=PropertyMode.Mandatory,
                                                direction=Direction.Output),
@@ -291,19 +301,47 @@ class ConvertWANDSCDtoQ(PythonAlgorithm):
         assert not data_array[:,:,0].ravel('F').flags.owndata
         assert data_array[:,:,0].flags.fnc
 
-        for n in range(number_of_runs):
-            R = inWS.getExperimentInfo(0).run().getGoniometer(n).getR()
-            RUBW = np.dot(R,UBW)
-            q = np.round(np.dot(np.linalg.inv(RUBW),qlab.T)/bin_size-offset).astype(np.int)
-            q_index = np.ravel_multi_index(q, (dim0_bins+2, dim1_bins+2, dim2_bins+2), mode='clip')
-            q_uniq, inverse = np.unique(q_index, return_inverse=True)
-            outputr[q_uniq] += np.bincount(inverse, data_array[:,:,n].ravel('F'))
-            output_scaler[q_uniq] += np.bincount(inverse)*scale[n]
-            if _norm:
-                output_normr[q_uniq] += np.bincount(inverse, norm_array.ravel('F'))
-                output_norm_scaler[q_uniq] += np.bincount(inverse)
-
-            progress.report()
+        shape = output.shape
+        rotations = [inWS.getExperimentInfo(0).run().getGoniometer(n).getR() for n in range(number_of_runs)]
+        number_of_threads = self.getProperty("NumberOfThreads").value or os.cpu_count() or 1
+
+        if number_of_threads == 1:
+            for n in range(number_of_runs):
+                RUBW = np.dot(rotations[n],UBW)
+                q = np.round(np.dot(np.linalg.inv(RUBW),qlab.T)/bin_size-offset).astype(np.int)
+                q_index = np.ravel_multi_index(q, shape, mode='clip')
+                q_uniq, inverse = np.unique(q_index, return_inverse=True)
+                outputr[q_uniq] += np.bincount(inverse, data_array[:,:,n].ravel('F'))
+                output_scaler[q_uniq] += np.bincount(inverse)*scale[n]
+                if _norm:
+                    output_normr[q_uniq] += np.bincount(inverse, norm_array.ravel('F'))
+                    output_norm_scaler[q_uniq] += np.bincount(inverse)
+
+                progress.report()
+        else:
+            runs_per_chunk = max(1, min(MAX_CHUNK_ENTRIES // len(qlab), -(-number_of_runs // number_of_threads)))
+            chunks = deque(range(start, min(start+runs_per_chunk, number_of_runs))
+                           for start in range(0, number_of_runs, runs_per_chunk))
+            norm_values = norm_array.ravel('F') if _norm else None
+
+            def bin_chunk(runs):
+                return bin_scan_points(runs, rotations, qlab, UBW, bin_size, offset, shape, data_array, scale, norm_values)
+
+            # At most number_of_threads partial volumes are held at a time, and they are summed in order
+            with ThreadPoolExecutor(max_workers=number_of_threads) as executor:
+                pending = deque()
+                while chunks or pending:
+                    while chunks and len(pending) < number_of_threads:
+                        runs = chunks.popleft()
+                        pending.append((len(runs), executor.submit(bin_chunk, runs)))
+                    n_runs, future = pending.popleft()
+                    signal, scaled, norm, counts = future.result()
+                    outputr += signal
+                    output_scaler += scaled
+                    if _norm:
+                        output_normr += norm
+                        output_norm_scaler += counts
+                    progress.reportIncrement(n_runs, 'Calculating Q volume')
 
         if _norm:
             output *= output_norm_scale*norm_scale
@@ -378,4 +416,38 @@ class ConvertWANDSCDtoQ(PythonAlgorithm):
         self.setProperty("OutputWorkspace", outWS)
 
 
+def bin_scan_points(runs, rotations, qlab, UBW, bin_size, offset, shape, data_array, scale, norm_values=None):
+    """
+    Bin a chunk of scan points into a partial Q volume, without finding the occupied bins of each scan point first.
+    The projection of the pixels is calculated once for each distinct goniometer setting of the chunk.
+
+    :param runs: the scan indices of the chunk
+    :param rotations: the goniometer rotation matrix of every scan point
+    :param qlab: the Q lab vector of each pixel
+    :param shape: the shape of the output volume including the overflow bins
+    :param data_array: the signal array of the input workspace, pixels x scan points
+    :param scale: the normalisation scale of every scan point
+    :param norm_values: the normalisation signal of each pixel, None if there is no normalisation
+    :return: flattened (signal, scale, normalisation, pixel counts) volumes, the normalisation is None if not used
+    """
+    projected = {}
+    q_indices = []
+    for n in runs:
+        key = rotations[n].tobytes()
+        if key not in projected:
+            RUBW = np.dot(rotations[n],UBW)
+            q = np.round(np.dot(np.linalg.inv(RUBW),qlab.T)/bin_size-offset).astype(int)
+            projected[key] = np.ravel_multi_index(q, shape, mode='clip')
+        q_indices.append(projected[key])
+    q_index = np.concatenate(q_indices)
+    size = np.prod(shape)
+    n_pixels = len(q_indices[0])
+
+    signal = np.bincount(q_index, np.concatenate([data_array[:,:,n].ravel('F') for n in runs]), minlength=size)
+    scaled = np.bincount(q_index, np.repeat(scale[list(runs)], n_pixels), minlength=size)
+    counts = np.bincount(q_index, minlength=size)
+    norm = None if norm_values is None else np.bincount(q_index, np.tile(norm_values, len(runs)), minlength=size)
+    return signal, scaled, norm, counts
+
+
 AlgorithmFactory.subscribe(ConvertWANDSCDtoQ)
@@ -6,6 +6,8 @@
 # SPDX - License - Identifier: GPL - 3.0 +
 #pylint: disable=no-init,too-many-locals,too-many-instance-attributes,too-many-arguments,invalid-name
 import math
+import os
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 from mantid.simpleapi import *
 from mantid.api import (PythonAlgorithm, AlgorithmFactory, PropertyMode, MatrixWorkspaceProperty,
@@ -241,20 +243,17 @@ class CylinderPaalmanPingsCorrection(PythonAlgorithm):
         self._get_angles()
         self._transmission()
 
-        dataA1 = []
-        dataA2 = []
-        dataA3 = []
-        dataA4 = []
-
-        data_prog = Progress(self, start=0.1, end=0.85, nreports=len(self._angles))
-        for angle in self._angles:
-            (A1, A2, A3, A4) = self._cyl_abs(angle)
-            logger.information('Angle : %f * successful' % angle)
-            data_prog.report('Appending data for angle %f' % angle)
-            dataA1 = np.append(dataA1, A1)
-            dataA2 = np.append(dataA2, A2)
-            dataA3 = np.append(dataA3, A3)
-            dataA4 = np.append(dataA4, A4)
+        # The detector angles are independent, so chunks of them are calculated in parallel
+        number_chunks = min(len(self._angles), os.cpu_count() or 1)
+        angle_chunks = np.array_split(np.asarray(self._angles), number_chunks)
+        data_prog = Progress(self, start=0.1, end=0.85, nreports=number_chunks)
+        results = []
+        with ThreadPoolExecutor(max_workers=number_chunks) as executor:
+            for angles, result in zip(angle_chunks, executor.map(self._cyl_abs, angle_chunks)):
+                logger.information('Angles : %f to %f * successful' % (angles[0], angles[-1]))
+                data_prog.report('Calculated data for %i angles' % len(angles))
+                results.append(result)
+        (dataA1, dataA2, dataA3, dataA4) = [np.concatenate([result[i] for result in results]).ravel() for i in range(4)]
 
         dataX = self._waves * len(self._angles)
 
@@ -589,7 +588,7 @@ class CylinderPaalmanPingsCorrection(PythonAlgorithm):
 
 #------------------------------------------------------------------------------
 
-    def _cyl_abs(self, angle):
+    def _cyl_abs(self, angles):
         #  Parameters :
         #  self._step_size - step size
         #  self._beam - beam parameters
@@ -598,44 +597,34 @@ class CylinderPaalmanPingsCorrection(PythonAlgorithm):
         #  density - list of densities (for each annulus)
         #  sigs - list of scattering cross-sections (for each annulus)
         #  siga - list of absorption cross-sections (for each annulus)
-        #  angle - list of angles
+        #  angles - array of detector angles
         #  wavelas - elastic wavelength
         #  waves - list of wavelengths
         #  Output parameters :  A1 - Ass ; A2 - Assc ; A3 - Acsc ; A4 - Acc
+        #  each of shape (angles, wavelengths)
 
-        amu_scat = np.zeros(self._number_can)
         amu_scat = self._density*self._sig_s
-        sig_abs = np.zeros(self._number_can)
         sig_abs = self._density*self._sig_a
-        amu_tot_i = np.zeros(self._number_can)
-        amu_tot_s = np.zeros(self._number_can)
-
-        theta = angle*math.pi/180.
-        A1 = []
-        A2 = []
-        A3 = []
-        A4 = []
-        #loop over wavelengths
-        for wave in self._waves:
-            #loop over annuli
-            if self._emode == 'Elastic':
-                amu_tot_i = amu_scat + sig_abs*self._elastic/1.7979
-                amu_tot_s = amu_scat + sig_abs*self._elastic/1.7979
-            elif self._emode == 'Direct':
-                amu_tot_i = amu_scat + sig_abs*self._fixed/1.7979
-                amu_tot_s = amu_scat + sig_abs*wave/1.7979
-            elif self._emode == 'Indirect':
-                amu_tot_i = amu_scat + sig_abs*wave/1.7979
-                amu_tot_s = amu_scat + sig_abs*self._fixed/1.7979
-            elif self._emode == 'Efixed':
-                amu_tot_i = amu_scat + sig_abs*self._fixed/1.7979
-                amu_tot_s = amu_scat + sig_abs*self._fixed/1.7979
-            (Ass, Assc, Acsc, Acc) = self._acyl(theta, amu_scat, amu_tot_i, amu_tot_s)
-            A1.append(Ass)
-            A2.append(Assc)
-            A3.append(Acsc)
-            A4.append(Acc)
-        return A1, A2, A3, A4
+
+        waves = np.asarray(self._waves, dtype=float)
+        if self._emode == 'Elastic':
+            wave_i = np.full_like(waves, self._elastic)
+            wave_s = wave_i
+        elif self._emode == 'Direct':
+            wave_i = np.full_like(waves, self._fixed)
+            wave_s = waves
+        elif self._emode == 'Indirect':
+            wave_i = waves
+            wave_s = np.full_like(waves, self._fixed)
+        else:
+            wave_i = np.full_like(waves, self._fixed)
+            wave_s = wave_i
+        # attenuation coefficients for each wavelength and annulus
+        amu_tot_i = amu_scat + sig_abs*wave_i[:, np.newaxis]/1.7979
+        amu_tot_s = amu_scat + sig_abs*wave_s[:, np.newaxis]/1.7979
+
+        theta = np.asarray(angles, dtype=float)*math.pi/180.
+        return self._acyl(theta, amu_scat, amu_tot_i, amu_tot_s)
 
 #------------------------------------------------------------------------------
 
@@ -689,94 +678,82 @@ class CylinderPaalmanPingsCorrection(PythonAlgorithm):
             Area_C = Area_A + Area_B
             Acsc = (AAAA + AAAB)/Area_C
             Acc = (BBBA + BBBB)/Area_C
-        return Ass, Assc, Acsc, Acc
+        zeros = np.zeros((len(theta), amu_tot_i.shape[0]))
+        return tuple(zeros + factor for factor in (Ass, Assc, Acsc, Acc))
 
 #------------------------------------------------------------------------------
 
     def _sum_rom(self, n_scat, n_abs, a, r1, r2, ms, theta, amu_scat, amu_tot_i, amu_tot_s):
         #n_scat is region for scattering
         #n_abs is region for absorption
+        #theta is an array of angles, amu_tot_i and amu_tot_s are arrays of wavelengths x annuli
+        #returns the sums as arrays of angles x wavelengths
         nan = self._number_can
         omega_add = 0.
         if a < 0.:
             omega_add = math.pi
-        AAA = 0.
-        BBB = 0.
-        Area = 0.
         theta_deg = math.pi - theta
-        num = ms
         r_step = (r2 - r1)/ms
         r_add = -0.5*r_step + r1
 
-# start loop over M
-        for M in range(1, num+1):
-            r = M*r_step + r_add
-            number_omega = int(math.pi*r/r_step)
-            omega_ster = math.pi/number_omega
-            omega_deg = -0.5*omega_ster + omega_add
-            Area_y = r*r_step*omega_ster*amu_scat[n_scat]
-            sum_1 = 0.
-            sum_2 = 0.
-            I = 1
-            Area_sum = 0.
-            for _ in range(1, number_omega +1):
-                omega = I*omega_ster + omega_deg
-                distance = r*math.sin(omega)
-
-                skip = True
-                if abs(distance) <= a:
-#
-# CALCULATE DISTANCE INCIDENT NEUTRON PASSES THROUGH EACH ANNULUS
-                    LIS = []
-                    for j in range(0, nan):
-                        LIST = self._distance(r, self._radii[j], omega)
-                        LISN = self._distance(r, self._radii[j+1], omega)
-                        LIS.append(LISN - LIST)
-#
-# CALCULATE DISTANCE SCATTERED NEUTRON PASSES THROUGH EACH ANNULUS
-                    O = omega + theta_deg
-                    LSS = []
-                    for j in range(0, nan):
-                        LSST = self._distance(r, self._radii[j], O)
-                        LSSN = self._distance(r, self._radii[j+1], O)
-                        LSS.append(LSSN - LSST)
-#
-# CALCULATE ABSORPTION FOR PATH THROUGH ALL ANNULI,AND THROUGH INNER ANNULI
-                    path = np.zeros(3)
-#	split into input (I) and scattered (S) paths
-                    path[0] += amu_tot_i[0]*LIS[0] + amu_tot_s[0]*LSS[0]
-                    if nan == 2:
-                        path[2] += amu_tot_i[1]*LIS[1] + amu_tot_s[1]*LSS[1]
-                        path[1] = path[0] + path[2]
-                    sum_1 += math.exp(-path[n_abs])
-                    sum_2 += math.exp(-path[n_abs +1])
-                    Area_sum += 1.0
-                    skip = False
-
-                if skip:
-                    I = number_omega -I +2
-                else:
-                    I += 1
-        AAA += sum_1*Area_y
-        BBB += sum_2*Area_y
-        Area += Area_sum*Area_y
+# the sums are reset for each radial step M, so only the last step, M = ms, contributes
+        r = ms*r_step + r_add
+        number_omega = int(math.pi*r/r_step)
+        omega_ster = math.pi/number_omega
+        omega_deg = -0.5*omega_ster + omega_add
+        Area_y = r*r_step*omega_ster*amu_scat[n_scat]
+
+# the omega steps visited only depend on the geometry, and are the same for all angles and wavelengths
+        omegas = []
+        I = 1
+        for _ in range(1, number_omega +1):
+            omega = I*omega_ster + omega_deg
+            if abs(r*math.sin(omega)) <= a:
+                omegas.append(omega)
+                I += 1
+            else:
+                I = number_omega -I +2
+        omega = np.array(omegas)
+
+# CALCULATE DISTANCE INCIDENT NEUTRON PASSES THROUGH EACH ANNULUS. Shape: annuli x omega
+        LIS = [self._distance(r, self._radii[j+1], omega) - self._distance(r, self._radii[j], omega) for j in range(0, nan)]
+# CALCULATE DISTANCE SCATTERED NEUTRON PASSES THROUGH EACH ANNULUS. Shape: annuli x angles x omega
+        O = omega[np.newaxis, :] + theta_deg[:, np.newaxis]
+        LSS = [self._distance(r, self._radii[j+1], O) - self._distance(r, self._radii[j], O) for j in range(0, nan)]
+
+        def annulus_path(j):
+            # split into input (I) and scattered (S) paths
+            return (amu_tot_i[np.newaxis, :, j, np.newaxis]*LIS[j][np.newaxis, np.newaxis, :]
+                    + amu_tot_s[np.newaxis, :, j, np.newaxis]*LSS[j][:, np.newaxis, :])
+
+# CALCULATE ABSORPTION FOR PATH THROUGH ALL ANNULI,AND THROUGH INNER ANNULI. Shape: angles x wavelengths x omega
+        path = [annulus_path(0), 0., 0.]
+        if nan == 2:
+            path[2] = annulus_path(1)
+            path[1] = path[0] + path[2]
+        shape = (len(theta), amu_tot_i.shape[0], len(omega))
+        sum_1 = np.sum(np.exp(-np.broadcast_to(path[n_abs], shape)), axis=2)
+        sum_2 = np.sum(np.exp(-np.broadcast_to(path[n_abs +1], shape)), axis=2)
+        Area_sum = float(len(omega))
+
+        AAA = sum_1*Area_y
+        BBB = sum_2*Area_y
+        Area = Area_sum*Area_y
         return AAA, BBB, Area
 
 #------------------------------------------------------------------------------
 
     def _distance(self, r1, radius, omega):
         r = r1
-        distance = 0.
-        b = r*math.sin(omega)
-        if abs(b) < radius:
-            t = r*math.cos(omega)
-            c = radius*radius -b*b
-            d = math.sqrt(c)
-            if r <= radius:
-                distance = t + d
-            else:
-                distance = d*(1.0 + math.copysign(1.0, t))
-        return distance
+        b = r*np.sin(omega)
+        t = r*np.cos(omega)
+        inside = np.abs(b) < radius
+        d = np.sqrt(np.where(inside, radius*radius -b*b, 0.))
+        if r <= radius:
+            distance = t + d
+        else:
+            distance = d*(1.0 + np.copysign(1.0, t))
+        return np.where(inside, distance, 0.)
 
 #------------------------------------------------------------------------------
 
@@ -9,6 +9,7 @@ from mantid.kernel import (Direction, EnabledWhenProperty, PropertyCriterion, Pr
                            FloatArrayProperty, FloatBoundedValidator)
 from mantid.geometry import SpaceGroupFactory
 from mantid import logger
+from fractions import Fraction
 import numpy as np
 from scipy import ndimage
 
@@ -196,11 +197,11 @@ class DeltaPDF3D(PythonAlgorithm):
         signal[np.isnan(signal)]=0
         signal[np.isinf(signal)]=0
 
-        signal=np.fft.fftshift(np.fft.fftn(np.fft.ifftshift(signal)))
         number_of_bins = signal.shape
+        signal = real_shifted_fft(signal)
 
         # CreateMDHistoWorkspace expects Fortan `column-major` ordering
-        signal = signal.real.flatten('F')
+        signal = signal.flatten('F')
 
         createWS_alg = self.createChildAlgorithm("CreateMDHistoWorkspace", enableLogging=False)
         createWS_alg.setProperty("SignalInput", signal)
@@ -244,28 +245,30 @@ class DeltaPDF3D(PythonAlgorithm):
         else:
             check_space_group = False
 
+        h = np.arange(int(np.ceil(Xmin)), int(Xmax)+1)
+        k = np.arange(int(np.ceil(Ymin)), int(Ymax)+1)
+        l = np.arange(int(np.ceil(Zmin)), int(Zmax)+1)
+        if check_space_group:
+            allowed = allowed_reflections(sg, h.reshape((-1,1,1)), k.reshape((-1,1)), l)
+        else:
+            allowed = np.ones((len(h), len(k), len(l)), dtype=bool)
+
         if cut_shape == 'cube':
-            for h in range(int(np.ceil(Xmin)), int(Xmax)+1):
-                for k in range(int(np.ceil(Ymin)), int(Ymax)+1):
-                    for l in range(int(np.ceil(Zmin)), int(Zmax)+1):
-                        if not check_space_group or sg.isAllowedReflection([h,k,l]):
-                            signal[int((h-size[0]-Xmin)/Xwidth+1):int((h+size[0]-Xmin)/Xwidth),
-                                   int((k-size[1]-Ymin)/Ywidth+1):int((k+size[1]-Ymin)/Ywidth),
-                                   int((l-size[2]-Zmin)/Zwidth+1):int((l+size[2]-Zmin)/Zwidth)]=np.nan
+            mask = reflection_mask(allowed,
+                                   reflection_boxes(h, size[0], Xmin, Xwidth, signal.shape[0]),
+                                   reflection_boxes(k, size[1], Ymin, Ywidth, signal.shape[1]),
+                                   reflection_boxes(l, size[2], Zmin, Zwidth, signal.shape[2]))
         else:  # sphere
             mask=((X-np.round(X))**2/size[0]**2 + (Y-np.round(Y))**2/size[1]**2 + (Z-np.round(Z))**2/size[2]**2 < 1)
 
             # Unmask invalid reflections
             if check_space_group:
-                for h in range(int(np.ceil(Xmin)), int(Xmax)+1):
-                    for k in range(int(np.ceil(Ymin)), int(Ymax)+1):
-                        for l in range(int(np.ceil(Zmin)), int(Zmax)+1):
-                            if not sg.isAllowedReflection([h,k,l]):
-                                mask[int((h-0.5-Xmin)/Xwidth+1):int((h+0.5-Xmin)/Xwidth),
-                                     int((k-0.5-Ymin)/Ywidth+1):int((k+0.5-Ymin)/Ywidth),
-                                     int((l-0.5-Zmin)/Zwidth+1):int((l+0.5-Zmin)/Zwidth)]=False
+                mask &= ~reflection_mask(~allowed,
+                                         reflection_boxes(h, 0.5, Xmin, Xwidth, signal.shape[0]),
+                                         reflection_boxes(k, 0.5, Ymin, Ywidth, signal.shape[1]),
+                                         reflection_boxes(l, 0.5, Zmin, Zwidth, signal.shape[2]))
 
-            signal[mask]=np.nan
+        signal[mask]=np.nan
 
         return signal
 
@@ -394,4 +397,83 @@ class DeltaPDF3D(PythonAlgorithm):
         return np.kaiser(width[0], beta).reshape((-1,1,1)) * np.kaiser(width[1], beta).reshape((-1,1)) * np.kaiser(width[2], beta)
 
 
+def allowed_reflections(space_group, h, k, l):
+    """
+    Returns SpaceGroup.isAllowedReflection for all the reflections of the broadcast arrays h, k and l at once.
+
+    As in SpaceGroup.isAllowedReflection, a reflection is forbidden if it is invariant under a symmetry operation
+    with a translation, and its phase shift by the reduced translation of the operation is not an integer.
+    """
+    allowed = np.ones(np.broadcast(h, k, l).shape, dtype=bool)
+    axes = np.identity(3)
+    for operation in space_group.getSymmetryOperations():
+        vector = np.array(operation.transformCoordinates([0, 0, 0]))
+        if not vector.any():
+            continue
+        matrix = np.rint(np.array([operation.transformCoordinates(axis) for axis in axes]) - vector).astype(int).T
+        hkl_matrix = np.rint(np.array([operation.transformHKL(axis) for axis in axes])).astype(int).T
+
+        # The reduced translation, (1 + W + ... + W^(order - 1)) w / order, calculated with exact fractions
+        order = operation.getOrder()
+        translation = sum(np.linalg.matrix_power(matrix, i) for i in range(order))
+        fractions = [Fraction(value).limit_denominator(1000) for value in vector]
+        reduced = [float(sum(int(translation[i, j])*fractions[j] for j in range(3))/order) for i in range(3)]
+
+        phase = h*reduced[0] + k*reduced[1] + l*reduced[2]
+        invariant = ((hkl_matrix[0, 0]-1)*h + hkl_matrix[0, 1]*k + hkl_matrix[0, 2]*l == 0) \
+            & (hkl_matrix[1, 0]*h + (hkl_matrix[1, 1]-1)*k + hkl_matrix[1, 2]*l == 0) \
+            & (hkl_matrix[2, 0]*h + hkl_matrix[2, 1]*k + (hkl_matrix[2, 2]-1)*l == 0)
+        allowed &= ~(invariant & (np.abs(np.fmod(np.abs(phase) + 1e-15, 1.0)) > 1e-14))
+    return allowed
+
+
+def reflection_boxes(indices, half_width, minimum, bin_width, number_of_bins):
+    """
+    Returns which bins along a dimension are within half_width of each integer index, as a boolean array of
+    indices x bins
+    """
+    bins = np.arange(number_of_bins)
+    boxes = np.zeros((len(indices), number_of_bins), dtype=bool)
+    for n, index in enumerate(indices):
+        boxes[n, bins[int((index-half_width-minimum)/bin_width+1):int((index+half_width-minimum)/bin_width)]] = True
+    return boxes
+
+
+def reflection_mask(selected, boxes_x, boxes_y, boxes_z):
+    """
+    Returns the mask of all bins within the box around any of the selected reflections
+    :param selected: boolean array of h x k x l
+    :param boxes_x: boolean array of h x bins from reflection_boxes, likewise boxes_y and boxes_z for k and l
+    """
+    # count the boxes containing each bin, one dimension at a time
+    counts = np.tensordot(selected.astype(np.float32), boxes_z.astype(np.float32), axes=(2, 0))
+    counts = np.tensordot(counts, boxes_y.astype(np.float32), axes=(1, 0))
+    counts = np.tensordot(boxes_x.astype(np.float32), counts, axes=(0, 0))
+    return counts.transpose((0, 2, 1)) > 0
+
+
+def real_shifted_fft(signal):
+    """
+    Returns the real part of fftshift(fftn(ifftshift(signal))) for a real signal.
+
+    Only half of the spectrum is calculated, with a real to complex transform, and the other half follows from
+    the symmetry of the transform of a real signal, F(-q) = F(q)*. The output is filled in the shifted order
+    directly, so no complex copy of the whole spectrum is needed.
+    """
+    shape = signal.shape
+    half_spectrum = np.fft.rfftn(np.fft.ifftshift(signal))
+    half = half_spectrum.real
+
+    # the frequency index at each position of the shifted output, and its negative
+    frequencies = [(np.arange(n) - n//2) % n for n in shape]
+    negative = [(-f) % n for f, n in zip(frequencies, shape)]
+    in_half = frequencies[-1] < half.shape[-1]
+
+    output = np.empty(shape)
+    positions = np.arange(shape[-1])
+    output[..., positions[in_half]] = half[np.ix_(frequencies[0], frequencies[1], frequencies[2][in_half])]
+    output[..., positions[~in_half]] = half[np.ix_(negative[0], negative[1], negative[2][~in_half])]
+    return output
+
+
 AlgorithmFactory.subscribe(DeltaPDF3D)
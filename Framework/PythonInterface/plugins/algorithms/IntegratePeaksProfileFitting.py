@@ -13,6 +13,7 @@ from mantid.kernel import *
 from mantid.api import *
 from mantid.simpleapi import *
 import numpy as np
+import os
 
 
 class IntegratePeaksProfileFitting(PythonAlgorithm):
@@ -64,6 +65,16 @@ class IntegratePeaksProfileFitting(PythonAlgorithm):
 
         self.declareProperty("DQMax", defaultValue=0.15, doc="Largest total side length (in Angstrom) to consider for profile fitting.")
         self.declareProperty("PeakNumber", defaultValue=-1,  doc="Which Peak to fit.  Leave negative for all.")
+        self.declareProperty("NumberOfProcesses", defaultValue=1, validator=IntBoundedValidator(lower=0),
+                             doc="Number of processes to fit the peaks in parallel, 0 for one per core.  Fitting in "
+                                 "parallel requires a StrongPeakParamsFile.")
+
+    def validateInputs(self):
+        issues = dict()
+        if self.getProperty('NumberOfProcesses').value != 1 and not self.getProperty('StrongPeakParamsFile').value:
+            issues['NumberOfProcesses'] = 'Peaks can only be fit in parallel with a StrongPeakParamsFile, ' \
+                                          'as otherwise the strong peaks library is built up peak by peak.'
+        return issues
 
     def initializeStrongPeakSettings(self, strongPeaksParamsFile, peaks_ws, sampleRun, forceCutoff, edgeCutoff, numDetRows,
                                      numDetCols):
@@ -164,10 +175,80 @@ class IntegratePeaksProfileFitting(PythonAlgorithm):
         UBMatrix = peaks_ws.sample().getOrientedLattice().getUB()
         return UBMatrix
 
+    def setPeakResult(self, params_ws, peak, peakNumber, params, intensity, sigma):
+        """
+        Adds the fit parameters of a peak to params_ws and sets its integrated intensity.
+        """
+        compStr = 'peak {:d}; original: {:4.2f} +- {:4.2f};  new: {:4.2f} +- {:4.2f}'.format(peakNumber,
+                                                                                             peak.getIntensity(),
+                                                                                             peak.getSigmaIntensity(),
+                                                                                             intensity, sigma)
+        logger.information(compStr)
+
+        # Save the results
+        params['peakNumber'] = peakNumber
+        params['Intens3d'] = intensity
+        params['SigInt3d'] = sigma
+        params['newQ'] = V3D(params['newQ'][0],params['newQ'][1],params['newQ'][2])
+        params_ws.addRow(params)
+        peak.setIntensity(intensity)
+        peak.setSigmaIntensity(sigma)
+
+    def setFailedPeak(self, peak, peakNumber, reason=None):
+        """
+        Sets the intensity of a peak that could not be fit to 0 with a sigma of 1, logging the reason if given.
+        """
+        message = 'Error fitting peak number ' + str(peakNumber)
+        if reason:
+            message += ': ' + str(reason)
+        logger.warning(message)
+        peak.setIntensity(0.0)
+        peak.setSigmaIntensity(1.0)
+
+    def fitPeaksInPool(self, peaks_ws, peaks_ws_out, params_ws, MDdata, UBMatrix, dQ, dQPixel, q_frame, peaksToFit,
+                       needsForcedProfile, strongPeakParams, fitSettings, numberOfProcesses):
+        """
+        Bins the box around each peak up front and saves it to a temporary file, then fits the boxes in a pool of
+        processes.  The results are set on peaks_ws_out and params_ws in the order of peaksToFit.
+        """
+        import tempfile
+        import ICCFitTools as ICCFT
+        import BVGFitTools as BVGFT
+        progress = Progress(self, 0.0, 1.0, 2*len(peaksToFit))
+        runNumber = MDdata.getExperimentInfo(0).getRunNumber()
+        with tempfile.TemporaryDirectory() as tempDir:
+            peaksFile = os.path.join(tempDir, 'peaks.nxs')
+            SaveNexusProcessed(InputWorkspace=peaks_ws, Filename=peaksFile)
+            tasks = []
+            for peakNumber in peaksToFit:
+                peakNumber = int(peakNumber)
+                peak = peaks_ws_out.getPeak(peakNumber)
+                progress.report('Binning peaks')
+                if peak.getRunNumber() != runNumber:
+                    logger.warning('Peak number %i has run number %i but MDWorkspace is from run number %i.  Skipping this peak.'%(
+                                   peakNumber, peak.getRunNumber(), runNumber))
+                    continue
+                try:
+                    box = ICCFT.getBoxFracHKL(peak, peaks_ws, MDdata, UBMatrix, peakNumber,
+                                              dQ, fracHKL=0.5, dQPixel=dQPixel, q_frame=q_frame)
+                    boxFile = os.path.join(tempDir, 'box_{:d}.nxs'.format(peakNumber))
+                    SaveMD(InputWorkspace=box, Filename=boxFile)
+                    tasks.append((peakNumber, boxFile, bool(needsForcedProfile[peakNumber])))
+                except Exception as err:
+                    self.setFailedPeak(peak, peakNumber, err)
+
+            for peakNumber, params, intensity, sigma, error in BVGFT.integratePeaksInPool(
+                    peaksFile, tasks, strongPeakParams, fitSettings, numberOfProcesses):
+                progress.report('Fitting peaks')
+                peak = peaks_ws_out.getPeak(peakNumber)
+                if params is None:
+                    self.setFailedPeak(peak, peakNumber, error)
+                else:
+                    self.setPeakResult(params_ws, peak, peakNumber, params, intensity, sigma)
+
     def PyExec(self):
         import ICCFitTools as ICCFT
         import BVGFitTools as BVGFT
-        from scipy.ndimage.filters import convolve
         MDdata = self.getProperty('InputWorkspace').value
         peaks_ws = self.getProperty('PeaksWorkspace').value
         fracStop = self.getProperty('FracStop').value
@@ -180,6 +261,7 @@ class IntegratePeaksProfileFitting(PythonAlgorithm):
         peakNumberToFit = self.getProperty('PeakNumber').value
         pplmin_frac = self.getProperty('MinpplFrac').value
         pplmax_frac = self.getProperty('MaxpplFrac').value
+        numberOfProcesses = self.getProperty('NumberOfProcesses').value or os.cpu_count() or 1
         sampleRun = peaks_ws.getPeak(0).getRunNumber()
 
         q_frame='lab'
@@ -234,9 +316,23 @@ class IntegratePeaksProfileFitting(PythonAlgorithm):
         # And we're off!
         peaks_ws_out = peaks_ws.clone()
         np.warnings.filterwarnings('ignore') # There can be a lot of warnings for bad solutions that get rejected.
-        progress = Progress(self, 0.0, 1.0, len(peaksToFit))
         sigX0Params, sigY0, sigP0Params = self.getBVGInitialGuesses(peaks_ws, strongPeakParams_ws)
+        # Settings of the fit common to all peaks
+        fitSettings = dict(padeCoefficients=padeCoefficients, qMask=qMask, fracStop=fracStop,
+                           neigh_length_m=neigh_length_m, nTheta=nTheta, nPhi=nPhi, plotResults=False, zBG=zBG,
+                           fracBoxToHistogram=1.0, bgPolyOrder=1, q_frame=q_frame, mindtBinWidth=mindtBinWidth,
+                           maxdtBinWidth=maxdtBinWidth, pplmin_frac=pplmin_frac, pplmax_frac=pplmax_frac,
+                           forceCutoff=forceCutoff, edgeCutoff=edgeCutoff, peakMaskSize=peakMaskSize,
+                           iccFitDict=iccFitDict, fitPenalty=1.e7)
+
+        if numberOfProcesses > 1 and len(peaksToFit) > 1:
+            # The strong peaks library is loaded from a file, so the initial guesses are the same for all peaks
+            fitSettings.update(sigX0Params=sigX0Params, sigY0=sigY0, sigP0Params=sigP0Params)
+            self.fitPeaksInPool(peaks_ws, peaks_ws_out, params_ws, MDdata, UBMatrix, dQ, dQPixel, q_frame,
+                                peaksToFit, needsForcedProfile, strongPeakParams, fitSettings, numberOfProcesses)
+            peaksToFit = []  # all fit in the pool
 
+        progress = Progress(self, 0.0, 1.0, len(peaksToFit))
         for fitNumber, peakNumber in enumerate(peaksToFit):#range(peaks_ws.getNumberPeaks()):
             peakNumber = int(peakNumber)
             peak = peaks_ws_out.getPeak(peakNumber)
@@ -254,47 +350,10 @@ class IntegratePeaksProfileFitting(PythonAlgorithm):
                     strongPeakParamsToSend = strongPeakParams
 
                 # Will allow forced weak and edge peaks to be fit using a neighboring peak profile
-                Y3D, goodIDX, pp_lambda, params = BVGFT.get3DPeak(
-                    peak, peakNumber, peaks_ws, box, padeCoefficients, qMask, nTheta=nTheta, nPhi=nPhi,
-                    plotResults=False, zBG=zBG, fracBoxToHistogram=1.0,bgPolyOrder=1,
-                    strongPeakParams=strongPeakParamsToSend, q_frame=q_frame, mindtBinWidth=mindtBinWidth,
-                    maxdtBinWidth=maxdtBinWidth, pplmin_frac=pplmin_frac, pplmax_frac=pplmax_frac,
-                    forceCutoff=forceCutoff, edgeCutoff=edgeCutoff, peakMaskSize=peakMaskSize, iccFitDict=iccFitDict,
-                    sigX0Params=sigX0Params, sigY0=sigY0, sigP0Params=sigP0Params, fitPenalty=1.e7)
-                # First we get the peak intensity
-                peakIDX = Y3D/Y3D.max() > fracStop
-                intensity = np.sum(Y3D[peakIDX])
-
-                # Now the number of background counts under the peak assuming a constant bg across the box
-                n_events = box.getNumEventsArray()
-                convBox = 1.0*np.ones([neigh_length_m, neigh_length_m,neigh_length_m]) / neigh_length_m**3
-                conv_n_events = convolve(n_events,convBox)
-                bgIDX = np.logical_and.reduce(np.array([~goodIDX, qMask, conv_n_events>0]))
-                bgEvents = np.mean(n_events[bgIDX])*np.sum(peakIDX)
-
-                # Now we consider the variation of the fit.  These are done as three independent fits.  So we need to consider
-                # the variance within our fit sig^2 = sum(N*(yFit-yData)) / sum(N) and scale by the number of parameters that go into
-                # the fit.  In total: 10 (removing scale variables)
-                w_events = n_events.copy()
-                w_events[w_events==0] = 1
-                varFit = np.average((n_events[peakIDX]-Y3D[peakIDX])*(n_events[peakIDX]-Y3D[peakIDX]), weights=(w_events[peakIDX]))
-
-                sigma = np.sqrt(intensity + bgEvents + varFit)
-
-                compStr = 'peak {:d}; original: {:4.2f} +- {:4.2f};  new: {:4.2f} +- {:4.2f}'.format(peakNumber,
-                                                                                                     peak.getIntensity(),
-                                                                                                     peak.getSigmaIntensity(),
-                                                                                                     intensity, sigma)
-                logger.information(compStr)
-
-                # Save the results
-                params['peakNumber'] = peakNumber
-                params['Intens3d'] = intensity
-                params['SigInt3d'] = sigma
-                params['newQ'] = V3D(params['newQ'][0],params['newQ'][1],params['newQ'][2])
-                params_ws.addRow(params)
-                peak.setIntensity(intensity)
-                peak.setSigmaIntensity(sigma)
+                params, intensity, sigma = BVGFT.integratePeak(
+                    peak, peakNumber, peaks_ws, box, strongPeakParams=strongPeakParamsToSend,
+                    sigX0Params=sigX0Params, sigY0=sigY0, sigP0Params=sigP0Params, **fitSettings)
+                self.setPeakResult(params_ws, peak, peakNumber, params, intensity, sigma)
 
                 if generateStrongPeakParams and ~needsForcedProfile[peakNumber]:
                     qPeak = peak.getQLabFrame()
@@ -325,11 +384,8 @@ class IntegratePeaksProfileFitting(PythonAlgorithm):
                 np.warnings.filterwarnings('default') # Re-enable on exit
                 raise
 
-            except:
-                #raise
-                logger.warning('Error fitting peak number ' + str(peakNumber))
-                peak.setIntensity(0.0)
-                peak.setSigmaIntensity(1.0)
+            except Exception as err:
+                self.setFailedPeak(peak, peakNumber, err)
 
         # Cleanup
         for wsName in mtd.getObjectNames():
@@ -4,13 +4,24 @@
 #   NScD Oak Ridge National Laboratory, European Spallation Source,
 #   Institut Laue - Langevin & CSNS, Institute of High Energy Physics, CAS
 # SPDX - License - Identifier: GPL - 3.0 +
-from mantid.api import PythonAlgorithm, AlgorithmFactory, PropertyMode, WorkspaceProperty, Progress, MultipleFileProperty, FileAction, mtd
+from mantid.api import (PythonAlgorithm, AlgorithmFactory, PropertyMode, WorkspaceProperty, Progress, MultipleFileProperty,
+                        FileProperty, FileAction, mtd)
 from mantid.kernel import Direction, Property, IntArrayProperty, StringListValidator, FloatTimeSeriesProperty
 from mantid.simpleapi import LoadEventNexus, RemoveLogs, DeleteWorkspace, ConvertToMD, Rebin, CreateGroupingWorkspace, GroupDetectors, SetUB
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import h5py
+import hashlib
+import os
 import re
 
+# Number of pixels of the detector: 8 banks of 480 tubes with 512 pixels each
+NUMBER_OF_TUBES = 480*8
+PIXELS_PER_TUBE = 512
+# Maximum number of event ids read from a bank at a time
+EVENT_CHUNK_SIZE = 2**24
+
 
 class LoadWANDSCD(PythonAlgorithm):
 
@@ -33,6 +44,9 @@ class LoadWANDSCD(PythonAlgorithm):
         self.declareProperty('IPTS', Property.EMPTY_INT, "IPTS number to load from")
         self.declareProperty(IntArrayProperty("RunNumbers", []), 'Run numbers to load')
         self.declareProperty("Grouping", 'None', StringListValidator(['None', '2x2', '4x4']), "Group pixels")
+        self.declareProperty(FileProperty(name="CacheDirectory", defaultValue="", action=FileAction.OptionalDirectory),
+                             "Directory to cache the detector counts of each run in, so that loading the same runs "
+                             "again does not need to read the events")
         self.declareProperty(WorkspaceProperty("OutputWorkspace", "",
                                                optional=PropertyMode.Mandatory,
                                                direction=Direction.Output),
@@ -60,8 +74,8 @@ class LoadWANDSCD(PythonAlgorithm):
         else:
             grouping = 2 if grouping == '2x2' else 4
 
-        x_dim = 480*8 // grouping
-        y_dim = 512 // grouping
+        x_dim = NUMBER_OF_TUBES // grouping
+        y_dim = PIXELS_PER_TUBE // grouping
 
         number_of_runs = len(runs)
 
@@ -74,25 +88,32 @@ class LoadWANDSCD(PythonAlgorithm):
 
         progress = Progress(self, 0.0, 1.0, number_of_runs+3)
 
-        for n, run in enumerate(runs):
-            progress.report('Loading: '+run)
-            with h5py.File(run, 'r') as f:
-                bc = np.zeros((512*480*8),dtype=np.int64)
-                for b in range(8):
-                    bc += np.bincount(f['/entry/bank'+str(b+1)+'_events/event_id'].value,minlength=512*480*8)
-                bc = bc.reshape((480*8, 512))
-                if grouping == 2:
-                    bc = bc[::2,::2]+bc[1::2,::2]+bc[::2,1::2]+bc[1::2,1::2]
-                elif grouping == 4:
-                    bc = (bc[::4,::4]    + bc[1::4,::4]  + bc[2::4,::4]  + bc[3::4,::4]
-                          + bc[::4,1::4] + bc[1::4,1::4] + bc[2::4,1::4] + bc[3::4,1::4]
-                          + bc[::4,2::4] + bc[1::4,2::4] + bc[2::4,2::4] + bc[3::4,2::4]
-                          + bc[::4,3::4] + bc[1::4,3::4] + bc[2::4,3::4] + bc[3::4,3::4])
-                data_array[n] = bc
-                s1_array.append(f['/entry/DASlogs/HB2C:Mot:s1.RBV/average_value'].value[0])
-                duration_array.append(float(f['/entry/duration'].value[0]))
-                run_number_array.append(float(f['/entry/run_number'].value[0]))
-                monitor_count_array.append(float(f['/entry/monitor1/total_counts'].value[0]))
+        cache_directory = self.getProperty("CacheDirectory").value
+        if cache_directory:
+            os.makedirs(cache_directory, exist_ok=True)
+
+        def loaded_runs():
+            """load the runs, yielding each with its loaded data in order. At most one run per thread is in flight"""
+            number_of_threads = min(number_of_runs, os.cpu_count() or 1)
+            with ThreadPoolExecutor(max_workers=number_of_threads) as executor:
+                pending = deque()
+                for run in runs:
+                    pending.append((run, executor.submit(load_run, run, cache_directory)))
+                    if len(pending) == number_of_threads:
+                        loaded_run, loaded = pending.popleft()
+                        yield loaded_run, loaded.result()
+                while pending:
+                    loaded_run, loaded = pending.popleft()
+                    yield loaded_run, loaded.result()
+
+        # h5py serialises access to the files, but the event histogramming of one run overlaps with reading the next
+        for n, (run, (bc, s1, duration, run_number, monitor_count)) in enumerate(loaded_runs()):
+            progress.report('Loaded: '+run)
+            data_array[n] = group_pixels(bc, grouping)
+            s1_array.append(s1)
+            duration_array.append(duration)
+            run_number_array.append(run_number)
+            monitor_count_array.append(monitor_count)
 
         progress.report('Creating MDHistoWorkspace')
         createWS_alg = self.createChildAlgorithm("CreateMDHistoWorkspace", enableLogging=False)
@@ -137,13 +158,8 @@ class LoadWANDSCD(PythonAlgorithm):
         if grouping > 1:
             _tmp_group, _, _ = CreateGroupingWorkspace(InputWorkspace=_tmp_ws, EnableLogging=False)
 
-            group_number = 0
-            for x in range(0,480*8,grouping):
-                for y in range(0,512,grouping):
-                    group_number += 1
-                    for j in range(grouping):
-                        for i in range(grouping):
-                            _tmp_group.dataY(y+i+(x+j)*512)[0] = group_number
+            for index, group_number in enumerate(group_numbers(grouping).tolist()):
+                _tmp_group.dataY(index)[0] = group_number
 
             _tmp_ws = GroupDetectors(InputWorkspace=_tmp_ws, CopyGroupingFromWorkspace=_tmp_group, EnableLogging=False)
             DeleteWorkspace(_tmp_group, EnableLogging=False)
@@ -182,6 +198,70 @@ class LoadWANDSCD(PythonAlgorithm):
         self.setProperty("OutputWorkspace", outWS)
 
 
+def load_run(filename, cache_directory=''):
+    """
+    Histogram the events of a run by detector pixel and read the logs needed
+    :param filename: the HB2C nexus file
+    :param cache_directory: directory of the cache of the detector counts, not used if empty
+    :return: (counts as an array of tubes x pixels, s1, duration, run_number, monitor_count)
+    """
+    cache_file = os.path.join(cache_directory, get_cache_key(filename) + '.npz') if cache_directory else ''
+    if cache_file and os.path.isfile(cache_file):
+        try:
+            with np.load(cache_file) as cached:
+                return (cached['counts'], float(cached['s1']), float(cached['duration']), float(cached['run_number']),
+                        float(cached['monitor_count']))
+        except (OSError, KeyError, ValueError):
+            pass
+
+    with h5py.File(filename, 'r') as f:
+        bc = np.zeros(NUMBER_OF_TUBES*PIXELS_PER_TUBE, dtype=np.int64)
+        for b in range(8):
+            event_id = f['/entry/bank'+str(b+1)+'_events/event_id']
+            for start in range(0, event_id.shape[0], EVENT_CHUNK_SIZE):
+                bc += np.bincount(event_id[start:start+EVENT_CHUNK_SIZE], minlength=NUMBER_OF_TUBES*PIXELS_PER_TUBE)
+        bc = bc.reshape((NUMBER_OF_TUBES, PIXELS_PER_TUBE))
+        s1 = f['/entry/DASlogs/HB2C:Mot:s1.RBV/average_value'].value[0]
+        duration = float(f['/entry/duration'].value[0])
+        run_number = float(f['/entry/run_number'].value[0])
+        monitor_count = float(f['/entry/monitor1/total_counts'].value[0])
+
+    if cache_file:
+        # Write to a temporary file first, so an interrupted save never leaves a partial entry in the cache
+        temporary_file = '{}.{}.tmp.npz'.format(os.path.splitext(cache_file)[0], os.getpid())
+        try:
+            np.savez(temporary_file, counts=bc, s1=s1, duration=duration, run_number=run_number,
+                     monitor_count=monitor_count)
+            os.replace(temporary_file, cache_file)
+        except OSError:
+            pass
+
+    return bc, s1, duration, run_number, monitor_count
+
+
+def get_cache_key(filename):
+    """The cache key of a run, which changes if the file is modified"""
+    filename = os.path.abspath(filename)
+    key_items = [filename, repr(os.path.getmtime(filename)), str(os.path.getsize(filename))]
+    return hashlib.sha256('\n'.join(key_items).encode()).hexdigest()
+
+
+def group_pixels(bc, grouping):
+    """Sum the counts of blocks of grouping x grouping pixels"""
+    if grouping == 1:
+        return bc
+    return bc.reshape((NUMBER_OF_TUBES // grouping, grouping, PIXELS_PER_TUBE // grouping, grouping)).sum(axis=(1, 3))
+
+
+def group_numbers(grouping):
+    """
+    The group number of each detector pixel, for blocks of grouping x grouping pixels
+    numbered from 1 along the tubes first
+    """
+    tube, pixel = np.divmod(np.arange(NUMBER_OF_TUBES*PIXELS_PER_TUBE), PIXELS_PER_TUBE)
+    return (tube // grouping) * (PIXELS_PER_TUBE // grouping) + pixel // grouping + 1
+
+
 def add_time_series_property(name, run, times, values):
     log = FloatTimeSeriesProperty(name)
     for t, v in zip(times, values):
@@ -51,6 +51,42 @@ class MuonMaxent(PythonAlgorithm):
                               direction=Direction.Input,
                               validator=RawCountValidator(True)),
             doc="Raw muon workspace to process")
+        self.declareAnalysisProperties()
+        self.declareProperty(
+            WorkspaceProperty("OutputWorkspace",
+                              "",
+                              direction=Direction.Output),
+            doc="Output Spectrum (combined) versus field")
+        self.declareProperty(
+            ITableWorkspaceProperty(
+                "OutputPhaseTable",
+                "",
+                direction=Direction.Output,
+                optional=PropertyMode.Optional),
+            doc="Output phase table (optional)")
+        self.declareProperty(
+            ITableWorkspaceProperty(
+                "OutputDeadTimeTable",
+                "",
+                direction=Direction.Output,
+                optional=PropertyMode.Optional),
+            doc="Output dead time table (optional)")
+        self.declareProperty(
+            WorkspaceProperty("ReconstructedSpectra",
+                              "",
+                              direction=Direction.Output,
+                              optional=PropertyMode.Optional),
+            doc="Reconstructed time spectra (optional)")
+        self.declareProperty(
+            WorkspaceProperty(
+                "PhaseConvergenceTable",
+                "",
+                direction=Direction.Output,
+                optional=PropertyMode.Optional),
+            doc="Convergence of phases (optional)")
+
+    def declareAnalysisProperties(self):
+        """Declare the properties controlling the analysis of a run"""
         self.declareProperty(
             ITableWorkspaceProperty("InputPhaseTable",
                                     "",
@@ -107,38 +143,6 @@ class MuonMaxent(PythonAlgorithm):
             1.04,
             doc="Used to control the value chi-squared converge to",
             direction=Direction.InOut)
-        self.declareProperty(
-            WorkspaceProperty("OutputWorkspace",
-                              "",
-                              direction=Direction.Output),
-            doc="Output Spectrum (combined) versus field")
-        self.declareProperty(
-            ITableWorkspaceProperty(
-                "OutputPhaseTable",
-                "",
-                direction=Direction.Output,
-                optional=PropertyMode.Optional),
-            doc="Output phase table (optional)")
-        self.declareProperty(
-            ITableWorkspaceProperty(
-                "OutputDeadTimeTable",
-                "",
-                direction=Direction.Output,
-                optional=PropertyMode.Optional),
-            doc="Output dead time table (optional)")
-        self.declareProperty(
-            WorkspaceProperty("ReconstructedSpectra",
-                              "",
-                              direction=Direction.Output,
-                              optional=PropertyMode.Optional),
-            doc="Reconstructed time spectra (optional)")
-        self.declareProperty(
-            WorkspaceProperty(
-                "PhaseConvergenceTable",
-                "",
-                direction=Direction.Output,
-                optional=PropertyMode.Optional),
-            doc="Convergence of phases (optional)")
 
     def validateInputs(self):
         issues = dict()
@@ -324,13 +328,12 @@ class MuonMaxent(PythonAlgorithm):
             phaseconvWS = None
         return phaseconvWS
 
-    def PyExec(self):
-        # logging
-        mylog = self.log()
-        #
-        originalWS = self.getProperty("InputWorkspace").value
-        ws, deadDetectors = removeDeadDetectors(originalWS)
-
+    def prepareInputs(self, ws, mylog):
+        """
+        Read the data of a run and the analysis properties into the inputs of MULTIMAX
+        :param ws: the run with any dead detectors removed
+        :return: a dict of the keyword arguments of MULTIMAX which do not depend on the output
+        """
         # crop off odd sized bins at start and end (if present)
         xv = ws.readX(0)
         rg0 = 0
@@ -359,8 +362,6 @@ class MuonMaxent(PythonAlgorithm):
         FLAGS_fitdead = self.getProperty("FitDeadTime").value
         OuterIter = self.getProperty("OuterIterations").value
         InnerIter = self.getProperty("InnerIterations").value
-        # progress
-        prog = Progress(self, start=0.0, end=1.0, nreports=OuterIter * InnerIter)
 
         tlast = self.getProperty("LastGoodTime").value
         ilast = min(
@@ -422,7 +423,6 @@ class MuonMaxent(PythonAlgorithm):
             MAXPAGE_n = POINTS_npts
         # load grouping. Mantid group table is different: one row per group, 1
         # column "detectors" with list of values
-        RUNDATA_hists = np.zeros(nhisto)  # not necessary?
         GROUPING_group, POINTS_ngroups = self.doGrouping(POINTS_nhists, nhisto)
 # load dead times (note Maxent needs values per GROUP!)
 # standard dead time table is per detector. Take averages
@@ -439,28 +439,54 @@ class MuonMaxent(PythonAlgorithm):
             POINTS_ngroups,
             POINTS_nhists,
             mylog)
+        return dict(
+            POINTS_nhists=POINTS_nhists, POINTS_ngroups=POINTS_ngroups, POINTS_npts=POINTS_npts,
+            CHANNELS_itzero=CHANNELS_itzero, CHANNELS_i1stgood=CHANNELS_i1stgood,
+            CHANNELS_itotal=CHANNELS_itotal, RUNDATA_res=RUNDATA_res, RUNDATA_frames=RUNDATA_frames,
+            GROUPING_group=GROUPING_group, DATALL_rdata=DATALL_rdata, FAC_factor=FAC_factor,
+            SENSE_taud=SENSE_taud, MAXPAGE_n=MAXPAGE_n, filePHASE=filePHASE, PULSES_def=PULSES_def,
+            PULSES_npulse=PULSES_npulse, FLAGS_fitdead=FLAGS_fitdead, FLAGS_fixphase=FLAGS_fixphase,
+            SAVETIME_i2=SAVETIME_i2, OuterIter=OuterIter, InnerIter=InnerIter, TZERO_fine=TZERO_fine)
+
+    def fieldAxis(self, inputs):
+        """The fields of the points of the spectrum calculated from inputs, a dict from prepareInputs"""
+        fperchan = 1. / (inputs["RUNDATA_res"] * float(inputs["POINTS_npts"]) * 2.)
+        MAXPAGE_n = inputs["MAXPAGE_n"]
+        return np.linspace(0.0, MAXPAGE_n * fperchan / 135.5e-4, MAXPAGE_n, endpoint=False)
+
+    def PyExec(self):
+        # logging
+        mylog = self.log()
+        #
+        originalWS = self.getProperty("InputWorkspace").value
+        ws, deadDetectors = removeDeadDetectors(originalWS)
+
+        inputs = self.prepareInputs(ws, mylog)
+        POINTS_ngroups = inputs["POINTS_ngroups"]
+        OuterIter = inputs["OuterIter"]
+        InnerIter = inputs["InnerIter"]
+        CHANNELS_itzero = inputs["CHANNELS_itzero"]
+        CHANNELS_i1stgood = inputs["CHANNELS_i1stgood"]
+        CHANNELS_itotal = inputs["CHANNELS_itotal"]
+        # progress
+        prog = Progress(self, start=0.0, end=1.0, nreports=OuterIter * InnerIter)
         #
         # debugging
         phaseconvWS = self.phaseConvergenceTable(
             POINTS_ngroups,
             deadDetectors,
             OuterIter,
-            filePHASE)
+            inputs["filePHASE"])
         # do the work! Lots to pass in and out
         (MISSCHANNELS_mm, RUNDATA_fnorm, RUNDATA_hists, MAXPAGE_f, FAC_factor, FAC_facfake, FAC_ratio,
          DETECT_a, DETECT_b, DETECT_c, DETECT_d, DETECT_e, PULSESHAPE_convol, SENSE_taud, FASE_phase, SAVETIME_ngo,
          AMPS_amp, SENSE_phi, OUTSPEC_test, OUTSPEC_guess) = MULTIMAX(
-            POINTS_nhists, POINTS_ngroups, POINTS_npts, CHANNELS_itzero, CHANNELS_i1stgood,
-            CHANNELS_itotal, RUNDATA_res, RUNDATA_frames, GROUPING_group, DATALL_rdata,
-            FAC_factor, SENSE_taud, MAXPAGE_n, filePHASE, PULSES_def, PULSES_npulse,
-            FLAGS_fitdead, FLAGS_fixphase, SAVETIME_i2,
-            OuterIter, InnerIter, mylog, prog, phaseconvWS, TZERO_fine, deadDetectors)
+            mylog=mylog, prog=prog, phaseconvWS=phaseconvWS, deadDetectors=deadDetectors, **inputs)
         #
-        fperchan = 1. / (RUNDATA_res * float(POINTS_npts) * 2.)
-        fchan = np.linspace(0.0, MAXPAGE_n * fperchan / 135.5e-4, MAXPAGE_n, endpoint=False)
+        MAXPAGE_n = inputs["MAXPAGE_n"]
         # write results! Frequency spectra
         outSpec = WorkspaceFactory.create(ws,NVectors=1,XLength=MAXPAGE_n,YLength=MAXPAGE_n)
-        outSpec.dataX(0)[:] = fchan
+        outSpec.dataX(0)[:] = self.fieldAxis(inputs)
         outSpec.dataY(0)[:] = MAXPAGE_f
         outSpec.getAxis(0).setUnit('Label').setLabel('Field', 'Gauss')
         self.setProperty("OutputWorkspace", outSpec)
@@ -0,0 +1,103 @@
+# Mantid Repository : https://github.com/mantidproject/mantid
+#
+# Copyright &copy; 2021 ISIS Rutherford Appleton Laboratory UKRI,
+#   NScD Oak Ridge National Laboratory, European Spallation Source,
+#   Institut Laue - Langevin & CSNS, Institute of High Energy Physics, CAS
+# SPDX - License - Identifier: GPL - 3.0 +
+import os
+
+from Muon.MaxentTools.dead_detector_handler import removeDeadDetectors
+from Muon.MaxentTools.multimaxseries import MULTIMAX_SERIES
+from MuonMaxent import MuonMaxent
+from mantid.api import *
+from mantid.kernel import *
+
+
+class MuonMaxentSeries(MuonMaxent):
+
+    def category(self):
+        return "Muon;Arithmetic\\FFT"
+
+    def summary(self):
+        return "Calculates the Maxent frequency spectra of a series of muon runs, such as a temperature or field scan."
+
+    def seeAlso(self):
+        return ["MuonMaxent"]
+
+    def PyInit(self):
+        self.declareProperty(
+            StringArrayProperty("InputWorkspaces",
+                                direction=Direction.Input,
+                                validator=StringArrayMandatoryValidator()),
+            doc="Raw muon workspaces, or groups of them, in the order of the series")
+        self.declareAnalysisProperties()
+        self.declareProperty(
+            "WarmStart",
+            True,
+            doc="Start each run from the spectrum of the previous run in the series instead of the default level")
+        self.declareProperty(
+            "NumberOfProcesses",
+            1,
+            validator=IntBoundedValidator(lower=0),
+            doc="Number of processes to analyse the runs in, each warm starting a contiguous part of the "
+                "series from its first run. 0 uses one process per core")
+        self.declareProperty(
+            WorkspaceProperty("OutputWorkspace",
+                              "",
+                              direction=Direction.Output),
+            doc="Output spectra versus field, one for each run")
+
+    def getInputWorkspaces(self):
+        """The names and workspaces of the runs, with groups replaced by their members"""
+        runs = []
+        for name in self.getProperty("InputWorkspaces").value:
+            ws = AnalysisDataService.retrieve(name)
+            if isinstance(ws, WorkspaceGroup):
+                runs.extend((member.name(), member) for member in ws)
+            else:
+                runs.append((name, ws))
+        return runs
+
+    def validateInputs(self):
+        issues = super(MuonMaxentSeries, self).validateInputs()
+        try:
+            runs = self.getInputWorkspaces()
+        except KeyError as error:
+            issues["InputWorkspaces"] = str(error)
+            return issues
+        for name, ws in runs:
+            if not isinstance(ws, MatrixWorkspace) or ws.isDistribution():
+                issues["InputWorkspaces"] = "{} is not a raw muon workspace".format(name)
+        return issues
+
+    def PyExec(self):
+        mylog = self.log()
+        names, inputs = [], []
+        for name, originalWS in self.getInputWorkspaces():
+            ws, deadDetectors = removeDeadDetectors(originalWS)
+            names.append(name)
+            inputs.append(self.prepareInputs(ws, mylog))
+        MAXPAGE_n = inputs[0]["MAXPAGE_n"]
+        if any(run["MAXPAGE_n"] != MAXPAGE_n for run in inputs):
+            raise RuntimeError("The runs give spectra with different numbers of points. "
+                               "Check that they have the same time resolution")
+
+        processes = self.getProperty("NumberOfProcesses").value
+        if processes == 0:
+            processes = os.cpu_count()
+        prog = Progress(self, start=0.0, end=1.0, nreports=len(inputs))
+        spectra = MULTIMAX_SERIES(inputs, self.getProperty("WarmStart").value, processes, mylog, prog)
+
+        # stacked frequency spectra, labelled by run
+        outSpec = WorkspaceFactory.create(ws, NVectors=len(names), XLength=MAXPAGE_n, YLength=MAXPAGE_n)
+        labels = TextAxis.create(len(names))
+        for i, (run, spectrum) in enumerate(zip(inputs, spectra)):
+            outSpec.dataX(i)[:] = self.fieldAxis(run)
+            outSpec.dataY(i)[:] = spectrum
+            labels.setLabel(i, names[i])
+        outSpec.getAxis(0).setUnit('Label').setLabel('Field', 'Gauss')
+        outSpec.replaceAxis(1, labels)
+        self.setProperty("OutputWorkspace", outSpec)
+
+
+AlgorithmFactory.subscribe(MuonMaxentSeries)
@@ -223,7 +223,8 @@ class SNSPowderReduction(DistributedDataProcessorAlgorithm):
         self.declareProperty( 'CacheDir', "", 'comma-delimited ascii string representation of a list of candidate cache directories')
         self.declareProperty('CleanCache', False, 'Remove all cache files within CacheDir')
         self.setPropertySettings('CleanCache', EnabledWhenProperty('CacheDir', PropertyCriterion.IsNotDefault))
-        property_names = ('CacheDir', 'CleanCache')
+        self.copyProperties('AlignAndFocusPowderFromFiles', ['CacheMaxSize', 'CacheMaxAgeInDays'])
+        property_names = ('CacheDir', 'CleanCache', 'CacheMaxSize', 'CacheMaxAgeInDays')
         [self.setPropertyGroup(name, 'Caching') for name in property_names]
 
         self.declareProperty("FinalDataUnits", "dSpacing", StringListValidator(["dSpacing","MomentumTransfer"]))
@@ -330,6 +331,8 @@ class SNSPowderReduction(DistributedDataProcessorAlgorithm):
                             if me.strip()]  # filter out empty elements
         self._cache_dir = self._cache_dirs[0] if self._cache_dirs else ""
         self._clean_cache = self.getProperty("CleanCache").value
+        self._cache_max_size = self.getProperty("CacheMaxSize").value
+        self._cache_max_age = self.getProperty("CacheMaxAgeInDays").value
 
         self._outPrefix = self.getProperty("OutputFilePrefix").value.strip()
         self._outTypes = self.getProperty("SaveAs").value.lower()
@@ -438,6 +441,8 @@ class SNSPowderReduction(DistributedDataProcessorAlgorithm):
             self._elementSize,  # Size of one side of the integration element cube in mm
             metaws,  # Optional workspace containing metadata
             self._cache_dirs,  # Cache dir for absorption correction workspace
+            self._cache_max_size,  # Maximum size of the cache in GiB
+            self._cache_max_age,  # Maximum age of the cache files in days
         )
 
         if self.getProperty("Sum").value and len(samRuns) > 1:
@@ -838,6 +843,8 @@ class SNSPowderReduction(DistributedDataProcessorAlgorithm):
                                          FilterBadPulses=self._filterBadPulses,
                                          Characterizations=characterizations,
                                          CacheDir=self._cache_dir,
+                                         CacheMaxSize=self._cache_max_size,
+                                         CacheMaxAgeInDays=self._cache_max_age,
                                          Params=self._binning,
                                          ResampleX=self._resampleX,
                                          Dspacing=self._bin_in_dspace,
@@ -1439,6 +1446,8 @@ class SNSPowderReduction(DistributedDataProcessorAlgorithm):
                 "SampleOnly",
                 element_size=self._elementSize,
                 cache_dirs=self._cache_dirs,
+                cache_max_size=self._cache_max_size,
+                cache_max_age=self._cache_max_age,
             )
             api.RenameWorkspace(abs_v_wsn, '__V_corr_abs')
 
@@ -14,6 +14,8 @@ import numpy as np
 import re
 import time
 
+import trajectory_correlations
+
 
 class VelocityCrossCorrelations(PythonAlgorithm):
 
@@ -88,57 +90,21 @@ class VelocityCrossCorrelations(PythonAlgorithm):
         # Extract useful simulation parameters
         # Number of species present in the simulation
         n_species=len(elements)
-        # Number of particles present in the simulation
-        n_particles=len(atoms_to_species)
         # Number of timesteps in the simulation
         n_timesteps=int(configuration.shape[0])
-        # Number of spatial dimensions
-        n_dimensions=int(configuration.shape[2])
 
         logger.information(str(time.time()-start_time) + " s")
 
-        logger.information("Transforming coordinates...")
+        logger.information("Calculating velocities...")
         start_time=time.time()
 
         # Box size for each timestep. Shape: timesteps x (3 consecutive 3-vectors)
         box_size=trajectory.variables["box_size"]
 
-        # Reshape the paralellepipeds into 3x3 tensors for coordinate transformations.
-        # Shape: timesteps x 3 vectors x (# of spatial dimensions)
-        box_size_tensors=np.array([box_size[j].reshape((3,3)) for j in range(n_timesteps)])
-
-        # Copy the configuration object into a numpy array
-        configuration_copy=np.array([configuration[i] for i in range(n_timesteps)])
-
-        # Swap the time and particle axes
-        configuration_copy=np.swapaxes(configuration_copy,0,1)#/1.12484770
-
-        # Get scaled coordinates (assumes orthogonal simulation box)
-        scaled_coords=np.zeros(np.shape(configuration_copy))
-        for i in range(n_particles):
-            for j in range(n_timesteps):
-                for k in range(n_dimensions):
-                    scaled_coords[i,j,k]=configuration_copy[i,j,k]/box_size_tensors[j,k,k]
-
-        # # Transform particle trajectories (configuration array) to Cartesian coordinates at each time step
-
-        logger.information(str(time.time()-start_time) + " s")
-
-        logger.information("Calculating velocities...")
-        start_time=time.time()
-
-        # Initialise velocity arrray. Note that the first dimension is 2 elements shorter than the coordinate array.
-        # Use finite difference methods to evaluate the time-derivative to 1st order
-        # Shape: (# of particles) x (timesteps-2) x (# of spatial dimensions)
-
-        velocities=np.zeros((n_particles,n_timesteps-1,n_dimensions))
-        v1=scaled_coords[:,1:-1,:]-scaled_coords[:,:-2,:]-np.round(scaled_coords[:,1:-1,:]-scaled_coords[:,:-2,:])
-        v2=scaled_coords[:,2:,:]-scaled_coords[:,1:-1,:]-np.round(scaled_coords[:,2:,:]-scaled_coords[:,1:-1,:])
-        velocities[:,:-1,:]=(v1+v2)/2.
-
-        # Transform velocities (configuration array) back to Cartesian coordinates at each time step
-        velocities=np.array([[np.dot(box_size_tensors[j+1],np.transpose(velocities[i,j]))
-                              for j in range(n_timesteps-1)] for i in range(n_particles)])
+        # Unwrap the coordinates and use finite difference methods to evaluate the time-derivative to 1st order.
+        # The trajectory is read in chunks of timesteps.
+        # Shape: (# of particles) x (timesteps-1) x (# of spatial dimensions)
+        velocities=trajectory_correlations.unwrapped_velocities(configuration,box_size)
         logger.information(str(time.time()-start_time) + " s")
 
         logger.information("Calculating velocity cross-correlations (resource intensive calculation)...")
@@ -147,23 +113,23 @@ class VelocityCrossCorrelations(PythonAlgorithm):
         correlations=np.zeros((n_species,n_species,correlation_length))
         # Array for counting particle pairings
         correlation_count=np.zeros((n_species,n_species))
-
-        # Compute cross-correlations for each pair of particles in each spatial coordinate
-        for i in range(n_particles):
-            for j in range(i+1,n_particles):
-                # Retrieve particle indices from the 'particles' dictionary and
-                # determine the relevant position in the 'correlations' matrices
-                k=elements.index(atoms_to_species[i])
-                l=elements.index(atoms_to_species[j])
-                # Check for the order of elements (ensures upper triangular matrix form & consistent order of operations)
-                if k<=l:
-                    correlation_temp=self.cross_correlation(velocities[i],velocities[j])
-                    correlations[k,l]+=correlation_temp
-                    correlation_count[k,l]+=1
+        norm=self.correlation_norm(correlation_length)
+
+        # Sum the cross-correlations of each pair of particles in each spatial coordinate. The particle
+        # of the species that comes first in 'elements' is the first argument of each correlation
+        # (ensures upper triangular matrix form & consistent order of operations)
+        for k in range(n_species):
+            species_one_atoms=sorted(species_to_atoms[elements[k]])
+            for l in range(k,n_species):
+                if k==l:
+                    correlation_sum=trajectory_correlations.pair_correlation_sum(velocities,species_one_atoms)
+                    correlation_count[k,l]=len(species_one_atoms)*(len(species_one_atoms)-1)/2
                 else:
-                    correlation_temp=self.cross_correlation(velocities[j],velocities[i])
-                    correlations[l,k]+=correlation_temp
-                    correlation_count[l,k]+=1
+                    species_two_atoms=sorted(species_to_atoms[elements[l]])
+                    correlation_sum=trajectory_correlations.cross_correlation_sum(velocities,species_one_atoms,
+                                                                                  species_two_atoms)
+                    correlation_count[k,l]=len(species_one_atoms)*len(species_two_atoms)
+                correlations[k,l]=correlation_sum/norm
 
         logger.information(str(time.time()-start_time) + " s")
 
@@ -307,19 +273,12 @@ class VelocityCrossCorrelations(PythonAlgorithm):
         # Set output workspace to output_ws
         self.setProperty('OutputWorkspace',output_ws)
 
-    def cross_correlation(self,u,v):
-        # Returns cross-correlation of two 3-vectors
-        n=np.shape(v)[0]
+    def correlation_norm(self,n):
+        # Returns the number of terms summed at each lag of a correlation of length n
         norm=np.arange(np.ceil(n/2.0),n+1)
         norm=np.append(norm,(np.arange(n/2+1,n)[::-1]))
-        # Correlation in x
-        C=np.divide(np.correlate(u[:,0],v[:,0],"same"),norm)
-        # Correlation in y
-        C+=np.divide(np.correlate(u[:,1],v[:,1],"same"),norm)
-        # Correlation in z
-        C+=np.divide(np.correlate(u[:,2],v[:,2],"same"),norm)
-
-        return C
+
+        return norm
 
     def fold_correlation(self,w):
         # Folds an array with symmetrical values into half by averaging values around the centre
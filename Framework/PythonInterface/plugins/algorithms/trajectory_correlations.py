@@ -0,0 +1,199 @@
+# Mantid Repository : https://github.com/mantidproject/mantid
+#
+# Copyright &copy; 2021 ISIS Rutherford Appleton Laboratory UKRI,
+#   NScD Oak Ridge National Laboratory, European Spallation Source,
+#   Institut Laue - Langevin & CSNS, Institute of High Energy Physics, CAS
+# SPDX - License - Identifier: GPL - 3.0 +
+"""
+Trajectory processing shared by the velocity and angular correlation algorithms.
+
+Frames are read from the netCDF trajectory in chunks of at most max_chunk_bytes,
+and the correlations are computed with FFTs (Wiener-Khinchin theorem) over
+batches of particles. The correlations of a set of particles are summed in
+frequency space, so only one inverse transform is needed per set.
+
+The correlations returned have the lags of numpy.correlate(u, v, 'same'),
+which the algorithms were written against.
+"""
+import numpy as np
+from scipy import sparse
+
+# Default bound on the size of a chunk of frames or a batch of particle spectra
+MAX_CHUNK_BYTES = 2 ** 28
+
+
+def box_tensors(box_size, start, stop, scale=1.0):
+    """
+    Return the simulation boxes of frames [start, stop) as 3x3 tensors
+    :param box_size: the box_size variable of the trajectory. Shape: frames x 9
+    """
+    return scale * np.asarray(box_size[start:stop], dtype=np.float64).reshape((-1, 3, 3))
+
+
+def frame_chunks(n_frames, values_per_frame, max_chunk_bytes=MAX_CHUNK_BYTES):
+    """Yield (start, stop) ranges covering n_frames frames, each holding at most max_chunk_bytes of float64 values"""
+    step = max(1, max_chunk_bytes // (8 * values_per_frame))
+    for start in range(0, n_frames, step):
+        yield start, min(start + step, n_frames)
+
+
+def unwrapped_velocities(configuration, box_size, max_chunk_bytes=MAX_CHUNK_BYTES):
+    """
+    Calculate the velocities of all particles by central differences of the unwrapped fractional coordinates,
+    assuming an orthorhombic simulation box. The velocities are transformed back to Cartesian coordinates
+    with the box of the frame they are centred on. The velocity of the last frame is zero.
+
+    :param configuration: the configuration variable of the trajectory. Shape: frames x particles x dimensions
+    :param box_size: the box_size variable of the trajectory
+    :param max_chunk_bytes: the maximum size of a chunk of frames read from the trajectory
+    :return: the velocities in distance per timestep. Shape: particles x (frames - 1) x dimensions
+    """
+    n_frames, n_particles, n_dimensions = configuration.shape
+    velocities = np.zeros((n_particles, n_frames - 1, n_dimensions))
+    for start, stop in frame_chunks(n_frames - 1, n_particles * n_dimensions, max_chunk_bytes):
+        # The velocity at frame t needs the positions at frames t, t + 1 and t + 2
+        read_stop = min(stop + 2, n_frames)
+        box = box_tensors(box_size, start, read_stop)
+        scaled = np.asarray(configuration[start:read_stop], dtype=np.float64) / \
+            np.diagonal(box, axis1=1, axis2=2)[:, np.newaxis, :]
+
+        # Unwrap the steps between frames to the nearest periodic image
+        steps = np.diff(scaled, axis=0)
+        steps -= np.round(steps)
+        fractional = (steps[:-1] + steps[1:]) / 2.0
+
+        n_velocities = fractional.shape[0]
+        velocities[:, start:start + n_velocities] = np.einsum('tjk,tpk->ptj', box[1:n_velocities + 1], fractional)
+    return velocities
+
+
+def cartesian_frames(configuration, box_size, box_scale=1.0, max_chunk_bytes=MAX_CHUNK_BYTES):
+    """
+    Yield chunks of frames transformed to Cartesian coordinates.
+
+    :param configuration: the configuration variable of the trajectory. Shape: frames x particles x dimensions
+    :param box_size: the box_size variable of the trajectory
+    :param box_scale: factor to scale the box by, to convert units
+    :param max_chunk_bytes: the maximum size of a chunk of frames read from the trajectory
+    :return: generator of (start, stop, coordinates, box_lengths) with coordinates of shape
+             (stop - start) x particles x dimensions and the box lengths along x, y and z of shape (stop - start) x 3
+    """
+    n_frames, n_particles, n_dimensions = configuration.shape
+    for start, stop in frame_chunks(n_frames, n_particles * n_dimensions, max_chunk_bytes):
+        box = box_tensors(box_size, start, stop, box_scale)
+        coordinates = np.einsum('tjk,tpk->tpj', box, np.asarray(configuration[start:stop], dtype=np.float64))
+        yield start, stop, coordinates, np.diagonal(box, axis1=1, axis2=2)
+
+
+def group_average_matrix(groups, n_particles):
+    """
+    Return a sparse matrix which averages the values of particles over groups of particles
+    :param groups: a list with a list of particle indices for each group
+    """
+    rows = np.concatenate([np.full(len(group), row, dtype=int) for row, group in enumerate(groups)])
+    columns = np.concatenate([np.asarray(group, dtype=int) for group in groups])
+    weights = np.concatenate([np.full(len(group), 1.0 / len(group)) for group in groups])
+    return sparse.csr_matrix((weights, (rows, columns)), shape=(len(groups), n_particles))
+
+
+def group_average(matrix, coordinates):
+    """
+    Average coordinates over groups of particles
+    :param matrix: the matrix from group_average_matrix
+    :param coordinates: Shape: frames x particles x dimensions
+    :return: the averages. Shape: groups x frames x dimensions
+    """
+    n_frames, n_particles, n_dimensions = coordinates.shape
+    values = coordinates.transpose((1, 0, 2)).reshape((n_particles, n_frames * n_dimensions))
+    return np.asarray(matrix @ values).reshape((matrix.shape[0], n_frames, n_dimensions))
+
+
+def minimum_image(vectors, box_lengths):
+    """
+    Wrap vectors to their shortest periodic image in an orthorhombic box
+    :param vectors: Shape: ... x frames x 3
+    :param box_lengths: Shape: frames x 3
+    """
+    fractional = vectors / box_lengths
+    return (fractional - np.round(fractional)) * box_lengths
+
+
+def normalise(vectors):
+    """Scale vectors of shape ... x 3 to unit length"""
+    return vectors / np.sqrt(np.sum(vectors * vectors, axis=-1, keepdims=True))
+
+
+def auto_correlation_sum(vectors, indices=None, max_chunk_bytes=MAX_CHUNK_BYTES):
+    """
+    Sum of numpy.correlate(u, u, 'same') over the particles in indices and the dimensions,
+    where u = vectors[particle, :, dimension]
+    :param vectors: Shape: particles x frames x dimensions
+    :param indices: the particles to sum over. All particles if None
+    """
+    indices = np.arange(vectors.shape[0]) if indices is None else np.asarray(indices, dtype=int)
+    n_frames = vectors.shape[1]
+    n_fft = _fft_length(n_frames)
+    power = np.zeros(n_fft // 2 + 1)
+    for batch in _particle_batches(indices, n_fft, vectors.shape[2], max_chunk_bytes):
+        spectra = np.fft.rfft(vectors[batch], n=n_fft, axis=1)
+        power += np.sum(spectra.real ** 2 + spectra.imag ** 2, axis=(0, 2))
+    return _same_mode_lags(power, n_frames, n_fft)
+
+
+def cross_correlation_sum(vectors, first, second, max_chunk_bytes=MAX_CHUNK_BYTES):
+    """
+    Sum of numpy.correlate(u, v, 'same') over every pair of particles i in first and j in second and
+    over the dimensions, where u = vectors[i, :, dimension] and v = vectors[j, :, dimension]
+    :param vectors: Shape: particles x frames x dimensions
+    """
+    n_frames = vectors.shape[1]
+    n_fft = _fft_length(n_frames)
+    first_spectrum = _spectrum_sum(vectors, first, n_fft, max_chunk_bytes)
+    second_spectrum = _spectrum_sum(vectors, second, n_fft, max_chunk_bytes)
+    return _same_mode_lags(np.sum(first_spectrum * np.conj(second_spectrum), axis=-1), n_frames, n_fft)
+
+
+def pair_correlation_sum(vectors, indices, max_chunk_bytes=MAX_CHUNK_BYTES):
+    """
+    Sum of numpy.correlate(u, v, 'same') over every pair of particles i, j in indices with i before j and
+    over the dimensions, where u = vectors[i, :, dimension] and v = vectors[j, :, dimension]
+    :param vectors: Shape: particles x frames x dimensions
+    """
+    n_frames, n_dimensions = vectors.shape[1:]
+    n_fft = _fft_length(n_frames)
+    preceding = np.zeros((n_fft // 2 + 1, n_dimensions), dtype=np.complex128)
+    correlation = np.zeros(n_fft // 2 + 1, dtype=np.complex128)
+    for batch in _particle_batches(np.asarray(indices, dtype=int), n_fft, n_dimensions, max_chunk_bytes, copies=3):
+        spectra = np.fft.rfft(vectors[batch], n=n_fft, axis=1)
+        # Sum of the spectra of all particles before each particle of the batch
+        before = np.cumsum(spectra, axis=0) - spectra + preceding
+        correlation += np.sum(before * np.conj(spectra), axis=(0, 2))
+        preceding += np.sum(spectra, axis=0)
+    return _same_mode_lags(correlation, n_frames, n_fft)
+
+
+def _fft_length(n_frames):
+    # Zero padding to at least 2n - 1 points avoids circular wrap-around of the correlation
+    return 1 << (2 * n_frames - 2).bit_length()
+
+
+def _particle_batches(indices, n_fft, n_dimensions, max_chunk_bytes, copies=1):
+    """Split indices into batches whose spectra take up at most max_chunk_bytes"""
+    spectrum_bytes = copies * 16 * (n_fft // 2 + 1) * n_dimensions
+    batch_size = max(1, max_chunk_bytes // spectrum_bytes)
+    for start in range(0, len(indices), batch_size):
+        yield indices[start:start + batch_size]
+
+
+def _spectrum_sum(vectors, indices, n_fft, max_chunk_bytes):
+    spectrum = np.zeros((n_fft // 2 + 1, vectors.shape[2]), dtype=np.complex128)
+    for batch in _particle_batches(np.asarray(indices, dtype=int), n_fft, vectors.shape[2], max_chunk_bytes):
+        spectrum += np.sum(np.fft.rfft(vectors[batch], n=n_fft, axis=1), axis=0)
+    return spectrum
+
+
+def _same_mode_lags(spectrum, n_frames, n_fft):
+    """Transform a correlation spectrum back and pick the lags numpy.correlate returns in 'same' mode"""
+    correlation = np.fft.irfft(spectrum, n=n_fft)
+    lags = np.arange(n_frames) - n_frames // 2
+    return correlation[lags % n_fft]
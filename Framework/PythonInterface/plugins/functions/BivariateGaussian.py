@@ -236,6 +236,7 @@ class BivariateGaussian(IFunction1D):
         for i in range(self.numParams()):
             c[i] = self.getParamValue(i)
         nc = np.prod(np.shape(c))
+        partials = np.empty((len(f_int), nc))
         for k in range(nc):
             dc = np.zeros(nc)
             if k == 1 or k == 2:
@@ -244,8 +245,8 @@ class BivariateGaussian(IFunction1D):
                 epsUse = eps
             dc[k] = max(epsUse, epsUse * c[k])
             f_new = self.function1DDiffParams(xvals, c + dc)
-            for i, dF in enumerate(f_new - f_int):
-                jacobian.set(i, k, dF / dc[k])
+            partials[:, k] = (f_new - f_int) / dc[k]
+        jacobian.setFromArray(partials)
 
 
 FunctionFactory.subscribe(BivariateGaussian)
@@ -9,7 +9,6 @@
 @author Spencer Howells, ISIS
 @date December 05, 2013
 '''
-import math
 import numpy as np
 
 from mantid.api import IFunction1D, FunctionFactory
@@ -43,11 +42,10 @@ class ChudleyElliot(IFunction1D):
         tau = self.getParameterValue("Tau")
         length = self.getParameterValue("L")
 
-        for i, x in enumerate(xvals, start=0):
-            s = 1.0 - np.sinc(x*length/np.pi)
-            hwhm = self.hbar*s/tau
-            jacobian.set(i, 0, -hwhm/tau)
-            jacobian.set(i, 1, (math.cos(x*length)-s)/(length*tau))
+        xvals = np.array(xvals)
+        s = 1.0 - np.sinc(xvals*length/np.pi)
+        hwhm = self.hbar*s/tau
+        jacobian.setFromArray(np.column_stack([-hwhm/tau, (np.cos(xvals*length)-s)/(length*tau)]))
 
 
 # Required to have Mantid recognise the new function
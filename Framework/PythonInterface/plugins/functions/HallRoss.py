@@ -9,7 +9,6 @@
 @author Spencer Howells, ISIS
 @date December 05, 2013
 '''
-import math
 import numpy as np
 
 from mantid.api import IFunction1D, FunctionFactory
@@ -44,11 +43,10 @@ class HallRoss(IFunction1D):
         l = self.getParameterValue("L")
         l = l**2 / 2
 
-        for i, x in enumerate(xvals, start=0):
-            ex = math.exp(-l*x*x)
-            hwhm = self.hbar*(1.0-ex)/tau
-            jacobian.set(i, 0, -hwhm/tau)
-            jacobian.set(i, 1, x*x*ex/tau)
+        xvals = np.array(xvals)
+        ex = np.exp(-l*xvals*xvals)
+        hwhm = self.hbar*(1.0-ex)/tau
+        jacobian.setFromArray(np.column_stack([-hwhm/tau, xvals*xvals*ex/tau]))
 
 
 # Required to have Mantid recognise the new function
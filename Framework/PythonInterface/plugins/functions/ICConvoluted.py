@@ -122,12 +122,13 @@ class IkedaCarpenterConvoluted(IFunction1D):
         for i in range(self.numParams()):
             c[i] = self.getParamValue(i)
         nc = np.prod(np.shape(c))
+        partials = np.empty((len(f_int), nc))
         for k in range(nc):
             dc = np.zeros(nc)
             dc[k] = max(eps, eps*c[k])
             f_new = self.function1DDiffParams(xvals, c+dc)
-            for i, dF in enumerate(f_new-f_int):
-                jacobian.set(i, k, dF/dc[k])
+            partials[:, k] = (f_new-f_int)/dc[k]
+        jacobian.setFromArray(partials)
 
 
 FunctionFactory.subscribe(IkedaCarpenterConvoluted)
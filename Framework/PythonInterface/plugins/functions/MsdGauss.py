@@ -9,7 +9,6 @@
 @author Spencer Howells, ISIS
 @date December 05, 2013
 '''
-import math
 import numpy as np
 
 from mantid.api import IFunction1D, FunctionFactory
@@ -40,11 +39,9 @@ class MsdGauss(IFunction1D):
         height = self.getParameterValue("Height")
         msd = self.getParameterValue("Msd")
 
-        for i, x in enumerate(xvals):
-            e = math.exp((-msd * x**2)/6)
-            jacobian.set(i, 0, e)
-            jacobian.set(i, 1, -((x**2)/6) * e * height)
-            i += 1
+        xvals = np.array(xvals)
+        e = np.exp((-msd * xvals**2)/6)
+        jacobian.setFromArray(np.column_stack([e, -((xvals**2)/6) * e * height]))
 
 
 # Required to have Mantid recognise the new function
@@ -14,7 +14,7 @@
 import numpy as np
 
 from mantid.api import IFunction1D, FunctionFactory
-from StretchedExpFTHelper import surrogate, function1Dcommon
+from StretchedExpFTHelper import surrogate, function1Dcommon, interpolationSlope, KernelCache
 
 
 class PrimStretchedExpFT(IFunction1D):
@@ -22,6 +22,7 @@ class PrimStretchedExpFT(IFunction1D):
     def __init__(self):
         super(self.__class__, self).__init__()
         self._parmList = list()
+        self._kernels = KernelCache()
 
     def category(self):
         return 'QuasiElastic'
@@ -56,11 +57,24 @@ class PrimStretchedExpFT(IFunction1D):
         :param optparms: alternate list of function parameters
         :return: P(bin_boundaries[i+1])- P(bin_boundaries[i]), the difference of the primitive
         """
-        rf = 16
         parms, de, energies, fourier = function1Dcommon(
-            self, xvals, rf=rf, **optparms)
+            self, xvals, **optparms)
         if parms is None:
             return fourier  # return zeros if parameters not valid
+        transform = self.shape(xvals, parms['Centre'], de, energies, fourier)
+        return transform * parms['Height']
+
+    def shape(self, xvals, centre, de, energies, kernel, slope=False):
+        """Difference of the primitive of the kernel at the boundaries of the
+        energy bins centred at xvals, shifted by centre
+        :param xvals: energy domain
+        :param centre: centre of the peak
+        :param de: energy width of the kernel
+        :param energies: energies of the kernel
+        :param kernel: Fourier transform, or one of its derivatives
+        :param slope: return instead the derivative with respect to the energy
+        """
+        rf = self._kernels.refine_factor
         denergies = (energies[-1] - energies[0]) / (len(energies)-1)
         # Find bin boundaries
         boundaries = (xvals[1:]+xvals[:-1])/2  # internal bin boundaries
@@ -68,10 +82,10 @@ class PrimStretchedExpFT(IFunction1D):
         boundaries = np.insert(boundaries, 0, 2*xvals[0]-boundaries[0])
         # external upper boundary
         boundaries = np.append(boundaries, 2*xvals[-1]-boundaries[-1])
-        primitive = np.cumsum(fourier) * (denergies / (rf*de))  # running Riemann sum
-        transform = np.interp(boundaries[1:] - parms['Centre'], energies, primitive) - \
-            np.interp(boundaries[:-1] - parms['Centre'], energies, primitive)
-        return transform * parms['Height']
+        primitive = np.cumsum(kernel) * (denergies / (rf*de))  # running Riemann sum
+        interpolate = interpolationSlope if slope else np.interp
+        return interpolate(boundaries[1:] - centre, energies, primitive) - \
+            interpolate(boundaries[:-1] - centre, energies, primitive)
 
     @surrogate
     def fillJacobian(self, xvals, jacobian, partials):
@@ -85,7 +99,7 @@ class PrimStretchedExpFT(IFunction1D):
 
     @surrogate
     def functionDeriv1D(self, xvals, jacobian):
-        """Numerical derivative except for Height parameter"""
+        """Analytical derivatives of the function"""
         # partial derivatives with respect to the fitting parameters
         pass
 
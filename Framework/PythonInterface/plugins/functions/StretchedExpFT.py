@@ -14,7 +14,7 @@
 import numpy as np
 
 from mantid.api import IFunction1D, FunctionFactory
-from StretchedExpFTHelper import surrogate, function1Dcommon
+from StretchedExpFTHelper import surrogate, function1Dcommon, interpolationSlope, KernelCache
 
 
 class StretchedExpFT(IFunction1D):
@@ -23,6 +23,7 @@ class StretchedExpFT(IFunction1D):
     def __init__(self):
         super(self.__class__, self).__init__()
         self._parmList = list()
+        self._kernels = KernelCache()
 
     def category(self):
         return 'QuasiElastic'
@@ -53,9 +54,21 @@ class StretchedExpFT(IFunction1D):
         if parms is None:
             return fourier  # return zeros if parameters not valid
         transform = parms['Height'] * \
-            np.interp(xvals-parms['Centre'], energies, fourier)
+            self.shape(xvals, parms['Centre'], de, energies, fourier)
         return transform
 
+    def shape(self, xvals, centre, de, energies, kernel, slope=False):
+        """Kernel interpolated at the energies xvals shifted by centre
+        :param xvals: energy domain
+        :param centre: centre of the peak
+        :param de: energy width of the kernel
+        :param energies: energies of the kernel
+        :param kernel: Fourier transform, or one of its derivatives
+        :param slope: return instead the derivative with respect to the energy
+        """
+        interpolate = interpolationSlope if slope else np.interp
+        return interpolate(xvals-centre, energies, kernel)
+
     @surrogate
     def fillJacobian(self, xvals, jacobian, partials):
         """Fill the jacobian object with the dictionary of partial derivatives
@@ -68,7 +81,7 @@ class StretchedExpFT(IFunction1D):
 
     @surrogate
     def functionDeriv1D(self, xvals, jacobian):
-        """Numerical derivative except for Height parameter"""
+        """Analytical derivatives of the function"""
         # partial derivatives with respect to the fitting parameters
         pass
 
@@ -13,12 +13,14 @@
 This module provides functionality common to classes StretchedExpFT and PrimStretchedExpFT
 """
 
-import copy
+from collections import OrderedDict
 from scipy.fftpack import fft, fftfreq
-from scipy.special import gamma
+from scipy.special import digamma, gamma
 from scipy import constants
 import numpy as np
 
+planck_constant = constants.Planck / constants.e * 1E15  # meV*psec
+
 
 def fillJacobian(function, xvals, jacobian, partials):
     """Fill the jacobian object with the dictionary of partial derivatives
@@ -30,44 +32,34 @@ def fillJacobian(function, xvals, jacobian, partials):
     """
     # Return zero derivatives if empty object
     if not partials:
-        for ip in range(len(function._parmList)):
-            for ix in range(len(xvals)):
-                jacobian.set(ix, ip, 0.0)
+        jacobian.setFromArray(np.zeros((len(xvals), len(function._parmList))))
     else:
-        for ip in range(len(function._parmList)):
-            name = function._parmList[ip]
-            pd = partials[name]
-            for ix in range(len(xvals)):
-                jacobian.set(ix, ip, pd[ix])
+        jacobian.setFromArray(np.column_stack([partials[name] for name in function._parmList]))
 
 
 def functionDeriv1D(function, xvals, jacobian):
-    """Numerical derivative except for Height parameter
+    """Analytical derivatives of the function
     :param function: instance of StretchedExpFT or PrimStretchedExpFT
     :param xvals: energy domain
     :param jacobian: object to store partial derivatives with respect to fitting parameters
     """
-    # partial derivatives with respect to the fitting parameters
-    partials = {}
     p = function.validateParams()
     if not p:
         function.fillJacobian(xvals, jacobian, {})
         return
-    f0 = function.function1D(xvals)
-    # Add these quantities to original parameter values
-    dp = {'Tau': 1.0,  # change by 1ps
-          'Beta': 0.01,
-          'Centre': 0.0001  # change by 0.1 micro-eV
-          }
-    for name in dp.keys():
-        pp = copy.copy(p)
-        pp[name] += dp[name]
-        partials[name] = (function.function1D(xvals, **pp) - f0) / dp[name]
-    # Analytical derivative for Height parameter. Note we don't use
-    # f0/p['Height'] in case p['Height'] was set to zero by the user
-    pp = copy.copy(p)
-    pp['Height'] = 1.0
-    partials['Height'] = function.function1D(xvals, **pp)
+    de, energies = function._kernels.grid(xvals)
+    fourier, dfourier_dtau, dfourier_dbeta = function._kernels.kernel(xvals, p['Tau'], p['Beta'], derivatives=True)
+
+    def shape(kernel, slope=False):
+        return function.shape(xvals, p['Centre'], de, energies, kernel, slope=slope)
+
+    # The function is Height * shape(fourier), where only the kernel fourier
+    # depends on Tau and Beta, and Centre shifts the energies. Note we don't
+    # use f0/p['Height'] in case p['Height'] was set to zero by the user
+    partials = {'Height': shape(fourier),
+                'Tau': p['Height'] * shape(dfourier_dtau),
+                'Beta': p['Height'] * shape(dfourier_dbeta),
+                'Centre': -p['Height'] * shape(fourier, slope=True)}
     function.fillJacobian(xvals, jacobian, partials)
 
 
@@ -116,47 +108,132 @@ def surrogate(method):
     return surrogates[method.__name__]
 
 
-def function1Dcommon(function, xvals, refine_factor=16, **optparms):
+def interpolationSlope(x, xp, fp):
+    """Derivative with respect to x of numpy.interp(x, xp, fp)
+    :param x: points where the slope is evaluated
+    :param xp: increasing abscissas of the interpolated values
+    :param fp: interpolated values
+    :return: slope of the linear interpolation, zero outside the range of xp
+    """
+    slopes = np.diff(fp) / np.diff(xp)
+    index = np.searchsorted(xp, x, side='right') - 1
+    inside = (index >= 0) & (index < len(slopes))
+    return np.where(inside, slopes[np.clip(index, 0, len(slopes) - 1)], 0.0)
+
+
+class KernelCache(object):
+    """Time and energy grids of each energy domain, and the Fourier transforms of
+    the symmetrized stretched exponential on them for the last few values of Tau and Beta.
+
+    Fit evaluates the function and its derivatives many times on the same domain, so the
+    grids are built once per domain, and the transforms are only calculated again when Tau
+    or Beta change. The derivatives with respect to Tau and Beta are transformed in the same
+    FFT call as the stretched exponential.
+    """
+
+    def __init__(self, refine_factor=16, max_kernels=8):
+        """
+        :param refine_factor: divide the natural energy width by this value
+        :param max_kernels: number of transforms kept for different values of Tau and Beta
+        """
+        self.refine_factor = refine_factor
+        self._max_kernels = max_kernels
+        self._grids = dict()
+        self._kernels = OrderedDict()
+
+    def _domainKey(self, xvals):
+        return len(xvals), xvals[0], xvals[-1], max(abs(xvals))
+
+    def _grid(self, xvals):
+        key = self._domainKey(xvals)
+        if key not in self._grids:
+            ne = len(xvals)
+            # energy spacing. Assumed xvals is a single-segment grid
+            # of increasing energy values
+            de = (xvals[-1] - xvals[0]) / (self.refine_factor * (ne - 1))
+            erange = 2 * max(abs(xvals))
+            dt = 0.5 * planck_constant / erange  # spacing in time
+            tmax = planck_constant / de  # maximum reciprocal time
+            # round to an upper power of two
+            nt = 2 ** (1 + int(np.log(tmax / dt) / np.log(2)))
+            abs_times = np.abs(dt * np.arange(-nt, nt))
+            # Find energy values corresponding to the fourier values
+            energies = planck_constant * fftfreq(2 * nt, d=dt)  # standard ordering
+            energies = np.concatenate(
+                [energies[nt:], energies[:nt]])  # increasing ordering
+            self._grids[key] = (de, energies, abs_times, nt)
+        return self._grids[key]
+
+    def grid(self, xvals):
+        """Energy width and energies of the transforms for an energy domain
+        :param xvals: energy domain
+        :return: energy width, and increasing energies
+        """
+        de, energies, _, _ = self._grid(xvals)
+        return de, energies
+
+    def kernel(self, xvals, tau, beta, derivatives=False):
+        """Fourier transform of the symmetrized stretched exponential, normalized to unit integral
+        :param xvals: energy domain
+        :param tau: relaxation time
+        :param beta: stretching exponent
+        :param derivatives: also return the derivatives of the transform with respect to tau and beta
+        :return: the transform at the energies of the grid, followed by its derivatives if requested
+        """
+        key = (self._domainKey(xvals), tau, beta)
+        cached = self._kernels.get(key)
+        if cached is None or (derivatives and len(cached) == 1):
+            cached = self._transform(xvals, tau, beta, derivatives)
+            self._kernels[key] = cached
+            if len(self._kernels) > self._max_kernels:
+                self._kernels.popitem(last=False)
+        self._kernels.move_to_end(key)
+        return cached if derivatives else cached[0]
+
+    def _transform(self, xvals, tau, beta, derivatives):
+        _, _, abs_times, nt = self._grid(xvals)
+        powered = (abs_times / tau) ** beta
+        decay = np.exp(-powered)
+        signals = [decay]
+        if derivatives:
+            log_ratio = np.log(abs_times / tau, out=np.zeros_like(abs_times), where=abs_times > 0)
+            signals += [decay * powered * beta / tau,  # derivative with respect to tau
+                        -decay * powered * log_ratio]  # derivative with respect to beta
+        # The Fourier transform introduces an extra factor exp(i*pi*E/de),
+        # which amounts to alternating sign every time E increases by de,
+        # the energy bin width. Thus, we take the absolute value
+        transforms = fft(np.array(signals), axis=-1).real  # notice the reverse of decay array
+        signs = np.sign(transforms[0])
+        fourier = np.abs(transforms[0])
+        maximum = fourier[0]
+        # set maximum to unity and normalize the integral in energies to unity
+        normalization = 2 * tau * gamma(1. / beta) / (beta * planck_constant)
+        kernels = [fourier * (normalization / maximum)]
+        if derivatives:
+            dlog_normalization = {'tau': 1. / tau, 'beta': -digamma(1. / beta) / beta ** 2 - 1. / beta}
+            for name, transform in zip(('tau', 'beta'), transforms[1:]):
+                dfourier = signs * transform
+                dunit = (dfourier - fourier * dfourier[0] / maximum) / maximum
+                kernels.append(normalization * dunit + kernels[0] * dlog_normalization[name])
+        # symmetrize to negative energies, in increasing ordering
+        return tuple(np.concatenate([kernel[nt:], kernel[:nt]]) for kernel in kernels)
+
+
+def function1Dcommon(function, xvals, **optparms):
     """Fourier transform of the symmetrized stretched exponential
     :param function: instance of StretchedExpFT or PrimStretchedExpFT
     :param xvals: energy domain
-    :param refine_factor: divide the natural energy width by this value
-    :param optparms: optional parameters used when evaluating the numerical derivative
+    :param optparms: optional parameters overriding those of the function
     :return: parameters, energy width, energies, and function values
     """
-    planck_constant = constants.Planck / constants.e * 1E15  # meV*psec
     p = function.validateParams()
     if p is None:
         # return zeros if parameters not valid
         return p, None, None, np.zeros(len(xvals), dtype=float)
-    # override with optparms (used for the numerical derivative)
+    # override with optparms
     if optparms:
         for name in optparms.keys():
             p[name] = optparms[name]
-
-    ne = len(xvals)
-    # energy spacing. Assumed xvals is a single-segment grid
-    # of increasing energy values
-    de = (xvals[-1] - xvals[0]) / (refine_factor * (ne - 1))
-    erange = 2 * max(abs(xvals))
-    dt = 0.5 * planck_constant / erange  # spacing in time
-    tmax = planck_constant / de  # maximum reciprocal time
-    # round to an upper power of two
-    nt = 2 ** (1 + int(np.log(tmax / dt) / np.log(2)))
-    sampled_times = dt * np.arange(-nt, nt)
-    decay = np.exp(-(np.abs(sampled_times) / p['Tau']) ** p['Beta'])
-    # The Fourier transform introduces an extra factor exp(i*pi*E/de),
-    # which amounts to alternating sign every time E increases by de,
-    # the energy bin width. Thus, we take the absolute value
-    fourier = np.abs(fft(decay).real)  # notice the reverse of decay array
-    fourier /= fourier[0]  # set maximum to unity
-    # Normalize the integral in energies to unity
-    fourier *= 2*p['Tau']*gamma(1./p['Beta']) / (p['Beta']*planck_constant)
-    # symmetrize to negative energies
-    fourier = np.concatenate(
-        [fourier[nt:], fourier[:nt]])  # increasing ordering
-    # Find energy values corresponding to the fourier values
-    energies = planck_constant * fftfreq(2 * nt, d=dt)  # standard ordering
-    energies = np.concatenate(
-        [energies[nt:], energies[:nt]])  # increasing ordering
+    de, energies = function._kernels.grid(xvals)
+    fourier = function._kernels.kernel(xvals, p['Tau'], p['Beta'])
     return p, de, energies, fourier
@@ -43,11 +43,10 @@ class TeixeiraWater(IFunction1D):
         tau = self.getParameterValue("Tau")
         length = self.getParameterValue("L")
 
-        for i, x in enumerate(xvals, start=0):
-            hwhm = self.hbar * \
-                np.square(x * length) / (tau * (6 + np.square(x * length)))
-            jacobian.set(i, 0, -hwhm / tau)
-            jacobian.set(i, 1, 2 * hwhm * (1.0 - hwhm * tau) / length)
+        xvals = np.array(xvals)
+        hwhm = self.hbar * \
+            np.square(xvals * length) / (tau * (6 + np.square(xvals * length)))
+        jacobian.setFromArray(np.column_stack([-hwhm / tau, 2 * hwhm * (1.0 - hwhm * tau) / length]))
 
 
 # Required to have Mantid recognise the new function
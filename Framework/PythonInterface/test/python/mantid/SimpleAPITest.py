@@ -5,6 +5,8 @@
 #   Institut Laue - Langevin & CSNS, Institute of High Energy Physics, CAS
 # SPDX - License - Identifier: GPL - 3.0 +
 import inspect
+import subprocess
+import sys
 import unittest
 
 from mantid.api import (AlgorithmFactory, IAlgorithm, IEventWorkspace, ITableWorkspace, PythonAlgorithm, MatrixWorkspace, mtd)
@@ -228,6 +230,58 @@ class SimpleAPITest(unittest.TestCase):
         self.assertTrue('workspace' in mtd)
         self.assertTrue('raw' in mtd)
 
+    def test_calls_in_a_loop_use_the_lhs_variable_names(self):
+        for index in range(3):
+            looped = simpleapi.CreateWorkspace([1.5], [float(index)], NSpec=1)
+            self.assertEqual('looped', looped.name())
+            self.assertEqual(index, looped.readY(0)[0])
+            first, second = simpleapi.CompareWorkspaces(looped, looped)
+            self.assertTrue(first)
+            self.assertTrue('second' in mtd)
+
+    def test_output_properties_are_read_again_when_an_algorithm_is_subscribed_again(self):
+        from mantid.api import AlgorithmManager, MatrixWorkspaceProperty, WorkspaceFactory
+        from mantid.kernel import Direction
+
+        def make_algorithm(output_names):
+            class SimpleAPIResubscribedAlgorithm(PythonAlgorithm):
+                def PyInit(self):
+                    for output_name in output_names:
+                        self.declareProperty(MatrixWorkspaceProperty(output_name, "", Direction.Output))
+
+                def PyExec(self):
+                    for output_name in output_names:
+                        self.setProperty(output_name, WorkspaceFactory.create("Workspace2D", NVectors=1, YLength=1,
+                                                                              XLength=1))
+            return SimpleAPIResubscribedAlgorithm
+
+        name = "SimpleAPIResubscribedAlgorithm"
+        try:
+            AlgorithmFactory.subscribe(make_algorithm(["OutputWorkspace"]))
+            algm_object = AlgorithmManager.createUnmanaged(name, 1)
+            algm_object.initialize()
+            simpleapi._create_algorithm_function(name, 1, algm_object)
+            single = simpleapi.SimpleAPIResubscribedAlgorithm()
+            self.assertEqual('single', single.name())
+
+            # Notifications are off outside the workbench, so the function is created again as on registration
+            AlgorithmFactory.subscribe(make_algorithm(["FirstWorkspace", "SecondWorkspace"]))
+            algm_object = AlgorithmManager.createUnmanaged(name, 1)
+            algm_object.initialize()
+            simpleapi._create_algorithm_function(name, 1, algm_object)
+            first, second = simpleapi.SimpleAPIResubscribedAlgorithm()
+            self.assertEqual('first', first.name())
+            self.assertEqual('second', second.name())
+
+            # The workbench enables update notifications, which also clear the cache
+            AlgorithmFactory.enableNotifications()
+            AlgorithmFactory.subscribe(make_algorithm(["OutputWorkspace"]))
+            single = simpleapi.SimpleAPIResubscribedAlgorithm()
+            self.assertEqual('single', single.name())
+        finally:
+            AlgorithmFactory.disableNotifications()
+            del simpleapi.SimpleAPIResubscribedAlgorithm
+
     def test_alg_produces_correct_workspace_in_APS_from_python(self):
         dataX = numpy.linspace(start=1, stop=3, num=11)
         dataY = numpy.linspace(start=1, stop=3, num=10)
@@ -324,6 +378,51 @@ class SimpleAPITest(unittest.TestCase):
         # Tidy up simple api function
         del simpleapi.OptionalWorkspace
 
+    def test_lazily_registered_function_is_created_on_first_access(self):
+        from mantid.api import AlgorithmManager
+
+        class SimpleAPILazyAlgorithm(PythonAlgorithm):
+            def PyInit(self):
+                pass
+
+            def PyExec(self):
+                pass
+
+        AlgorithmFactory.subscribe(SimpleAPILazyAlgorithm)
+        name = "SimpleAPILazyAlgorithm"
+        entry = simpleapi._IndexedAlgorithm.entry_from_algorithm(AlgorithmManager.createUnmanaged(name, 1))
+        simpleapi._register_lazy_algorithm_function(simpleapi._IndexedAlgorithm(name, entry))
+
+        self.assertFalse(name in vars(simpleapi))
+        self.assertTrue(name in dir(simpleapi))
+        func = simpleapi.SimpleAPILazyAlgorithm
+        self.assertTrue(name in vars(simpleapi))
+        self.assertFalse(name in simpleapi._lazy_algorithms)
+        self.assertEqual(name, func.__name__)
+        self.assertGreater(len(func.__doc__), 0)
+        func()
+
+        # Tidy up simple api function
+        del simpleapi.SimpleAPILazyAlgorithm
+
+    def test_import_with_lazy_loading_creates_functions_on_first_access(self):
+        # The module can only be imported once per process so a fresh interpreter is needed
+        script = "\n".join(["from mantid.kernel import ConfigService",
+                            "ConfigService['python.simpleapi.lazyload'] = '1'",
+                            "import mantid.simpleapi as simpleapi",
+                            "assert 'Rebin' in simpleapi._lazy_algorithms",
+                            "assert 'Rebin' not in vars(simpleapi)",
+                            "assert simpleapi.Rebin.__name__ == 'Rebin'",
+                            "assert 'Rebin' in vars(simpleapi)",
+                            "assert 'Rebin' in simpleapi.__all__",
+                            "simpleapi.CreateSampleWorkspace(OutputWorkspace='ws')"])
+        result = subprocess.run([sys.executable, "-c", script], stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                universal_newlines=True)
+        self.assertEqual(result.returncode, 0, msg=result.stdout)
+
+    def test_unknown_attribute_raises_AttributeError(self):
+        self.assertRaises(AttributeError, getattr, simpleapi, "NotAnAlgorithmName")
+
     def test_create_algorithm_object_produces_initialized_non_child_alorithm_outside_PyExec(self):
         alg = simpleapi._create_algorithm_object("Rebin")
         self._is_initialized_test(alg, 1, expected_class=IAlgorithm, expected_child=False)
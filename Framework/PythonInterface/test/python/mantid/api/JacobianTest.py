@@ -5,14 +5,70 @@
 #   Institut Laue - Langevin & CSNS, Institute of High Energy Physics, CAS
 # SPDX - License - Identifier: GPL - 3.0 +
 import unittest
-from mantid.api import Jacobian
+import numpy as np
+from mantid.api import FunctionFactory, IFunction1D, Jacobian
+from mantid.simpleapi import CreateWorkspace, Fit
+
+
+class LinearWithArrayJacobian(IFunction1D):
+
+    def init(self):
+        self.declareParameter("A0", 0.0)
+        self.declareParameter("A1", 0.0)
+
+    def function1D(self, xvals):
+        return self.getParameterValue("A0") + self.getParameterValue("A1") * xvals
+
+    def functionDeriv1D(self, xvals, jacobian):
+        jacobian.setFromArray(np.column_stack([np.ones_like(xvals), xvals]))
+
+
+class LinearWithWrongJacobian(LinearWithArrayJacobian):
+
+    def functionDeriv1D(self, xvals, jacobian):
+        jacobian.setFromArray(xvals)
+
+
+class LinearWithMissingParameterJacobian(LinearWithArrayJacobian):
+
+    def functionDeriv1D(self, xvals, jacobian):
+        jacobian.setFromArray(np.ones_like(xvals)[:, np.newaxis])
 
 
 class JacobianTest(unittest.TestCase):
 
+    @classmethod
+    def setUpClass(cls):
+        FunctionFactory.subscribe(LinearWithArrayJacobian)
+        FunctionFactory.subscribe(LinearWithWrongJacobian)
+        FunctionFactory.subscribe(LinearWithMissingParameterJacobian)
+        x = np.linspace(0.0, 10.0, 50)
+        CreateWorkspace(DataX=x, DataY=1.5 + 2.0 * x, OutputWorkspace='JacobianTest_linear')
+
+    @classmethod
+    def tearDownClass(cls):
+        FunctionFactory.unsubscribe('LinearWithArrayJacobian')
+        FunctionFactory.unsubscribe('LinearWithWrongJacobian')
+        FunctionFactory.unsubscribe('LinearWithMissingParameterJacobian')
+
     def test_class_has_expected_attrs(self):
         self.assertTrue(hasattr(Jacobian, 'set'), "No set method found on Jacobian class")
         self.assertTrue(hasattr(Jacobian, 'get'), "No get method found on Jacobian class")
+        self.assertTrue(hasattr(Jacobian, 'setFromArray'), "No setFromArray method found on Jacobian class")
+
+    def test_setFromArray_sets_the_derivatives_used_by_Fit(self):
+        function = Fit(Function='name=LinearWithArrayJacobian', InputWorkspace='JacobianTest_linear').Function
+        self.assertAlmostEqual(function.getParameterValue('A0'), 1.5, places=8)
+        self.assertAlmostEqual(function.getParameterValue('A1'), 2.0, places=8)
+
+    def test_setFromArray_throws_for_an_array_which_is_not_2D(self):
+        with self.assertRaises(RuntimeError):
+            Fit(Function='name=LinearWithWrongJacobian', InputWorkspace='JacobianTest_linear')
+
+    def test_setFromArray_throws_for_an_array_with_the_wrong_shape(self):
+        with self.assertRaisesRegex(RuntimeError, r'expects an array of shape \(50, 2\) but was given one of shape \(50, 1\)'):
+            Fit(Function='name=LinearWithMissingParameterJacobian', InputWorkspace='JacobianTest_linear')
+
 
 if __name__ == '__main__':
     unittest.main()
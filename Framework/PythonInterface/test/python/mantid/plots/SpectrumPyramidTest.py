@@ -0,0 +1,92 @@
+# Mantid Repository : https://github.com/mantidproject/mantid
+#
+# Copyright &copy; 2021 ISIS Rutherford Appleton Laboratory UKRI,
+#   NScD Oak Ridge National Laboratory, European Spallation Source,
+#   Institut Laue - Langevin & CSNS, Institute of High Energy Physics, CAS
+# SPDX - License - Identifier: GPL - 3.0 +
+#
+import unittest
+
+import matplotlib
+
+matplotlib.use('AGG')  # noqa
+import numpy as np
+
+import mantid.plots.datafunctions as funcs
+from mantid.plots.resampling_image import pyramid
+from mantid.simpleapi import CreateWorkspace, DeleteWorkspace, Integration
+
+
+class SpectrumPyramidTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        np.random.seed(42)
+        cls.nspec = 37
+        cls.ws = CreateWorkspace(DataX=list(range(1, 5)) * cls.nspec,
+                                 DataY=np.random.randint(0, 5, 3 * cls.nspec).astype(float),
+                                 NSpec=cls.nspec,
+                                 OutputWorkspace='spectrum_pyramid_ws')
+        cls.ws_rag = CreateWorkspace(DataX=[1, 2, 3, 4, 5, 2, 4, 6, 8, 10],
+                                     DataY=[2, 3, 4, 5, 6, 7, 8, 9],
+                                     NSpec=2,
+                                     VerticalAxisUnit='DeltaE',
+                                     VerticalAxisValues=[5, 7, 9],
+                                     OutputWorkspace='spectrum_pyramid_ws_rag')
+
+    @classmethod
+    def tearDownClass(cls):
+        DeleteWorkspace('spectrum_pyramid_ws')
+        DeleteWorkspace('spectrum_pyramid_ws_rag')
+
+    def tearDown(self):
+        pyramid.clear()
+
+    def test_max_pooled_index_matches_argmax(self):
+        counts = Integration(self.ws, StoreInADS=False).extractY().ravel()
+        spectrum_pyramid = pyramid.SpectrumPyramid(self.ws)
+        for start in range(self.nspec):
+            for stop in range(start + 1, self.nspec + 1):
+                self.assertEqual(start + np.argmax(counts[start:stop]),
+                                 spectrum_pyramid.max_pooled_index(start, stop))
+
+    def test_get_matrix_2d_ragged_same_with_pyramid(self):
+        for maxpooling in (False, True):
+            expected = funcs.get_matrix_2d_ragged(self.ws, False, histogram2D=True, extent=[1, 4, 1, self.nspec],
+                                                  xbins=7, ybins=5, maxpooling=maxpooling)
+            spectrum_pyramid = pyramid.SpectrumPyramid(self.ws)
+            for _ in range(2):
+                result = funcs.get_matrix_2d_ragged(self.ws, False, histogram2D=True, extent=[1, 4, 1, self.nspec],
+                                                    xbins=7, ybins=5, maxpooling=maxpooling,
+                                                    pyramid=spectrum_pyramid)
+                for expected_array, array in zip(expected, result):
+                    np.testing.assert_array_equal(expected_array, array)
+
+    def test_get_matrix_2d_ragged_same_with_pyramid_for_ragged_workspace(self):
+        expected = funcs.get_matrix_2d_ragged(self.ws_rag, True, histogram2D=True, extent=[0, 11, 5, 9],
+                                              xbins=23, ybins=4)
+        result = funcs.get_matrix_2d_ragged(self.ws_rag, True, histogram2D=True, extent=[0, 11, 5, 9],
+                                            xbins=23, ybins=4, pyramid=pyramid.SpectrumPyramid(self.ws_rag))
+        np.testing.assert_array_equal(expected[2].mask, result[2].mask)
+        np.testing.assert_allclose(expected[2].compressed(), result[2].compressed())
+
+    def test_pyramid_is_shared_until_workspace_is_replaced(self):
+        first = pyramid.get_spectrum_pyramid(self.ws_rag)
+        self.assertIs(first, pyramid.get_spectrum_pyramid(self.ws_rag))
+
+        CreateWorkspace(DataX=[1, 2, 3, 4, 5, 2, 4, 6, 8, 10],
+                        DataY=[2, 3, 4, 5, 6, 7, 8, 9],
+                        NSpec=2,
+                        VerticalAxisUnit='DeltaE',
+                        VerticalAxisValues=[5, 7, 9],
+                        OutputWorkspace='spectrum_pyramid_ws_rag')
+
+        self.assertIsNot(first, pyramid.get_spectrum_pyramid(self.ws_rag))
+
+    def test_unnamed_workspace_is_not_cached(self):
+        ws = CreateWorkspace(DataX=[1, 2], DataY=[1], StoreInADS=False)
+        self.assertIsNot(pyramid.get_spectrum_pyramid(ws), pyramid.get_spectrum_pyramid(ws))
+
+
+if __name__ == '__main__':
+    unittest.main()
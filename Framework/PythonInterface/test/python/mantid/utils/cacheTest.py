@@ -0,0 +1,173 @@
+# Mantid Repository : https://github.com/mantidproject/mantid
+#
+# Copyright &copy; 2021 ISIS Rutherford Appleton Laboratory UKRI,
+#   NScD Oak Ridge National Laboratory, European Spallation Source,
+#   Institut Laue - Langevin & CSNS, Institute of High Energy Physics, CAS
+# SPDX - License - Identifier: GPL - 3.0 +
+from mantid.utils.cache import FileCache, BYTES_PER_GIB, LOCK_NAME, SECONDS_PER_DAY
+
+from concurrent.futures import ThreadPoolExecutor
+import os
+import stat
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+
+class FileCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.cache_dir = self._directory.name
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def _cache_file(self, index):
+        return os.path.join(self.cache_dir, 'PG3_{:040x}.nxs'.format(index))
+
+    def _write(self, cache, filename, size=100):
+        with cache.saving(filename) as temporary:
+            with open(temporary, 'wb') as handle:
+                handle.write(b'0' * size)
+
+    def _cache_files(self):
+        return sorted(name for name in os.listdir(self.cache_dir) if name.endswith('.nxs'))
+
+    def test_saving_renames_the_temporary_file(self):
+        cache = FileCache(self.cache_dir)
+        filename = self._cache_file(1)
+        with cache.saving(filename) as temporary:
+            self.assertNotEqual(temporary, filename)
+            self.assertTrue(temporary.endswith('.nxs'))
+            with open(temporary, 'wb') as handle:
+                handle.write(b'data')
+            self.assertFalse(os.path.exists(filename))
+
+        self.assertEqual(self._cache_files(), [os.path.basename(filename)])
+        self.assertFalse(os.path.exists(os.path.join(self.cache_dir, LOCK_NAME)))
+
+    def test_saving_removes_the_temporary_file_if_the_save_fails(self):
+        cache = FileCache(self.cache_dir)
+        with self.assertRaises(RuntimeError):
+            with cache.saving(self._cache_file(1)) as temporary:
+                with open(temporary, 'wb') as handle:
+                    handle.write(b'data')
+                raise RuntimeError('Save failed')
+
+        self.assertEqual(self._cache_files(), [])
+
+    def test_contains_counts_hits_and_misses(self):
+        cache = FileCache(self.cache_dir)
+        self._write(cache, self._cache_file(1))
+
+        self.assertTrue(cache.contains(self._cache_file(1)))
+        self.assertFalse(cache.contains(self._cache_file(2)))
+        self.assertTrue(cache.contains(self._cache_file(1)))
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+
+    def test_contains_finds_files_in_a_directory_that_cannot_be_written_to(self):
+        cache = FileCache(self.cache_dir)
+        self._write(cache, self._cache_file(1))
+        os.chmod(self.cache_dir, stat.S_IRUSR | stat.S_IXUSR)
+        try:
+            if os.access(self.cache_dir, os.W_OK):
+                self.skipTest('The directory can still be written to, e.g. by root')
+            self.assertTrue(cache.contains(self._cache_file(1)))
+            self.assertFalse(cache.contains(self._cache_file(2)))
+            self.assertEqual((cache.hits, cache.misses), (1, 1))
+        finally:
+            os.chmod(self.cache_dir, stat.S_IRWXU)
+
+    def test_contains_finds_files_when_the_index_cannot_be_locked(self):
+        cache = FileCache(os.path.join(self.cache_dir, 'missing'))
+        self._write(FileCache(self.cache_dir), self._cache_file(1))
+
+        self.assertTrue(cache.contains(self._cache_file(1)))
+
+    def test_evicts_the_least_recently_used_files_over_the_size_budget(self):
+        cache = FileCache(self.cache_dir, max_size=250. / BYTES_PER_GIB)
+        self._write(cache, self._cache_file(1))
+        self._write(cache, self._cache_file(2))
+        cache.contains(self._cache_file(1))  # now file 2 is the least recently used
+
+        self._write(cache, self._cache_file(3))
+
+        self.assertEqual(self._cache_files(), [os.path.basename(self._cache_file(i)) for i in (1, 3)])
+        self.assertEqual((cache.evicted, cache.evicted_size), (1, 100))
+
+    def test_evicts_files_not_used_within_the_age_budget(self):
+        old = self._cache_file(1)
+        with open(old, 'wb') as handle:
+            handle.write(b'data')
+        last_used = time.time() - 3. * SECONDS_PER_DAY
+        os.utime(old, (last_used, last_used))
+        cache = FileCache(self.cache_dir, max_age=2.)
+
+        self._write(cache, self._cache_file(2))
+
+        self.assertEqual(self._cache_files(), [os.path.basename(self._cache_file(2))])
+
+    def test_only_evicts_cache_files(self):
+        other = os.path.join(self.cache_dir, 'notes.nxs')
+        with open(other, 'wb') as handle:
+            handle.write(b'0' * 1000)
+        cache = FileCache(self.cache_dir, max_size=1. / BYTES_PER_GIB)
+
+        self._write(cache, self._cache_file(1))
+
+        self.assertEqual(self._cache_files(), ['notes.nxs'])
+
+    def test_concurrent_writers_keep_the_index_consistent(self):
+        cache = FileCache(self.cache_dir, max_size=1000. / BYTES_PER_GIB)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(lambda i: self._write(cache, self._cache_file(i)), range(20)))
+
+        self.assertEqual(len(self._cache_files()), 10)
+        self.assertEqual(cache.evicted, 10)
+        self.assertFalse(os.path.exists(os.path.join(self.cache_dir, LOCK_NAME)))
+
+    def test_a_stale_lock_is_broken(self):
+        lock = os.path.join(self.cache_dir, LOCK_NAME)
+        open(lock, 'w').close()
+        os.utime(lock, (time.time() - 60., time.time() - 60.))
+        cache = FileCache(self.cache_dir)
+
+        self._write(cache, self._cache_file(1))
+
+        self.assertEqual(self._cache_files(), [os.path.basename(self._cache_file(1))])
+
+    def test_contains_finds_files_when_the_lock_is_busy(self):
+        cache = FileCache(self.cache_dir)
+        self._write(cache, self._cache_file(1))
+        open(os.path.join(self.cache_dir, LOCK_NAME), 'w').close()
+
+        with mock.patch('mantid.utils.cache.LOCK_TIMEOUT', 0.05):
+            self.assertTrue(cache.contains(self._cache_file(1)))
+        self.assertEqual(cache.hits, 1)
+
+    def test_a_lock_taken_by_another_holder_is_not_removed(self):
+        cache = FileCache(self.cache_dir)
+        lock = os.path.join(self.cache_dir, LOCK_NAME)
+        with cache._locked():
+            # the lock was broken as stale and taken by another holder
+            os.remove(lock)
+            with open(lock, 'w') as lock_file:
+                lock_file.write('another holder')
+
+        self.assertTrue(os.path.exists(lock))
+
+    def test_keep_alive_stops_a_held_lock_becoming_stale(self):
+        cache = FileCache(self.cache_dir)
+        lock = os.path.join(self.cache_dir, LOCK_NAME)
+        with cache._locked() as keep_alive:
+            os.utime(lock, (time.time() - 60., time.time() - 60.))
+            with mock.patch('mantid.utils.cache.time.time', return_value=time.time() + 60.):
+                keep_alive()
+            self.assertLess(time.time() - os.path.getmtime(lock), 10.)
+        self.assertFalse(os.path.exists(lock))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+# Mantid Repository : https://github.com/mantidproject/mantid
+#
+# Copyright &copy; 2021 ISIS Rutherford Appleton Laboratory UKRI,
+#   NScD Oak Ridge National Laboratory, European Spallation Source,
+#   Institut Laue - Langevin & CSNS, Institute of High Energy Physics, CAS
+# SPDX - License - Identifier: GPL - 3.0 +
+from mantid.utils.pool import create_pool
+
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+
+class CreatePoolTest(unittest.TestCase):
+
+    def test_pool_runs_tasks_in_order(self):
+        with create_pool(2) as pool:
+            self.assertEqual(list(pool.imap(abs, range(0, -10, -1))), list(range(10)))
+
+    def test_main_module_is_restored(self):
+        main_module = sys.modules['__main__']
+        with create_pool(1, initializer=os.getpid) as pool:
+            pool.map(abs, [-1])
+        self.assertIs(sys.modules['__main__'], main_module)
+
+    def test_unguarded_script_is_not_run_by_the_workers(self):
+        with tempfile.TemporaryDirectory() as directory:
+            log = os.path.join(directory, 'runs.txt')
+            script = os.path.join(directory, 'unguarded.py')
+            with open(script, 'w') as handle:
+                handle.write('\n'.join(['from mantid.utils.pool import create_pool',
+                                        f'with open({log!r}, "a") as log:',
+                                        '    log.write("run\\n")',
+                                        'with create_pool(2) as pool:',
+                                        '    assert pool.map(abs, [-1, -2]) == [1, 2]']))
+            result = subprocess.run([sys.executable, script], stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                    universal_newlines=True)
+            self.assertEqual(result.returncode, 0, msg=result.stdout)
+            with open(log) as handle:
+                self.assertEqual(handle.read(), 'run\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -111,6 +111,20 @@ class ConvertWANDSCDtoQTest(unittest.TestCase):
 
         ConvertWANDSCDtoQTest_out.delete()
 
+    def test_NumberOfThreads(self):
+        serial = ConvertWANDSCDtoQ('ConvertWANDSCDtoQTest_data', NormalisationWorkspace='ConvertWANDSCDtoQTest_norm',
+                                   BinningDim0='-8.08,8.08,101', BinningDim1='-0.88,0.88,11',
+                                   BinningDim2='-8.08,8.08,101')
+        threaded = ConvertWANDSCDtoQ('ConvertWANDSCDtoQTest_data', NormalisationWorkspace='ConvertWANDSCDtoQTest_norm',
+                                     BinningDim0='-8.08,8.08,101', BinningDim1='-0.88,0.88,11',
+                                     BinningDim2='-8.08,8.08,101', NumberOfThreads=4)
+
+        np.testing.assert_allclose(threaded.getSignalArray(), serial.getSignalArray(), rtol=1e-12)
+        np.testing.assert_allclose(threaded.getErrorSquaredArray(), serial.getErrorSquaredArray(), rtol=1e-12)
+
+        serial.delete()
+        threaded.delete()
+
     def test_COP(self):
         ConvertWANDSCDtoQTest_out = ConvertWANDSCDtoQ('ConvertWANDSCDtoQTest_data', BinningDim0='-8.08,8.08,101',
                                                       BinningDim1='-1.68,1.68,21', BinningDim2='-8.08,8.08,101',
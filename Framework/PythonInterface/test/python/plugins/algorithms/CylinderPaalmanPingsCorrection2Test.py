@@ -4,12 +4,81 @@
 #   NScD Oak Ridge National Laboratory, European Spallation Source,
 #   Institut Laue - Langevin & CSNS, Institute of High Energy Physics, CAS
 # SPDX - License - Identifier: GPL - 3.0 +
+import math
 import unittest
+import numpy as np
 from mantid import mtd, config
 from mantid.simpleapi import (CreateSampleWorkspace, Scale, DeleteWorkspace, ConvertToPointData,
                               CylinderPaalmanPingsCorrection, SetInstrumentParameter)
 
 
+def reference_distance(r, radius, omega):
+    distance = 0.
+    b = r*math.sin(omega)
+    if abs(b) < radius:
+        t = r*math.cos(omega)
+        d = math.sqrt(radius*radius - b*b)
+        if r <= radius:
+            distance = t + d
+        else:
+            distance = d*(1.0 + math.copysign(1.0, t))
+    return distance
+
+
+def reference_sum_rom(radii, n_scat, n_abs, a, r1, r2, ms, theta, amu_scat, amu_tot_i, amu_tot_s):
+    """The scalar integration of the corrections for one angle and wavelength, as first implemented"""
+    nan = len(radii) - 1
+    omega_add = math.pi if a < 0. else 0.
+    r_step = (r2 - r1)/ms
+    for M in range(1, ms + 1):
+        r = M*r_step - 0.5*r_step + r1
+        number_omega = int(math.pi*r/r_step)
+        omega_ster = math.pi/number_omega
+        omega_deg = -0.5*omega_ster + omega_add
+        Area_y = r*r_step*omega_ster*amu_scat[n_scat]
+        sum_1 = sum_2 = Area_sum = 0.
+        I = 1
+        for _ in range(number_omega):
+            omega = I*omega_ster + omega_deg
+            if abs(r*math.sin(omega)) > a:
+                I = number_omega - I + 2
+                continue
+            LIS = [reference_distance(r, radii[j+1], omega) - reference_distance(r, radii[j], omega) for j in range(nan)]
+            O = omega + math.pi - theta
+            LSS = [reference_distance(r, radii[j+1], O) - reference_distance(r, radii[j], O) for j in range(nan)]
+            path = np.zeros(3)
+            path[0] = amu_tot_i[0]*LIS[0] + amu_tot_s[0]*LSS[0]
+            if nan == 2:
+                path[2] = amu_tot_i[1]*LIS[1] + amu_tot_s[1]*LSS[1]
+                path[1] = path[0] + path[2]
+            sum_1 += math.exp(-path[n_abs])
+            sum_2 += math.exp(-path[n_abs + 1])
+            Area_sum += 1.0
+            I += 1
+    return sum_1*Area_y, sum_2*Area_y, Area_sum*Area_y
+
+
+def reference_sample_and_can_corrections(radii, amu_scat, amu_tot_i, amu_tot_s, theta, a):
+    """Ass, Assc, Acsc and Acc for a sample in a can, one angle and one wavelength at a time"""
+    Ass = Assc = Area_s = 0.
+    ms = max(1, int((radii[1] - radii[0])/(radii[1] - radii[0])))
+    for sign in (1, -1):
+        AAA, BBB, Area = reference_sum_rom(radii, 0, 0, sign*a, radii[0], radii[1], ms, theta, amu_scat, amu_tot_i,
+                                           amu_tot_s)
+        Ass += AAA
+        Assc += BBB
+        Area_s += Area
+    ms = max(1, int((radii[2] - radii[1])/(radii[1] - radii[0])))
+    Acsc = Acc = Area_c = 0.
+    for sign in (1, -1):
+        AAA, BBB, Area = reference_sum_rom(radii, 1, 1, sign*a, radii[1], radii[2], ms, theta, amu_scat, amu_tot_i,
+                                           amu_tot_s)
+        Acsc += AAA
+        Acc += BBB
+        Area_c += Area
+    return Ass/Area_s, Assc/Area_s, Acsc/Area_c, Acc/Area_c
+
+
 class CylinderPaalmanPingsCorrection2Test(unittest.TestCase):
     def setUp(self):
         """
@@ -258,6 +327,49 @@ class CylinderPaalmanPingsCorrection2Test(unittest.TestCase):
         for workspace in corrections_ws:
             self.assertEqual(workspace.blocksize(), 10)
 
+    def test_corrections_match_scalar_integration(self):
+        """
+        Tests the corrections of several detectors against integrating one angle and wavelength at a time.
+        """
+        sample = CreateSampleWorkspace(NumBanks=2, BankPixelWidth=2, XUnit='Wavelength', XMin=6.8, XMax=7.9,
+                                       BinWidth=0.1)
+        can = Scale(InputWorkspace=sample, Factor=1.2)
+        radii = [0.05, 0.1, 0.15]
+        efixed = 1.845
+
+        CylinderPaalmanPingsCorrection(OutputWorkspace=self._corrections_ws_name,
+                                       SampleWorkspace=sample,
+                                       SampleChemicalFormula='H2-O',
+                                       SampleInnerRadius=radii[0],
+                                       SampleOuterRadius=radii[1],
+                                       CanWorkspace=can,
+                                       CanChemicalFormula='V',
+                                       CanOuterRadius=radii[2],
+                                       BeamWidth=2.0,
+                                       Emode='Indirect',
+                                       Efixed=efixed,
+                                       Interpolate=False)
+
+        materials = [sample.sample().getMaterial(), can.sample().getMaterial()]
+        density = np.array([material.numberDensity for material in materials])
+        amu_scat = density*np.array([material.totalScatterXSection() for material in materials])
+        sig_abs = density*np.array([material.absorbXSection() for material in materials])
+        amu_tot_s = amu_scat + sig_abs*math.sqrt(81.787/efixed)/1.7979
+
+        source_pos = sample.getInstrument().getSource().getPos()
+        sample_pos = sample.getInstrument().getSample().getPos()
+        factors = [mtd[self._corrections_ws_name + suffix] for suffix in ('_ass', '_assc', '_acsc', '_acc')]
+        for index in range(sample.getNumberHistograms()):
+            theta = sample.getDetector(index).getTwoTheta(sample_pos, sample_pos - source_pos)
+            for bin_index, wave in enumerate(factors[0].readX(index)):
+                amu_tot_i = amu_scat + sig_abs*wave/1.7979
+                expected = reference_sample_and_can_corrections(radii, amu_scat, amu_tot_i, amu_tot_s, theta, 1.0)
+                for factor, value in zip(factors, expected):
+                    self.assertAlmostEqual(factor.readY(index)[bin_index], value, delta=1e-12*abs(value))
+
+        DeleteWorkspace(sample)
+        DeleteWorkspace(can)
+
     def test_validationNoCanFormula(self):
         """
         Tests validation for no chemical formula for can when a can WS is provided.
@@ -6,6 +6,8 @@
 # SPDX - License - Identifier: GPL - 3.0 +
 import unittest
 from mantid.simpleapi import DeltaPDF3D, CreateMDWorkspace, FakeMDEventData, BinMD, mtd
+from mantid.geometry import SpaceGroupFactory
+from DeltaPDF3D import allowed_reflections, real_shifted_fft
 import numpy as np
 from scipy import signal
 
@@ -170,6 +172,30 @@ class DeltaPDF3DTest(unittest.TestCase):
         self.assertAlmostEqual(fft.signalAt(1866), -70.77683306878) # [1,0,0]
         self.assertAlmostEqual(fft.signalAt(2232), 69.86001401877) # [1,1,0]
 
+    def test_3D_RemoveReflections_SpaceGroup(self):
+        for shape in ('cube', 'sphere'):
+            DeltaPDF3D(InputWorkspace='DeltaPDF3DTest_MDH',OutputWorkspace='fft',IntermediateWorkspace='int',
+                       Method='Punch and fill',Shape=shape,Size=0.4,SpaceGroup='I m -3 m',CropSphere=False,
+                       Convolution=False,WindowFunction='None')
+            intermediate=mtd['int'].getSignalArray()
+            # [1,0,0] is forbidden by the body centring, so it is kept, while [1,1,0] is removed
+            self.assertFalse(np.isnan(intermediate[40,30,30]))
+            self.assertTrue(np.isnan(intermediate[40,40,30]))
+
+    def test_allowed_reflections_match_space_group(self):
+        h = np.arange(-6, 7)
+        for symbol in ('P 21 21 21', 'I m -3 m', 'F d -3 m', 'P 63/m m c', 'R -3 c', 'P 41 21 2'):
+            sg = SpaceGroupFactory.createSpaceGroup(symbol)
+            allowed = allowed_reflections(sg, h.reshape((-1,1,1)), h.reshape((-1,1)), h)
+            expected = [[[sg.isAllowedReflection([a,b,c]) for c in h] for b in h] for a in h]
+            np.testing.assert_array_equal(allowed, expected, err_msg=symbol)
+
+    def test_real_shifted_fft(self):
+        for shape in ((8,7,6), (5,4,1)):
+            values = np.random.random(shape)
+            np.testing.assert_allclose(real_shifted_fft(values),
+                                       np.fft.fftshift(np.fft.fftn(np.fft.ifftshift(values))).real, atol=1e-12)
+
 
 if __name__ == '__main__':
     unittest.main()
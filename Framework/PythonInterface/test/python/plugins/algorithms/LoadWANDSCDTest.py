@@ -5,6 +5,10 @@
 #   Institut Laue - Langevin & CSNS, Institute of High Energy Physics, CAS
 # SPDX - License - Identifier: GPL - 3.0 +
 from mantid.simpleapi import LoadWANDSCD
+import numpy as np
+import os
+import shutil
+import tempfile
 import unittest
 
 
@@ -63,6 +67,23 @@ class LoadWANDTest(unittest.TestCase):
 
         LoadWANDTest_ws.delete()
 
+    def test_cache_directory(self):
+        cache_directory = tempfile.mkdtemp()
+        try:
+            uncached = LoadWANDSCD('HB2C_7000.nxs.h5,HB2C_7001.nxs.h5', Grouping='4x4')
+            first = LoadWANDSCD('HB2C_7000.nxs.h5,HB2C_7001.nxs.h5', Grouping='4x4', CacheDirectory=cache_directory)
+            self.assertEqual(len([f for f in os.listdir(cache_directory) if f.endswith('.npz')]), 2)
+            second = LoadWANDSCD('HB2C_7000.nxs.h5,HB2C_7001.nxs.h5', Grouping='4x4', CacheDirectory=cache_directory)
+
+            for ws in (first, second):
+                np.testing.assert_equal(ws.getSignalArray(), uncached.getSignalArray())
+                np.testing.assert_equal(ws.getExperimentInfo(0).run().getProperty('run_number').value, [7000, 7001])
+                np.testing.assert_equal(ws.getExperimentInfo(0).run().getProperty('s1').value, [-142.6, -142.5])
+        finally:
+            shutil.rmtree(cache_directory)
+        for ws in (uncached, first, second):
+            ws.delete()
+
 
 if __name__ == '__main__':
     unittest.main()
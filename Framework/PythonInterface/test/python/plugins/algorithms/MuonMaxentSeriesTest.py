@@ -0,0 +1,96 @@
+# Mantid Repository : https://github.com/mantidproject/mantid
+#
+# Copyright &copy; 2021 ISIS Rutherford Appleton Laboratory UKRI,
+#   NScD Oak Ridge National Laboratory, European Spallation Source,
+#   Institut Laue - Langevin & CSNS, Institute of High Energy Physics, CAS
+# SPDX - License - Identifier: GPL - 3.0 +
+import numpy as np
+import unittest
+from mantid.simpleapi import *
+from mantid.api import *
+
+
+class MuonMaxentSeriesTest(unittest.TestCase):
+
+    def genData(self, name, frequency):
+        x_data = np.linspace(0, 30., 100)
+        y_data = []
+        e_data = []
+        for phase in (0.1, 0.2):
+            y_data.extend(np.sin(frequency * x_data + phase) * np.exp(-x_data / 2.19703))
+            e_data.extend(np.cos(0.2 * x_data))
+        return CreateWorkspace(
+            DataX=x_data,
+            DataY=y_data,
+            DataE=e_data,
+            NSpec=2,
+            UnitX='Time',
+            OutputWorkspace=name)
+
+    def setUp(self):
+        self.genData("run1", 2.3)
+        self.genData("run2", 2.4)
+        self.genData("run3", 2.5)
+        GroupWorkspaces(InputWorkspaces="run2,run3", OutputWorkspace="runs")
+
+    def tearDown(self):
+        AnalysisDataService.clear()
+
+    def runSeries(self, OutputWorkspace='spectra', **kwargs):
+        MuonMaxentSeries(
+            InputWorkspaces="run1,runs",
+            Npts=32768,
+            FitDeadTime=False,
+            FixPhases=True,
+            OuterIterations=1,
+            InnerIterations=1,
+            OutputWorkspace=OutputWorkspace,
+            **kwargs)
+        return AnalysisDataService.retrieve(OutputWorkspace)
+
+    def test_executes(self):
+        spectra = self.runSeries()
+        self.assertEqual(spectra.getNumberHistograms(), 3)
+        labels = spectra.getAxis(1)
+        self.assertEqual([labels.label(i) for i in range(3)], ["run1", "run2", "run3"])
+        self.assertEqual(spectra.getAxis(0).getUnit().caption(), 'Field')
+
+    def test_cold_start_matches_MuonMaxent(self):
+        spectra = self.runSeries(WarmStart=False)
+        for i, name in enumerate(["run1", "run2", "run3"]):
+            MuonMaxent(
+                InputWorkspace=name,
+                Npts=32768,
+                FitDeadTime=False,
+                FixPhases=True,
+                OuterIterations=1,
+                InnerIterations=1,
+                OutputWorkspace='freq')
+            freq = AnalysisDataService.retrieve('freq')
+            np.testing.assert_array_equal(spectra.readX(i), freq.readX(0))
+            np.testing.assert_array_equal(spectra.readY(i), freq.readY(0))
+
+    def test_warm_start_changes_later_runs(self):
+        cold = self.runSeries(WarmStart=False, OutputWorkspace='cold')
+        warm = self.runSeries(WarmStart=True, OutputWorkspace='warm')
+        np.testing.assert_array_equal(warm.readY(0), cold.readY(0))
+        self.assertFalse(np.array_equal(warm.readY(1), cold.readY(1)))
+
+    def test_processes_match_serial(self):
+        serial = self.runSeries(NumberOfProcesses=1, OutputWorkspace='serial')
+        # the first run of each chain is cold started, so compare without warm starts
+        serial_cold = self.runSeries(NumberOfProcesses=1, WarmStart=False, OutputWorkspace='serial_cold')
+        parallel_cold = self.runSeries(NumberOfProcesses=3, WarmStart=False, OutputWorkspace='parallel_cold')
+        np.testing.assert_array_equal(parallel_cold.extractY(), serial_cold.extractY())
+        # with two chains the first chain is run1, run2 and is warm started as in the serial run
+        parallel = self.runSeries(NumberOfProcesses=2, OutputWorkspace='parallel')
+        np.testing.assert_array_equal(parallel.extractY()[:2], serial.extractY()[:2])
+        np.testing.assert_array_equal(parallel.readY(2), serial_cold.readY(2))
+
+    def test_missing_workspace(self):
+        with self.assertRaises(RuntimeError):
+            MuonMaxentSeries(InputWorkspaces="run1,missing", OutputWorkspace='spectra')
+
+
+if __name__ == '__main__':
+    unittest.main()
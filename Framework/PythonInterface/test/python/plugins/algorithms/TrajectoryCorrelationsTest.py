@@ -0,0 +1,93 @@
+# Mantid Repository : https://github.com/mantidproject/mantid
+#
+# Copyright &copy; 2021 ISIS Rutherford Appleton Laboratory UKRI,
+#   NScD Oak Ridge National Laboratory, European Spallation Source,
+#   Institut Laue - Langevin & CSNS, Institute of High Energy Physics, CAS
+# SPDX - License - Identifier: GPL - 3.0 +
+import unittest
+import numpy as np
+import numpy.testing as npt
+
+import trajectory_correlations
+
+
+def correlate(u, v):
+    return sum(np.correlate(u[:, d], v[:, d], "same") for d in range(u.shape[1]))
+
+
+class TrajectoryCorrelationsTest(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(42)
+        self.vectors = np.random.normal(size=(6, 11, 3))
+
+    def test_auto_correlation_sum_matches_numpy_correlate(self):
+        indices = [0, 2, 5]
+        expected = sum(correlate(self.vectors[i], self.vectors[i]) for i in indices)
+
+        npt.assert_allclose(trajectory_correlations.auto_correlation_sum(self.vectors, indices), expected, atol=1e-12)
+
+    def test_cross_correlation_sum_matches_numpy_correlate(self):
+        first, second = [0, 3], [1, 2, 4]
+        expected = sum(correlate(self.vectors[i], self.vectors[j]) for i in first for j in second)
+
+        npt.assert_allclose(trajectory_correlations.cross_correlation_sum(self.vectors, first, second), expected,
+                            atol=1e-12)
+
+    def test_pair_correlation_sum_matches_numpy_correlate_in_batches(self):
+        indices = [0, 1, 3, 4, 5]
+        expected = sum(correlate(self.vectors[i], self.vectors[j])
+                       for position, i in enumerate(indices) for j in indices[position + 1:])
+
+        # batches of one particle, so the sums are carried between batches
+        npt.assert_allclose(trajectory_correlations.pair_correlation_sum(self.vectors, indices, max_chunk_bytes=1),
+                            expected, atol=1e-12)
+
+    def test_unwrapped_velocities_cross_the_periodic_boundary(self):
+        n_frames = 6
+        box_size = np.tile(np.diag([2.0, 3.0, 4.0]).ravel(), (n_frames, 1))
+        # one particle moving by 0.5 along x per frame, wrapped into the box
+        configuration = np.zeros((n_frames, 1, 3))
+        configuration[:, 0, 0] = np.mod(1.2 + 0.5 * np.arange(n_frames), 2.0)
+
+        for max_chunk_bytes in (1, trajectory_correlations.MAX_CHUNK_BYTES):
+            velocities = trajectory_correlations.unwrapped_velocities(configuration, box_size, max_chunk_bytes)
+
+            self.assertEqual(velocities.shape, (1, n_frames - 1, 3))
+            npt.assert_allclose(velocities[0, :-1, 0], 0.5)
+            npt.assert_allclose(velocities[0, -1], 0.0)
+            npt.assert_allclose(velocities[0, :, 1:], 0.0)
+
+    def test_cartesian_frames_chunks_cover_the_trajectory(self):
+        n_frames = 5
+        box_size = np.tile(np.diag([1.0, 2.0, 3.0]).ravel(), (n_frames, 1))
+        configuration = np.random.random((n_frames, 4, 3))
+
+        chunks = list(trajectory_correlations.cartesian_frames(configuration, box_size, box_scale=10.0,
+                                                               max_chunk_bytes=200))
+
+        self.assertGreater(len(chunks), 1)
+        coordinates = np.concatenate([chunk[2] for chunk in chunks])
+        npt.assert_allclose(coordinates, 10.0 * configuration * np.array([1.0, 2.0, 3.0]))
+        npt.assert_allclose(np.concatenate([chunk[3] for chunk in chunks]), np.tile([10.0, 20.0, 30.0], (n_frames, 1)))
+
+    def test_group_average(self):
+        coordinates = np.random.random((3, 5, 3))
+        matrix = trajectory_correlations.group_average_matrix([[0, 1], [4], [2, 3, 4]], 5)
+
+        averages = trajectory_correlations.group_average(matrix, coordinates)
+
+        self.assertEqual(averages.shape, (3, 3, 3))
+        npt.assert_allclose(averages[0], coordinates[:, 0:2].mean(axis=1))
+        npt.assert_allclose(averages[1], coordinates[:, 4])
+        npt.assert_allclose(averages[2], coordinates[:, 2:5].mean(axis=1))
+
+    def test_minimum_image(self):
+        box_lengths = np.array([[2.0, 2.0, 2.0]])
+        vectors = np.array([[[1.5, -1.5, 0.5]]])
+
+        npt.assert_allclose(trajectory_correlations.minimum_image(vectors, box_lengths), [[[-0.5, 0.5, 0.5]]])
+
+
+if __name__ == '__main__':
+    unittest.main()
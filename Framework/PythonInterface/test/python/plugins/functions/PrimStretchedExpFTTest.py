@@ -6,7 +6,7 @@
 # SPDX - License - Identifier: GPL - 3.0 +
 import unittest
 
-from StretchedExpFTTestHelper import isregistered, do_fit
+from StretchedExpFTTestHelper import isregistered, do_fit, check_derivatives
 
 
 class PrimStretchedExpFTTest(unittest.TestCase):
@@ -14,6 +14,9 @@ class PrimStretchedExpFTTest(unittest.TestCase):
     def testRegistered(self):
         self.assertTrue(*isregistered('PrimStretchedExpFT'))
 
+    def testDerivatives(self):
+        self.assertTrue(*check_derivatives('PrimStretchedExpFT'))
+
     def testGaussian(self):
         """ Test PrimStretchedExpFT against the binned-integrated of
          the Fourier transform of a gaussian
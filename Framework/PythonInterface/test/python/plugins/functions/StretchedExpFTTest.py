@@ -6,7 +6,7 @@
 # SPDX - License - Identifier: GPL - 3.0 +
 import unittest
 
-from StretchedExpFTTestHelper import isregistered, do_fit
+from StretchedExpFTTestHelper import isregistered, do_fit, check_derivatives
 
 
 class StretchedExpFTTest(unittest.TestCase):
@@ -14,6 +14,9 @@ class StretchedExpFTTest(unittest.TestCase):
     def testRegistered(self):
         self.assertTrue(*isregistered('StretchedExpFT'))
 
+    def testDerivatives(self):
+        self.assertTrue(*check_derivatives('StretchedExpFT'))
+
     def testGaussian(self):
         """ Test the Fourier transform of a gaussian is a Gaussian"""
         # Target parameters
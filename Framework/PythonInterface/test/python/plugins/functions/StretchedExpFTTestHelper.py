@@ -79,6 +79,41 @@ def isregistered(function):
     return status, msg
 
 
+class _Jacobian(object):
+    """Stores the partial derivatives passed to Jacobian.setFromArray"""
+
+    def setFromArray(self, values):
+        self.values = np.array(values)
+
+
+def check_derivatives(function_name):
+    """
+    Compare the derivatives of the function with central differences
+    :param function_name: StretchedExpFT or PrimStretchedExpFT
+    :return: success or failure of the comparison
+    """
+    function = FunctionFactory.createFunction(function_name)
+    parameters = {'Height': 1.3, 'Tau': 37.0, 'Beta': 0.8, 'Centre': 0.002}
+    for name, value in parameters.items():
+        function.setParameter(name, value)
+    energies = np.arange(-0.1, 0.5, 0.0004)
+    jacobian = _Jacobian()
+    function.functionDeriv1D(energies, jacobian)
+    steps = {'Height': 1.e-6, 'Tau': 1.e-4, 'Beta': 1.e-6, 'Centre': 1.e-7}
+    # the derivative with respect to Centre is that of a linear interpolation,
+    # which differs from the central difference close to the nodes
+    tolerances = {'Height': 1.e-4, 'Tau': 1.e-4, 'Beta': 1.e-4, 'Centre': 0.02}
+    for index, name in enumerate(['Height', 'Tau', 'Beta', 'Centre']):
+        upper, lower = dict(parameters), dict(parameters)
+        upper[name] += steps[name]
+        lower[name] -= steps[name]
+        difference = (function.function1D(energies, **upper) - function.function1D(energies, **lower)) / (2 * steps[name])
+        error = np.max(np.abs(jacobian.values[:, index] - difference)) / np.max(np.abs(difference))
+        if error > tolerances[name]:
+            return False, 'Derivative with respect to {} has relative error {}'.format(name, error)
+    return True, ""
+
+
 def do_fit(tg, fString, shape):
     """
     Given a target shape and initial fit function guess, carry out the fit
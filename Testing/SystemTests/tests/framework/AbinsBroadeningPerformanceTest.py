@@ -0,0 +1,47 @@
+# Mantid Repository : https://github.com/mantidproject/mantid
+#
+# Copyright &copy; 2021 ISIS Rutherford Appleton Laboratory UKRI,
+#   NScD Oak Ridge National Laboratory, European Spallation Source,
+#   Institut Laue - Langevin & CSNS, Institute of High Energy Physics, CAS
+# SPDX - License - Identifier: GPL - 3.0 +
+#pylint: disable=no-init,attribute-defined-outside-init
+"""
+Benchmarks broadening a stack of Abins spectra in one batch against
+broadening the spectra one at a time.
+"""
+import time
+
+import numpy as np
+
+import systemtesting
+import abins.instruments
+
+
+class AbinsBroadeningBatchPerformance(systemtesting.MantidSystemTest):
+    n_spectra = 800  # e.g. 200 atoms x 4 quantum orders
+    n_peaks = 500
+
+    def runTest(self):
+        np.random.seed(0)
+        bins = np.arange(0., 4100. + 1., 1.)
+        s_dft = np.zeros((self.n_spectra, bins.size - 1))
+        for spectrum in s_dft:
+            spectrum[np.random.randint(0, bins.size - 1, self.n_peaks)] = np.random.random(self.n_peaks)
+
+        instrument = abins.instruments.get_instrument('TOSCA')
+        frequencies = (bins[1:] + bins[:-1]) / 2
+
+        start = time.time()
+        single = np.array([instrument.convolve_with_resolution_function(frequencies=frequencies, bins=bins,
+                                                                        s_dft=spectrum, scheme='interpolate')[1]
+                           for spectrum in s_dft])
+        self.single_time = time.time() - start
+
+        start = time.time()
+        _, batch = instrument.convolve_spectra_with_resolution_function(bins=bins, s_dft=s_dft, scheme='interpolate')
+        self.batch_time = time.time() - start
+
+        self.reportResult('broadening_time_per_spectrum', self.single_time)
+        self.reportResult('broadening_time_batch', self.batch_time)
+
+        self.assertTrue(np.allclose(single, batch))
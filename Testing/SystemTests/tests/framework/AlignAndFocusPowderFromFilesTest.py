@@ -112,6 +112,36 @@ class ChunkingCompare(systemtesting.MantidSystemTest):
         return ('with_chunks', 'no_chunks')
 
 
+class PrefetchAndThreadsCompare(systemtesting.MantidSystemTest):
+    cal_file  = "PG3_FERNS_d4832_2011_08_24.cal"
+    data_files = ['PG3_9829_event.nxs', 'PG3_9830_event.nxs']
+
+    def requiredMemoryMB(self):
+        return 6*1024  # GiB
+
+    def requiredFiles(self):
+        return [self.cal_file] + self.data_files
+
+    def runTest(self):
+        kwargs = {'Filename': ','.join(self.data_files),
+                  'CalFileName': self.cal_file,
+                  'MaxChunkSize': .05,
+                  'Params': -.0002,
+                  'CompressTolerance': 0.01,
+                  'PrimaryFlightPath': 60, 'SpectrumIDs': '1', 'L2': '3.18', 'Polar': '90', 'Azimuthal': '0'}
+
+        # load the next chunk while focusing and focus both files at the same time
+        AlignAndFocusPowderFromFiles(OutputWorkspace='pipelined', PrefetchChunks=True, NumberOfThreads=2, **kwargs)
+        # one chunk at a time
+        AlignAndFocusPowderFromFiles(OutputWorkspace='serial', **kwargs)
+
+    def validateMethod(self):
+        return "ValidateWorkspaceToWorkspace"
+
+    def validate(self):
+        return ('pipelined', 'serial')
+
+
 class UseCache(systemtesting.MantidSystemTest):
     cal_file  = "PG3_FERNS_d4832_2011_08_24.cal"
     char_file = "PG3_characterization_2012_02_23-HR-ILL.txt"
@@ -0,0 +1,67 @@
+# Mantid Repository : https://github.com/mantidproject/mantid
+#
+# Copyright &copy; 2021 ISIS Rutherford Appleton Laboratory UKRI,
+#   NScD Oak Ridge National Laboratory, European Spallation Source,
+#   Institut Laue - Langevin & CSNS, Institute of High Energy Physics, CAS
+# SPDX - License - Identifier: GPL - 3.0 +
+#pylint: disable=no-init,attribute-defined-outside-init
+"""
+Benchmarks ConvertWANDSCDtoQ on a synthetic full rotation of WAND with 4x4
+pixel grouping, binning the scan points serially and with all cores.
+"""
+import time
+
+import numpy as np
+
+import systemtesting
+from mantid.kernel import FloatTimeSeriesProperty
+from mantid.simpleapi import ConvertWANDSCDtoQ, CreateMDHistoWorkspace, CreateSingleValuedWorkspace, SetGoniometer
+
+
+def create_full_rotation(name, n_pixels_y=128, n_pixels_x=960, n_scan_points=360):
+    """Create an input workspace like LoadWANDSCD with 4x4 grouping, rotating s1 through 360 degrees"""
+    counts = np.random.poisson(5.0, size=(n_pixels_y, n_pixels_x, n_scan_points)).astype(np.float64)
+    ws = CreateMDHistoWorkspace(Dimensionality=3,
+                                Extents='0.5,{},0.5,{},0.5,{}'.format(n_pixels_y + 0.5, n_pixels_x + 0.5,
+                                                                      n_scan_points + 0.5),
+                                SignalInput=counts.ravel('F'), ErrorInput=np.sqrt(counts.ravel('F')),
+                                NumberOfBins='{},{},{}'.format(n_pixels_y, n_pixels_x, n_scan_points),
+                                Names='y,x,scanIndex', Units='bin,bin,number', OutputWorkspace=name)
+    ws.addExperimentInfo(CreateSingleValuedWorkspace())
+
+    run = ws.getExperimentInfo(0).run()
+    s1 = FloatTimeSeriesProperty('s1')
+    for t, v in enumerate(np.linspace(0.0, 360.0, n_scan_points, endpoint=False)):
+        s1.addValue(t, v)
+    run['s1'] = s1
+    run.addProperty('duration', [40.0] * n_scan_points, True)
+    run.addProperty('monitor_count', [900000.0] * n_scan_points, True)
+    run.addProperty('twotheta', list(np.linspace(np.deg2rad(156.0), np.deg2rad(-4.0), n_pixels_x).repeat(n_pixels_y)),
+                    True)
+    run.addProperty('azimuthal', list(np.tile(np.linspace(-0.15, 0.15, n_pixels_y), n_pixels_x)), True)
+    SetGoniometer(ws, Axis0='s1,0,1,0,1', Average=False)
+    return ws
+
+
+class ConvertWANDSCDtoQFullRotationPerformance(systemtesting.MantidSystemTest):
+
+    def requiredMemoryMB(self):
+        return 4000
+
+    def runTest(self):
+        np.random.seed(0)
+        create_full_rotation('full_rotation')
+
+        start = time.time()
+        serial = ConvertWANDSCDtoQ('full_rotation', NumberOfThreads=1, OutputWorkspace='full_rotation_serial')
+        self.serial_time = time.time() - start
+
+        start = time.time()
+        threaded = ConvertWANDSCDtoQ('full_rotation', NumberOfThreads=0, OutputWorkspace='full_rotation_threaded')
+        self.threaded_time = time.time() - start
+
+        self.reportResult('convert_wand_full_rotation_serial_time', self.serial_time)
+        self.reportResult('convert_wand_full_rotation_threaded_time', self.threaded_time)
+
+        # integer counts with monitor normalisation bin to exactly the same volume
+        np.testing.assert_array_equal(threaded.getSignalArray(), serial.getSignalArray())
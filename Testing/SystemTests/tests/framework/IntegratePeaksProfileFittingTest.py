@@ -0,0 +1,77 @@
+# Mantid Repository : https://github.com/mantidproject/mantid
+#
+# Copyright &copy; 2021 ISIS Rutherford Appleton Laboratory UKRI,
+#   NScD Oak Ridge National Laboratory, European Spallation Source,
+#   Institut Laue - Langevin & CSNS, Institute of High Energy Physics, CAS
+# SPDX - License - Identifier: GPL - 3.0 +
+#pylint: disable=no-init,attribute-defined-outside-init
+"""
+Fits the strongest TOPAZ peaks with IntegratePeaksProfileFitting in a pool of processes and
+checks that the results are the same as when they are fit one after the other.
+"""
+import os
+import pickle
+import tempfile
+
+import numpy as np
+
+import systemtesting
+from mantid.api import mtd
+from mantid.simpleapi import ConvertToMD, DeleteTableRows, FindPeaksMD, FindUBUsingFFT, IndexPeaks, \
+    IntegratePeaksProfileFitting, LoadEventNexus
+
+
+class IntegratePeaksProfileFittingInParallel(systemtesting.MantidSystemTest):
+    number_of_peaks = 6
+
+    def requiredMemoryMB(self):
+        return 2000
+
+    def requiredFiles(self):
+        return ['TOPAZ_3132_event.nxs']
+
+    def runTest(self):
+        LoadEventNexus(Filename='TOPAZ_3132_event.nxs', OutputWorkspace='TOPAZ_3132_event')
+        ConvertToMD(InputWorkspace='TOPAZ_3132_event', QDimensions='Q3D', dEAnalysisMode='Elastic',
+                    Q3DFrames='Q_lab', QConversionScales='Q in A^-1', MinValues='-25, -25, -25',
+                    Maxvalues='25, 25, 25', MaxRecursionDepth=10, LorentzCorrection=False,
+                    OutputWorkspace='TOPAZ_3132_md')
+
+        # the peaks are sorted by decreasing density, so keep the strongest ones once they have been indexed
+        peaks_ws = FindPeaksMD(InputWorkspace='TOPAZ_3132_md', PeakDistanceThreshold=0.12, MaxPeaks=200,
+                               OutputWorkspace='peaks_ws')
+        FindUBUsingFFT(PeaksWorkspace=peaks_ws, MinD=2, MaxD=16)
+        IndexPeaks(PeaksWorkspace=peaks_ws)
+        DeleteTableRows(TableWorkspace=peaks_ws, Rows='{}-{}'.format(self.number_of_peaks,
+                                                                     peaks_ws.getNumberPeaks() - 1))
+
+        with tempfile.TemporaryDirectory() as directory:
+            # constant moderator emission parameters (A, B, R and T0): each row gives the coefficients of a Pade
+            # approximant c0 * x**c1 * (1 + c2*x + c3*x**2 + (x/c4)**c5) / (1 + c6*x + c7*x**2 + (x/c8)**c9)
+            moderator_coefficients_file = os.path.join(directory, 'moderator_coefficients.dat')
+            np.savetxt(moderator_coefficients_file,
+                       [[value, 0, 0, 0, 1, 0, 0, 0, 1, 0] for value in (0.3, 0.02, 0.1, 0.)])
+            # fitting in a pool needs a strong peaks library. No peak has its profile forced, and the instrument
+            # defaults are used for the initial guesses of fewer than 30 strong peaks, so an empty one will do.
+            strong_peak_params_file = os.path.join(directory, 'strong_peak_params.pkl')
+            with open(strong_peak_params_file, 'wb') as strong_peak_params:
+                pickle.dump(np.empty((0, 9)), strong_peak_params)
+
+            for processes, name in ((2, 'parallel'), (1, 'serial')):
+                IntegratePeaksProfileFitting(InputWorkspace='TOPAZ_3132_md', PeaksWorkspace='peaks_ws',
+                                             ModeratorCoefficientsFile=moderator_coefficients_file,
+                                             StrongPeakParamsFile=strong_peak_params_file, MinpplFrac=0.9,
+                                             MaxpplFrac=1.1, NumberOfProcesses=processes,
+                                             OutputPeaksWorkspace=name + '_peaks', OutputParamsWorkspace=name + '_params')
+
+        parallel_params, serial_params = mtd['parallel_params'], mtd['serial_params']
+        self.assertGreaterThan(serial_params.rowCount(), 0, 'No peaks were fit')
+        self.assertEqual(parallel_params.rowCount(), serial_params.rowCount())
+        for column in ('peakNumber', 'Intens3d', 'SigInt3d'):
+            np.testing.assert_allclose(parallel_params.column(column), serial_params.column(column))
+
+    def validateMethod(self):
+        return "ValidateWorkspaceToWorkspace"
+
+    def validate(self):
+        return ('parallel_peaks', 'serial_peaks')
@@ -0,0 +1,79 @@
+# Mantid Repository : https://github.com/mantidproject/mantid
+#
+# Copyright &copy; 2021 ISIS Rutherford Appleton Laboratory UKRI,
+#   NScD Oak Ridge National Laboratory, European Spallation Source,
+#   Institut Laue - Langevin & CSNS, Institute of High Energy Physics, CAS
+# SPDX - License - Identifier: GPL - 3.0 +
+#pylint: disable=no-init,attribute-defined-outside-init
+"""
+Benchmarks fitting a Python fit function which sets its Jacobian from one array
+against the same function setting the Jacobian one element at a time.
+"""
+import time
+
+import numpy as np
+
+import systemtesting
+from mantid.api import FunctionFactory, IFunction1D
+from mantid.simpleapi import CreateWorkspace, Fit
+
+
+class _ExpDecayBase(IFunction1D):
+
+    def init(self):
+        self.declareParameter("Height", 1.0)
+        self.declareParameter("Lifetime", 1.0)
+
+    def function1D(self, xvals):
+        return self.getParameterValue("Height") * np.exp(-xvals / self.getParameterValue("Lifetime"))
+
+    def partials(self, xvals):
+        height = self.getParameterValue("Height")
+        lifetime = self.getParameterValue("Lifetime")
+        decay = np.exp(-xvals / lifetime)
+        return np.column_stack([decay, height * xvals * decay / lifetime**2])
+
+
+class ExpDecayElementJacobian(_ExpDecayBase):
+
+    def functionDeriv1D(self, xvals, jacobian):
+        for ix, row in enumerate(self.partials(xvals)):
+            for ip, value in enumerate(row):
+                jacobian.set(ix, ip, value)
+
+
+class ExpDecayArrayJacobian(_ExpDecayBase):
+
+    def functionDeriv1D(self, xvals, jacobian):
+        jacobian.setFromArray(self.partials(xvals))
+
+
+class PythonFitFunctionJacobianPerformance(systemtesting.MantidSystemTest):
+    n_points = 20000
+    n_spectra = 10
+
+    def runTest(self):
+        FunctionFactory.subscribe(ExpDecayElementJacobian)
+        FunctionFactory.subscribe(ExpDecayArrayJacobian)
+        x = np.linspace(0.0, 10.0, self.n_points)
+        y = np.concatenate([(2.0 + i) * np.exp(-x / (1.5 + 0.1 * i)) for i in range(self.n_spectra)])
+        CreateWorkspace(DataX=np.tile(x, self.n_spectra), DataY=y, NSpec=self.n_spectra, OutputWorkspace='decays')
+
+        times = dict()
+        lifetimes = dict()
+        for name in ('ExpDecayElementJacobian', 'ExpDecayArrayJacobian'):
+            start = time.time()
+            lifetimes[name] = [Fit(Function='name={},Height=1,Lifetime=1'.format(name), InputWorkspace='decays',
+                                   WorkspaceIndex=i).Function.getParameterValue('Lifetime')
+                               for i in range(self.n_spectra)]
+            times[name] = time.time() - start
+        FunctionFactory.unsubscribe('ExpDecayElementJacobian')
+        FunctionFactory.unsubscribe('ExpDecayArrayJacobian')
+
+        self.reportResult('element_jacobian_fit_time', times['ExpDecayElementJacobian'])
+        self.reportResult('array_jacobian_fit_time', times['ExpDecayArrayJacobian'])
+
+        np.testing.assert_allclose(lifetimes['ExpDecayArrayJacobian'], [1.5 + 0.1 * i for i in range(self.n_spectra)],
+                                   rtol=1.e-6)
+        np.testing.assert_allclose(lifetimes['ExpDecayArrayJacobian'], lifetimes['ExpDecayElementJacobian'],
+                                   rtol=1.e-8)
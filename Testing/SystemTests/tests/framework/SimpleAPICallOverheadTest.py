@@ -0,0 +1,74 @@
+# Mantid Repository : https://github.com/mantidproject/mantid
+#
+# Copyright &copy; 2021 ISIS Rutherford Appleton Laboratory UKRI,
+#   NScD Oak Ridge National Laboratory, European Spallation Source,
+#   Institut Laue - Langevin & CSNS, Institute of High Energy Physics, CAS
+# SPDX - License - Identifier: GPL - 3.0 +
+#pylint: disable=no-init,attribute-defined-outside-init
+"""
+Micro-benchmarks of the per-call overhead of running small algorithms
+through mantid.simpleapi, compared with running them through the
+algorithm API directly.
+"""
+import inspect
+import time
+
+import systemtesting
+from mantid.api import AlgorithmManager
+from mantid.kernel import funcinspect
+from mantid.simpleapi import CreateSampleWorkspace, CreateSingleValuedWorkspace, Plus, Rebin, Scale
+
+
+def time_per_call(function, repeats):
+    start = time.time()
+    for _ in range(repeats):
+        function()
+    return (time.time() - start) / repeats
+
+
+def run_algorithm(name, **kwargs):
+    alg = AlgorithmManager.create(name)
+    alg.setRethrows(True)
+    for key, value in kwargs.items():
+        alg.setProperty(key, value)
+    alg.execute()
+
+
+class SimpleAPICallOverhead(systemtesting.MantidSystemTest):
+    repeats = 2000
+
+    def runTest(self):
+        small = CreateSampleWorkspace(NumBanks=1, BankPixelWidth=1, XMax=100, BinWidth=10)
+        single = CreateSingleValuedWorkspace(DataValue=2.0)
+
+        def scale():
+            scaled = Scale(small, Factor=2.0)  # noqa: F841
+
+        def plus():
+            summed = Plus(small, single)  # noqa: F841
+
+        def rebin():
+            rebinned = Rebin(small, Params='0,20,100')  # noqa: F841
+
+        calls = {'Scale': (scale, dict(InputWorkspace='small', Factor=2.0, OutputWorkspace='scaled')),
+                 'Plus': (plus, dict(LHSWorkspace='small', RHSWorkspace='single', OutputWorkspace='summed')),
+                 'Rebin': (rebin, dict(InputWorkspace='small', Params='0,20,100', OutputWorkspace='rebinned'))}
+        for name, (simpleapi_call, properties) in calls.items():
+            simpleapi_time = time_per_call(simpleapi_call, self.repeats)
+            direct_time = time_per_call(lambda: run_algorithm(name, **properties), self.repeats)
+            self.reportResult('simpleapi_{}_time_per_call'.format(name), simpleapi_time)
+            self.reportResult('simpleapi_{}_overhead_per_call'.format(name), simpleapi_time - direct_time)
+
+        # left hand side inference on its own, with and without the cache
+        frame = inspect.currentframe()
+        self.cached_lhs_time = time_per_call(lambda: funcinspect.process_frame(frame), self.repeats)
+        uncached_decompile = funcinspect._decompile.__wrapped__
+        uncached_process_code = funcinspect._process_code.__wrapped__
+
+        def uncached_lhs_info():
+            uncached_decompile(frame.f_code)
+            uncached_process_code(frame.f_code, frame.f_lasti)
+
+        self.uncached_lhs_time = time_per_call(uncached_lhs_info, self.repeats)
+        self.reportResult('lhs_info_time_cached', self.cached_lhs_time)
+        self.reportResult('lhs_info_time_uncached', self.uncached_lhs_time)
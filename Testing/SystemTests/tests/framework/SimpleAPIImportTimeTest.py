@@ -0,0 +1,47 @@
+# Mantid Repository : https://github.com/mantidproject/mantid
+#
+# Copyright &copy; 2021 ISIS Rutherford Appleton Laboratory UKRI,
+#   NScD Oak Ridge National Laboratory, European Spallation Source,
+#   Institut Laue - Langevin & CSNS, Institute of High Energy Physics, CAS
+# SPDX - License - Identifier: GPL - 3.0 +
+#pylint: disable=no-init,attribute-defined-outside-init
+"""
+Benchmarks the time taken to import mantid.simpleapi with the algorithm
+functions created on import and with them created lazily on first use.
+"""
+import os
+import subprocess
+import sys
+
+import systemtesting
+
+IMPORT_SCRIPT = """
+import time
+from mantid.kernel import config
+config['python.simpleapi.lazyload'] = '{lazy}'
+start = time.time()
+import mantid.simpleapi
+rebin = mantid.simpleapi.Rebin
+print(time.time() - start)
+"""
+
+
+def time_import(lazy):
+    """Import mantid.simpleapi in a fresh interpreter and return the time taken in seconds"""
+    env = os.environ.copy()
+    env['PYTHONPATH'] = os.pathsep.join(sys.path)
+    output = subprocess.check_output([sys.executable, '-c', IMPORT_SCRIPT.format(lazy=int(lazy))], env=env)
+    return float(output.decode().strip().splitlines()[-1])
+
+
+class SimpleAPILazyImportTime(systemtesting.MantidSystemTest):
+    repeats = 3
+
+    def runTest(self):
+        # the first lazy import builds the algorithm index
+        time_import(lazy=True)
+
+        self.eager_time = min(time_import(lazy=False) for _ in range(self.repeats))
+        self.lazy_time = min(time_import(lazy=True) for _ in range(self.repeats))
+        self.reportResult('import_time_eager', self.eager_time)
+        self.reportResult('import_time_lazy', self.lazy_time)
@@ -0,0 +1,78 @@
+# Mantid Repository : https://github.com/mantidproject/mantid
+#
+# Copyright &copy; 2021 ISIS Rutherford Appleton Laboratory UKRI,
+#   NScD Oak Ridge National Laboratory, European Spallation Source,
+#   Institut Laue - Langevin & CSNS, Institute of High Energy Physics, CAS
+# SPDX - License - Identifier: GPL - 3.0 +
+#pylint: disable=no-init,attribute-defined-outside-init
+"""
+Benchmarks the velocity correlation algorithms on a synthetic trajectory
+against correlating the velocities one particle at a time.
+"""
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+from scipy.io import netcdf
+
+import systemtesting
+from mantid.simpleapi import VelocityAutoCorrelations, VelocityCrossCorrelations
+
+
+def write_synthetic_trajectory(file_name, n_molecules, n_frames):
+    """Write a trajectory of diatomic molecules doing a random walk in a periodic box to an MMTK-like .nc file"""
+    n_particles = 2 * n_molecules
+    description = ','.join("AC(A('h{0}',{1}),A('o{0}',{2}))".format(i, 2 * i, 2 * i + 1) for i in range(n_molecules))
+    description = 'S(' + description + ')'
+
+    box_lengths = np.array([2.0, 2.5, 3.0])
+    steps = np.random.normal(scale=0.02, size=(n_frames, n_particles, 3))
+    positions = np.random.random((n_particles, 3)) * box_lengths + np.cumsum(steps, axis=0)
+
+    trajectory = netcdf.netcdf_file(file_name, mode='w')
+    trajectory.createDimension('description_length', len(description))
+    trajectory.createDimension('step', n_frames)
+    trajectory.createDimension('atom_number', n_particles)
+    trajectory.createDimension('xyz', 3)
+    trajectory.createDimension('box_size_length', 9)
+    trajectory.createVariable('description', 'c', ('description_length',))[:] = np.array(list(description), dtype='S1')
+    trajectory.createVariable('configuration', 'f', ('step', 'atom_number', 'xyz'))[:] = np.mod(positions, box_lengths)
+    trajectory.createVariable('box_size', 'f', ('step', 'box_size_length'))[:] = np.tile(np.diag(box_lengths).ravel(),
+                                                                                         (n_frames, 1))
+    trajectory.close()
+
+
+class VelocityCorrelationsPerformance(systemtesting.MantidSystemTest):
+    n_molecules = 250
+    n_frames = 4000
+
+    def runTest(self):
+        np.random.seed(0)
+        directory = tempfile.mkdtemp()
+        try:
+            file_name = os.path.join(directory, 'synthetic_trajectory.nc')
+            write_synthetic_trajectory(file_name, self.n_molecules, self.n_frames)
+
+            start = time.time()
+            VelocityAutoCorrelations(InputFile=file_name, Timestep='1.0', OutputWorkspace='autocorrelations')
+            self.auto_time = time.time() - start
+
+            start = time.time()
+            VelocityCrossCorrelations(InputFile=file_name, Timestep='1.0', OutputWorkspace='crosscorrelations')
+            self.cross_time = time.time() - start
+        finally:
+            shutil.rmtree(directory)
+
+        # the correlation step alone, one particle and dimension at a time
+        velocities = np.random.normal(size=(2 * self.n_molecules, self.n_frames - 1, 3))
+        start = time.time()
+        for particle in velocities:
+            for dimension in range(3):
+                np.correlate(particle[:, dimension], particle[:, dimension], 'same')
+        self.single_time = time.time() - start
+
+        self.reportResult('velocity_auto_correlations_time', self.auto_time)
+        self.reportResult('velocity_cross_correlations_time', self.cross_time)
+        self.reportResult('auto_correlation_time_per_particle', self.single_time)
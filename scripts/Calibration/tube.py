@@ -277,6 +277,16 @@ def calibrate(ws, tubeSet, knownPositions, funcForm, **kwargs):
     the name of this workspace to option **parameters_table_group**. The name of each table workspace will
     the string **parameters_table_group** plus a suffix which is the index of the tube in the input **tubeSet**.
 
+    The peaks of the tubes are fitted one tube after the other. With option **parallel** set to True, the tubes
+    are fitted concurrently on a pool of threads, or on at most **parallel** threads if an integer is given. The
+    polynomial fits and the tables are then filled in the order of **rangeList**, so the calibration table and
+    the peak table are the same as those of the serial calibration.
+
+    With option **batched** set to True, the peaks of all the tubes are found at once: the counts of the tubes
+    are extracted as one array and the peaks are fitted to all the tubes together with a vectorised least-squares
+    minimiser, instead of running Fit for each peak. Only the tubes whose fits do not converge, and the tubes in
+    **plotTube**, are fitted with Fit. The peak positions agree with those of Fit within the tolerance of the fits.
+
     **Define the new position for the detectors**
 
     Finally, the position of the detectors are defined as a vector operation
@@ -384,6 +394,8 @@ def calibrate(ws, tubeSet, knownPositions, funcForm, **kwargs):
     # Legacy code requires kwargs to contain only the list of parameters specify below. Thus, we pop other
     # arguments into temporary variables, such as `parameters_table_group`
     parameters_table_group = kwargs.pop('parameters_table_group') if 'parameters_table_group' in kwargs else None
+    parallel = kwargs.pop('parallel') if 'parallel' in kwargs else False
+    batched = kwargs.pop('batched') if 'batched' in kwargs else False
 
     FITPAR = 'fitPar'
     MARGIN = 'margin'
@@ -443,7 +455,8 @@ def calibrate(ws, tubeSet, knownPositions, funcForm, **kwargs):
 
     getCalibration(ws, tubeSet, calib_table, fit_par, ideal_tube, output_peak,
                    override_peaks, exclude_short_tubes, plot_tube, range_list, polin_fit,
-                   parameters_table_group=parameters_table_group)
+                   parameters_table_group=parameters_table_group, parallel=parallel,
+                   batched=batched)
 
     if delete_peak_table_after:
         DeleteWorkspace(str(output_peak))
@@ -17,10 +17,12 @@ Users should not need to directly call any other function other than :func:`getC
 ## Author: Karl palmen ISIS and for readPeakFile Gesner Passos ISIS
 
 # Standard and third-party
+from concurrent.futures import ThreadPoolExecutor
 import copy
 import numpy
 import os
 import re
+from scipy.special import erfc
 from typing import Any, Dict, List, Optional, Tuple, Union
 
 # Mantid
@@ -131,7 +133,7 @@ def fit_edges(fit_par, index, ws, output_ws):
     return 1  # peakIndex (center) -> parameter B of EndERFC
 
 
-def fit_gaussian(fit_par, index, ws, output_ws):
+def fit_gaussian(fit_par, index, ws, output_ws, workspace_prefix=''):
     # find the peak position
     centre = fit_par.getPeaks()[index]
     margin = fit_par.getMargin()
@@ -188,17 +190,17 @@ def fit_gaussian(fit_par, index, ws, output_ws):
         # it was seen that the best result for static general fitParamters,
         # is to divide the values in two fitting steps
         Fit(InputWorkspace=ws, Function='name=LinearBackground,A0=%f' % background,
-            StartX=str(start), EndX=str(end), Output='Z1')
-        Fit(InputWorkspace='Z1_Workspace',
+            StartX=str(start), EndX=str(end), Output=workspace_prefix + 'Z1')
+        Fit(InputWorkspace=workspace_prefix + 'Z1_Workspace',
             Function='name=Gaussian,Height=%f,PeakCentre=%f,Sigma=%f' % (height, centre, width),
             WorkspaceIndex=2, StartX=str(start), EndX=str(end), Output=output_ws)
-        CloneWorkspace(output_ws + '_Workspace', OutputWorkspace='gauss_' + str(index))
+        CloneWorkspace(output_ws + '_Workspace', OutputWorkspace=workspace_prefix + 'gauss_' + str(index))
         peak_index = 1
 
     return peak_index
 
 
-def getPoints(integrated_ws, func_forms, fit_params, which_tube, show_plot=False):
+def getPoints(integrated_ws, func_forms, fit_params, which_tube, show_plot=False, workspace_prefix=''):
     """
     Get the centres of N slits or edges for calibration
 
@@ -213,18 +215,34 @@ def getPoints(integrated_ws, func_forms, fit_params, which_tube, show_plot=False
     :param fit_params: a TubeCalibFitParams object contain the fit parameters
     :param which_tube:  a list of workspace indices for one tube (define a single tube)
     :param show_plot: show plot for this tube
+    :param workspace_prefix: prefix for the names of the temporary workspaces of the fits
 
     :rtype: array of the slit/edge positions (-1.0 indicates failed to find position)
 
     """
 
-    # Create input workspace for fitting
     # get all the counts for the integrated workspace inside the tube
     counts_y = numpy.array([integrated_ws.dataY(i)[0] for i in which_tube])
     if len(counts_y) == 0:
         return
-    get_points_ws = CreateWorkspace(range(len(counts_y)), counts_y, OutputWorkspace='TubePlot')
-    calib_points_ws = 'CalibPoint'
+    return fit_tube_points(counts_y, func_forms, fit_params, show_plot, workspace_prefix)
+
+
+def fit_tube_points(counts_y, func_forms, fit_params, show_plot=False, workspace_prefix=''):
+    """
+    Get the centres of N slits or edges for calibration from the counts of the pixels of one tube
+
+    :param counts_y: array of the integrated counts of the pixels of the tube
+    :param func_forms: array of function form 1=slit/bar, 2=edge
+    :param fit_params: a TubeCalibFitParams object contain the fit parameters
+    :param show_plot: show plot for this tube
+    :param workspace_prefix: prefix for the names of the temporary workspaces of the fits
+
+    :rtype: array of the slit/edge positions (-1.0 indicates failed to find position)
+    """
+    # Create input workspace for fitting
+    get_points_ws = CreateWorkspace(range(len(counts_y)), counts_y, OutputWorkspace=workspace_prefix + 'TubePlot')
+    calib_points_ws = workspace_prefix + 'CalibPoint'
     results = []
     fitt_y_values = []
     fitt_x_values = []
@@ -235,7 +253,7 @@ def getPoints(integrated_ws, func_forms, fit_params, which_tube, show_plot=False
             # find the edge position
             peak_index = fit_edges(fit_params, i, get_points_ws, calib_points_ws)
         else:
-            peak_index = fit_gaussian(fit_params, i, get_points_ws, calib_points_ws)
+            peak_index = fit_gaussian(fit_params, i, get_points_ws, calib_points_ws, workspace_prefix)
         peak_centre = tuple(ADS.retrieve(calib_points_ws + '_Parameters').row(peak_index).items())[1][1]
         results.append(peak_centre)
 
@@ -245,7 +263,7 @@ def getPoints(integrated_ws, func_forms, fit_params, which_tube, show_plot=False
             fitt_x_values.append(copy.copy(ws.dataX(1)))
 
     if show_plot:
-        CreateWorkspace(OutputWorkspace='FittedData',
+        CreateWorkspace(OutputWorkspace=workspace_prefix + 'FittedData',
                         DataX=numpy.hstack(fitt_x_values),
                         DataY=numpy.hstack(fitt_y_values))
     return results
@@ -497,6 +515,286 @@ def read_peak_file(file_name):
 
 ### THESE FUNCTIONS NEXT SHOULD BE THE ONLY FUNCTIONS THE USER CALLS FROM THIS FILE
 
+# Names of the temporary workspaces created while fitting the peaks and the polynomial of a tube
+TEMPORARY_WORKSPACES = ('TubePlot', 'CalibPoint_NormalisedCovarianceMatrix', 'CalibPoint_Parameters',
+                        'CalibPoint_Workspace', 'PolyFittingWorkspace', 'QF_NormalisedCovarianceMatrix',
+                        'QF_Parameters', 'QF_Workspace', 'Z1_Workspace', 'Z1_Parameters',
+                        'Z1_NormalisedCovarianceMatrix')
+
+
+def delete_temporary_workspaces(workspace_prefix: str = '') -> None:
+    for ws_name in TEMPORARY_WORKSPACES:
+        try:
+            DeleteWorkspace(workspace_prefix + ws_name)
+        except:
+            pass
+
+
+def _tube_workspace_prefix(tube_index: int) -> str:
+    return f'__tube{tube_index}_'
+
+
+def _fit_tube_points_in_thread(tube_index: int, counts_y: numpy.ndarray, func_forms: List[int],
+                               fitPar: TubeCalibFitParams, show_plot: bool) -> List[float]:
+    """
+    Find the peaks of one tube with temporary workspaces of its own, so that several tubes can be fitted at once
+    """
+    workspace_prefix = _tube_workspace_prefix(tube_index)
+    try:
+        actual_tube = fit_tube_points(counts_y, func_forms, fitPar, show_plot, workspace_prefix)
+        if show_plot:
+            RenameWorkspace(workspace_prefix + 'FittedData', OutputWorkspace='FittedTube%d' % (tube_index))
+            RenameWorkspace(workspace_prefix + 'TubePlot', OutputWorkspace='TubePlot%d' % (tube_index))
+        return actual_tube
+    finally:
+        delete_temporary_workspaces(workspace_prefix)
+
+
+def fit_tubes_points_in_parallel(input_workspace: Workspace2D,
+                                 tubes: List[Tuple[int, ArrayInt]],
+                                 func_forms: List[int],
+                                 fitPar: TubeCalibFitParams,
+                                 plotTube: List[int] = [],
+                                 max_workers: Optional[int] = None) -> Dict[int, List[float]]:
+    """
+    Find the peaks of several tubes, fitting the tubes concurrently on a pool of threads.
+
+    :param input_workspace: Integrated Workspace with the tubes
+    :param tubes: list of (tube index, workspace indices of the tube) pairs
+    :param func_forms: array of function form 1=slit/bar, 2=edge
+    :param fitPar: A :class:`~tube_calib_fit_params.TubeCalibFitParams` object for fitting the peaks
+    :param plotTube: List of tube indexes whose fits will be kept for plotting
+    :param max_workers: maximum number of threads. Default None, means the default of ThreadPoolExecutor
+
+    :return: dictionary of the peak positions in pixels, keyed by tube index
+    """
+    # the counts are read here, so that the threads only run the fits
+    counts = [numpy.array([input_workspace.readY(j)[0] for j in wht]) for _, wht in tubes]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(_fit_tube_points_in_thread, i, counts_y, func_forms, fitPar, i in plotTube)
+                   for (i, _), counts_y in zip(tubes, counts)]
+        peaks = {i: future.result() for (i, _), future in zip(tubes, futures)}
+
+    # keep the gaussian fits of the last tube, as when the tubes are fitted one after the other
+    for i, _ in tubes:
+        workspace_prefix = _tube_workspace_prefix(i)
+        for index in range(len(func_forms)):
+            gauss_ws = workspace_prefix + 'gauss_' + str(index)
+            if ADS.doesExist(gauss_ws):
+                RenameWorkspace(gauss_ws, OutputWorkspace='gauss_' + str(index))
+    return peaks
+
+
+#
+# batched estimation of the peaks of many tubes
+#
+
+
+def _gaussian_and_background(x, params):
+    r"""Values and derivatives of a linear background plus a Gaussian (A0, A1, Height, PeakCentre, Sigma)"""
+    a0, a1, height, centre, sigma = (params[:, k, None] for k in range(5))
+    gaussian = numpy.exp(-0.5 * ((x - centre) / sigma)**2)
+    values = a0 + a1 * x + height * gaussian
+    jacobian = numpy.stack([numpy.ones_like(values), numpy.broadcast_to(x, values.shape), gaussian,
+                            height * gaussian * (x - centre) / sigma**2,
+                            height * gaussian * (x - centre)**2 / sigma**3], axis=-1)
+    return values, jacobian
+
+
+def _gaussian(x, params):
+    r"""Values and derivatives of a Gaussian (Height, PeakCentre, Sigma)"""
+    height, centre, sigma = (params[:, k, None] for k in range(3))
+    gaussian = numpy.exp(-0.5 * ((x - centre) / sigma)**2)
+    jacobian = numpy.stack([gaussian,
+                            height * gaussian * (x - centre) / sigma**2,
+                            height * gaussian * (x - centre)**2 / sigma**3], axis=-1)
+    return height * gaussian, jacobian
+
+
+def _end_erfc(x, params):
+    r"""Values and derivatives of the EndErfc function A * erfc((B - x) / C) + D"""
+    a, b, c, d = (params[:, k, None] for k in range(4))
+    u = (b - x) / c
+    complement = erfc(u)
+    slope = 2 / numpy.sqrt(numpy.pi) * numpy.exp(-u**2)
+    jacobian = numpy.stack([complement, -a * slope / c, a * slope * u / c, numpy.ones_like(complement)], axis=-1)
+    return a * complement + d, jacobian
+
+
+def _clamp_end_erfc(params):
+    r"""EndErfc does not let its minimum value D become negative"""
+    params[:, 3] = numpy.maximum(params[:, 3], 0.0)
+
+
+def least_squares_batch(model, x, y, mask, params, constrain=None, max_iterations=500, tolerance=1.e-8):
+    r"""
+    Minimise the sum of the squares of the residuals of a model for a batch of independent problems at once,
+    with the Levenberg-Marquardt method.
+
+    :param model: function of x and the parameters (n, p) returning the values (n, m) and the derivatives (n, m, p)
+    :param x: array of the m points
+    :param y: array (n, m) of the data of each problem
+    :param mask: boolean array (n, m) of the points fitted in each problem
+    :param params: array (n, p) of the starting values of the parameters
+    :param constrain: function enforcing the constraints on an array of parameters, in place
+    :param max_iterations: maximum number of iterations
+    :param tolerance: relative change of the parameters or of the cost at which a problem has converged
+
+    :return: the fitted parameters and a boolean array of the problems which converged
+    """
+    params = numpy.array(params, dtype=float)
+    y = numpy.asarray(y, dtype=float)
+
+    def evaluate(rows, trial):
+        values, jacobian = model(x, trial)
+        residuals = numpy.where(mask[rows], values - y[rows], 0.0)
+        return residuals, jacobian * mask[rows][..., None], numpy.sum(residuals**2, axis=1)
+
+    all_rows = numpy.arange(len(params))
+    residuals, jacobian, cost = evaluate(all_rows, params)
+    damping = numpy.full(len(params), 1.e-3)
+    converged = numpy.zeros(len(params), dtype=bool)
+    failed = ~numpy.isfinite(cost) | (numpy.count_nonzero(mask, axis=1) < params.shape[1])
+    for _ in range(max_iterations):
+        rows = numpy.flatnonzero(~(converged | failed))
+        if len(rows) == 0:
+            break
+        jtj = numpy.einsum('nmp,nmq->npq', jacobian[rows], jacobian[rows])
+        gradient = numpy.einsum('nmp,nm->np', jacobian[rows], residuals[rows])
+        diagonal = numpy.diagonal(jtj, axis1=1, axis2=2)
+        system = jtj + damping[rows, None, None] * (diagonal[:, :, None] * numpy.eye(params.shape[1]))
+        try:
+            steps = -numpy.linalg.solve(system, gradient[..., None])[..., 0]
+        except numpy.linalg.LinAlgError:
+            steps = -numpy.einsum('npq,nq->np', numpy.linalg.pinv(system), gradient)
+        trial = params[rows] + steps
+        if constrain is not None:
+            constrain(trial)
+        trial_residuals, trial_jacobian, trial_cost = evaluate(rows, trial)
+
+        better = numpy.isfinite(trial_cost) & (trial_cost <= cost[rows])
+        small_step = numpy.all(numpy.abs(trial - params[rows]) <= tolerance * (numpy.abs(params[rows]) + tolerance),
+                               axis=1)
+        small_change = better & (cost[rows] - trial_cost <= tolerance * cost[rows])
+        accepted = rows[better]
+        params[accepted] = trial[better]
+        residuals[accepted] = trial_residuals[better]
+        jacobian[accepted] = trial_jacobian[better]
+        cost[accepted] = trial_cost[better]
+        damping[rows] = numpy.where(better, damping[rows] / 10, damping[rows] * 10)
+        converged[rows[small_step | small_change]] = True
+        failed[rows[damping[rows] > 1.e10]] = True
+    return params, converged & ~failed
+
+
+def _fit_gaussian_batch(fit_par, index, x, counts_y):
+    r"""Vectorised :func:`fit_gaussian` for the counts (n_tubes, n_pixels) of several tubes"""
+    centre = fit_par.getPeaks()[index]
+    margin = fit_par.getMargin()
+    right_limit = counts_y.shape[1]
+    min_index = max(int(centre - margin), 0)
+    max_index = min(int(centre + margin), right_limit)
+    values = counts_y[:, min_index:max_index]
+
+    if fit_par.getAutomatic():
+        # find the parameters for fit dynamically
+        max_value = numpy.max(values, axis=1)
+        min_value = numpy.min(values, axis=1)
+        half = (max_value - min_value) * 2 / 3 + min_value
+        above_half_line = numpy.count_nonzero(values > half[:, None], axis=1)
+        is_peak = above_half_line < values.shape[1] - above_half_line
+        centres = numpy.where(is_peak, numpy.argmax(values, axis=1), numpy.argmin(values, axis=1)) + min_index
+        background = numpy.where(is_peak, min_value, max_value)
+        height = numpy.where(is_peak, max_value - min_value, min_value - max_value)
+        width = numpy.ones(len(counts_y))  # fit_gaussian starts from the length of the tuple from numpy.where
+        start = numpy.maximum(centres - margin, 0)
+        end = numpy.minimum(centres + margin, right_limit)
+        mask = (x >= start[:, None]) & (x <= end[:, None])
+        params = numpy.stack([background, numpy.zeros(len(counts_y)), height, centres, width], axis=1)
+        params, converged = least_squares_batch(_gaussian_and_background, x, counts_y, mask, params)
+        peak_centres = params[:, 3]
+    else:
+        # as fit_gaussian, fit the linear background first and then the gaussian to the difference
+        height, width = fit_par.getHeightAndWidth()
+        start = numpy.full(len(counts_y), max(centre - margin, 0))
+        end = numpy.full(len(counts_y), min(centre + margin, right_limit))
+        window = (x >= start[0]) & (x <= end[0])
+        design = numpy.stack([numpy.ones(numpy.count_nonzero(window)), x[window]], axis=1)
+        background = numpy.linalg.lstsq(design, counts_y[:, window].T, rcond=None)[0]
+        difference = counts_y - (background[0][:, None] + background[1][:, None] * x)
+        mask = numpy.broadcast_to(window, counts_y.shape)
+        params = numpy.tile([height, centre, width], (len(counts_y), 1))
+        params, converged = least_squares_batch(_gaussian, x, difference, mask, params)
+        peak_centres = params[:, 1]
+
+    return peak_centres, converged & (peak_centres >= start) & (peak_centres <= end)
+
+
+def _fit_edges_batch(fit_par, index, x, counts_y):
+    r"""Vectorised :func:`fit_edges` for the counts (n_tubes, n_pixels) of several tubes"""
+    centre = fit_par.getPeaks()[index]
+    outer_edge, inner_edge, end_grad = fit_par.getEdgeParameters()
+    margin = fit_par.getMargin()
+    right_limit = counts_y.shape[1]
+    values = counts_y[:, max(int(centre - margin), 0):min(int(centre + margin), right_limit)]
+
+    # identify if the edge is a sloping edge or descent edge
+    descent_mode = values[:, 0] > values[:, -1]
+    start = numpy.where(descent_mode, max(centre - outer_edge, 0), max(centre - inner_edge, 0))
+    end = numpy.where(descent_mode, min(centre + inner_edge, right_limit), min(centre + outer_edge, right_limit))
+    mask = (x >= start[:, None]) & (x <= end[:, None])
+    # the default values of A and D of EndErfc
+    params = numpy.stack([numpy.full(len(counts_y), 2000.0), numpy.full(len(counts_y), centre),
+                          numpy.where(descent_mode, -end_grad, end_grad), numpy.zeros(len(counts_y))], axis=1)
+    params, converged = least_squares_batch(_end_erfc, x, counts_y, mask, params, constrain=_clamp_end_erfc)
+    # EndErfc is a constant for negative A, so leave those tubes to Fit
+    edge_centres = params[:, 1]
+    return edge_centres, converged & (params[:, 0] >= 0) & (edge_centres >= start) & (edge_centres <= end)
+
+
+def fit_tubes_points_batched(input_workspace: Workspace2D,
+                             tubes: List[Tuple[int, ArrayInt]],
+                             func_forms: List[int],
+                             fitPar: TubeCalibFitParams) -> Dict[int, List[float]]:
+    """
+    Find the peaks of several tubes at once, without running Fit.
+
+    The counts of the tubes are extracted as one array, the starting values of the fits of :func:`fit_gaussian`
+    and :func:`fit_edges` are estimated for all the tubes with array operations, and the same functions are
+    fitted to all the tubes together with a vectorised least-squares minimiser.
+
+    :param input_workspace: Integrated Workspace with the tubes
+    :param tubes: list of (tube index, workspace indices of the tube) pairs
+    :param func_forms: array of function form 1=slit/bar, 2=edge
+    :param fitPar: A :class:`~tube_calib_fit_params.TubeCalibFitParams` object for fitting the peaks
+
+    :return: dictionary of the peak positions in pixels, keyed by tube index. Tubes with a fit which did not
+        converge, or with a peak outside its fitting range, are left out so that they can be fitted with Fit.
+    """
+    counts = input_workspace.extractY()[:, 0]
+    # tubes with the same number of pixels are fitted together
+    tubes_by_length = dict()
+    for i, wht in tubes:
+        tubes_by_length.setdefault(len(wht), list()).append((i, wht))
+
+    peaks = dict()
+    for same_length_tubes in tubes_by_length.values():
+        counts_y = counts[numpy.array([wht for _, wht in same_length_tubes])]
+        x = numpy.arange(counts_y.shape[1], dtype=float)
+        positions = numpy.zeros((len(counts_y), len(func_forms)))
+        converged = numpy.ones(len(counts_y), dtype=bool)
+        for index, form in enumerate(func_forms):
+            if form == 2:
+                positions[:, index], peak_converged = _fit_edges_batch(fitPar, index, x, counts_y)
+            else:
+                positions[:, index], peak_converged = _fit_gaussian_batch(fitPar, index, x, counts_y)
+            converged &= peak_converged
+        for (i, _), tube_positions, tube_converged in zip(same_length_tubes, positions, converged):
+            if tube_converged:
+                peaks[i] = [float(position) for position in tube_positions]
+    return peaks
+
+
 def getCalibration(input_workspace: Union[str, Workspace2D],
                    tubeSet: TubeSpec,
                    calibTable: TableWorkspace,
@@ -509,7 +807,9 @@ def getCalibration(input_workspace: Union[str, Workspace2D],
                    range_list: Optional[List[int]] = None,
                    polinFit: int = 2,
                    peaksTestMode: bool = False,
-                   parameters_table_group: Optional[str] = None) -> None:
+                   parameters_table_group: Optional[str] = None,
+                   parallel: Union[bool, int] = False,
+                   batched: bool = False) -> None:
     """
     Get the results the calibration and put them in the calibration table provided.
 
@@ -535,6 +835,11 @@ def getCalibration(input_workspace: Union[str, Workspace2D],
         holds the goodness-of-fit, chi-square value. The name of each individual TableWorkspace is the string
         `parameters_table_group` plus the suffix `_I`, where `I` is the tube index as given by list `range_list`.
         If `None`, no group workspace is generated.
+    :param parallel: if True, fit the peaks of the tubes concurrently on a pool of threads. An integer gives the
+        maximum number of threads. The results are put in the tables in the order of `range_list`, and are the same
+        as those of fitting the tubes one after the other.
+    :param batched: if True, find the peaks of all the tubes at once with :func:`fit_tubes_points_batched`,
+        and fit with Fit only the tubes whose batched fit did not converge and the tubes in `plotTube`.
 
     This is the main method called from :func:`~tube.calibrate` to perform the calibration.
     """
@@ -547,7 +852,7 @@ def getCalibration(input_workspace: Union[str, Workspace2D],
 
     all_skipped = set()
 
-    parameters_tables = list()  # hold the names of all the fit parameter tables
+    tubes = list()  # hold the index and the workspace indices of the tubes to calibrate
     for i in range_list:
 
         # Deal with (i+1)st tube specified
@@ -566,13 +871,28 @@ def getCalibration(input_workspace: Union[str, Workspace2D],
             # skip this tube
             continue
 
-        ##############################
-        # Define Peak Position session
-        ##############################
+        tubes.append((i, wht))
+
+    ##############################
+    # Define Peak Position session
+    ##############################
+    fitted_peaks = dict()
+    tubes_to_fit = [tube for tube in tubes if tube[0] not in overridePeaks]
+    if batched:
+        fitted_peaks.update(fit_tubes_points_batched(ws, [tube for tube in tubes_to_fit if tube[0] not in plotTube],
+                                                     iTube.getFunctionalForms(), fitPar))
+        tubes_to_fit = [tube for tube in tubes_to_fit if tube[0] not in fitted_peaks]
+    if parallel:
+        fitted_peaks.update(fit_tubes_points_in_parallel(ws, tubes_to_fit, iTube.getFunctionalForms(), fitPar,
+                                                         plotTube, max_workers=None if parallel is True else parallel))
 
+    parameters_tables = list()  # hold the names of all the fit parameter tables
+    for i, wht in tubes:
         # if this tube is to be override, get the peaks positions for this tube.
         if i in overridePeaks:
             actual_tube = overridePeaks[i]
+        elif i in fitted_peaks:
+            actual_tube = fitted_peaks[i]
         else:
             # find the peaks positions
             plot_this_tube = i in plotTube
@@ -610,15 +930,7 @@ def getCalibration(input_workspace: Union[str, Workspace2D],
         GroupWorkspaces(InputWorkspaces=parameters_tables, OutputWorkspace=parameters_table_group)
 
     # Delete temporary workspaces used in the calibration
-    for ws_name in ('TubePlot', 'CalibPoint_NormalisedCovarianceMatrix',
-                    'CalibPoint_NormalisedCovarianceMatrix', 'CalibPoint_NormalisedCovarianceMatrix',
-                    'CalibPoint_Parameters', 'CalibPoint_Workspace', 'PolyFittingWorkspace',
-                    'QF_NormalisedCovarianceMatrix', 'QF_Parameters', 'QF_Workspace',
-                    'Z1_Workspace', 'Z1_Parameters', 'Z1_NormalisedCovarianceMatrix'):
-        try:
-            DeleteWorkspace(ws_name)
-        except:
-            pass
+    delete_temporary_workspaces()
 
 
 def getCalibrationFromPeakFile(ws, calibTable, iTube, PeakFile):
@@ -10,11 +10,15 @@
 from mantid.simpleapi import *
 from mantid.kernel import funcinspect
 from mantid import geometry,api
+from mantid.utils.pool import create_pool
 
 import os.path
 import copy
 import math
 import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import tempfile
 import numpy as np
 import collections
 import Direct.CommonFunctions  as common
@@ -484,8 +488,16 @@ class DirectEnergyConversion(object):
                 # will be cut in chunks and bg regions removed
                 bkgd_range = self.bkgd_range
                 self._find_or_build_bkgr_ws(PropertyManager.sample_run,bkgd_range[0],bkgd_range[1])
+            if self._can_reduce_multirep_in_processes(mono_van_cache_num):
+                result = self._reduce_multirep_in_processes(masking,out_ws_name)
+                self.clean_up_convert_to_energy(start_time)
+                return result
             # initialize list to store resulting workspaces to return
             result = []
+            # the result of a chunk is not changed when the following chunks are reduced, so it is saved on
+            # a separate thread while they are. One thread keeps the files written in order of the energies.
+            save_executor = ThreadPoolExecutor(max_workers=1)
+            pending_saves = []
         else:
 #pylint: disable=W0201
             self._multirep_mode = False
@@ -558,10 +570,14 @@ class DirectEnergyConversion(object):
                 PropertyManager.sample_run.synchronize_ws(deltaE_ws_sample)
             except AttributeError:
                 pass
-            self.save_results(deltaE_ws_sample)
-
             # prepare output workspace
             results_name = deltaE_ws_sample.name()
+            if self._multirep_mode:
+                pending_saves.extend(save_executor.submit(save_task)
+                                     for save_task in self._get_save_tasks(deltaE_ws_sample))
+            else:
+                self.save_results(deltaE_ws_sample)
+
             if out_ws_name:
                 if self._multirep_mode:
                     result.append(deltaE_ws_sample)
@@ -578,10 +594,140 @@ class DirectEnergyConversion(object):
 #------------------------------------------------------------------------------------------
 # END Main loop over incident energies
 #------------------------------------------------------------------------------------------
+        if self._multirep_mode:
+            save_executor.shutdown(wait=True)
+            # re-raise any error which occurred while saving
+            for pending_save in pending_saves:
+                pending_save.result()
 
         self.clean_up_convert_to_energy(start_time)
         return result
 
+#------------------------------------------------------------------------------------------
+    def _can_reduce_multirep_in_processes(self,mono_van_cache_num):
+        """Check if the incident energies of a multirep run can be reduced by a pool of processes.
+
+           Each process builds its own reducer, so the reductions which depend on the state of this one
+           (absolute units, absorption corrections, custom pre- and post-processing and custom names of
+           saved files) are done here.
+        """
+        prop_man = self.prop_man
+        if prop_man.multirep_processes < 2 or len(PropertyManager.incident_energy.getAllEiList()) < 2:
+            return False
+        if mono_van_cache_num is not None or self.mono_correction_factor:
+            reason = 'reduction to absolute units'
+        elif prop_man.correct_absorption_on is not None:
+            reason = 'absorption corrections'
+        elif type(self) is not DirectEnergyConversion or 'do_preprocessing' in self.__dict__ or \
+                'do_postprocessing' in self.__dict__:
+            reason = 'custom pre- or post-processing'
+#pylint: disable=protected-access
+        elif PropertyManager.save_file_name._custom_print is not None:
+            reason = 'custom names of saved files'
+        else:
+            return True
+        prop_man.log("*** Multirep processes are not used for {0}. Incident energies are reduced one after another".
+                     format(reason),'notice')
+        return False
+
+    def _reduce_multirep_in_processes(self,masking,out_ws_name):
+        """Reduce the incident energies of a multirep run with a pool of processes.
+
+           The run is cut into the chunk for each energy and tested for bleeding here, as when the
+           energies are reduced one after another. The chunks are saved to files together with the white
+           beam integrals, monitors, masks and background shared by all chunks, which each process loads
+           once. The processes reduce and save the chunks with their own reducers.
+
+           Returns the list of reduced workspaces if out_ws_name is defined, or None otherwise
+        """
+        prop_man = self.prop_man
+        AllEn = PropertyManager.incident_energy.getAllEiList()
+        num_ei_cuts = len(AllEn)
+        processes = min(prop_man.multirep_processes,num_ei_cuts)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            def save_to_tmp_dir(workspace,file_name):
+                file_path = os.path.join(tmp_dir,file_name + '.nxs')
+                SaveNexusProcessed(InputWorkspace=workspace,Filename=file_path)
+                return file_path
+
+            white_ws = self._get_wb_inegrals(PropertyManager.wb_run)
+            white_file = save_to_tmp_dir(white_ws,'white_integrals')
+            if self._keep_wb_workspace:
+                DeleteWorkspace(white_ws)
+            sample_ws = PropertyManager.sample_run.get_workspace()
+            mon_ws = PropertyManager.sample_run.get_monitor_workspace(sample_ws)
+            if mon_ws is None: # monitors are in the sample workspace, which the chunks are given a copy of
+                mon_ws = sample_ws
+            monitors_file = save_to_tmp_dir(mon_ws,'monitors')
+            masks_file = save_to_tmp_dir(masking,'masks') if masking else None
+            if 'bkgr_ws_source' in mtd:
+                bkgr_file = save_to_tmp_dir('bkgr_ws_source','background')
+            else:
+                bkgr_file = None
+
+            tasks = []
+            ws_base = None
+            for ind,ei_guess in enumerate(AllEn):
+                PropertyManager.incident_energy.set_current_ind(ind)
+                cut_ind = ind + 1
+                tof_range = self.find_tof_range_for_multirep(ws_base)
+                ws_base = PropertyManager.sample_run.chop_ws_part(ws_base,tof_range,self._do_early_rebinning,
+                                                                  cut_ind,num_ei_cuts)
+                prop_man.log("*** Cutting multirep chunk: #{0}/{1} for provisional energy: {2} meV".
+                             format(cut_ind,num_ei_cuts,ei_guess),'notice')
+                bleed_mask = self._do_bleed_corrections(PropertyManager.sample_run,cut_ind)
+                if bleed_mask is not None:
+                    mask_ws_name =  PropertyManager.sample_run.get_workspace().name()+'_bleed_mask'
+                    RenameWorkspace(bleed_mask,OutputWorkspace=mask_ws_name)
+                    self._old_runs_list.append(mask_ws_name)
+                chunk_ws = PropertyManager.sample_run.get_workspace()
+                chunk_name = chunk_ws.name()
+                tasks.append((ind,chunk_name,save_to_tmp_dir(chunk_ws,'chunk{0}'.format(cut_ind))))
+                # the chunks are reduced from their files, so only the rest of the run is kept
+                try:
+                    DeleteWorkspace(chunk_ws.getMonitorWorkspace())
+                except RuntimeError: # no monitors are attached to the chunk
+                    pass
+                DeleteWorkspace(chunk_name)
+
+            prop_man.log("*** Reducing {0} multirep chunks with {1} processes".format(num_ei_cuts,processes),'notice')
+            settings = {key:config[key] for key in ('defaultsave.directory','datasearch.directories',
+                                                    'default.facility','default.instrument')}
+            results_dir = tmp_dir if out_ws_name else None
+            result = []
+            with create_pool(processes,initializer=_init_multirep_worker,
+                             initargs=(prop_man.instr_name,self._get_multirep_worker_properties(),AllEn,
+                                       white_file,monitors_file,masks_file,bkgr_file,results_dir,settings)) as pool:
+                for results_name,results_file in pool.imap(_reduce_multirep_chunk_in_worker,tasks):
+                    if results_file:
+                        result.append(LoadNexusProcessed(Filename=results_file,OutputWorkspace=results_name))
+                    self._old_runs_list.append(results_name)
+        if out_ws_name:
+            return result
+        return None
+
+    def _get_multirep_worker_properties(self):
+        """Return the changed properties to set to the reducers of multirep processes.
+
+           The runs and incident energies are set up by the processes themselves.
+        """
+        prop_man = self.prop_man
+        properties = {}
+        for prop_name in prop_man.getChangedProperties():
+            if prop_name.startswith('_') or prop_name == 'incident_energy' or \
+                    isinstance(getattr(PropertyManager,prop_name,None),RunDescriptor):
+                continue
+            if prop_name == 'save_file_name':
+                # the name built by default depends on the energy, so it is only set if it is fixed
+#pylint: disable=protected-access
+                value = PropertyManager.save_file_name._file_name
+            else:
+                value = getattr(prop_man,prop_name)
+            if isinstance(value,set): # e.g. save formats, which are cleared by an empty list
+                value = list(value)
+            properties[prop_name] = value
+        return properties
+
 #------------------------------------------------------------------------------------------
     def remove_empty_background(self,masking_ws=None):
         """Remove empty background from the workspaces, described by RunDescriptors, specified here
@@ -1273,6 +1419,15 @@ class DirectEnergyConversion(object):
         Save the result workspace to the specified filename using the list of formats specified in
         formats. If formats is None then the default list is used
         """
+        for save_task in self._get_save_tasks(workspace, save_file, formats):
+            save_task()
+
+    def _get_save_tasks(self, workspace, save_file=None, formats=None):
+        """
+        Resolve the file names and formats to save the result workspace with, as save_results does.
+        Returns the list of functions doing the saving. They are called without arguments and do not use the
+        property manager, so can run while the reduction changes it.
+        """
         if formats:
            # clear up existing save formats as one is defined in parameters
             self.prop_man.save_format = None
@@ -1291,7 +1446,7 @@ class DirectEnergyConversion(object):
             if workspace is None:
                 self.prop_man.log("DirectEnergyConversion:save_results: Nothing to save",
                                   'warning')
-                return
+                return []
             else:
                 save_file = workspace.name()
         elif os.path.isdir(save_file):
@@ -1303,31 +1458,33 @@ class DirectEnergyConversion(object):
 
         prop_man = self.prop_man
         name_orig = workspace.name()
+        save_tasks = []
         for file_format  in formats:
             for case in common.switch(file_format):
                 if case('nxspe'):
-                    filename = save_file + '.nxspe'
-                   # nxspe can not write workspace with / in the name
-                   # (something to do with folder names inside nxspe)
+                    # nxspe can not write workspace with / in the name
+                    # (something to do with folder names inside nxspe)
                     name_supported = name_orig.replace('/','of')
                     if name_supported != name_orig:
-                        RenameWorkspace(InputWorkspace=name_orig,OutputWorkspace=name_supported)
-                    SaveNXSPE(InputWorkspace=name_supported,Filename= filename,
-                              KiOverKfScaling=prop_man.apply_kikf_correction,psi=prop_man.psi)
-                    if name_supported != name_orig:
-                        RenameWorkspace(InputWorkspace=name_supported,OutputWorkspace=name_orig)
+                        # save a copy with the supported name, as renaming the workspace in the ADS would race
+                        # with the reduction of the next chunk if the task runs in the background
+                        CloneWorkspace(InputWorkspace=name_orig,OutputWorkspace=name_supported)
+                    save_tasks.append(partial(_save_nxspe, name_supported, save_file + '.nxspe',
+                                              prop_man.apply_kikf_correction, prop_man.psi,
+                                              name_supported != name_orig))
                     break
                 if case('spe'):
                     filename = save_file + '.spe'
-                    SaveSPE(InputWorkspace=workspace,Filename= filename)
+                    save_tasks.append(partial(SaveSPE, InputWorkspace=workspace, Filename=filename))
                     break
                 if case('nxs'):
                     filename = save_file + '.nxs'
-                    SaveNexus(InputWorkspace=workspace,Filename= filename)
+                    save_tasks.append(partial(SaveNexus, InputWorkspace=workspace, Filename=filename))
                     break
                 if case(): # default, could also just omit condition or 'if True'
                     prop_man.log("Unknown file format {0} requested to save results. No saving performed this format".
                                  format(file_format))
+        return save_tasks
     #########
 
     @property
@@ -1961,6 +2118,76 @@ class DirectEnergyConversion(object):
         return ws
 
 
+def _save_nxspe(ws_name, filename, apply_kikf_correction, psi, delete_after_save):
+    """Save workspace with the given name in nxspe format, deleting it afterwards if it is a copy made for saving"""
+    SaveNXSPE(InputWorkspace=ws_name,Filename= filename,
+              KiOverKfScaling=apply_kikf_correction,psi=psi)
+    if delete_after_save:
+        DeleteWorkspace(ws_name)
+
+
+# the reducer and shared workspaces of a process reducing multirep chunks
+_multirep_worker = {}
+
+
+def _init_multirep_worker(instr_name, properties, energies, white_file, monitors_file, masks_file, bkgr_file,
+                          results_dir, settings):
+    """Build the reducer of a process reducing multirep chunks and load the workspaces shared by all chunks"""
+    for key, value in settings.items():
+        config[key] = value
+    reducer = DirectEnergyConversion(instr_name)
+    prop_man = reducer.prop_man
+    prop_man.set_input_parameters(**properties)
+    prop_man.incident_energy = energies
+
+    # the white beam integrals are found by the name the reducer gives them
+    white_ws = LoadNexusProcessed(Filename=white_file, OutputWorkspace='white_integrals')
+    prop_man.wb_run = white_ws
+    white_name = PropertyManager.wb_run.set_action_suffix('_norm_white')
+    RenameWorkspace(InputWorkspace=white_ws, OutputWorkspace=white_name)
+    PropertyManager.wb_run.synchronize_ws(white_ws)
+
+    monitors = LoadNexusProcessed(Filename=monitors_file, OutputWorkspace='multirep_monitors')
+    if masks_file:
+        reducer.spectra_masks = LoadNexusProcessed(Filename=masks_file, OutputWorkspace='multirep_masks')
+    if bkgr_file:
+        LoadNexusProcessed(Filename=bkgr_file, OutputWorkspace='bkgr_ws_source')
+    _multirep_worker.update(reducer=reducer, monitors=monitors, results_dir=results_dir)
+
+
+def _reduce_multirep_chunk_in_worker(task):
+    """Reduce and save the multirep chunk of a task (energy index, chunk name, chunk file) in a process.
+
+       Returns the name of the reduced workspace and the file it is saved to for the parent process,
+       which is None if the parent does not need it.
+    """
+    ind, chunk_name, chunk_file = task
+    reducer = _multirep_worker['reducer']
+    chunk_ws = LoadNexusProcessed(Filename=chunk_file, OutputWorkspace=chunk_name)
+    mon_ws = CloneWorkspace(InputWorkspace=_multirep_worker['monitors'], OutputWorkspace=chunk_name + '_monitors')
+    chunk_ws.setMonitorWorkspace(mon_ws)
+    PropertyManager.incident_energy.set_current_ind(ind)
+    reducer.prop_man.sample_run = chunk_ws
+    ei_guess = PropertyManager.incident_energy.get_current()
+
+    deltaE_ws_sample = reducer.mono_sample(PropertyManager.sample_run, ei_guess, PropertyManager.wb_run,
+                                           reducer.map_file, reducer.spectra_masks)
+    deltaE_ws_sample = PropertyManager.sample_run.synchronize_ws(deltaE_ws_sample)
+    reducer.save_results(deltaE_ws_sample)
+
+    results_name = deltaE_ws_sample.name()
+    results_dir = _multirep_worker['results_dir']
+    if results_dir:
+        results_file = os.path.join(results_dir, 'result{0}.nxs'.format(ind + 1))
+        SaveNexusProcessed(InputWorkspace=deltaE_ws_sample, Filename=results_file)
+    else:
+        results_file = None
+    for ws_name in (results_name, chunk_name + '_monitors'):
+        if ws_name in mtd:
+            DeleteWorkspace(ws_name)
+    return results_name, results_file
+
+
 def get_failed_spectra_list_from_masks(masked_wksp,prop_man):
     """Compile a list of spectra numbers that are marked as
        masked in the masking workspace
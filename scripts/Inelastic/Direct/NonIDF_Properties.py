@@ -80,6 +80,8 @@ class NonIDF_Properties(object):
         super(NonIDF_Properties,self).__setattr__('second_white',None)
         super(NonIDF_Properties,self).__setattr__('_tmp_run',None)
         super(NonIDF_Properties,self).__setattr__('_cashe_sum_ws',False)
+        super(NonIDF_Properties,self).__setattr__('_stream_sum_runs',False)
+        super(NonIDF_Properties,self).__setattr__('_multirep_processes',1)
         super(NonIDF_Properties,self).__setattr__('_mapmask_ref_ws',None)
 
     #end
@@ -189,6 +191,41 @@ class NonIDF_Properties(object):
         self._cashe_sum_ws = bool(val)
     # -----------------------------------------------------------------------------
 
+    @property
+    def stream_sum_runs(self):
+        """Used together with sum_runs property. If True, the next run to sum
+           is loaded while the previous one is added to the sum, and the partial sum
+           is saved to the default save directory when the summation is interrupted (and
+           every ten minutes while it runs), so that an interrupted summation resumes from it
+           rather than starting again
+      """
+        return self._stream_sum_runs
+
+    @stream_sum_runs.setter
+    def stream_sum_runs(self,val):
+#pylint: disable=attribute-defined-outside-init
+        self._stream_sum_runs = bool(val)
+    # -----------------------------------------------------------------------------
+
+    @property
+    def multirep_processes(self):
+        """The number of processes reducing the incident energies of a multirep run.
+           If more than one, the run is cut into the parts for each energy, which
+           are reduced and saved concurrently by separate processes.
+           Reductions to absolute units, with absorption corrections or
+           with custom pre- or post-processing use one process only.
+      """
+        return self._multirep_processes
+
+    @multirep_processes.setter
+    def multirep_processes(self,val):
+        if val is None:
+            val = 1
+        if int(val) < 1:
+            raise KeyError("Number of multirep processes has to be positive but is: {0}".format(val))
+        object.__setattr__(self,'_multirep_processes',int(val))
+    # -----------------------------------------------------------------------------
+
     @property
     def log_to_mantid(self):
         """Property specify if high level log should be printed to stdout or added to common Mantid log"""
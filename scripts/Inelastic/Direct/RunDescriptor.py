@@ -13,7 +13,11 @@ from mantid.simpleapi import *
 from mantid.dataobjects import *
 from mantid.kernel import funcinspect
 from Direct.PropertiesDescriptors import *
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import os
 import re
+import time
 import collections
 
 
@@ -357,6 +361,8 @@ class RunDescriptor(PropDescriptor):
     _holder = None
     _logger = None
     _sum_log_name = 'SumRuns'
+    # the minimal time in seconds between saves of the partial sum when streaming summed runs
+    _sum_checkpoint_interval = 600.
 #--------------------------------------------------------------------------------------------------------------------
 
     def __init__(self,prop_name,DocString=None):
@@ -1424,11 +1430,21 @@ class RunDescriptor(PropDescriptor):
         """Load multiple runs and sum them together
 
            monitors_with_ws -- if true, load monitors with workspace
+
+           If stream_sum_runs property is True, the next run is loaded on a background thread
+           while the previous one is added to the sum, and the partial sum is saved to the
+           default save directory if the summation is interrupted, and at most every
+           _sum_checkpoint_interval seconds while it runs, so an interrupted summation resumes from it.
         """
 
         RunDescriptor._logger("*** Summing multiple runs            ****")
+        streaming = RunDescriptor._holder.stream_sum_runs
 
         runs_to_sum,sum_ws,n_already_summed = self.get_runs_to_sum()
+        if streaming and not sum_ws:
+            sum_ws = self._load_sum_checkpoint(inst_name,monitors_with_ws)
+            if sum_ws:
+                runs_to_sum,sum_ws,n_already_summed = self.get_runs_to_sum(sum_ws)
         num_to_sum = len(runs_to_sum)
 
         if sum_ws:
@@ -1453,31 +1469,72 @@ class RunDescriptor(PropDescriptor):
             load_start = 1
         #end
 
-        for ind,run_num in enumerate(runs_to_sum[load_start:num_to_sum]):
-
+        def load_term(ind,run_num):
             RunDescriptor._logger("*** Adding  #{0}/{1}, run N: {2} ".
                                   format(ind + 1 + load_start,num_to_sum,run_num))
 
             term_name = '{0}_ADDITIVE_#{1}/{2}'.format(inst_name,ind + 1 + load_start,num_to_sum)#
             f_guess,index = self._run_list.get_file_guess(inst_name,run_num)
 
-            wsp = self.load_file(inst_name,term_name,False,
-                                 monitors_with_ws,False,file_hint=f_guess)
-
-            wsp_name = wsp.name()
-            wsp_mon_name = wsp_name + '_monitors'
-            Plus(LHSWorkspace=sum_ws_name,RHSWorkspace=wsp_name,
-                 OutputWorkspace=sum_ws_name,ClearRHSWorkspace=True)
-            #  AddedRunNumbers.append(run_num)
-            AddedRunNumbers+=',' + str(run_num)
-            if not monitors_with_ws:
-                Plus(LHSWorkspace=sum_mon_name,RHSWorkspace=wsp_mon_name,
-                     OutputWorkspace=sum_mon_name,ClearRHSWorkspace=True)
-            if wsp_name in mtd:
-                DeleteWorkspace(wsp_name)
-            if wsp_mon_name in mtd:
-                DeleteWorkspace(wsp_mon_name)
-        #end for
+            return self.load_file(inst_name,term_name,False,
+                                  monitors_with_ws,False,file_hint=f_guess)
+
+        terms = list(enumerate(runs_to_sum[load_start:num_to_sum]))
+        prefetch = ThreadPoolExecutor(max_workers=1) if streaming else None
+        last_checkpoint_time = time.time()
+        n_summed_since_checkpoint = 0
+        # True while a run is added to the data but not yet to the monitors and the list of added runs
+        adding = False
+        try:
+            next_term = prefetch.submit(load_term,*terms[0]) if prefetch and terms else None
+            for ind,run_num in terms:
+                if prefetch:
+                    wsp = next_term.result()
+                    # load the next run while this one is added
+                    if ind + 1 < len(terms):
+                        next_term = prefetch.submit(load_term,*terms[ind + 1])
+                else:
+                    wsp = load_term(ind,run_num)
+
+                wsp_name = wsp.name()
+                wsp_mon_name = wsp_name + '_monitors'
+                del wsp
+                adding = True
+                Plus(LHSWorkspace=sum_ws_name,RHSWorkspace=wsp_name,
+                     OutputWorkspace=sum_ws_name,ClearRHSWorkspace=True)
+                if not monitors_with_ws:
+                    Plus(LHSWorkspace=sum_mon_name,RHSWorkspace=wsp_mon_name,
+                         OutputWorkspace=sum_mon_name,ClearRHSWorkspace=True)
+                #  AddedRunNumbers.append(run_num)
+                AddedRunNumbers+=',' + str(run_num)
+                adding = False
+                if wsp_name in mtd:
+                    DeleteWorkspace(wsp_name)
+                if wsp_mon_name in mtd:
+                    DeleteWorkspace(wsp_mon_name)
+                if streaming:
+                    n_summed_since_checkpoint += 1
+                    # saving the growing sum after every run would make the I/O quadratic in the number of runs
+                    if time.time() - last_checkpoint_time > RunDescriptor._sum_checkpoint_interval:
+                        self._save_sum_checkpoint(inst_name,sum_ws_name,AddedRunNumbers,monitors_with_ws)
+                        last_checkpoint_time = time.time()
+                        n_summed_since_checkpoint = 0
+            #end for
+        except BaseException:
+            if adding:
+                # the sum does not match the list of added runs, so resume from the previous checkpoint instead
+                RunDescriptor._logger("*** Summation interrupted while adding a run, the partial sum is not saved",
+                                      'warning')
+            elif n_summed_since_checkpoint > 0:
+                # keep the runs summed so far to resume from them
+                try:
+                    self._save_sum_checkpoint(inst_name,sum_ws_name,AddedRunNumbers,monitors_with_ws)
+                except Exception as err:
+                    RunDescriptor._logger("*** Failed to save the partial sum: {0}".format(err),'warning')
+            raise
+        finally:
+            if prefetch:
+                prefetch.shutdown(wait=True)
         RunDescriptor._logger("*** Summing multiple runs  completed ****")
 
         #AddSampleLog(Workspace=sum_ws_name,LogName =
@@ -1485,6 +1542,9 @@ class RunDescriptor(PropDescriptor):
         #             LogText=AddedRunNumbers,LogType='Number Series')
         AddSampleLog(Workspace=sum_ws_name,LogName = RunDescriptor._sum_log_name,
                      LogText=AddedRunNumbers,LogType='String')
+        if streaming and len(AddedRunNumbers.split(',')) >= len(self._run_list.get_all_run_list()):
+            # all runs are summed, so there is nothing to resume any more
+            self._delete_sum_checkpoint(inst_name)
 
         if RunDescriptor._holder.cashe_sum_ws:
             # store workspace in cash for further usage
@@ -1494,6 +1554,59 @@ class RunDescriptor(PropDescriptor):
             ws = mtd[sum_ws_name]
         return ws
 
+    def _get_sum_checkpoint_files(self,inst_name):
+        """Return names of the files the partial sum of the run list and its monitors are saved to
+
+           The names contain a hash of the whole run list, so that run lists which
+           only share their first and last runs do not share the partial sum.
+        """
+        runs = self._run_list.get_all_run_list()
+        runs_hash = hashlib.sha1(','.join(str(run) for run in sorted(runs)).encode()).hexdigest()[:16]
+        base_name = os.path.join(config['defaultsave.directory'],
+                                 '{0}{1}_{2}-{3}_{4}_partial_sum'.format(inst_name,self._prop_name,runs[0],runs[-1],
+                                                                         runs_hash))
+        return (base_name + '.nxs',base_name + '_monitors.nxs')
+
+    def _save_sum_checkpoint(self,inst_name,sum_ws_name,added_run_numbers,monitors_with_ws):
+        """Save the partial sum to disk, to resume summation from it if it is interrupted"""
+        sum_file,mon_file = self._get_sum_checkpoint_files(inst_name)
+        AddSampleLog(Workspace=sum_ws_name,LogName = RunDescriptor._sum_log_name,
+                     LogText=added_run_numbers,LogType='String')
+        # write to temporary files first so an interrupted save never replaces a valid checkpoint
+        if not monitors_with_ws:
+            SaveNexusProcessed(InputWorkspace=sum_ws_name + '_monitors',Filename=mon_file + '.tmp.nxs')
+            os.replace(mon_file + '.tmp.nxs',mon_file)
+        SaveNexusProcessed(InputWorkspace=sum_ws_name,Filename=sum_file + '.tmp.nxs')
+        os.replace(sum_file + '.tmp.nxs',sum_file)
+
+    def _load_sum_checkpoint(self,inst_name,monitors_with_ws):
+        """Load the partial sum of the run list saved by an interrupted summation.
+
+           Returns None if there is no partial sum or its runs are not the first runs of the run list
+        """
+        sum_file,mon_file = self._get_sum_checkpoint_files(inst_name)
+        if not os.path.isfile(sum_file) or (not monitors_with_ws and not os.path.isfile(mon_file)):
+            return None
+        sum_ws = LoadNexusProcessed(Filename=sum_file,OutputWorkspace='Sum_ws')
+        try:
+            summed_runs = RunDescriptor.get_sum_run_list(sum_ws)
+        except RuntimeError:
+            summed_runs = None
+        all_runs = list(self._run_list.get_all_run_list())
+        if not summed_runs or summed_runs != all_runs[:len(summed_runs)]:
+            DeleteWorkspace(sum_ws)
+            return None
+        if not monitors_with_ws:
+            LoadNexusProcessed(Filename=mon_file,OutputWorkspace='Sum_ws_monitors')
+        RunDescriptor._logger("*** Resuming summation from partial sum of runs {0} in {1}".
+                              format(summed_runs,sum_file))
+        return sum_ws
+
+    def _delete_sum_checkpoint(self,inst_name):
+        for file_name in self._get_sum_checkpoint_files(inst_name):
+            if os.path.isfile(file_name):
+                os.remove(file_name)
+
     def remove_empty_background(self,ebg_ws = None):
         """Remove empty background from the workspace, described by the run descriptor.
 
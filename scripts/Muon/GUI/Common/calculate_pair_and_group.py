@@ -11,7 +11,7 @@ from typing import Iterable
 
 
 def calculate_group_data(context, group, run, rebin, workspace_name, periods):
-    processed_data = get_pre_process_workspace_name(run, context.data_context.instrument)
+    processed_data = get_pre_process_workspace_name(run, context.data_context.instrument, rebin)
 
     params = _get_MuonGroupingCounts_parameters(group, periods)
     params["InputWorkspace"] = processed_data
@@ -29,7 +29,7 @@ def calculate_pair_data(pair: MuonPair, forward_group: str, backward_group: str,
 
 
 def estimate_group_asymmetry_data(context, group, run, rebin, workspace_name, unormalised_workspace_name, periods):
-    processed_data = get_pre_process_workspace_name(run, context.data_context.instrument)
+    processed_data = get_pre_process_workspace_name(run, context.data_context.instrument, rebin)
 
     params = _get_MuonGroupingAsymmetry_parameters(context, group, run, periods)
     params["InputWorkspace"] = processed_data
@@ -46,8 +46,25 @@ def run_pre_processing(context, run, rebin):
     return processed_data
 
 
-def get_pre_process_workspace_name(run: Iterable[int], instrument: str) -> str:
-    workspace_name = "".join(["__", instrument, run_list_to_string(run), "_pre_processed_data"])
+def get_pre_processing_dependencies(context, run, rebin):
+    """
+    Returns the parameters and the names of the input workspaces which determine the pre-processed data of a run. The
+    loaded workspaces are included in the parameters, so that reloading a run changes them.
+    """
+    params = _get_pre_processing_params(context, run, rebin)
+    loaded_data = context.data_context.get_loaded_data_for_run(run)
+    loaded_workspaces = tuple(loaded_data["OutputWorkspace"]) if loaded_data else ()
+
+    input_workspaces = tuple(workspace.workspace_name for workspace in loaded_workspaces)
+    if "DeadTimeTable" in params:
+        input_workspaces += (params["DeadTimeTable"],)
+    return (tuple(sorted(params.items())), loaded_workspaces), input_workspaces
+
+
+def get_pre_process_workspace_name(run: Iterable[int], instrument: str, rebin: bool = False) -> str:
+    # The rebinned data is kept separately so that the groups can be recalculated without pre-processing again
+    suffix = "_pre_processed_data_rebin" if rebin else "_pre_processed_data"
+    workspace_name = "".join(["__", instrument, run_list_to_string(run), suffix])
     return workspace_name
 
 
@@ -84,7 +101,7 @@ def _get_pre_processing_params(context, run, rebin):
     except KeyError:
         pass
 
-    pre_process_params["OutputWorkspace"] = get_pre_process_workspace_name(run, context.data_context.instrument)
+    pre_process_params["OutputWorkspace"] = get_pre_process_workspace_name(run, context.data_context.instrument, rebin)
 
     return pre_process_params
 
@@ -12,10 +12,11 @@ from Muon.GUI.Common.ADSHandler.workspace_naming import (get_raw_data_workspace_
                                                          get_pair_phasequad_name,
                                                          add_phasequad_extensions, get_diff_asymmetry_name)
 from Muon.GUI.Common.calculate_pair_and_group import calculate_group_data, calculate_pair_data, \
-    estimate_group_asymmetry_data, run_pre_processing
+    estimate_group_asymmetry_data, get_pre_processing_dependencies, run_pre_processing
 from Muon.GUI.Common.utilities.run_string_utils import run_list_to_string, run_string_to_list
 from Muon.GUI.Common.utilities.algorithm_utils import run_PhaseQuad, split_phasequad, rebin_ws, apply_deadtime, \
     calculate_diff_data, run_crop_workspace
+from Muon.GUI.Common.utilities.calculation_graph import CalculationGraph, CalculationNode
 import Muon.GUI.Common.ADSHandler.workspace_naming as wsName
 from Muon.GUI.Common.ADSHandler.ADS_calls import retrieve_ws
 from Muon.GUI.Common.contexts.muon_group_pair_context import get_default_grouping
@@ -25,6 +26,7 @@ from mantidqt.utils.observer_pattern import Observable
 from Muon.GUI.Common.muon_pair import MuonPair
 from Muon.GUI.Common.muon_diff import MuonDiff
 from typing import List
+import functools
 
 
 class MuonContext(object):
@@ -43,6 +45,8 @@ class MuonContext(object):
         self.base_directory = base_directory
         self.workspace_suffix = workspace_suffix
         self._plot_panes_context = plot_panes_context
+        # Records what each derived workspace was calculated from, so that only the invalidated ones are recalculated
+        self._calculation_graph = CalculationGraph()
         self.ads_observer = MuonContextADSObserver(
             self.remove_workspace,
             self.clear_context,
@@ -226,23 +230,29 @@ class MuonContext(object):
             self.calculate_phasequads(phasequad.name, phasequad)
 
     def _calculate_pairs(self, rebin):
-        for run in self._data_context.current_runs:
-
-            self._update_phasequads(rebin)
-            # construct the pairs
-            for pair in self._group_pair_context.pairs:
-                if isinstance(pair, MuonPair):
-                    pair_asymmetry_workspace = self.calculate_pair(
-                        pair, run, rebin=rebin)
-                else:
-                    continue
-
-                if not pair_asymmetry_workspace:
-                    continue
-                pair.update_asymmetry_workspace(
-                     pair_asymmetry_workspace,
-                     run,
-                     rebin=rebin)
+        self._update_phasequads(rebin)
+        # construct the pairs
+        self._calculation_graph.evaluate([self._pair_node(pair, run, rebin)
+                                          for run in self._data_context.current_runs
+                                          for pair in self._group_pair_context.pairs if isinstance(pair, MuonPair)])
+
+    def _pair_node(self, pair: MuonPair, run: List[int], rebin: bool) -> CalculationNode:
+        return CalculationNode(key=("Pair", pair.name, tuple(run), rebin),
+                               parameters=(pair.forward_group, pair.backward_group, pair.alpha),
+                               parents=(("Group", pair.forward_group, tuple(run), rebin),
+                                        ("Group", pair.backward_group, tuple(run), rebin)),
+                               input_workspaces=(),
+                               calculate=functools.partial(self.calculate_pair, pair, run, rebin=rebin),
+                               update=functools.partial(self._update_asymmetry_workspace, pair, run, rebin))
+
+    @staticmethod
+    def _update_asymmetry_workspace(pair_or_diff, run, rebin, asymmetry_workspace):
+        if not asymmetry_workspace:
+            return
+        pair_or_diff.update_asymmetry_workspace(
+             asymmetry_workspace,
+             run,
+             rebin=rebin)
 
     def calculate_all_diffs(self):
         self._calculate_diffs(rebin=False)
@@ -250,21 +260,20 @@ class MuonContext(object):
             self._calculate_diffs(rebin=True)
 
     def _calculate_diffs(self, rebin):
-        for run in self._data_context.current_runs:
-            # construct the diffs
-            for diff in self._group_pair_context.diffs:
-                if isinstance(diff, MuonDiff):
-                    diff_asymmetry_workspace = self.calculate_diff(
-                        diff, run, rebin=rebin)
-                else:
-                    continue
-
-                if not diff_asymmetry_workspace:
-                    continue
-                diff.update_asymmetry_workspace(
-                     diff_asymmetry_workspace,
-                     run,
-                     rebin=rebin)
+        # construct the diffs
+        self._calculation_graph.evaluate([self._diff_node(diff, run, rebin)
+                                          for run in self._data_context.current_runs
+                                          for diff in self._group_pair_context.diffs if isinstance(diff, MuonDiff)])
+
+    def _diff_node(self, diff: MuonDiff, run: List[int], rebin: bool) -> CalculationNode:
+        kind = "Group" if diff.group_or_pair == "group" else "Pair"
+        return CalculationNode(key=("Diff", diff.name, tuple(run), rebin),
+                               parameters=(diff.positive, diff.negative, diff.group_or_pair),
+                               parents=((kind, diff.positive, tuple(run), rebin),
+                                        (kind, diff.negative, tuple(run), rebin)),
+                               input_workspaces=(),
+                               calculate=functools.partial(self.calculate_diff, diff, run, rebin=rebin),
+                               update=functools.partial(self._update_asymmetry_workspace, diff, run, rebin))
 
     def calculate_all_groups(self):
         self._calculate_groups(rebin=False)
@@ -272,19 +281,40 @@ class MuonContext(object):
             self._calculate_groups(rebin=True)
 
     def _calculate_groups(self, rebin):
-        for run in self._data_context.current_runs:
-            run_pre_processing(context=self, run=run, rebin=rebin)
-            for group in self._group_pair_context.groups:
-                group_workspace, group_asymmetry, group_asymmetry_unormalised = \
-                     self.calculate_group(group, run, rebin=rebin)
-
-                # If this run contains none of the relevant periods for the group no
-                # workspace is created.
-                if not group_workspace:
-                    continue
-
-                self.group_pair_context[group.name].update_workspaces(run, group_workspace, group_asymmetry,
-                                                                      group_asymmetry_unormalised, rebin=rebin)
+        runs = self._data_context.current_runs
+        self._calculation_graph.evaluate([self._pre_processing_node(run, rebin) for run in runs])
+        self._calculation_graph.evaluate([self._group_node(group, run, rebin)
+                                          for run in runs for group in self._group_pair_context.groups])
+
+    def _pre_processing_node(self, run: List[int], rebin: bool) -> CalculationNode:
+        parameters, input_workspaces = get_pre_processing_dependencies(self, run, rebin)
+        return CalculationNode(key=("PreProcess", tuple(run), rebin),
+                               parameters=parameters,
+                               parents=(),
+                               input_workspaces=input_workspaces,
+                               calculate=functools.partial(run_pre_processing, context=self, run=run, rebin=rebin),
+                               update=lambda pre_processed_workspace: None)
+
+    def _group_node(self, group, run: List[int], rebin: bool) -> CalculationNode:
+        return CalculationNode(key=("Group", group.name, tuple(run), rebin),
+                               parameters=(tuple(group.detectors), tuple(group.periods),
+                                           self.gui_context.get('GroupRangeMin'),
+                                           self.gui_context.get('GroupRangeMax')),
+                               parents=(("PreProcess", tuple(run), rebin),),
+                               input_workspaces=(),
+                               calculate=functools.partial(self.calculate_group, group, run, rebin=rebin),
+                               update=functools.partial(self._update_group_workspaces, group, run, rebin))
+
+    def _update_group_workspaces(self, group, run, rebin, group_workspaces):
+        group_workspace, group_asymmetry, group_asymmetry_unormalised = group_workspaces
+
+        # If this run contains none of the relevant periods for the group no
+        # workspace is created.
+        if not group_workspace:
+            return
+
+        self.group_pair_context[group.name].update_workspaces(run, group_workspace, group_asymmetry,
+                                                              group_asymmetry_unormalised, rebin=rebin)
 
     def calculate_phasequads(self, name, phasequad_obj):
         self._calculate_phasequads(name, phasequad_obj, rebin=False)
@@ -313,21 +343,37 @@ class MuonContext(object):
         return workspaces
 
     def _calculate_phasequads(self, name, phasequad_obj, rebin):
-        for run in self._data_context.current_runs:
+        runs = self._data_context.current_runs
+        for run in runs:
             if self._data_context.num_periods(run) > 1:
                 raise ValueError("Cannot support multiple periods")
 
-            ws_list = self.calculate_phasequad(phasequad_obj, run, rebin)
-            run_string = run_list_to_string(run)
-            directory = get_base_data_directory(self, run_string)
-            for ws in ws_list:
-                muon_workspace_wrapper = MuonWorkspaceWrapper(directory + ws)
-                muon_workspace_wrapper.show()
+        self._calculation_graph.evaluate([self._phasequad_node(phasequad_obj, run, rebin) for run in runs])
+
+    def _phasequad_node(self, phasequad, run: List[int], rebin: bool) -> CalculationNode:
+        # The phasequad is calculated from the raw data with the same dead time correction and rebinning as the
+        # pre-processed data, and cropped to the good data range of the first run
+        parameters, input_workspaces = get_pre_processing_dependencies(self, run, rebin)
+        runs = self._data_context.current_runs
+        crop_range = (self.first_good_data(runs[0]), self.last_good_data(runs[0])) if runs else None
+        return CalculationNode(key=("Phasequad", phasequad.name, tuple(run), rebin),
+                               parameters=(parameters, phasequad.phase_table, crop_range),
+                               parents=(),
+                               input_workspaces=input_workspaces + (phasequad.phase_table,),
+                               calculate=functools.partial(self.calculate_phasequad, phasequad, run, rebin),
+                               update=functools.partial(self._update_phasequad_workspaces, phasequad, run, rebin))
+
+    def _update_phasequad_workspaces(self, phasequad, run, rebin, ws_list):
+        run_string = run_list_to_string(run)
+        directory = get_base_data_directory(self, run_string)
+        for ws in ws_list:
+            muon_workspace_wrapper = MuonWorkspaceWrapper(directory + ws)
+            muon_workspace_wrapper.show()
 
-            phasequad_obj.update_asymmetry_workspaces(
-                ws_list,
-                run,
-                rebin=rebin)
+        phasequad.update_asymmetry_workspaces(
+            ws_list,
+            run,
+            rebin=rebin)
 
     def _run_deadtime(self, run_string, output):
         name = get_raw_data_workspace_name(self.data_context.instrument, run_string, multi_period=False,
@@ -542,6 +588,7 @@ class MuonContext(object):
         else:
             workspace_name = workspace.name()
 
+        self._calculation_graph.invalidate_workspace(workspace_name)
         self.data_context.remove_workspace_by_name(workspace_name)
         self.group_pair_context.remove_workspace_by_name(workspace_name)
         self.phase_context.remove_workspace_by_name(workspace_name)
@@ -551,6 +598,7 @@ class MuonContext(object):
         self.deleted_plots_notifier.notify_subscribers(workspace)
 
     def clear_context(self):
+        self._calculation_graph.clear()
         self.data_context.clear()
         self.group_pair_context.clear()
         self.phase_context.clear()
@@ -558,4 +606,5 @@ class MuonContext(object):
         self.update_view_from_model_notifier.notify_subscribers()
 
     def workspace_replaced(self, workspace):
+        self._calculation_graph.invalidate_workspace(workspace.name())
         self.update_plots_notifier.notify_subscribers(workspace)
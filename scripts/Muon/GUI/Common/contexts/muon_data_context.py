@@ -167,7 +167,9 @@ class MuonDataContext(object):
         if self.is_multi_period():
             workspace_list = [wrapper._workspace_name for wrapper in self._loaded_data.get_data(
                 run=run, instrument=self.instrument)['workspace']['OutputWorkspace']]
-            return GroupWorkspaces(InputWorkspaces=workspace_list, OutputWorkspace='__temp_group')
+            # Named after the run so that runs can be pre-processed at the same time
+            return GroupWorkspaces(InputWorkspaces=workspace_list,
+                                   OutputWorkspace='__temp_group_' + run_list_to_string(run))
         else:
             return self._loaded_data.get_data(run=run, instrument=self.instrument)['workspace']['OutputWorkspace'][0].workspace
 
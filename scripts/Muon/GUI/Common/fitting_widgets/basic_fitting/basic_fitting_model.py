@@ -18,8 +18,10 @@ from Muon.GUI.Common.contexts.muon_context import MuonContext
 from Muon.GUI.Common.utilities.algorithm_utils import run_Fit
 from Muon.GUI.Common.utilities.workspace_utils import StaticWorkspaceWrapper
 
+import functools
 import math
 import re
+import threading
 from typing import List, NamedTuple
 
 DEFAULT_CHI_SQUARED = 0.0
@@ -56,6 +58,8 @@ class BasicFittingModel:
         """Initializes the model with empty fit data."""
         self.context = context
         self.fitting_context = fitting_context
+        # Fits running on a worker of a parallel sequential fit defer adding their results to the ADS and context
+        self._deferred_fit_results = threading.local()
 
     @property
     def current_dataset_index(self) -> int:
@@ -557,8 +561,8 @@ class BasicFittingModel:
         output_workspace, parameter_table, function, fit_status, chi_squared, covariance_matrix = \
             self._do_single_fit_and_return_workspace_parameters_and_fit_function(parameters)
 
-        self._add_single_fit_results_to_ADS_and_context(parameters["InputWorkspace"], parameter_table, output_workspace,
-                                                        covariance_matrix)
+        self._record_fit_results(self._add_single_fit_results_to_ADS_and_context, parameters["InputWorkspace"],
+                                 parameter_table, output_workspace, covariance_matrix)
         return function, fit_status, chi_squared
 
     def _do_single_fit_and_return_workspace_parameters_and_fit_function(self, parameters: dict) -> tuple:
@@ -613,6 +617,14 @@ class BasicFittingModel:
         second_pulse_weighting = 1 / (1 + decay)
         return first_pulse_weighting, second_pulse_weighting
 
+    def _record_fit_results(self, add_fit_results, *args) -> None:
+        """Calls add_fit_results with the args provided, unless the results are being deferred by this thread."""
+        deferred_fit_results = getattr(self._deferred_fit_results, "results", None)
+        if deferred_fit_results is None:
+            add_fit_results(*args)
+        else:
+            deferred_fit_results.append(functools.partial(add_fit_results, *args))
+
     def _add_single_fit_results_to_ADS_and_context(self, input_workspace_name: str, parameters_table, output_workspace,
                                                    covariance_matrix) -> None:
         """Adds the results of a single fit to the ADS and context."""
@@ -318,9 +318,8 @@ class GeneralFittingModel(BasicFittingModel):
         output_group_workspace, parameter_table, function, fit_status, chi_squared, covariance_matrix = \
             self._do_simultaneous_fit_and_return_workspace_parameters_and_fit_function(parameters)
 
-        self._add_simultaneous_fit_results_to_ADS_and_context(parameters["InputWorkspace"], parameter_table,
-                                                              output_group_workspace, covariance_matrix,
-                                                              global_parameters)
+        self._record_fit_results(self._add_simultaneous_fit_results_to_ADS_and_context, parameters["InputWorkspace"],
+                                 parameter_table, output_group_workspace, covariance_matrix, global_parameters)
         return function, fit_status, chi_squared
 
     def _do_simultaneous_fit_and_return_workspace_parameters_and_fit_function(self, parameters: dict) -> tuple:
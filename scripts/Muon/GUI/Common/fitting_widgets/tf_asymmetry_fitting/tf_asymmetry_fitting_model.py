@@ -4,6 +4,9 @@
 #   NScD Oak Ridge National Laboratory, European Spallation Source,
 #   Institut Laue - Langevin & CSNS, Institute of High Energy Physics, CAS
 # SPDX - License - Identifier: GPL - 3.0 +
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 from mantid import AlgorithmManager, logger
 from mantid.api import IFunction
 from mantid.simpleapi import CopyLogs, ConvertFitFunctionForMuonTFAsymmetry
@@ -611,8 +614,8 @@ class TFAsymmetryFittingModel(GeneralFittingModel):
 
         dataset_name = parameters["ReNormalizedWorkspaceList"]
         CopyLogs(InputWorkspace=dataset_name, OutputWorkspace=output_workspace, StoreInADS=False)
-        self._add_single_fit_results_to_ADS_and_context(dataset_name, parameter_table, output_workspace,
-                                                        covariance_matrix)
+        self._record_fit_results(self._add_single_fit_results_to_ADS_and_context, dataset_name, parameter_table,
+                                 output_workspace, covariance_matrix)
         return function, fit_status, chi_squared
 
     def _do_tf_asymmetry_simultaneous_fit(self, parameters: dict, global_parameters: list) -> tuple:
@@ -622,8 +625,8 @@ class TFAsymmetryFittingModel(GeneralFittingModel):
 
         dataset_names = parameters["ReNormalizedWorkspaceList"]
         self._copy_logs(dataset_names, output_workspace)
-        self._add_simultaneous_fit_results_to_ADS_and_context(dataset_names, parameter_table, output_workspace,
-                                                              covariance_matrix, global_parameters)
+        self._record_fit_results(self._add_simultaneous_fit_results_to_ADS_and_context, dataset_names,
+                                 parameter_table, output_workspace, covariance_matrix, global_parameters)
         return function, fit_status, chi_squared
 
     def _run_tf_asymmetry_fit(self, parameters: dict) -> tuple:
@@ -859,12 +862,16 @@ class TFAsymmetryFittingModel(GeneralFittingModel):
         groups_and_pairs = self._get_selected_groups_and_pairs()
         return [";".join(runs)] * len(groups_and_pairs), groups_and_pairs
 
-    def perform_sequential_fit(self, workspaces: list, parameter_values: list, use_initial_values: bool = False):
+    def perform_sequential_fit(self, workspaces: list, parameter_values: list, use_initial_values: bool = False,
+                               fit_in_parallel: bool = False, row_fit_finished=None):
         """Performs a sequential fit of the workspace names provided for the current fitting mode.
 
         :param workspaces: A list of lists of workspace names e.g. [[Row 1 workspaces], [Row 2 workspaces], etc...]
         :param parameter_values: A list of lists of parameter values e.g. [[Row 1 params], [Row 2 params], etc...]
         :param use_initial_values: If false the parameters at the end of each fit are passed on to the next fit.
+        :param fit_in_parallel: If true and use_initial_values is true, the rows are fitted on a pool of threads.
+        :param row_fit_finished: An optional callable taking the row index, function, fit status and chi squared. It
+                                 is called in the order of the rows as the fit of each row finishes.
         """
         if self.fitting_context.tf_asymmetry_mode:
             fitting_func = self._get_sequential_fitting_func_for_tf_asymmetry_fitting_mode()
@@ -874,8 +881,12 @@ class TFAsymmetryFittingModel(GeneralFittingModel):
         if not self.fitting_context.simultaneous_fitting_mode:
             workspaces = self._flatten_workspace_names(workspaces)
 
-        functions, fit_statuses, chi_squared_list = self._evaluate_sequential_fit(
-            fitting_func, workspaces, parameter_values, use_initial_values)
+        if fit_in_parallel and use_initial_values:
+            functions, fit_statuses, chi_squared_list = self._evaluate_sequential_fit_in_parallel(
+                fitting_func, workspaces, parameter_values, row_fit_finished)
+        else:
+            functions, fit_statuses, chi_squared_list = self._evaluate_sequential_fit(
+                fitting_func, workspaces, parameter_values, use_initial_values, row_fit_finished)
 
         self._update_fit_functions_after_sequential_fit(workspaces, functions)
         self._update_fit_statuses_and_chi_squared_after_sequential_fit(workspaces, fit_statuses, chi_squared_list)
@@ -902,7 +913,7 @@ class TFAsymmetryFittingModel(GeneralFittingModel):
 
     @staticmethod
     def _evaluate_sequential_fit(fitting_func, workspace_names: list, parameter_values: list,
-                                 use_initial_values: bool = False):
+                                 use_initial_values: bool = False, row_fit_finished=None):
         """Evaluates a sequential fit using the provided fitting func. The workspace_names is either a 1D or 2D list."""
         functions, fit_statuses, chi_squared_list = [], [], []
 
@@ -913,6 +924,43 @@ class TFAsymmetryFittingModel(GeneralFittingModel):
             functions.append(function)
             fit_statuses.append(fit_status)
             chi_squared_list.append(chi_squared)
+            if row_fit_finished is not None:
+                row_fit_finished(row_index, function, fit_status, chi_squared)
+
+        return functions, fit_statuses, chi_squared_list
+
+    def _evaluate_sequential_fit_in_parallel(self, fitting_func, workspace_names: list, parameter_values: list,
+                                             row_fit_finished=None):
+        """Evaluates a sequential fit of independent rows using the provided fitting func on a pool of threads. The
+        results of each fit are added to the ADS and context on this thread in the order of the rows."""
+        def fit_row(row_index: int) -> tuple:
+            self._deferred_fit_results.results = []
+            try:
+                result = fitting_func(row_index, workspace_names[row_index], parameter_values[row_index], [], True)
+                return result, self._deferred_fit_results.results
+            finally:
+                self._deferred_fit_results.results = None
+
+        functions, fit_statuses, chi_squared_list = [], [], []
+        number_of_threads = max(1, min(os.cpu_count() or 1, len(workspace_names)))
+        with ThreadPoolExecutor(max_workers=number_of_threads) as executor:
+            futures = [executor.submit(fit_row, row_index) for row_index in range(len(workspace_names))]
+            try:
+                for row_index, future in enumerate(futures):
+                    (function, fit_status, chi_squared), deferred_fit_results = future.result()
+                    for add_fit_results in deferred_fit_results:
+                        add_fit_results()
+
+                    functions.append(function)
+                    fit_statuses.append(fit_status)
+                    chi_squared_list.append(chi_squared)
+                    if row_fit_finished is not None:
+                        row_fit_finished(row_index, function, fit_status, chi_squared)
+            except BaseException:
+                # Do not start the remaining fits if a fit fails or the sequential fit is interrupted
+                for future in futures:
+                    future.cancel()
+                raise
 
         return functions, fit_statuses, chi_squared_list
 
@@ -100,7 +100,8 @@ class SeqFittingTabPresenter(object):
         parameter_values = [self.view.fit_table.get_fit_parameter_values_from_row(row) for row in self.selected_rows]
 
         calculation_function = functools.partial(self.model.perform_sequential_fit, workspace_names, parameter_values,
-                                                 self.view.use_initial_values_for_fits())
+                                                 self.view.use_initial_values_for_fits(),
+                                                 self.view.fit_rows_in_parallel(), self._notify_row_fit_finished)
         self.calculation_thread = self.create_thread(calculation_function)
 
         self.calculation_thread.threadWrapperSetUp(on_thread_start_callback=self.handle_fit_started,
@@ -131,6 +132,17 @@ class SeqFittingTabPresenter(object):
 
         self.sequential_fit_finished_notifier.notify_subscribers()
 
+    def _notify_row_fit_finished(self, index, fit_function, fit_status, fit_chi_squared):
+        """Called on the fitting thread when the fit of the selected row at index has finished."""
+        parameter_values = self.model.get_all_fit_function_parameter_values_for(fit_function)
+        self.view.notify_row_fit_finished(self.selected_rows[index], parameter_values, fit_status, fit_chi_squared)
+
+    def handle_row_fit_finished(self, row, parameter_values, fit_status, fit_chi_squared):
+        self.view.fit_table.set_parameter_values_for_row(row, parameter_values)
+        self.view.fit_table.set_fit_quality(row, fit_status, fit_chi_squared)
+        # The table signals stay blocked until the sequential fit has finished
+        self.view.fit_table.block_signals(True)
+
     def handle_updated_fit_parameter_in_table(self, index):
         self._update_parameter_values_in_fitting_model_for_row(index.row())
         self.fit_parameter_changed_notifier.notify_subscribers()
@@ -4,7 +4,7 @@
 #   NScD Oak Ridge National Laboratory, European Spallation Source,
 #   Institut Laue - Langevin & CSNS, Institute of High Energy Physics, CAS
 # SPDX - License - Identifier: GPL - 3.0 +
-from qtpy import QtWidgets
+from qtpy import QtCore, QtWidgets
 from mantidqt.utils.qt import load_ui
 from Muon.GUI.Common.message_box import warning
 from Muon.GUI.Common.seq_fitting_tab_widget.SequentialTableWidget import SequentialTableWidget
@@ -16,10 +16,13 @@ default_fit_status = "No fit"
 
 
 class SeqFittingTabView(QtWidgets.QWidget, ui_seq_fitting_tab):
+    # Emitted with the row, parameter values, fit status and chi squared when the fit of a row has finished
+    rowFitFinished = QtCore.Signal(int, object, object, object)
 
     def __init__(self, parent=None):
         super(SeqFittingTabView, self).__init__(parent)
         self.setupUi(self)
+        self.initial_fit_values_radio.toggled.connect(self.parallel_fits_checkbox.setEnabled)
         self.fit_table = SequentialTableWidget(parent)
         self.tableLayout.addWidget(self.fit_table.widget)
         self.setEnabled(False)
@@ -30,6 +33,16 @@ class SeqFittingTabView(QtWidgets.QWidget, ui_seq_fitting_tab):
     def use_initial_values_for_fits(self):
         return self.initial_fit_values_radio.isChecked()
 
+    def fit_rows_in_parallel(self):
+        return self.use_initial_values_for_fits() and self.parallel_fits_checkbox.isChecked()
+
+    def notify_row_fit_finished(self, row, parameter_values, fit_status, chi_squared):
+        """Can be called from the fitting thread, the slot is called on the GUI thread."""
+        self.rowFitFinished.emit(row, parameter_values, fit_status, chi_squared)
+
+    def setup_slot_for_row_fit_finished(self, slot):
+        self.rowFitFinished.connect(slot)
+
     def setup_slot_for_fit_selected_button(self, slot):
         self.fit_selected_button.clicked.connect(slot)
 
@@ -0,0 +1,134 @@
+# Mantid Repository : https://github.com/mantidproject/mantid
+#
+# Copyright &copy; 2021 ISIS Rutherford Appleton Laboratory UKRI,
+#   NScD Oak Ridge National Laboratory, European Spallation Source,
+#   Institut Laue - Langevin & CSNS, Institute of High Energy Physics, CAS
+# SPDX - License - Identifier: GPL - 3.0 +
+from Muon.GUI.Common.ADSHandler.ADS_calls import check_if_workspace_exist
+
+from concurrent.futures import ThreadPoolExecutor
+import threading
+from typing import Any, Callable, NamedTuple
+
+
+class CalculationNode(NamedTuple):
+    """
+    A calculation of derived workspaces, such as the group workspaces of a run.
+
+    key: Identifies the calculation, e.g. ("Group", "fwd", (62260,), False).
+    parameters: Everything the calculation depends on other than its parents, compared with ==.
+    parents: The keys of the calculations whose outputs are used as inputs to this calculation.
+    input_workspaces: The names of workspaces in the ADS which are used as inputs, but are not calculated by the graph.
+    calculate: Performs the calculation and returns the names of the output workspaces (or None).
+    update: Called with the result of the calculation to store it in the context, even if it was not recalculated.
+    """
+    key: tuple
+    parameters: tuple
+    parents: tuple
+    input_workspaces: tuple
+    calculate: Callable[[], Any]
+    update: Callable[[Any], None]
+
+
+class _Evaluation(NamedTuple):
+    dependencies: tuple
+    input_workspaces: tuple
+    result: Any
+    version: int
+
+
+def _workspace_names(result) -> list:
+    """Returns the workspace names found in the result of a calculation."""
+    if isinstance(result, str):
+        return [result]
+    if isinstance(result, (list, tuple)):
+        return [name for item in result for name in _workspace_names(item)]
+    return []
+
+
+class CalculationGraph(object):
+    """
+    Records the dependencies of the calculations of derived workspaces so that only the calculations whose parameters,
+    parents or input workspaces have changed since they were last evaluated are performed again.
+    """
+
+    def __init__(self, max_workers: int = None):
+        self._max_workers = max_workers
+        self._evaluations = {}
+        self._lock = threading.Lock()
+        self._next_version = 0
+
+    def version(self, key: tuple):
+        """Returns the version of the last evaluation of a calculation, which changes each time it is performed."""
+        with self._lock:
+            evaluation = self._evaluations.get(key)
+            return evaluation.version if evaluation is not None else None
+
+    def is_up_to_date(self, node: CalculationNode) -> bool:
+        return self._up_to_date_evaluation(node, self._dependencies(node)) is not None
+
+    def evaluate(self, nodes: list) -> None:
+        """
+        Performs the calculations of the nodes which are not up to date on a pool of threads, then updates the context
+        with the result of every node in order on this thread. The nodes must not depend on each other.
+        """
+        results = [None] * len(nodes)
+        stale_indices, stale_dependencies = [], []
+        for index, node in enumerate(nodes):
+            dependencies = self._dependencies(node)
+            evaluation = self._up_to_date_evaluation(node, dependencies)
+            if evaluation is not None:
+                results[index] = evaluation.result
+            else:
+                stale_indices.append(index)
+                stale_dependencies.append(dependencies)
+
+        calculated = self._calculate([nodes[index] for index in stale_indices])
+        for index, dependencies, result in zip(stale_indices, stale_dependencies, calculated):
+            self._record(nodes[index], dependencies, result)
+            results[index] = result
+
+        for node, result in zip(nodes, results):
+            node.update(result)
+
+    def invalidate_workspace(self, workspace_name: str) -> None:
+        """Forgets the calculations which use the named workspace as an input, e.g. when it is replaced or deleted."""
+        with self._lock:
+            self._evaluations = {key: evaluation for key, evaluation in self._evaluations.items()
+                                 if workspace_name not in evaluation.input_workspaces}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._evaluations = {}
+
+    def _calculate(self, nodes: list) -> list:
+        if len(nodes) <= 1:
+            return [node.calculate() for node in nodes]
+
+        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            futures = [executor.submit(node.calculate) for node in nodes]
+            try:
+                return [future.result() for future in futures]
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+
+    def _dependencies(self, node: CalculationNode) -> tuple:
+        return node.parameters, tuple(self.version(parent) for parent in node.parents)
+
+    def _up_to_date_evaluation(self, node: CalculationNode, dependencies: tuple):
+        """Returns the last evaluation of the node if it has the same dependencies and its outputs still exist."""
+        with self._lock:
+            evaluation = self._evaluations.get(node.key)
+        if evaluation is None or evaluation.dependencies != dependencies:
+            return None
+        if not all(check_if_workspace_exist(name) for name in _workspace_names(evaluation.result)):
+            return None
+        return evaluation
+
+    def _record(self, node: CalculationNode, dependencies: tuple, result) -> None:
+        with self._lock:
+            self._evaluations[node.key] = _Evaluation(dependencies, tuple(node.input_workspaces), result,
+                                                      self._next_version)
+            self._next_version += 1
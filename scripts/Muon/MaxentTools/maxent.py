@@ -24,6 +24,10 @@ def warningMsg(values,name,mylog):
         mylog.warning(name+" has some NaNs or Infs")
 
 
+def symmetric(matrix):
+    return np.tril(matrix) + np.tril(matrix, -1).T
+
+
 def MAXENT(datum, sigma, flat, base, itermax, sumfix, SAVETIME_ngo, MAXPAGE_n, MAXPAGE_f, PULSESHAPE_convol,
            DETECT_a, DETECT_b, DETECT_e, FAC_factor, FAC_facfake, SAVETIME_i2, mylog, prog):
     npts, ngroups = datum.shape
@@ -44,8 +48,10 @@ def MAXENT(datum, sigma, flat, base, itermax, sumfix, SAVETIME_ngo, MAXPAGE_n, M
     m = 3
     if(SAVETIME_ngo > 0):
         HERITAGE_iter = 1
-    else:
+    elif(MAXPAGE_f is None):
         MAXPAGE_f = np.array(base)
+    else: # warm start from a given spectrum, e.g. that of the previous run in a series
+        MAXPAGE_f = np.array(MAXPAGE_f)
     test = 99. # temporary for 1st test
     SPACE_chisq = SPACE_chizer*2. # temporary for 1st test
     mylog.debug("entering loop with spectrum from {0} to {1}".format(np.amin(MAXPAGE_f), np.amax(MAXPAGE_f)))
@@ -92,8 +98,7 @@ def MAXENT(datum, sigma, flat, base, itermax, sumfix, SAVETIME_ngo, MAXPAGE_n, M
         if(sumfix):
             PROJECT(0, MAXPAGE_n, xi)
             PROJECT(1, MAXPAGE_n, xi)
-        eta[:,:, 0] = OPUS(xi[:, 0], SAVETIME_i2, PULSESHAPE_convol, DETECT_a, DETECT_b, DETECT_e)
-        eta[:,:, 1] = OPUS(xi[:, 1], SAVETIME_i2, PULSESHAPE_convol, DETECT_a, DETECT_b, DETECT_e)
+        eta[:,:, :2] = OPUS(xi[:, :2], SAVETIME_i2, PULSESHAPE_convol, DETECT_a, DETECT_b, DETECT_e)
         warningMsg(eta[:,:, 0],"eta[,,0]",mylog)
         warningMsg(eta[:,:, 1],"eta[,,1]",mylog)
         ox = eta[:,:, 1]/(sigma**2)
@@ -108,17 +113,10 @@ def MAXENT(datum, sigma, flat, base, itermax, sumfix, SAVETIME_ngo, MAXPAGE_n, M
         # loop DO 17, DO 18
         SPACE_s1 = np.dot(sgrad, xi)
         SPACE_c1 = np.dot(cgrad, xi)/SPACE_chisq
-        # loops DO 19,DO 20, DO 21 harder to completely remove
-        SPACE_s2 = np.zeros([3, 3])
-        SPACE_c2 = np.zeros([3, 3])
-        for L in range(m):
-            for k in range(m):
-                if(L <= k):
-                    SPACE_s2[k, L] = -np.sum(xi[:, k]*xi[:, L]/MAXPAGE_f)/SPACE_blank
-                    SPACE_c2[k, L] = np.sum(eta[:,:, k]*eta[:,:, L]/sigma**2)*2./SPACE_chisq
-                else: # make symmetric
-                    SPACE_s2[k, L] = SPACE_s2[L, k]
-                    SPACE_c2[k, L] = SPACE_c2[L, k]
+        # loops DO 19,DO 20, DO 21 as matrix products, made exactly symmetric from the lower triangle
+        SPACE_s2 = symmetric(-np.dot(xi.T, xi/MAXPAGE_f[:, np.newaxis])/SPACE_blank)
+        eta_m = eta.reshape((p, m))
+        SPACE_c2 = symmetric(np.dot(eta_m.T, eta_m/(sigma**2).reshape((p, 1)))*2./SPACE_chisq)
         s = -np.sum(MAXPAGE_f*np.log(MAXPAGE_f/(base*math.e)))/(SPACE_blank*math.e) # spotted missing minus sign!
         a = s*SPACE_blank*math.e/SPACE_xsum
         mylog.notice("{:3}    {:10.4}  {:10.4}  {:10.4}  {:10.4}  {:10.4}".format(HERITAGE_iter,
@@ -21,7 +21,7 @@ def MULTIMAX(
       POINTS_nhists, POINTS_ngroups, POINTS_npts, CHANNELS_itzero, CHANNELS_i1stgood, CHANNELS_itotal, RUNDATA_res, RUNDATA_frames,
       GROUPING_group, DATALL_rdata, FAC_factor, SENSE_taud, MAXPAGE_n, filePHASE,
       PULSES_def, PULSES_npulse, FLAGS_fitdead, FLAGS_fixphase, SAVETIME_i2,
-      OuterIter, InnerIter, mylog, prog, phaseconvWS, TZERO_fine,deadDetectors):
+      OuterIter, InnerIter, mylog, prog, phaseconvWS, TZERO_fine,deadDetectors, initialSpectrum=None):
     #
     base = np.zeros([MAXPAGE_n])
     (datum, sigma, corr, datt, MISSCHANNELS_mm, RUNDATA_fnorm, RUNDATA_hists, FAC_facfake, FAC_ratio) = INPUT(
@@ -34,7 +34,7 @@ def MULTIMAX(
     (datum, DETECT_a, DETECT_b, DETECT_d, FASE_phase) = BACK(
         RUNDATA_hists, datum, sigma, DETECT_e, filePHASE, mylog)
     SAVETIME_ngo = -1
-    MAXPAGE_f = None
+    MAXPAGE_f = initialSpectrum  # flat default spectrum if None
     for j in range(OuterIter):  # outer "alpha chop" iterations?
         SAVETIME_ngo = SAVETIME_ngo + 1
         mylog.information("CYCLE NUMBER=" + str(SAVETIME_ngo))
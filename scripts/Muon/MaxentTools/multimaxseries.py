@@ -0,0 +1,110 @@
+# Mantid Repository : https://github.com/mantidproject/mantid
+#
+# Copyright &copy; 2021 ISIS Rutherford Appleton Laboratory UKRI,
+#   NScD Oak Ridge National Laboratory, European Spallation Source,
+#   Institut Laue - Langevin & CSNS, Institute of High Energy Physics, CAS
+# SPDX - License - Identifier: GPL - 3.0 +
+"""
+Maxent analysis of a series of runs, e.g. a temperature or field scan.
+
+Each run can start from the converged spectrum of the previous run in the series instead of the flat
+default level, which usually needs fewer iterations for runs taken in small steps. The series can be
+split into contiguous chains which are analysed in a pool of worker processes, each chain being
+warm started from its own first run.
+"""
+from mantid.utils.pool import create_pool
+from Muon.MaxentTools.multimaxalpha import MULTIMAX
+
+
+class RecordingLog(object):
+    """Records the messages of a worker process so they can be written to the algorithm log afterwards"""
+
+    def __init__(self):
+        self.messages = []
+
+    def debug(self, message):
+        self.messages.append(('debug', message))
+
+    def information(self, message):
+        self.messages.append(('information', message))
+
+    def notice(self, message):
+        self.messages.append(('notice', message))
+
+    def warning(self, message):
+        self.messages.append(('warning', message))
+
+    def error(self, message):
+        self.messages.append(('error', message))
+
+
+class NullProgress(object):
+    """Progress reporter for MULTIMAX when only the progress through the series is reported"""
+
+    def report(self, *args):
+        pass
+
+
+def chains(n_runs, n_chains):
+    """Split the indices of n_runs runs into at most n_chains contiguous chains of similar lengths"""
+    n_chains = max(1, min(n_chains, n_runs))
+    length, extra = divmod(n_runs, n_chains)
+    start = 0
+    for c in range(n_chains):
+        stop = start + length + (1 if c < extra else 0)
+        yield list(range(start, stop))
+        start = stop
+
+
+def MULTIMAX_CHAIN(runs, warmStart, mylog, prog=None):
+    """
+    Run MULTIMAX on each run in turn.
+    :param runs: list with a dict of the keyword arguments of MULTIMAX which depend on the data for each run
+    :param warmStart: start each run from the spectrum of the previous one when the frequency points match
+    :param prog: reported once per run if given
+    :return: a list with the frequency spectrum of each run
+    """
+    spectra = []
+    previous = None
+    for inputs in runs:
+        initial = None
+        if warmStart and previous is not None and len(previous) == inputs['MAXPAGE_n']:
+            initial = previous
+        results = MULTIMAX(mylog=mylog, prog=NullProgress(), phaseconvWS=None, deadDetectors=[],
+                           initialSpectrum=initial, **inputs)
+        previous = results[3]
+        spectra.append(previous)
+        if prog is not None:
+            prog.report()
+    return spectra
+
+
+def _multimax_chain_in_worker(args):
+    runs, warmStart = args
+    mylog = RecordingLog()
+    return MULTIMAX_CHAIN(runs, warmStart, mylog), mylog.messages
+
+
+def MULTIMAX_SERIES(runs, warmStart, processes, mylog, prog):
+    """
+    Run MULTIMAX on a series of runs, split into contiguous chains analysed by a pool of processes.
+    :param runs: list with a dict of the keyword arguments of MULTIMAX which depend on the data for each run
+    :param warmStart: start each run in a chain from the spectrum of the previous one
+    :param processes: number of worker processes. With 1 the series is analysed in this process as one chain
+    :param prog: reported once per run
+    :return: a list with the frequency spectrum of each run, in the order of runs
+    """
+    if processes <= 1 or len(runs) <= 1:
+        return MULTIMAX_CHAIN(runs, warmStart, mylog, prog)
+
+    spectra = []
+    tasks = [([runs[i] for i in chain], warmStart) for chain in chains(len(runs), processes)]
+    with create_pool(len(tasks)) as pool:
+        # imap keeps the order of the chains, so the spectra come back in the order of runs
+        for chain_spectra, messages in pool.imap(_multimax_chain_in_worker, tasks):
+            for level, message in messages:
+                getattr(mylog, level)(message)
+            for spectrum in chain_spectra:
+                spectra.append(spectrum)
+                prog.report()
+    return spectra
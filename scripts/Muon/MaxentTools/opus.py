@@ -8,11 +8,13 @@ import numpy as np
 
 
 def OPUS(x, SAVETIME_i2, PULSESHAPE_convol, DETECT_a, DETECT_b, DETECT_e):
+    # x is one spectrum, or n x k for k spectra transformed together giving npts x ngroups x k
     npts = DETECT_e.shape[0]
     n = x.shape[0]
-    y = np.zeros([SAVETIME_i2], dtype=np.complex_)
-    y[:n] = x * PULSESHAPE_convol
-    y2 = np.fft.ifft(y) * SAVETIME_i2  # SN=+1, inverse FFT without the 1/N
-    ox = (np.outer(np.real(y2[:npts]), DETECT_a) + np.outer(
-        np.imag(y2[:npts]), DETECT_b)) * DETECT_e[:, np.newaxis]
+    extra = (1,) * (x.ndim - 1)
+    y = np.zeros((SAVETIME_i2,) + x.shape[1:], dtype=np.complex_)
+    y[:n] = x * PULSESHAPE_convol.reshape((n,) + extra)
+    y2 = np.fft.ifft(y, axis=0)[:npts] * SAVETIME_i2  # SN=+1, inverse FFT without the 1/N
+    ox = (np.real(y2)[:, np.newaxis] * DETECT_a.reshape(DETECT_a.shape + extra) + np.imag(
+        y2)[:, np.newaxis] * DETECT_b.reshape(DETECT_b.shape + extra)) * DETECT_e.reshape((npts, 1) + extra)
     return ox
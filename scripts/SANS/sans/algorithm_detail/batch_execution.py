@@ -4,6 +4,7 @@
 #   NScD Oak Ridge National Laboratory, European Spallation Source,
 #   Institut Laue - Langevin & CSNS, Institute of High Energy Physics, CAS
 # SPDX - License - Identifier: GPL - 3.0 +
+from contextlib import nullcontext
 from copy import deepcopy
 
 from mantid.api import AnalysisDataService, WorkspaceGroup
@@ -56,7 +57,8 @@ def select_reduction_alg(split_for_event_slices, use_compatibility_mode,
     return event_slice_optimisation, reduction_packages
 
 
-def single_reduction_for_batch(state, use_optimizations, output_mode, plot_results, output_graph, save_can=False):
+def single_reduction_for_batch(state, use_optimizations, output_mode, plot_results, output_graph, save_can=False,
+                               publish_lock=None):
     """
     Runs a single reduction.
 
@@ -71,6 +73,10 @@ def single_reduction_for_batch(state, use_optimizations, output_mode, plot_resul
                          with event slice compatibility
     :param output_graph: The graph object for plotting workspaces.
     :param save_can: bool. whether or not to save out can workspaces
+    :param publish_lock: an optional lock which is held while the output is plotted, grouped, saved and cleaned up.
+                         This allows several reductions to run concurrently when they do not share workspace names.
+                         With a lock the output of all the reduction packages is published together at the end,
+                         otherwise each package is plotted and grouped as soon as it is reduced.
     """
     # ------------------------------------------------------------------------------------------------------------------
     # Load the data
@@ -135,16 +141,48 @@ def single_reduction_for_batch(state, use_optimizations, output_mode, plot_resul
         reduction_package.out_scale_factor = out_scale_factor
         reduction_package.out_shift_factor = out_shift_factor
 
-        if not event_slice_optimisation and plot_results:
-            # Plot results is intended to show the result of each workspace/slice as it is reduced
-            # as we reduce in bulk, it is not possible to plot live results while in event_slice mode
-            plot_workspace(reduction_package, output_graph)
-        # -----------------------------------
-        # The workspaces are already on the ADS, but should potentially be grouped
-        # -----------------------------------
-        group_workspaces_if_required(reduction_package, output_mode, save_can,
-                                     event_slice_optimisation=event_slice_optimisation)
+        if publish_lock is None:
+            _publish_reduction_package(reduction_package, output_mode, plot_results, output_graph, save_can,
+                                       event_slice_optimisation)
+
+    with publish_lock if publish_lock is not None else nullcontext():
+        if publish_lock is not None:
+            for reduction_package in reduction_packages:
+                _publish_reduction_package(reduction_package, output_mode, plot_results, output_graph, save_can,
+                                           event_slice_optimisation)
+        _save_reduction_packages(state, reduction_packages, workspaces, monitors, use_optimizations, output_mode,
+                                 save_can, event_slice_optimisation)
+
+    out_scale_factors = []
+    out_shift_factors = []
+    for reduction_package in reduction_packages:
+        out_scale_factors.extend(reduction_package.out_scale_factor)
+        out_shift_factors.extend(reduction_package.out_shift_factor)
+
+    return out_scale_factors, out_shift_factors
+
 
+def _publish_reduction_package(reduction_package, output_mode, plot_results, output_graph, save_can,
+                               event_slice_optimisation):
+    """
+    Plots and groups the output of a reduced package. Grouping uses ADS groups which are shared between reductions.
+    """
+    if not event_slice_optimisation and plot_results:
+        # Plot results is intended to show the result of each workspace/slice as it is reduced
+        # as we reduce in bulk, it is not possible to plot live results while in event_slice mode
+        plot_workspace(reduction_package, output_graph)
+    # -----------------------------------
+    # The workspaces are already on the ADS, but should potentially be grouped
+    # -----------------------------------
+    group_workspaces_if_required(reduction_package, output_mode, save_can,
+                                 event_slice_optimisation=event_slice_optimisation)
+
+
+def _save_reduction_packages(state, reduction_packages, workspaces, monitors, use_optimizations, output_mode,
+                             save_can, event_slice_optimisation):
+    """
+    Saves the output of the reduced packages of a single reduction and cleans up afterwards.
+    """
     data = state.data
     additional_run_numbers = {"SampleTransmissionRunNumber":
                               "" if data.sample_transmission is None else str(data.sample_transmission),
@@ -178,14 +216,6 @@ def single_reduction_for_batch(state, use_optimizations, output_mode, plot_resul
     if not use_optimizations:
         delete_optimization_workspaces(reduction_packages, workspaces, monitors, save_can)
 
-    out_scale_factors = []
-    out_shift_factors = []
-    for reduction_package in reduction_packages:
-        out_scale_factors.extend(reduction_package.out_scale_factor)
-        out_shift_factors.extend(reduction_package.out_shift_factor)
-
-    return out_scale_factors, out_shift_factors
-
 
 def _get_ws_from_alg(reduction_alg, reduction_package):
     reduction_package.reduced_lab = get_workspace_from_algorithm(reduction_alg, "OutputWorkspaceLAB")
@@ -47,6 +47,9 @@ CACHING:
 Adding to the cache(ADS) is supported for the TubeCalibration file.
 Reading from the cache is supported for all files. This avoids data reloads if the correct file is already in the
 cache.
+
+If the sans.load.cache_directory property is set, the loaded and calibrated workspaces are also kept in a disk cache,
+see load_disk_cache. The disk cache is checked after the ADS and before loading the file.
 """
 from abc import (ABCMeta, abstractmethod)
 import os
@@ -62,6 +65,7 @@ from sans.common.general_functions import (create_child_algorithm)
 from sans.common.log_tagger import (set_tag, has_tag, get_tag)
 from sans.state.StateObjects.StateData import (StateData)
 from sans.algorithm_detail.calibration import apply_calibration
+from sans.algorithm_detail.load_disk_cache import load_from_disk_cache, save_to_disk_cache
 
 
 # ----------------------------------------------------------------------------------------------------------------------
@@ -674,6 +678,13 @@ def load_isis(data_type, file_information, period, use_cached, calibration_file_
         workspace, workspace_monitor = use_cached_workspaces_from_ads(file_information, is_transmission, period,
                                                                       calibration_file_name)
 
+    # Then try the disk cache, which holds workspaces loaded in earlier sessions
+    if len(workspace) == 0 or (len(workspace_monitor) == 0 and not is_transmission):
+        number_of_workspaces = len(get_expected_file_tags(file_information, is_transmission, period))
+        workspace, workspace_monitor = load_from_disk_cache(file_information, is_transmission, period,
+                                                            calibration_file_name, number_of_workspaces,
+                                                            parent_alg)
+
     # Load the workspace if required. We need to load it if there is no workspace loaded from the cache or, in the case
     # of scatter, ie. non-trans, there is no monitor workspace. There are several ways to load the data
     if len(workspace) == 0 or (len(workspace_monitor) == 0 and not is_transmission):
@@ -745,6 +756,11 @@ class SANSLoadDataISIS(SANSLoadData):
             progress.report(report_message)
             apply_calibration(calibration_file, workspaces, workspace_monitors, use_cached, publish_to_ads, parent_alg)
 
+        # Keep the loaded and calibrated data in the disk cache, if it is used
+        for key, value in list(file_infos.items()):
+            save_to_disk_cache(value, is_transmission_type(key), period_infos[key], calibration_file,
+                               workspaces[key], workspace_monitors.get(key, []), parent_alg)
+
         # Apply corrections for transmission workspaces
         transmission_correction = get_transmission_correction(data_info)
         transmission_correction.correct(workspaces, parent_alg)
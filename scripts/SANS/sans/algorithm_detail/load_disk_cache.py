@@ -0,0 +1,190 @@
+# Mantid Repository : https://github.com/mantidproject/mantid
+#
+# Copyright &copy; 2021 ISIS Rutherford Appleton Laboratory UKRI,
+#   NScD Oak Ridge National Laboratory, European Spallation Source,
+#   Institut Laue - Langevin & CSNS, Institute of High Energy Physics, CAS
+# SPDX - License - Identifier: GPL - 3.0 +
+""" Disk cache of loaded and calibrated SANS workspaces
+
+The ADS cache in load_data only helps within a session. If the sans.load.cache_directory property is set, the
+loaded workspaces are also saved to that directory after the calibration has been applied, and are read back
+instead of loading the original file again in later sessions and in command line reductions.
+
+A cache entry is identified by the full path and modification time of the data file, the selected period, if the
+data is used as transmission data, and for scatter data the path and modification time of the calibration file.
+The least recently used entries are removed once the cache is larger than sans.load.cache_max_size bytes.
+"""
+import hashlib
+import os
+
+from mantid.kernel import config, Logger
+from sans.common.constants import EMPTY_NAME
+from sans.common.file_information import find_full_file_path
+from sans.common.general_functions import create_child_algorithm
+
+CACHE_DIRECTORY_KEY = "sans.load.cache_directory"
+CACHE_MAX_SIZE_KEY = "sans.load.cache_max_size"
+DEFAULT_CACHE_MAX_SIZE = 10 * 1024 ** 3
+CACHE_FILE_EXTENSION = ".nxs"
+
+logger = Logger("SANS")
+
+
+def get_disk_cache_directory():
+    """
+    :return: the directory of the disk cache or an empty string if the disk cache is not used
+    """
+    return config[CACHE_DIRECTORY_KEY].strip()
+
+
+def get_disk_cache_max_size():
+    try:
+        return int(float(config[CACHE_MAX_SIZE_KEY]))
+    except ValueError:
+        return DEFAULT_CACHE_MAX_SIZE
+
+
+def get_disk_cache_key(file_information, is_transmission, period, calibration_file_name):
+    """
+    Creates the key of the cache entry for a data file.
+
+    :param file_information: a SANSFileInformation object.
+    :param is_transmission: if the workspaces are used as transmission or direct data.
+    :param period: the selected period.
+    :param calibration_file_name: the calibration file name. It is ignored for transmission data, which is not
+                                  calibrated.
+    :return: a hex digest identifying the cache entry
+    """
+    file_name = file_information.get_file_name()
+    key_items = [file_name, repr(os.path.getmtime(file_name)), str(period), str(is_transmission)]
+    if calibration_file_name and not is_transmission:
+        full_calibration_file_path = find_full_file_path(calibration_file_name)
+        key_items.extend([full_calibration_file_path, repr(os.path.getmtime(full_calibration_file_path))])
+    return hashlib.sha256("\n".join(key_items).encode()).hexdigest()
+
+
+def _get_cache_file_names(directory, key, number_of_workspaces, is_monitor):
+    prefix = key + ("_monitor" if is_monitor else "")
+    return [os.path.join(directory, "{0}_{1}{2}".format(prefix, index, CACHE_FILE_EXTENSION))
+            for index in range(number_of_workspaces)]
+
+
+def load_from_disk_cache(file_information, is_transmission, period, calibration_file_name, number_of_workspaces,
+                         parent_alg):
+    """
+    Loads the workspaces of a data file from the disk cache.
+
+    :param file_information: a SANSFileInformation object.
+    :param is_transmission: if the workspaces are used as transmission or direct data.
+    :param period: the selected period.
+    :param calibration_file_name: the calibration file name.
+    :param number_of_workspaces: the number of workspaces expected for the data file and period.
+    :param parent_alg: a handle to the parent algorithm.
+    :return: a list of workspaces and a list of monitor workspaces. Both are empty if the cache does not hold
+             all of them.
+    """
+    directory = get_disk_cache_directory()
+    if not directory:
+        return [], []
+
+    try:
+        key = get_disk_cache_key(file_information, is_transmission, period, calibration_file_name)
+    except OSError:
+        return [], []
+
+    file_names = _get_cache_file_names(directory, key, number_of_workspaces, is_monitor=False)
+    monitor_file_names = [] if is_transmission else \
+        _get_cache_file_names(directory, key, number_of_workspaces, is_monitor=True)
+    if not all(os.path.isfile(file_name) for file_name in file_names + monitor_file_names):
+        return [], []
+
+    try:
+        workspaces = [_load_cache_file(file_name, parent_alg) for file_name in file_names]
+        workspace_monitors = [_load_cache_file(file_name, parent_alg) for file_name in monitor_file_names]
+    except (RuntimeError, ValueError) as error:
+        logger.warning("SANSLoad: could not read {0} from the disk cache: {1}".format(
+            file_information.get_file_name(), str(error)))
+        return [], []
+
+    # mark the entry as used so that it is not the next one removed, if the cache can be written to
+    for file_name in file_names + monitor_file_names:
+        try:
+            os.utime(file_name)
+        except OSError as error:
+            logger.debug("SANSLoad: could not mark {0} as used in the disk cache: {1}".format(file_name, str(error)))
+    return workspaces, workspace_monitors
+
+
+def save_to_disk_cache(file_information, is_transmission, period, calibration_file_name, workspaces,
+                       workspace_monitors, parent_alg):
+    """
+    Saves the loaded and calibrated workspaces of a data file to the disk cache, if they are not cached already.
+
+    :param file_information: a SANSFileInformation object.
+    :param is_transmission: if the workspaces are used as transmission or direct data.
+    :param period: the selected period.
+    :param calibration_file_name: the calibration file name.
+    :param workspaces: a list of workspaces.
+    :param workspace_monitors: a list of monitor workspaces.
+    :param parent_alg: a handle to the parent algorithm.
+    """
+    directory = get_disk_cache_directory()
+    if not directory or not workspaces:
+        return
+
+    try:
+        key = get_disk_cache_key(file_information, is_transmission, period, calibration_file_name)
+        os.makedirs(directory, exist_ok=True)
+        to_save = list(zip(_get_cache_file_names(directory, key, len(workspaces), is_monitor=False), workspaces))
+        if workspace_monitors:
+            to_save += list(zip(_get_cache_file_names(directory, key, len(workspace_monitors), is_monitor=True),
+                                workspace_monitors))
+        for file_name, workspace in to_save:
+            if not os.path.isfile(file_name):
+                _save_cache_file(file_name, workspace, parent_alg)
+        limit_disk_cache_size(directory, get_disk_cache_max_size())
+    except (OSError, RuntimeError, ValueError) as error:
+        logger.warning("SANSLoad: could not write {0} to the disk cache: {1}".format(
+            file_information.get_file_name(), str(error)))
+
+
+def limit_disk_cache_size(directory, max_size):
+    """
+    Deletes the least recently used cache files until the cache is no larger than max_size bytes.
+
+    :param directory: the cache directory.
+    :param max_size: the maximum size of the cache in bytes.
+    """
+    cache_files = []
+    for entry in os.scandir(directory):
+        if entry.is_file() and entry.name.endswith(CACHE_FILE_EXTENSION):
+            stat = entry.stat()
+            cache_files.append((stat.st_mtime, stat.st_size, entry.path))
+
+    total_size = sum(size for _, size, _ in cache_files)
+    for _, size, path in sorted(cache_files):
+        if total_size <= max_size:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total_size -= size
+
+
+def _load_cache_file(file_name, parent_alg):
+    load_options = {"Filename": file_name,
+                    "OutputWorkspace": EMPTY_NAME}
+    load_alg = create_child_algorithm(parent_alg, "LoadNexusProcessed", **load_options)
+    load_alg.execute()
+    return load_alg.getProperty("OutputWorkspace").value
+
+
+def _save_cache_file(file_name, workspace, parent_alg):
+    # Write to a temporary file first, so an interrupted save never leaves a partial entry in the cache
+    temporary_file_name = "{0}.{1}.tmp{2}".format(os.path.splitext(file_name)[0], os.getpid(), CACHE_FILE_EXTENSION)
+    save_options = {"InputWorkspace": workspace,
+                    "Filename": temporary_file_name}
+    save_alg = create_child_algorithm(parent_alg, "SaveNexusProcessed", **save_options)
+    save_alg.execute()
+    os.replace(temporary_file_name, file_name)
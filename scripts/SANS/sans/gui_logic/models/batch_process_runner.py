@@ -4,16 +4,85 @@
 #   NScD Oak Ridge National Laboratory, European Spallation Source,
 #   Institut Laue - Langevin & CSNS, Institute of High Energy Physics, CAS
 # SPDX - License - Identifier: GPL - 3.0 +
+import os
+import re
 import traceback
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
 
 from qtpy.QtCore import Slot, QThreadPool, Signal, QObject
 
-from mantid.kernel import Logger
+from mantid.kernel import ConfigService, Logger
 from sans.algorithm_detail.batch_execution import load_workspaces_from_states
 from sans.common.enums import ReductionMode
 from sans.sans_batch import SANSBatchReduction
 from ui.sans_isis.worker import Worker
 
+# Number of rows of the batch table to reduce at the same time. Zero or less uses one row per core.
+MAX_CONCURRENT_ROWS_KEY = "sans.batch.max_concurrent_rows"
+
+# Files and names of a state which map to workspaces in the ADS
+STATE_DATA_FILES = ("sample_scatter", "sample_transmission", "sample_direct",
+                    "can_scatter", "can_transmission", "can_direct")
+
+
+def get_max_concurrent_rows():
+    """
+    Read the number of rows to reduce concurrently from the user properties, defaulting to one row at a time
+    """
+    try:
+        max_concurrent_rows = int(ConfigService.Instance().getString(MAX_CONCURRENT_ROWS_KEY))
+    except ValueError:
+        return 1
+    return max_concurrent_rows if max_concurrent_rows > 0 else os.cpu_count()
+
+
+def chain_states_sharing_workspaces(index_state_pairs):
+    """
+    Split (index, state) pairs into chains which can be reduced independently of each other. Two states go into the same
+    chain if the workspaces they load or output could have the same names in the ADS.
+    :param index_state_pairs: a list of (row index, state) pairs
+    :return: a list of chains, each a list of (row index, state) pairs in their original order
+    """
+    chains = []
+    for position, (_, state) in enumerate(index_state_pairs):
+        names = _get_workspace_names_of_state(state.all_states)
+        linked_chains = [chain for chain in chains if chain["names"] & names]
+        chains = [chain for chain in chains if not chain["names"] & names]
+        # Merge every chain this state links to, keeping the rows in their original order
+        merged_chain = {"names": names.union(*[chain["names"] for chain in linked_chains]),
+                        "positions": sorted([chain_position for chain in linked_chains
+                                             for chain_position in chain["positions"]] + [position])}
+        chains.append(merged_chain)
+    chains.sort(key=lambda chain: chain["positions"][0])
+    return [[index_state_pairs[position] for position in chain["positions"]] for chain in chains]
+
+
+def _get_workspace_names_of_state(state):
+    """
+    Get keys for the names of the workspaces a state puts in the ADS. Loaded workspaces are named after the run number
+    of their file, e.g. 22024_sans_nxs, and the output and transmission workspaces after the user specified output name
+    or else the run number of the sample scatter file, e.g. 22024_rear_1D_2.0_14.0.
+    """
+    names = set()
+    for data_file in STATE_DATA_FILES:
+        file_name = getattr(state.data, data_file)
+        if file_name:
+            names.add(("run", _get_run_number_of_file(file_name)))
+    output_name = state.save.user_specified_output_name
+    names.add(("output", output_name if output_name else str(state.data.sample_scatter_run_number)))
+    return names
+
+
+def _get_run_number_of_file(file_name):
+    """
+    Get the run number in the name of a file, e.g. 22024 for SANS2D00022024.nxs or SANS2D00022024-add.nxs. Different
+    files with the same run number are loaded into the same workspaces. A name without a run number is returned as is.
+    """
+    base_name = os.path.splitext(os.path.basename(file_name))[0]
+    run_number = re.search(r"(\d+)(-add)?$", base_name, re.IGNORECASE)
+    return int(run_number.group(1)) if run_number else base_name
+
 
 class BatchProcessRunner(QObject):
     row_processed_signal = Signal(int, list, list)
@@ -39,11 +108,21 @@ class BatchProcessRunner(QObject):
         self._worker = None
 
     def process_states(self, row_index_pair, get_states_func, use_optimizations, output_mode, plot_results, output_graph,
-                       save_can=False):
-        self._worker = Worker(self._process_states_on_thread,
-                              row_index_pair=row_index_pair, get_states_func=get_states_func, use_optimizations=use_optimizations,
-                              output_mode=output_mode, plot_results=plot_results,
-                              output_graph=output_graph, save_can=save_can)
+                       save_can=False, max_concurrent_rows=None):
+        if max_concurrent_rows is None:
+            max_concurrent_rows = get_max_concurrent_rows()
+
+        if max_concurrent_rows > 1:
+            self._worker = Worker(self._process_states_concurrently_on_thread,
+                                  row_index_pair=row_index_pair, get_states_func=get_states_func,
+                                  use_optimizations=use_optimizations, output_mode=output_mode,
+                                  plot_results=plot_results, output_graph=output_graph, save_can=save_can,
+                                  max_concurrent_rows=max_concurrent_rows)
+        else:
+            self._worker = Worker(self._process_states_on_thread,
+                                  row_index_pair=row_index_pair, get_states_func=get_states_func,
+                                  use_optimizations=use_optimizations, output_mode=output_mode,
+                                  plot_results=plot_results, output_graph=output_graph, save_can=save_can)
         self._worker.signals.finished.connect(self.on_finished)
         self._worker.signals.error.connect(self.on_error)
 
@@ -75,20 +154,60 @@ class BatchProcessRunner(QObject):
                 self.row_failed_signal.emit(index, error)
 
             for state in states.values():
-                try:
-                    out_scale_factors, out_shift_factors = \
-                        self.batch_processor([state.all_states], use_optimizations, output_mode, plot_results, output_graph, save_can)
-                except Exception as e:
-                    self._handle_err(index, e)
-                    continue
+                self._reduce_state(index, state, use_optimizations, output_mode, plot_results, output_graph, save_can)
+
+    def _process_states_concurrently_on_thread(self, row_index_pair, get_states_func, use_optimizations,
+                                               output_mode, plot_results, output_graph, save_can=False,
+                                               max_concurrent_rows=2):
+        """
+        Reduces up to max_concurrent_rows rows at the same time. Rows whose workspaces could have the same names
+        are reduced one after another, so concurrent reductions never use the same workspaces. Plotting, grouping
+        and saving the output of a row is done for one row at a time.
+        """
+        index_state_pairs = []
+        for row, index in row_index_pair:
+            try:
+                states, errors = get_states_func(row_entries=[row])
+            except Exception as e:
+                self._handle_err(index, e)
+                continue
 
-                if state.all_states.reduction.reduction_mode == ReductionMode.MERGED:
-                    out_shift_factors = out_shift_factors[0]
-                    out_scale_factors = out_scale_factors[0]
-                else:
-                    out_shift_factors = []
-                    out_scale_factors = []
-                self.row_processed_signal.emit(index, out_shift_factors, out_scale_factors)
+            for error in errors.values():
+                self.row_failed_signal.emit(index, error)
+
+            for state in states.values():
+                index_state_pairs.append((index, state))
+
+        publish_lock = Lock()
+
+        def reduce_chain(chain):
+            for index, state in chain:
+                self._reduce_state(index, state, use_optimizations, output_mode, plot_results, output_graph,
+                                   save_can, publish_lock=publish_lock)
+
+        with ThreadPoolExecutor(max_workers=max_concurrent_rows) as executor:
+            futures = [executor.submit(reduce_chain, chain)
+                       for chain in chain_states_sharing_workspaces(index_state_pairs)]
+        for future in futures:
+            future.result()
+
+    def _reduce_state(self, index, state, use_optimizations, output_mode, plot_results, output_graph, save_can,
+                      publish_lock=None):
+        try:
+            out_scale_factors, out_shift_factors = \
+                self.batch_processor([state.all_states], use_optimizations, output_mode, plot_results, output_graph,
+                                     save_can, publish_lock=publish_lock)
+        except Exception as e:
+            self._handle_err(index, e)
+            return
+
+        if state.all_states.reduction.reduction_mode == ReductionMode.MERGED:
+            out_shift_factors = out_shift_factors[0]
+            out_scale_factors = out_scale_factors[0]
+        else:
+            out_shift_factors = []
+            out_scale_factors = []
+        self.row_processed_signal.emit(index, out_shift_factors, out_scale_factors)
 
     def _load_workspaces_on_thread(self, row_index_pair, get_states_func):
         for row, index in row_index_pair:
@@ -17,7 +17,7 @@ class SANSBatchReduction(object):
         super(SANSBatchReduction, self).__init__()
 
     def __call__(self, states, use_optimizations=True, output_mode=OutputMode.PUBLISH_TO_ADS, plot_results = False,
-                 output_graph='', save_can=False):
+                 output_graph='', save_can=False, publish_lock=None):
         """
         This is the start of any reduction.
 
@@ -27,20 +27,24 @@ class SANSBatchReduction(object):
                             1. PublishToADS
                             2. SaveToFile
                             3. Both
+        :param publish_lock: an optional lock held while the reduced data is grouped and saved, for running
+                             several batch reductions concurrently.
         """
         self.validate_inputs(states, use_optimizations, output_mode, plot_results, output_graph)
 
-        return self._execute(states, use_optimizations, output_mode, plot_results, output_graph, save_can=save_can)
+        return self._execute(states, use_optimizations, output_mode, plot_results, output_graph, save_can=save_can,
+                             publish_lock=publish_lock)
 
     @staticmethod
-    def _execute(states, use_optimizations, output_mode, plot_results, output_graph, save_can=False):
+    def _execute(states, use_optimizations, output_mode, plot_results, output_graph, save_can=False,
+                 publish_lock=None):
         # Iterate over each state, load the data and perform the reduction
         out_scale_factors_list = []
         out_shift_factors_list = []
         for state in states:
             out_scale_factors, out_shift_factors = \
                 single_reduction_for_batch(state, use_optimizations, output_mode, plot_results, output_graph,
-                                           save_can=save_can)
+                                           save_can=save_can, publish_lock=publish_lock)
             out_shift_factors_list.append(out_shift_factors)
             out_scale_factors_list.append(out_scale_factors)
         return out_scale_factors_list, out_shift_factors_list
@@ -8,6 +8,7 @@ import numpy as np
 import matplotlib.pyplot as plt
 import ICCFitTools as ICCFT
 from mantid.simpleapi import *
+from mantid.utils.pool import create_pool
 from scipy.interpolate import interp1d
 from scipy.ndimage.filters import convolve
 from matplotlib.mlab import bivariate_normal
@@ -174,6 +175,88 @@ def get3DPeak(peak, peakNumber, peaks_ws, box, padeCoefficients, qMask, nTheta=1
     return Y2, goodIDX, pp_lambda, retParams
 
 
+def integratePeak(peak, peakNumber, peaks_ws, box, padeCoefficients, qMask, fracStop=0.05, neigh_length_m=3, **kwargs):
+    """
+    integratePeak fits the 3D profile of a peak with get3DPeak and integrates the model.
+    Input:
+        peak, peakNumber, peaks_ws, box, padeCoefficients, qMask: as for get3DPeak
+        fracStop: fraction of the maximum of the model above which voxels are included in the peak
+        neigh_length_m: side length of the kernel used to find voxels with background counts
+        kwargs: passed to get3DPeak
+    Output:
+        params: the fit parameters returned by get3DPeak
+        intensity, sigma: the integrated intensity and its uncertainty
+    """
+    Y3D, goodIDX, pp_lambda, params = get3DPeak(peak, peakNumber, peaks_ws, box, padeCoefficients, qMask, **kwargs)
+    # First we get the peak intensity
+    peakIDX = Y3D/Y3D.max() > fracStop
+    intensity = np.sum(Y3D[peakIDX])
+
+    # Now the number of background counts under the peak assuming a constant bg across the box
+    n_events = box.getNumEventsArray()
+    convBox = 1.0*np.ones([neigh_length_m, neigh_length_m,neigh_length_m]) / neigh_length_m**3
+    conv_n_events = convolve(n_events,convBox)
+    bgIDX = np.logical_and.reduce(np.array([~goodIDX, qMask, conv_n_events>0]))
+    bgEvents = np.mean(n_events[bgIDX])*np.sum(peakIDX)
+
+    # Now we consider the variation of the fit.  These are done as three independent fits.  So we need to consider
+    # the variance within our fit sig^2 = sum(N*(yFit-yData)) / sum(N) and scale by the number of parameters that go into
+    # the fit.  In total: 10 (removing scale variables)
+    w_events = n_events.copy()
+    w_events[w_events==0] = 1
+    varFit = np.average((n_events[peakIDX]-Y3D[peakIDX])*(n_events[peakIDX]-Y3D[peakIDX]), weights=(w_events[peakIDX]))
+
+    sigma = np.sqrt(intensity + bgEvents + varFit)
+    return params, intensity, sigma
+
+
+# State of the processes of integratePeaksInPool, set once by _initializeIntegrationWorker
+_workerPeaks = None
+_workerStrongPeakParams = None
+_workerSettings = None
+
+
+def _initializeIntegrationWorker(peaksFile, strongPeakParams, settings):
+    global _workerPeaks, _workerStrongPeakParams, _workerSettings
+    _workerPeaks = LoadNexusProcessed(Filename=peaksFile, OutputWorkspace='__integrationPeaks')
+    _workerStrongPeakParams = strongPeakParams
+    _workerSettings = settings
+    np.warnings.filterwarnings('ignore') # There can be a lot of warnings for bad solutions that get rejected.
+
+
+def _integratePeakInWorker(task):
+    peakNumber, boxFile, forceProfile = task
+    try:
+        box = LoadMD(Filename=boxFile, OutputWorkspace='MDbox', LoadHistory=False)
+        strongPeakParams = _workerStrongPeakParams if forceProfile else None
+        params, intensity, sigma = integratePeak(_workerPeaks.getPeak(peakNumber), peakNumber, _workerPeaks, box,
+                                                 strongPeakParams=strongPeakParams, **_workerSettings)
+        return peakNumber, params, intensity, sigma, None
+    except Exception as err:
+        # the exception may not be picklable, so only its description is sent back
+        return peakNumber, None, 0.0, 1.0, '{}: {}'.format(type(err).__name__, err)
+
+
+def integratePeaksInPool(peaksFile, tasks, strongPeakParams, settings, processes):
+    """
+    integratePeaksInPool runs integratePeak for a list of peaks in a pool of processes.
+    Input:
+        peaksFile: a processed NeXus file of the PeaksWorkspace, loaded once by each process
+        tasks: a list of (peakNumber, boxFile, forceProfile), where boxFile is the MDHistoWorkspace of the
+               peak saved by SaveMD and forceProfile is whether the profile is forced from strongPeakParams
+        strongPeakParams: the strong peaks library, sent to each process once
+        settings: the keyword arguments of integratePeak common to all peaks
+        processes: the number of processes
+    Output:
+        yields (peakNumber, params, intensity, sigma, error) in the order of tasks.  If the fit failed params is None
+        and error describes the exception, otherwise error is None.
+    """
+    with create_pool(processes, initializer=_initializeIntegrationWorker,
+                     initargs=(peaksFile, strongPeakParams, settings)) as pool:
+        for result in pool.imap(_integratePeakInWorker, tasks):
+            yield result
+
+
 def coshPeakWidthModel(x,A,x0,b,BG):
     """
     coshPeakWidthModel: returns A*cosh((x-x0)/b) + BG
@@ -768,6 +768,7 @@ class AbinsAlgorithm:
         cls._check_threshold(message)
         cls._check_chunk_size(message)
         cls._check_threads(message)
+        cls._check_cache(message)
 
     def _check_general_resolution(self, message_end=None):
         """
@@ -858,6 +859,20 @@ class AbinsAlgorithm:
         if not (isinstance(optimal_size, int) and optimal_size > 0):
             raise RuntimeError("Invalid value of optimal_size" + message_end)
 
+    @staticmethod
+    def _check_cache(message_end=None):
+        """
+        Checks the location and size of the cache directory
+        :param message_end: closing part of the error message.
+        """
+        cache_directory = abins.parameters.performance.get('cache_directory', '')
+        if not isinstance(cache_directory, str):
+            raise RuntimeError("Invalid value of cache_directory" + message_end)
+
+        cache_max_size = abins.parameters.performance.get('cache_max_size', 0)
+        if not (isinstance(cache_max_size, int) and cache_max_size >= 0):
+            raise RuntimeError("Invalid value of cache_max_size" + message_end)
+
     @staticmethod
     def _check_threads(message_end=None):
         """
@@ -213,8 +213,9 @@ class Tester(object):
 
         data = cls._get_reader_data(ab_initio_reader)
 
-        # Discard advanced_parameters cache as this is not relevant to loader tests
+        # Discard advanced_parameters and cache_key as these are not relevant to loader tests
         del data["attributes"]["advanced_parameters"]
+        del data["attributes"]["cache_key"]
 
         displacements = data["datasets"]["k_points_data"].pop("atomic_displacements")
         for i, eigenvector in displacements.items():
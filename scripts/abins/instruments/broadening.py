@@ -4,6 +4,8 @@
 #   NScD Oak Ridge National Laboratory, European Spallation Source,
 #   Institut Laue - Langevin & CSNS, Institute of High Energy Physics, CAS
 # SPDX - License - Identifier: GPL - 3.0 +
+from functools import lru_cache
+
 import numpy as np
 from scipy.special import erf
 from scipy.signal import convolve
@@ -148,6 +150,67 @@ def broaden_spectrum(frequencies, bins, s_dft, sigma, scheme='gaussian_truncated
                          'abins.parameters.sampling["broadening_scheme"]'.format(scheme))
 
 
+def broaden_spectra(bins, s_dft, sigma, scheme='interpolate'):
+    """Broaden a stack of binned spectra which share the same bins and broadening widths
+
+    This is equivalent to calling broaden_spectrum() for each row of *s_dft* with *frequencies* set to None, but the
+    broadening kernels are only constructed once and applied to all rows together.
+
+    :param bins: Evenly-spaced frequency bin values for the input and output spectra.
+    :type bins: 1D array-like
+    :param s_dft: binned scattering values; each row is one spectrum corresponding to the mid-point frequencies of *bins*
+    :type s_dft: 2D array-like
+    :param sigma: width of broadening function; a scalar or a series of values corresponding to the mid-bin frequencies
+    :type sigma: float or 1D array-like
+    :param scheme: Name of broadening method used; see broaden_spectrum() for options.
+    :type scheme: str
+
+    :returns: (freq_points, broadened_spectra)
+
+    The *freq_points* are the mid-bin frequency values; *broadened_spectra* has the same shape as *s_dft*.
+    """
+    if (bins is None) or (s_dft is None) or (sigma is None):
+        raise ValueError("Frequency bins, S data and broadening width must be provided.")
+
+    bins = np.asarray(bins)
+    freq_points = (bins[1:] + bins[:-1]) / 2
+
+    s_dft = np.atleast_2d(s_dft)
+    if s_dft.shape[-1] != freq_points.size:
+        raise ValueError("Each spectrum in s_dft must correspond to the mid-point frequencies of the bins")
+    sigma = np.asarray(sigma, dtype=float) * np.ones_like(freq_points)
+
+    if scheme == 'none':
+        return freq_points, s_dft.copy()
+
+    elif scheme == 'gaussian':
+        kernels = mesh_gaussian(sigma=sigma[:, np.newaxis],
+                                points=freq_points,
+                                center=freq_points[:, np.newaxis])
+        return freq_points, np.dot(s_dft, kernels)
+
+    elif scheme == 'normal':
+        kernels = normal(sigma=sigma[:, np.newaxis],
+                         bins=bins,
+                         center=freq_points[:, np.newaxis])
+        return freq_points, np.dot(s_dft, kernels)
+
+    elif scheme in ('interpolate', 'interpolate_coarse'):
+        return interpolated_broadening(sigma=sigma, points=freq_points, bins=bins,
+                                       center=freq_points, weights=s_dft, is_hist=True,
+                                       limit=3, function='gaussian',
+                                       spacing=('sqrt2' if scheme == 'interpolate' else '2'))
+
+    elif scheme in ('gaussian_truncated', 'normal_truncated'):
+        # The truncated kernels are placed per peak, so these schemes are applied spectrum by spectrum
+        return freq_points, np.array([broaden_spectrum(freq_points, bins, spectrum, sigma, scheme=scheme)[1]
+                                      for spectrum in s_dft])
+
+    else:
+        raise ValueError('Broadening scheme "{}" not supported for this instrument, please correct '
+                         'abins.parameters.sampling["broadening_scheme"]'.format(scheme))
+
+
 def mesh_gaussian(sigma=None, points=None, center=0):
     """Evaluate a Gaussian function over a regular (given) mesh
 
@@ -506,6 +569,8 @@ def interpolated_broadening(sigma=None, points=None, bins=None,
     :param is_hist:
         If "weights" is already a histogram corresponding to evenly-spaced
         frequencies, set this to True to avoid a redundant binning operation.
+        In this case "weights" may also be a 2-D array with one histogram per
+        row; all rows are broadened with the same kernels.
     :type is_hist: bool
     :param function: broadening function; currently only 'gaussian' is accepted
     :type function: str
@@ -518,7 +583,7 @@ def interpolated_broadening(sigma=None, points=None, bins=None,
     :type spacing: str
 
     :returns: (points, spectrum)
-    :returntype: (1D array, 1D array)
+    :returntype: (1D array, 1D or 2D array)
 
     """
 
@@ -526,41 +591,26 @@ def interpolated_broadening(sigma=None, points=None, bins=None,
                                         'upper': [0.2638, -1.968, 5.057, -3.353]},
                                   'sqrt2': {'lower': [-0.6079, 4.101, -9.632, 7.139],
                                             'upper': [0.7533, -4.882, 10.87, -6.746]}}}
-    log_bases = {'2': 2, 'sqrt2': np.sqrt(2)}
-    log_base = log_bases[spacing]
-
-    # Sample on appropriate log scale: log_b(x) = log(x) / lob(b)
-    n_kernels = int(np.ceil(np.log(max(sigma) / min(sigma)) / np.log(log_base)))
-
-    if n_kernels == 1:
-        sigma_samples = np.array([min(sigma)])
-    else:
-        sigma_samples = log_base**np.arange(n_kernels + 1) * min(sigma)
-
     bin_width = bins[1] - bins[0]
 
     # Get set of convolved spectra for interpolation
     if is_hist:
-        hist = weights
+        hist = np.asarray(weights)
     else:
         hist, _ = np.histogram(center, bins=bins, weights=weights, density=False)
-    freq_range = 3 * max(sigma)
-    kernel_npts_oneside = np.ceil(freq_range / bin_width)
 
-    if function == 'gaussian':
-        kernels = mesh_gaussian(sigma=sigma_samples[:, np.newaxis],
-                                points=np.arange(-kernel_npts_oneside, kernel_npts_oneside + 1, 1) * bin_width,
-                                center=0)
-    else:
-        raise ValueError('"{}" kernel not supported for "interpolate" broadening method.'.format(function))
+    sigma_samples, kernels = _interpolation_kernels(min_sigma=min(sigma), max_sigma=max(sigma),
+                                                    bin_width=bin_width, function=function, spacing=spacing)
 
-    spectra = np.array([convolve(hist, kernel, mode='same') for kernel in kernels])
+    # A 2-D histogram is convolved row by row with a single-row kernel
+    spectra = np.array([convolve(hist, kernel.reshape((1,) * (hist.ndim - 1) + kernel.shape), mode='same')
+                        for kernel in kernels])
 
     # Interpolate with parametrised relationship
     sigma_locations = np.searchsorted(sigma_samples, sigma) # locations in sampled values of points from sigma
-    spectrum = np.zeros_like(points)
+    spectrum = np.zeros(hist.shape[:-1] + points.shape)
     # Samples with sigma == min(sigma) are a special case: copy directly from spectrum
-    spectrum[sigma_locations==0] = spectra[0, sigma_locations==0]
+    spectrum[..., sigma_locations==0] = spectra[0][..., sigma_locations==0]
 
     for i in range(1, len(sigma_samples)):
         masked_block = (sigma_locations == i)
@@ -568,7 +618,54 @@ def interpolated_broadening(sigma=None, points=None, bins=None,
         lower_mix = np.polyval(mix_functions[function][spacing]['lower'], sigma_factors)
         upper_mix = np.polyval(mix_functions[function][spacing]['upper'], sigma_factors)
 
-        spectrum[masked_block] = (lower_mix * spectra[i-1, masked_block]
-                                  + upper_mix * spectra[i, masked_block])
+        spectrum[..., masked_block] = (lower_mix * spectra[i-1][..., masked_block]
+                                       + upper_mix * spectra[i][..., masked_block])
 
     return points, spectrum
+
+
+@lru_cache(maxsize=16)
+def _interpolation_kernels(min_sigma, max_sigma, bin_width, function='gaussian', spacing='sqrt2'):
+    """Get the log-spaced set of fixed-width kernels used by interpolated_broadening
+
+    The kernels only depend on the range of sigma and the bin width, which are usually the same for every spectrum
+    broadened in a calculation, so they are cached between calls. The returned arrays are read-only.
+
+    :param min_sigma: smallest width of broadening functions
+    :type min_sigma: float
+    :param max_sigma: largest width of broadening functions
+    :type max_sigma: float
+    :param bin_width: spacing of the evenly-spaced bins
+    :type bin_width: float
+    :param function: broadening function; currently only 'gaussian' is accepted
+    :type function: str
+    :param spacing: Spacing factor between kernel widths on log scale: '2' or 'sqrt2'
+    :type spacing: str
+
+    :returns: (sigma_samples, kernels)
+    :returntype: (1D array, 2D array)
+    """
+    log_bases = {'2': 2, 'sqrt2': np.sqrt(2)}
+    log_base = log_bases[spacing]
+
+    # Sample on appropriate log scale: log_b(x) = log(x) / lob(b)
+    n_kernels = int(np.ceil(np.log(max_sigma / min_sigma) / np.log(log_base)))
+
+    if n_kernels == 1:
+        sigma_samples = np.array([min_sigma])
+    else:
+        sigma_samples = log_base**np.arange(n_kernels + 1) * min_sigma
+
+    freq_range = 3 * max_sigma
+    kernel_npts_oneside = np.ceil(freq_range / bin_width)
+
+    if function == 'gaussian':
+        kernels = mesh_gaussian(sigma=sigma_samples[:, np.newaxis],
+                                points=np.arange(-kernel_npts_oneside, kernel_npts_oneside + 1, 1) * bin_width,
+                                center=0)
+    else:
+        raise ValueError('"{}" kernel not supported for "interpolate" broadening method.'.format(function))
+
+    sigma_samples.flags.writeable = False
+    kernels.flags.writeable = False
+    return sigma_samples, kernels
@@ -9,7 +9,7 @@ import numpy as np
 import abins
 from abins.constants import WAVENUMBER_TO_INVERSE_A
 from .instrument import Instrument
-from .broadening import broaden_spectrum, prebin_required_schemes
+from .broadening import broaden_spectra, broaden_spectrum, prebin_required_schemes
 
 
 class IndirectInstrument(Instrument, abins.FrequencyPowderGenerator):
@@ -60,32 +60,19 @@ class IndirectInstrument(Instrument, abins.FrequencyPowderGenerator):
     def get_sigma(cls, frequencies):
         raise NotImplementedError()
 
-    def convolve_with_resolution_function(self, frequencies=None, bins=None, s_dft=None, scheme='auto', prebin='auto'):
+    def get_broadening_settings(self, frequencies=None, bins=None, scheme='auto', prebin='auto'):
         """
-        Convolves discrete DFT spectrum with the  resolution function for the TOSCA instrument (and TOSCA-like).
-        :param frequencies:   DFT frequencies for which resolution function should be calculated (frequencies in cm^-1)
+        Resolves the broadening scheme and prebinning used by convolve_with_resolution_function().
+
+        :param frequencies: DFT frequencies of the peaks which will be broadened (frequencies in cm^-1)
         :param bins: Evenly-spaced frequency bin values for the output spectrum.
-        :type bins: 1D array-like
-        :param s_dft:  discrete S calculated directly from DFT
-        :param scheme: Broadening scheme. This is passed to ``Instruments.Broadening.broaden_spectrum()`` unless set to
-            'auto'. If set to 'auto', the scheme will be based on the number of frequency values: 'gaussian_windowed' is
-            used for small numbers of peaks, while richer spectra will use the fast approximate 'interpolate' scheme.
-            To avoid any approximation or truncation, the 'gaussian' and 'normal' schemes are the most accurate, but
-            will run considerably more slowly.
-        :param prebin:
-            Bin the data before convolution. This greatly reduces the workload for large sets of frequencies, but loses
-            a little precision. If set to 'auto', a choice is made based on the relative numbers of frequencies and
-            sampling bins. For 'legacy' broadening this step is desregarded and implemented elsewhere.
-        :type prebin: str or bool
+        :param scheme: Broadening scheme, or 'auto' to choose one from the number of peaks
+        :param prebin: True, False or 'auto'
 
-        :returns: (points_freq, broadened_spectrum)
+        :returns: (scheme, prebin) with 'auto' replaced by the selected values
         """
-
         if scheme == 'auto':
-            if frequencies.size > 50:
-                selected_scheme = 'interpolate'
-            else:
-                selected_scheme = 'gaussian_truncated'
+            selected_scheme = self._get_auto_scheme(frequencies.size)
         else:
             selected_scheme = scheme
 
@@ -97,17 +84,77 @@ class IndirectInstrument(Instrument, abins.FrequencyPowderGenerator):
             else:
                 prebin = False
 
-        if prebin is True:
-            s_dft, _ = np.histogram(frequencies, bins=bins, weights=s_dft, density=False)
-            frequencies = (bins[1:] + bins[:-1]) / 2
-        elif prebin is False:
+        if prebin is False:
             if selected_scheme in prebin_required_schemes:
                 raise ValueError('"prebin" should not be set to False when using "{}" broadening scheme'.format(scheme))
-        else:
+        elif prebin is not True:
             raise ValueError('"prebin" option must be True, False or "auto"')
 
+        return selected_scheme, prebin
+
+    @staticmethod
+    def _get_auto_scheme(number_of_peaks):
+        return 'interpolate' if number_of_peaks > 50 else 'gaussian_truncated'
+
+    def convolve_with_resolution_function(self, frequencies=None, bins=None, s_dft=None, scheme='auto', prebin='auto'):
+        """
+        Convolves discrete DFT spectrum with the  resolution function for the TOSCA instrument (and TOSCA-like).
+        :param frequencies:   DFT frequencies for which resolution function should be calculated (frequencies in cm^-1)
+        :param bins: Evenly-spaced frequency bin values for the output spectrum.
+        :type bins: 1D array-like
+        :param s_dft:  discrete S calculated directly from DFT
+        :param scheme: Broadening scheme. This is passed to ``Instruments.Broadening.broaden_spectrum()`` unless set to
+            'auto'. If set to 'auto', the scheme will be based on the number of peaks (the size of *frequencies*):
+            'gaussian_truncated' is used for up to 50 peaks, while richer spectra will use the fast approximate
+            'interpolate' scheme. To avoid any approximation or truncation, the 'gaussian' and 'normal' schemes are the
+            most accurate, but will run considerably more slowly.
+        :param prebin:
+            Bin the data before convolution. This greatly reduces the workload for large sets of frequencies, but loses
+            a little precision. If set to 'auto', a choice is made based on the relative numbers of frequencies and
+            sampling bins. For 'legacy' broadening this step is desregarded and implemented elsewhere.
+        :type prebin: str or bool
+
+        :returns: (points_freq, broadened_spectrum)
+        """
+        selected_scheme, prebin = self.get_broadening_settings(frequencies=frequencies, bins=bins,
+                                                               scheme=scheme, prebin=prebin)
+
+        if prebin:
+            s_dft, _ = np.histogram(frequencies, bins=bins, weights=s_dft, density=False)
+            frequencies = (bins[1:] + bins[:-1]) / 2
+
         sigma = self.get_sigma(frequencies)
 
         points_freq, broadened_spectrum = broaden_spectrum(frequencies, bins, s_dft,
                                                            sigma, scheme=selected_scheme)
         return points_freq, broadened_spectrum
+
+    def convolve_spectra_with_resolution_function(self, bins=None, s_dft=None, scheme='auto'):
+        """
+        Convolves a stack of binned spectra with the resolution function of the instrument.
+
+        All spectra share the same bins and hence the same resolution widths, so the broadening kernels are only
+        constructed once. This gives the same result as calling convolve_with_resolution_function() for each
+        spectrum with prebinned data.
+
+        :param bins: Evenly-spaced frequency bin values for the input and output spectra.
+        :type bins: 1D array-like
+        :param s_dft: binned S; each row is one spectrum (e.g. one atom) over the mid-point frequencies of *bins*
+        :type s_dft: 2D array-like
+        :param scheme: Broadening scheme. This is passed to ``Instruments.Broadening.broaden_spectra()`` unless set to
+            'auto'. The peaks have already been binned, so 'auto' counts the occupied bins of the fullest spectrum as
+            its number of peaks and then chooses as convolve_with_resolution_function() does. This can differ from the
+            choice for the unbinned peaks, so callers which know the number of peaks should pass the scheme.
+
+        :returns: (points_freq, broadened_spectra)
+        """
+        frequencies = (bins[1:] + bins[:-1]) / 2
+
+        if scheme == 'auto':
+            selected_scheme = self._get_auto_scheme(np.count_nonzero(s_dft, axis=-1).max(initial=0))
+        else:
+            selected_scheme = scheme
+
+        sigma = self.get_sigma(frequencies)
+
+        return broaden_spectra(bins, s_dft, sigma, scheme=selected_scheme)
@@ -55,8 +55,15 @@ class IO(object):
         else:
             core_name = filename  # e.g. OUTCAR -> OUTCAR (core_name) -> OUTCAR.hdf5
 
-        save_dir_path = ConfigService.getString("defaultsave.directory")
-        self._hdf_filename = os.path.join(save_dir_path, core_name + ".hdf5")  # name of hdf file
+        cache_directory = abins.parameters.performance.get('cache_directory', '')
+        if cache_directory:
+            # each group is stored in its own file, named by the hash of everything the data depends on
+            self._cache_directory = cache_directory
+            self._hdf_filename = os.path.join(cache_directory, self._get_cache_key() + ".hdf5")
+        else:
+            self._cache_directory = None
+            save_dir_path = ConfigService.getString("defaultsave.directory")
+            self._hdf_filename = os.path.join(save_dir_path, core_name + ".hdf5")  # name of hdf file
 
         self._attributes = {}  # attributes for group
 
@@ -83,47 +90,86 @@ class IO(object):
         saved_setting = self.load(list_of_attributes=["setting"])
         return self._setting == saved_setting["attributes"]["setting"]
 
-    def _valid_advanced_parameters(self):
+    def _get_cache_parameters(self):
         """
-        Check if advanced parameters haven't changed.
-
-        Compare JSON dict stored as data attribute with data in AbinsParams.
-        :returns: True if they are the same, otherwise False
+        Get the advanced parameters on which the data in this group depends. Ab initio and powder data
+        do not depend on any of them; S depends on the sampling parameters and on the parameters of its
+        instrument. Other groups depend on all non-performance parameters.
 
+        :returns: dict of parameters
         """
-        from abins.parameters import non_performance_parameters as current_advanced_parameters
+        group_path = self._group_name.split('/')
+        hdf_groups = abins.parameters.hdf_groups
 
-        previous_advanced_parameters = self.load(list_of_attributes=["advanced_parameters"])
-        previous_advanced_parameters = json.loads(
-            previous_advanced_parameters["attributes"]["advanced_parameters"])
+        if group_path[0] in (hdf_groups['ab_initio_data'], hdf_groups['powder_data']):
+            return {}
+        elif group_path[0] == hdf_groups['s_data'] and len(group_path) > 1:
+            return {'fwhm': abins.parameters.instruments['fwhm'],
+                    'instrument': abins.parameters.instruments.get(group_path[1]),
+                    'sampling': abins.parameters.sampling}
+        else:
+            return abins.parameters.non_performance_parameters
 
-        diff = {key: (value, previous_advanced_parameters.get(key, None))
-                for key, value in current_advanced_parameters.items()
-                if previous_advanced_parameters.get(key, None) != value}
-        diff.update({key: (None, value)
-                     for key, value in previous_advanced_parameters.items()
-                     if key not in current_advanced_parameters})
+    def _get_cache_key(self):
+        """
+        Calculate the key identifying the data of this group: a hash of the input file, the group name,
+        the instrument setting and the advanced parameters on which the data depends.
 
-        if diff:
-            sections = ('instruments', 'sampling', 'hdf_groups')
+        :returns: string with hexadecimal digits
+        """
+        content = json.dumps({'input_hash': self._hash_input_filename,
+                              'group': self._group_name,
+                              'setting': self._setting,
+                              'parameters': self._get_cache_parameters()}, sort_keys=True)
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
 
-            for section in sections:
-                if section in diff:
-                    logger.information(f"Differences in Abins {section} parameters:")
-                    new_group, old_group = diff[section]
-                    for key in new_group:
-                        if key not in old_group:
-                            old_group[key] = '<key not present>'
+    def _valid_cache_key(self):
+        """
+        Checks if the data of this group was calculated with the same inputs.
+        :returns: True if consistent, otherwise False.
+        """
+        saved_key = self.load(list_of_attributes=["cache_key"])
+        return self._get_cache_key() == saved_key["attributes"]["cache_key"]
 
-                        if new_group[key] != old_group[key]:
-                            logger.information(key)
-                            logger.information("New values:")
-                            logger.information(str(new_group[key]))
-                            logger.information("Previous values:")
-                            logger.information(str(old_group[key]))
-            return False
-        else:
-            return True
+    def _touch_cache_file(self):
+        """
+        Mark a file in the cache directory as recently used. This is skipped if the file cannot be changed,
+        e.g. in a read-only cache directory.
+        """
+        if self._cache_directory is not None and os.path.isfile(self._hdf_filename):
+            try:
+                os.utime(self._hdf_filename)
+            except OSError as err:
+                logger.debug("Unable to mark {} as used in the Abins cache: {}".format(self._hdf_filename, str(err)))
+
+    def _limit_cache_size(self):
+        """
+        Remove the least recently used files from the cache directory until its size is within
+        abins.parameters.performance['cache_max_size']. The current file is always kept.
+        """
+        max_size = abins.parameters.performance.get('cache_max_size', 0)
+        if self._cache_directory is None or max_size <= 0:
+            return
+
+        cache_files = []
+        for filename in os.listdir(self._cache_directory):
+            path = os.path.join(self._cache_directory, filename)
+            if filename.endswith(".hdf5") and os.path.isfile(path):
+                file_stat = os.stat(path)
+                cache_files.append((file_stat.st_mtime, file_stat.st_size, path))
+
+        total_size = sum(size for _, size, _ in cache_files)
+        for _, size, path in sorted(cache_files):
+            if total_size <= max_size:
+                break
+            if os.path.samefile(path, self._hdf_filename):
+                continue
+            try:
+                os.remove(path)
+                total_size -= size
+                logger.information("Removed {} from the Abins cache.".format(path))
+            except OSError as err:
+                logger.warning("Unable to remove {} from the Abins cache: {}".format(path, str(err)))
 
     def get_previous_ab_initio_program(self):
         """
@@ -139,12 +185,11 @@ class IO(object):
         if not self._valid_hash():
             raise ValueError("Different ab initio file  was used in the previous calculations.")
 
-        if not self._valid_advanced_parameters():
+        if not self._valid_cache_key():
+            if not self._valid_setting():
+                raise ValueError("Different instrument setting was used in the previous calculations")
             raise ValueError("Different advanced parameters were used in the previous calculations.")
 
-        if not self._valid_setting():
-            raise ValueError("Different instrument setting was used in the previous calculations")
-
     def erase_hdf_file(self):
         """
         Erases content of hdf file.
@@ -170,6 +215,7 @@ class IO(object):
         self.add_attribute("filename", self._input_filename)
         self.add_attribute("advanced_parameters",
                            json.dumps(abins.parameters.non_performance_parameters))
+        self.add_attribute("cache_key", self._get_cache_key())
 
     def add_data(self, name=None, value=None):
         """
@@ -253,6 +299,9 @@ class IO(object):
         Saves datasets and attributes to an hdf file.
         """
 
+        if self._cache_directory is not None:
+            os.makedirs(self._cache_directory, exist_ok=True)
+
         with h5py.File(self._hdf_filename, 'a') as hdf_file:
             if self._group_name not in hdf_file:
                 hdf_file.create_group(self._group_name)
@@ -279,6 +328,8 @@ class IO(object):
         except RuntimeError:
             pass
 
+        self._limit_cache_size()
+
     @staticmethod
     def _list_of_str(list_str=None):
         """
@@ -437,6 +488,8 @@ class IO(object):
                                                           list_of_datasets=list_of_datasets,
                                                           group=group)
 
+        # the least recently used files are removed first, so reading counts as a use
+        self._touch_cache_file()
         return results
 
     @staticmethod
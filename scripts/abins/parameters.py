@@ -75,7 +75,10 @@ sampling = {
 # Parameters related to performance optimisation that do NOT impact calculation results
 performance = {
     'optimal_size': 5000000,  # this is used to create optimal size of chunk energies for which S is calculated
-    'threads': 4  # number of threads used in parallel calculations
+    'threads': 4,  # number of threads used in parallel calculations
+    'process_pool': False,  # calculate S for the atoms in a pool of 'threads' worker processes
+    'cache_directory': '',  # if set, cache intermediate data here, one file per group, instead of the save directory
+    'cache_max_size': 2 * 1024 ** 3  # maximum size of cache_directory in bytes; least recently used files are removed
     }
 
 all_parameters = {'instruments': instruments,
@@ -5,8 +5,9 @@
 #   Institut Laue - Langevin & CSNS, Institute of High Energy Physics, CAS
 # SPDX - License - Identifier: GPL - 3.0 +
 import gc
+from multiprocessing.shared_memory import SharedMemory
 import numpy as np
-from typing import List, Optional, Tuple, Union
+from typing import Dict, List, Optional, Tuple, Union
 
 import abins
 from abins.constants import (ANGLE_MESSAGE_INDENTATION,
@@ -19,6 +20,7 @@ from abins.constants import (ANGLE_MESSAGE_INDENTATION,
 from abins.instruments import Instrument
 from abins.sdata import SData, SDataByAngle
 from mantid.api import Progress
+from mantid.utils.pool import create_pool
 
 
 # noinspection PyMethodMayBeStatic
@@ -103,6 +105,9 @@ class SPowderSemiEmpiricalCalculator:
         self._b_traces = None
         self._fundamentals_freq = None
 
+        # binned spectra waiting to be broadened, by (angle index, atom key, order key, broadening scheme)
+        self._binned_spectra = {}
+
     def _calculate_s(self):
 
         # calculate powder data
@@ -161,10 +166,12 @@ class SPowderSemiEmpiricalCalculator:
 
         return freq, coeff
 
-    def _get_empty_data(self):
+    def _get_empty_data(self, atom_keys: Optional[List[str]] = None):
+        if atom_keys is None:
+            atom_keys = list(self._abins_data.get_atoms_data().extract().keys())
         return SDataByAngle.get_empty(angles=self._instrument.get_angles(),
                                       frequencies=self._frequencies,
-                                      atom_keys=list(self._abins_data.get_atoms_data().extract().keys()),
+                                      atom_keys=atom_keys,
                                       order_keys=[f'order_{n}' for n in range(1, self._quantum_order_num + 1)],
                                       temperature=self._temperature, sample_form=self._sample_form)
 
@@ -178,11 +185,73 @@ class SPowderSemiEmpiricalCalculator:
         """
         angle_resolved_data = existing_data if existing_data else self._get_empty_data()
 
+        if abins.parameters.performance.get('process_pool', False) and self._num_atoms > 1:
+            return self._calculate_s_powder_over_atoms_in_pool(existing_data=angle_resolved_data)
+
         for q_index in range(self._num_k):
             _ = self._calculate_s_powder_over_atoms(q_indx=q_index,
                                                     existing_data=angle_resolved_data)
+        self._broaden_binned_spectra(existing_data=angle_resolved_data)
         return angle_resolved_data
 
+    def _calculate_s_powder_over_atoms_in_pool(self, *, existing_data: SDataByAngle) -> SDataByAngle:
+        """
+        Evaluates S for all atoms and q-points, distributing the atoms over a pool of worker processes.
+
+        The tensors and frequencies for every q-point are placed in a shared memory block which the
+        workers read without copying. Each worker sums over q-points for one atom in the same order
+        as the serial calculation, so the results are identical.
+
+        :param existing_data: Results will be summed to this existing object
+
+        :returns: SDataByAngle
+        """
+        powder_data, weights = self._load_powder_data()
+        arrays = {}
+        for k_point in range(self._num_k):
+            arrays[f'a_tensors_{k_point}'] = powder_data.get_a_tensors()[k_point]
+            arrays[f'b_tensors_{k_point}'] = powder_data.get_b_tensors()[k_point]
+            arrays[f'frequencies_{k_point}'] = powder_data.get_frequencies()[k_point]
+        del powder_data
+
+        shared_memory, layout = _to_shared_memory(arrays)
+        del arrays
+        gc.collect()
+
+        # Workers may not share this interpreter's module state, so pass on any user changes to the parameters
+        parameters = {'instruments': abins.parameters.instruments,
+                      'sampling': abins.parameters.sampling,
+                      'performance': abins.parameters.performance}
+        processes = max(1, min(abins.parameters.performance['threads'], self._num_atoms))
+        try:
+            with create_pool(processes, initializer=_init_pool_worker,
+                             initargs=(self, shared_memory.name, layout, weights, parameters)) as pool:
+                for atom_index, data_by_angle in pool.imap(_calculate_s_powder_one_atom_in_worker,
+                                                           range(self._num_atoms)):
+                    for angle_index, angle_data in enumerate(data_by_angle):
+                        existing_data.set_angle_data_from_dict(angle_index=angle_index, data=angle_data,
+                                                               add_to_existing=True)
+                    for q_index in range(self._num_k):
+                        self._report_progress(msg=f"S for atom {atom_index} has been calculated at qpt {q_index}.",
+                                              reporter=self.progress_reporter)
+        finally:
+            shared_memory.close()
+            shared_memory.unlink()
+
+        return existing_data
+
+    def __getstate__(self):
+        """
+        Drop the members which are not needed (or cannot be pickled) when the calculator is sent to a
+        pool worker.
+        """
+        state = self.__dict__.copy()
+        for key in ('_abins_data', '_clerk', '_progress_reporter',
+                    '_a_tensors', '_b_tensors', '_a_traces', '_b_traces', '_fundamentals_freq'):
+            state[key] = None
+        state['_binned_spectra'] = {}
+        return state
+
     def _calculate_s_powder_over_atoms(self, *, q_indx: int,
                                        existing_data: Optional[SDataByAngle] = None
                                        ) -> SDataByAngle:
@@ -210,27 +279,49 @@ class SPowderSemiEmpiricalCalculator:
         Sets all necessary fields for 1D calculations. Sorts atom indices to improve parallelism.
         :returns: number of atoms, sorted atom indices
         """
-        # load powder data for one k
+        powder_data, weights = self._load_powder_data()
+        self._set_k_point_data(a_tensors=powder_data.get_a_tensors()[k_point],
+                               b_tensors=powder_data.get_b_tensors()[k_point],
+                               frequencies=powder_data.get_frequencies()[k_point],
+                               weight=weights[k_point])
+
+        # free memory
+        gc.collect()
+
+    def _load_powder_data(self):
+        """
+        Loads the powder tensors and the k-point weights from the HDF file.
+        :returns: PowderData for all k-points, numpy array with k-point weights
+        """
         clerk = abins.IO(input_filename=self._input_filename,
                          group_name=abins.parameters.hdf_groups['powder_data'])
         powder_data = abins.PowderData.from_extracted(clerk.load(list_of_datasets=["powder_data"]
                                                                  )["datasets"]["powder_data"])
-        self._a_tensors = powder_data.get_a_tensors()[k_point]
-        self._b_tensors = powder_data.get_b_tensors()[k_point]
-
-        self._a_traces = np.trace(a=self._a_tensors, axis1=1, axis2=2)
-        self._b_traces = np.trace(a=self._b_tensors, axis1=2, axis2=3)
-
-        self._fundamentals_freq = powder_data.get_frequencies()[k_point]
 
         # load dft data to get k-point weighting
         clerk = abins.IO(input_filename=self._input_filename,
                          group_name=abins.parameters.hdf_groups['ab_initio_data'])
         dft_data = clerk.load(list_of_datasets=["frequencies", "weights"])
-        self._weight = dft_data["datasets"]["weights"][k_point]
 
-        # free memory
-        gc.collect()
+        return powder_data, dft_data["datasets"]["weights"]
+
+    def _set_k_point_data(self, *, a_tensors: np.ndarray, b_tensors: np.ndarray,
+                          frequencies: np.ndarray, weight: float) -> None:
+        """
+        Sets the tensors, frequencies and weight of the k-point for which S is calculated.
+        :param a_tensors: total MSD tensors for all atoms
+        :param b_tensors: frequency dependent MSD tensors for all atoms
+        :param frequencies: fundamental frequencies
+        :param weight: weight of the k-point
+        """
+        self._a_tensors = a_tensors
+        self._b_tensors = b_tensors
+
+        self._a_traces = np.trace(a=self._a_tensors, axis1=1, axis2=2)
+        self._b_traces = np.trace(a=self._b_tensors, axis1=2, axis2=3)
+
+        self._fundamentals_freq = frequencies
+        self._weight = weight
 
     @property
     def progress_reporter(self) -> Union[None, Progress]:
@@ -381,45 +472,38 @@ class SPowderSemiEmpiricalCalculator:
                                                (angles[0], atom))
             q2 = self._instrument.calculate_q_powder(input_data=local_freq, angle=angles[0])
 
-            opt_local_freq, opt_local_coeff, rebinned_broad_spectrum = self._helper_atom_angle(
-                atom=atom, local_freq=local_freq, local_coeff=local_coeff, angle=angles[0], order=order, q2=q2)
-
-            existing_data.set_angle_data_from_dict(
-                angle_index=0,
-                data={f'atom_{atom}': {'s': {f'order_{order}': rebinned_broad_spectrum * self._weight}}},
-                add_to_existing=True)
+            opt_local_freq, opt_local_coeff = self._helper_atom_angle(
+                atom=atom, local_freq=local_freq, local_coeff=local_coeff, angle_index=0, order=order, q2=q2,
+                existing_data=existing_data)
 
             for angle_index, angle in list(enumerate(angles))[1:]:
                 self._report_progress(msg=indent + "Calculation for the detector at angle %s (atom=%s)" %
                                                    (angle, atom))
                 q2 = self._instrument.calculate_q_powder(input_data=local_freq, angle=angle)
-                existing_data.set_angle_data_from_dict(
-                    angle_index=angle_index,
-                    data={f'atom_{atom}': {'s': {f'order_{order}': self._helper_atom_angle(
-                        atom=atom, local_freq=local_freq, local_coeff=local_coeff,
-                        angle=angle, order=order, return_freq=False, q2=q2
-                        ) * self._weight}}},
-                    add_to_existing=True)
+                self._helper_atom_angle(atom=atom, local_freq=local_freq, local_coeff=local_coeff,
+                                        angle_index=angle_index, order=order, return_freq=False, q2=q2,
+                                        existing_data=existing_data)
 
             local_coeff = opt_local_coeff
             local_freq = opt_local_freq
 
         return local_freq, local_coeff
 
-    def _helper_atom_angle(self, atom=None, local_freq=None, local_coeff=None, angle=None, order=None, return_freq=True, q2=None):
+    def _helper_atom_angle(self, atom=None, local_freq=None, local_coeff=None, angle_index=None, order=None,
+                           return_freq=True, q2=None, existing_data=None):
         """
-        Helper function. It calculates S for one atom, q-index, order and angle (detector).
+        Helper function. It calculates S for one atom, q-index, order and angle (detector) and adds the broadened
+        spectrum to existing_data.
         In case 2D instrument rebinning over q is performed.
         :param q2: squared momentum transfer
         :param atom: number of atom
         :param local_freq: frequency from the previous transition
         :param local_coeff: coefficients from the previous transition
-        :param angle: scattering angle
+        :param angle_index: index of the scattering angle
         :param order: order of quantum event
-        :param return_freq: if true frequencies and corresponding coefficients are returned together with rebinned
-                            spectrum; otherwise only rebinned spectrum is returned
-        :return: (optionally) frequencies and corresponding coefficients are returned together
-                 (always) with rebinned spectrum
+        :param return_freq: if true frequencies and corresponding coefficients are returned
+        :param existing_data: object to which the spectrum will be added
+        :return: (optionally) frequencies and corresponding coefficients
         """
         # calculate discrete S for the given quantum order event
         value_dft = self._calculate_order[order](q2=q2,
@@ -431,19 +515,60 @@ class SPowderSemiEmpiricalCalculator:
                                                  b_trace=self._b_traces[atom])
 
         # convolve with instrumental resolution
-        broadening_scheme = abins.parameters.sampling['broadening_scheme']
-        _, rebinned_broad_spectrum = self._instrument.convolve_with_resolution_function(frequencies=local_freq,
-                                                                                        bins=self._bins,
-                                                                                        s_dft=value_dft,
-                                                                                        scheme=broadening_scheme)
-
-        # calculate transition energies for construction of higher order quantum event
-        local_freq, local_coeff = self._calculate_s_over_threshold(s=value_dft, freq=local_freq, coeff=local_coeff)
+        self._add_broadened_spectrum(atom=atom, angle_index=angle_index, order=order, frequencies=local_freq,
+                                     s_dft=value_dft, existing_data=existing_data)
 
         if return_freq:
-            return local_freq, local_coeff, rebinned_broad_spectrum
+            # calculate transition energies for construction of higher order quantum event
+            return self._calculate_s_over_threshold(s=value_dft, freq=local_freq, coeff=local_coeff)
+
+    def _add_broadened_spectrum(self, *, atom: int, angle_index: int, order: int,
+                                frequencies: np.ndarray, s_dft: np.ndarray, existing_data: SDataByAngle) -> None:
+        """
+        Adds a spectrum, convolved with the instrumental resolution and weighted for the k-point, to existing_data.
+
+        The convolution is linear, so spectra which are binned before they are broadened are summed in
+        self._binned_spectra and broadened together by _broaden_binned_spectra(). Other spectra are broadened here.
+
+        :param atom: number of atom
+        :param angle_index: index of the scattering angle
+        :param order: order of quantum event
+        :param frequencies: frequencies of the peaks
+        :param s_dft: discrete S of the peaks
+        :param existing_data: object to which the spectrum will be added
+        """
+        scheme, prebin = self._instrument.get_broadening_settings(
+            frequencies=frequencies, bins=self._bins, scheme=abins.parameters.sampling['broadening_scheme'])
+
+        if prebin:
+            binned_spectrum, _ = np.histogram(frequencies, bins=self._bins, weights=s_dft, density=False)
+            key = (angle_index, f'atom_{atom}', f'order_{order}', scheme)
+            self._binned_spectra[key] = self._binned_spectra.get(key, 0.) + binned_spectrum * self._weight
         else:
-            return rebinned_broad_spectrum
+            _, broadened_spectrum = self._instrument.convolve_with_resolution_function(
+                frequencies=frequencies, bins=self._bins, s_dft=s_dft, scheme=scheme, prebin=False)
+            existing_data.set_angle_data_from_dict(
+                angle_index=angle_index,
+                data={f'atom_{atom}': {'s': {f'order_{order}': broadened_spectrum * self._weight}}},
+                add_to_existing=True)
+
+    def _broaden_binned_spectra(self, *, existing_data: SDataByAngle) -> None:
+        """
+        Broadens the spectra summed by _add_broadened_spectrum(), one batch for each broadening scheme, and adds
+        them to existing_data.
+
+        :param existing_data: object to which the spectra will be added
+        """
+        for scheme in sorted({key[-1] for key in self._binned_spectra}):
+            keys = [key for key in self._binned_spectra if key[-1] == scheme]
+            _, broadened_spectra = self._instrument.convolve_spectra_with_resolution_function(
+                bins=self._bins, s_dft=np.stack([self._binned_spectra[key] for key in keys]), scheme=scheme)
+
+            for (angle_index, atom_key, order_key, _), broadened_spectrum in zip(keys, broadened_spectra):
+                existing_data.set_angle_data_from_dict(angle_index=angle_index,
+                                                       data={atom_key: {'s': {order_key: broadened_spectrum}}},
+                                                       add_to_existing=True)
+        self._binned_spectra = {}
 
     # noinspection PyUnusedLocal
     def _calculate_order_one(self, q2=None, frequencies=None, indices=None, a_tensor=None, a_trace=None,
@@ -649,3 +774,85 @@ class SPowderSemiEmpiricalCalculator:
 
         data.check_thresholds()
         return data
+
+
+def _to_shared_memory(arrays: Dict[str, np.ndarray]) -> Tuple[SharedMemory, Dict[str, Tuple[int, tuple, str]]]:
+    """
+    Copies arrays into one new shared memory block.
+
+    :param arrays: arrays to be shared, by name
+    :returns: shared memory block, layout of the arrays in the block as {name: (offset, shape, dtype)}
+    """
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        layout[name] = (offset, array.shape, array.dtype.str)
+        # keep every array aligned to 8 bytes
+        offset += -(-array.nbytes // 8) * 8
+
+    shared_memory = SharedMemory(create=True, size=max(offset, 1))
+    for name, array in arrays.items():
+        _from_shared_memory(shared_memory, layout[name])[...] = array
+
+    return shared_memory, layout
+
+
+def _from_shared_memory(shared_memory: SharedMemory, layout: Tuple[int, tuple, str]) -> np.ndarray:
+    """
+    :param shared_memory: block created by _to_shared_memory
+    :param layout: (offset, shape, dtype) of the array in the block
+    :returns: numpy array using the shared memory as its buffer
+    """
+    offset, shape, dtype = layout
+    return np.ndarray(shape, dtype=dtype, buffer=shared_memory.buf, offset=offset)
+
+
+# State of a pool worker process, set by _init_pool_worker
+_pool_worker_state = {}
+
+
+def _init_pool_worker(calculator: SPowderSemiEmpiricalCalculator, shared_memory_name: str,
+                      layout: Dict[str, Tuple[int, tuple, str]], weights: np.ndarray,
+                      parameters: Dict[str, dict]) -> None:
+    """
+    Initialises a process of the pool used by SPowderSemiEmpiricalCalculator.
+
+    :param calculator: calculator which evaluates S for one atom
+    :param shared_memory_name: name of the block holding the tensors and frequencies
+    :param layout: layout of the arrays in the shared memory block
+    :param weights: weights of the k-points
+    :param parameters: abins.parameters sections used by the calculation
+    """
+    for section, values in parameters.items():
+        setattr(abins.parameters, section, values)
+
+    # The block is owned, and unlinked, by the parent process. The pool processes share its resource tracker,
+    # so attaching to the block here does not track it a second time.
+    shared_memory = SharedMemory(name=shared_memory_name)
+    _pool_worker_state.update(calculator=calculator, shared_memory=shared_memory, weights=weights,
+                              arrays={name: _from_shared_memory(shared_memory, array_layout)
+                                      for name, array_layout in layout.items()})
+
+
+def _calculate_s_powder_one_atom_in_worker(atom: int) -> Tuple[int, List[Dict[str, dict]]]:
+    """
+    Calculates S for one atom summed over all k-points in a pool worker process.
+
+    :param atom: number of atom
+    :returns: number of atom, S data for the atom at each angle
+    """
+    calculator = _pool_worker_state['calculator']
+    arrays = _pool_worker_state['arrays']
+    weights = _pool_worker_state['weights']
+
+    atom_key = f'atom_{atom}'
+    data = calculator._get_empty_data(atom_keys=[atom_key])
+    for q_index in range(calculator._num_k):
+        calculator._set_k_point_data(a_tensors=arrays[f'a_tensors_{q_index}'],
+                                     b_tensors=arrays[f'b_tensors_{q_index}'],
+                                     frequencies=arrays[f'frequencies_{q_index}'],
+                                     weight=weights[q_index])
+        calculator._calculate_s_powder_one_atom(atom=atom, q_index=q_index, existing_data=data)
+    calculator._broaden_binned_spectra(existing_data=data)
+
+    return atom, [{atom_key: data[angle_index].extract()[atom_key]} for angle_index in range(len(data))]
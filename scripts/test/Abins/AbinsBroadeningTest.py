@@ -165,6 +165,31 @@ class BroadeningTest(unittest.TestCase):
         self.assertLess(abs(sum(interp_spectrum) - pre_broadening_total) / pre_broadening_total,
                         0.05)
 
+    def test_broaden_spectra_matches_broaden_spectrum(self):
+        """Check batched broadening gives the same values as broadening each spectrum separately"""
+        np.random.seed(0)
+
+        bins = np.linspace(0, 1000, 1001)
+        freq_points = (bins[1:] + bins[:-1]) / 2
+        sigma = 2 + freq_points * 1e-2
+        s_dft = np.zeros((4, freq_points.size))
+        for spectrum in s_dft:
+            spectrum[np.random.randint(0, freq_points.size, 20)] = np.random.random(20)
+
+        for scheme in ('none', 'gaussian', 'normal', 'gaussian_truncated', 'normal_truncated',
+                       'interpolate', 'interpolate_coarse'):
+            points, batch = broadening.broaden_spectra(bins, s_dft, sigma, scheme=scheme)
+            self.assertEqual(batch.shape, s_dft.shape)
+            assert_array_almost_equal(points, freq_points)
+            for spectrum, batch_spectrum in zip(s_dft, batch):
+                _, single_spectrum = broadening.broaden_spectrum(freq_points, bins, spectrum, sigma, scheme=scheme)
+                assert_array_almost_equal(batch_spectrum, single_spectrum)
+
+    def test_broaden_spectra_wrong_size(self):
+        bins = np.linspace(0, 100, 101)
+        with self.assertRaises(ValueError):
+            broadening.broaden_spectra(bins, np.ones((2, 101)), 1.)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -27,11 +27,15 @@ class SCalculatorFactoryPowderTest(unittest.TestCase):
 
     def setUp(self):
         self.default_threads = abins.parameters.performance['threads']
+        self.default_process_pool = abins.parameters.performance['process_pool']
+        self.default_broadening_scheme = abins.parameters.sampling['broadening_scheme']
         abins.parameters.performance['threads'] = 1
 
     def tearDown(self):
         abins.test_helpers.remove_output_files(list_of_names=["CalculateSPowder"])
         abins.parameters.performance['threads'] = self.default_threads
+        abins.parameters.performance['process_pool'] = self.default_process_pool
+        abins.parameters.sampling['broadening_scheme'] = self.default_broadening_scheme
 
     #     test input
     def test_wrong_input(self):
@@ -75,6 +79,37 @@ class SCalculatorFactoryPowderTest(unittest.TestCase):
     def test_good_case(self):
         self._good_case(name=self._si2)
 
+    def test_good_case_process_pool(self):
+        abins.parameters.performance['process_pool'] = True
+        abins.parameters.performance['threads'] = 2
+        self._good_case(name=self._si2)
+
+    def test_binned_spectra_broadened_together_match_broadening_each_spectrum(self):
+        from abins.spowdersemiempiricalcalculator import SPowderSemiEmpiricalCalculator
+
+        class SpectrumBySpectrumCalculator(SPowderSemiEmpiricalCalculator):
+            def _add_broadened_spectrum(self, *, atom, angle_index, order, frequencies, s_dft, existing_data):
+                _, spectrum = self._instrument.convolve_with_resolution_function(
+                    frequencies=frequencies, bins=self._bins, s_dft=s_dft,
+                    scheme=abins.parameters.sampling['broadening_scheme'])
+                existing_data.set_angle_data_from_dict(
+                    angle_index=angle_index,
+                    data={f'atom_{atom}': {'s': {f'order_{order}': spectrum * self._weight}}},
+                    add_to_existing=True)
+
+        abins.parameters.sampling['broadening_scheme'] = 'interpolate'
+        good_data = self._get_good_data(filename=self._si2)
+        batched, spectrum_by_spectrum = [
+            calculator(filename=abins.test_helpers.find_file(filename=self._si2 + ".phonon"),
+                       temperature=self._temperature, abins_data=good_data["DFT"], instrument=self._instrument,
+                       quantum_order_num=self._order_event)._calculate_s().extract()
+            for calculator in (SPowderSemiEmpiricalCalculator, SpectrumBySpectrumCalculator)]
+
+        for el in range(len(good_data["S"]) - 1):
+            spectrum = spectrum_by_spectrum["atom_%s" % el]["s"]["order_%s" % FUNDAMENTALS]
+            self.assertTrue(np.any(spectrum))
+            self.assertTrue(np.allclose(batched["atom_%s" % el]["s"]["order_%s" % FUNDAMENTALS], spectrum))
+
     # helper functions
     def _good_case(self, name=None):
         # calculation of powder data
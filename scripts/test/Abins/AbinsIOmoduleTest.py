@@ -4,9 +4,12 @@
 #   NScD Oak Ridge National Laboratory, European Spallation Source,
 #   Institut Laue - Langevin & CSNS, Institute of High Energy Physics, CAS
 # SPDX - License - Identifier: GPL - 3.0 +
+import os
+import tempfile
 import unittest
 
 import numpy as np
+import abins.parameters
 from abins import IO, test_helpers
 
 
@@ -117,5 +120,69 @@ class IOTest(unittest.TestCase):
         self._loading_structured_datasets()
 
 
+class IOCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self._input_filename = os.path.join(self._tmp_dir.name, "Cars.phonon")
+        with open(self._input_filename, 'w') as input_file:
+            input_file.write("Volksvagen")
+        self._cache_directory = os.path.join(self._tmp_dir.name, "cache")
+
+        self._default_performance = abins.parameters.performance.copy()
+        self._default_sampling = abins.parameters.sampling.copy()
+        abins.parameters.performance['cache_directory'] = self._cache_directory
+
+    def tearDown(self):
+        abins.parameters.performance.clear()
+        abins.parameters.performance.update(self._default_performance)
+        abins.parameters.sampling.clear()
+        abins.parameters.sampling.update(self._default_sampling)
+        self._tmp_dir.cleanup()
+
+    def _save(self, group_name):
+        saver = IO(input_filename=self._input_filename, group_name=group_name)
+        saver.add_file_attributes()
+        saver.add_data("Passengers", np.arange(1000))
+        saver.save()
+        return saver
+
+    def test_powder_data_does_not_depend_on_sampling(self):
+        powder_group = abins.parameters.hdf_groups['powder_data']
+        s_group = abins.parameters.hdf_groups['s_data'] + "/TOSCA/Powder/10.0K"
+        self._save(powder_group)
+        self._save(s_group)
+
+        abins.parameters.sampling['s_relative_threshold'] *= 2
+
+        IO(input_filename=self._input_filename, group_name=powder_group).check_previous_data()
+        self.assertRaises((IOError, ValueError),
+                          IO(input_filename=self._input_filename, group_name=s_group).check_previous_data)
+
+    def test_least_recently_used_files_are_removed(self):
+        first = self._save("First")
+        abins.parameters.performance['cache_max_size'] = os.path.getsize(first._hdf_filename) + 1
+        second = self._save("Second")
+
+        self.assertFalse(os.path.isfile(first._hdf_filename))
+        self.assertTrue(os.path.isfile(second._hdf_filename))
+
+    def test_loaded_files_are_kept(self):
+        first = self._save("First")
+        second = self._save("Second")
+        # the first file was saved before the second and was then loaded
+        os.utime(first._hdf_filename, (1000., 1000.))
+        os.utime(second._hdf_filename, (2000., 2000.))
+        first.load(list_of_datasets=["Passengers"])
+
+        abins.parameters.performance['cache_max_size'] = (os.path.getsize(first._hdf_filename)
+                                                          + os.path.getsize(second._hdf_filename))
+        third = self._save("Third")
+
+        self.assertTrue(os.path.isfile(first._hdf_filename))
+        self.assertFalse(os.path.isfile(second._hdf_filename))
+        self.assertTrue(os.path.isfile(third._hdf_filename))
+
+
 if __name__ == '__main__':
     unittest.main()
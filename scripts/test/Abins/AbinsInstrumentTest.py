@@ -6,6 +6,8 @@
 # SPDX - License - Identifier: GPL - 3.0 +
 import unittest
 
+import numpy as np
+
 from abins.constants import ALL_INSTRUMENTS
 from abins.instruments.instrument import Instrument
 
@@ -21,6 +23,26 @@ class InstrumentTest(unittest.TestCase):
             instrument.convolve_with_resolution_function()
 
 
+class IndirectInstrumentTest(unittest.TestCase):
+    bins = np.arange(0., 1001., 1.)
+
+    def test_auto_broadening_scheme_depends_on_number_of_peaks(self):
+        from abins.instruments import get_instrument
+        instrument = get_instrument('TOSCA')
+
+        for number_of_peaks, scheme in ((20, 'gaussian_truncated'), (100, 'interpolate')):
+            frequencies = np.linspace(100., 900., number_of_peaks)
+            self.assertEqual(instrument.get_broadening_settings(frequencies=frequencies, bins=self.bins),
+                             (scheme, scheme == 'interpolate'))
+
+            # binned spectra of the same peaks choose the same scheme, however many bins there are
+            s_dft = np.histogram(frequencies, bins=self.bins)[0][np.newaxis, :]
+            _, broadened = instrument.convolve_spectra_with_resolution_function(bins=self.bins, s_dft=s_dft)
+            _, expected = instrument.convolve_spectra_with_resolution_function(bins=self.bins, s_dft=s_dft,
+                                                                               scheme=scheme)
+            self.assertTrue(np.allclose(broadened, expected))
+
+
 class GetInstrumentTest(unittest.TestCase):
     def setUp(self):
         ALL_INSTRUMENTS.append('Unimplemented')
@@ -12,7 +12,7 @@ import unittest
 # Mantid imports
 from mantid import config
 from mantid.api import AnalysisDataService, mtd
-from mantid.simpleapi import DeleteWorkspaces, LoadNexusProcessed
+from mantid.simpleapi import CloneWorkspace, DeleteWorkspaces, LoadNexusProcessed
 from corelli.calibration.utils import wire_positions
 
 # Calibration imports
@@ -73,6 +73,25 @@ class TestTube(unittest.TestCase):
                     self.assertAlmostEqual(expected[row['Name']], row['Value'], delta=1.e-6)
         DeleteWorkspaces(['CalibTable', 'parameters_table_group', 'PeakTable'])
 
+    def test_calibrate_in_parallel(self):
+        data = self.corelli
+        tables = dict()
+        for parallel in (False, 4):
+            calibrate(data['workspace'], data['bank_name'], data['wire_positions'],
+                      data['peaks_form'], fitPar=data['fit_parameters'], outputPeak=True, parallel=parallel)
+            tables[parallel] = (CloneWorkspace('CalibTable', OutputWorkspace=f'CalibTable_{parallel}'),
+                                CloneWorkspace('PeakTable', OutputWorkspace=f'PeakTable_{parallel}'))
+            DeleteWorkspaces(['CalibTable', 'PeakTable'])
+        # the rows of the tables are in the same order, with the same values
+        for serial_table, parallel_table in zip(tables[False], tables[4]):
+            self.assertEqual(serial_table.rowCount(), parallel_table.rowCount())
+            for column in serial_table.getColumnNames():
+                self.assertEqual(serial_table.column(column), parallel_table.column(column))
+        # the temporary workspaces of the tubes are deleted
+        for tube_index in range(16):
+            self.assertFalse(AnalysisDataService.doesExist(f'__tube{tube_index}_CalibPoint_Parameters'))
+        DeleteWorkspaces(['CalibTable_False', 'PeakTable_False', 'CalibTable_4', 'PeakTable_4'])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -14,10 +14,14 @@ import unittest
 # Mantid import
 from mantid import config
 from mantid.api import AnalysisDataService, mtd
-from mantid.simpleapi import DeleteWorkspaces, LoadNexusProcessed
+from mantid.simpleapi import CreateWorkspace, DeleteWorkspaces, LoadNexusProcessed
+from corelli.calibration.utils import wire_positions
+from scipy.special import erfc
 
 # Calibration imports
-from Calibration.tube_calib import correct_tube_to_ideal_tube, getCalibratedPixelPositions
+from Calibration.tube_calib import (correct_tube_to_ideal_tube, delete_temporary_workspaces, fit_tubes_points_batched,
+                                    getCalibratedPixelPositions, getPoints)
+from Calibration.tube_calib_fit_params import TubeCalibFitParams
 
 
 class TestTubeCalib(unittest.TestCase):
@@ -128,6 +132,63 @@ class TestTubeCalib(unittest.TestCase):
         DeleteWorkspaces(['parameters', 'PolyFittingWorkspace', 'QF_NormalisedCovarianceMatrix',
                           'QF_Parameters', 'QF_Workspace'])
 
+    def test_fit_tubes_points_batched(self):
+        pixels_per_tube = self.corelli['pixels_per_tube']
+        wire_positions_pixels = wire_positions(units='pixels')[1: -1]
+        fit_parameters = TubeCalibFitParams(wire_positions_pixels, height=-1000, width=4, margin=7)
+        fit_parameters.setAutomatic(True)
+        peaks_form = [1] * len(wire_positions_pixels)
+        tubes = [(i, list(range(i * pixels_per_tube, (i + 1) * pixels_per_tube))) for i in range(16)]
+
+        workspace = mtd[self.corelli['workspace']]
+        peaks = fit_tubes_points_batched(workspace, tubes, peaks_form, fit_parameters)
+        # the batched fits agree with those of Fit for the tubes which converged
+        assert len(peaks) > 0
+        for i, wht in tubes:
+            if i in peaks:
+                assert_allclose(peaks[i], getPoints(workspace, peaks_form, fit_parameters, wht), atol=0.01)
+        delete_temporary_workspaces()
+
+    def test_fit_tubes_points_batched_edges(self):
+        # two tubes of 100 pixels, with a rising edge at pixels 40.3 and 42.7
+        edges = [40.3, 42.7]
+        pixels = np.arange(100)
+        counts = np.array([10 + 500 * erfc((edge - pixels) / 5.0) for edge in edges])
+        fit_parameters = TubeCalibFitParams([41], outEdge=10, inEdge=10, edgeGrad=4.0, margin=15)
+        tubes = [(0, list(range(0, 200, 2))), (1, list(range(1, 200, 2)))]
+        counts_by_pixel = counts.T.flatten()  # spectra alternate between the two tubes
+        workspace = CreateWorkspace(DataX=np.zeros(200), DataY=counts_by_pixel, NSpec=200, OutputWorkspace='edges')
+
+        peaks = fit_tubes_points_batched(workspace, tubes, [2], fit_parameters)
+        self.assertEqual(sorted(peaks), [0, 1])
+        assert_allclose([peaks[0][0], peaks[1][0]], edges, atol=1.e-4)
+        # the batched fits agree with those of Fit
+        for i, wht in tubes:
+            assert_allclose(peaks[i], getPoints(workspace, [2], fit_parameters, wht), atol=1.e-3)
+        delete_temporary_workspaces()
+        DeleteWorkspaces(['edges'])
+
+    def test_fit_tubes_points_batched_slits(self):
+        # three tubes of 256 pixels on a sloping background, with the shadows of five wires shifted along each tube
+        wires = np.array([30., 80., 130., 180., 230.])
+        pixels = np.arange(256)
+        centres = [wires + 0.3 * i for i in range(3)]
+        counts = np.array([1000 + 0.5 * pixels - 600 * np.exp(-0.5 * ((pixels[:, None] - c) / 2.5)**2).sum(axis=1)
+                           for c in centres])
+        fit_parameters = TubeCalibFitParams(list(wires), height=-600, width=3, margin=10)
+        fit_parameters.setAutomatic(True)
+        tubes = [(i, list(range(i * 256, (i + 1) * 256))) for i in range(3)]
+        workspace = CreateWorkspace(DataX=np.zeros(768), DataY=counts.flatten(), NSpec=768, OutputWorkspace='slits')
+
+        peaks = fit_tubes_points_batched(workspace, tubes, [1] * len(wires), fit_parameters)
+        self.assertEqual(sorted(peaks), [0, 1, 2])
+        for i, wht in tubes:
+            assert_allclose(peaks[i], centres[i], atol=1.e-4)
+            # the batched fits agree with those of Fit
+            assert_allclose(peaks[i], getPoints(workspace, [1] * len(wires), fit_parameters, wht), atol=1.e-3)
+        delete_temporary_workspaces()
+        DeleteWorkspaces(['slits'])
+
 
 if __name__ == '__main__':
     unittest.main()
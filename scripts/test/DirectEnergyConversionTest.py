@@ -105,6 +105,44 @@ class DirectEnergyConversionTest(unittest.TestCase):
         # this is strange feature.
         self.assertEqual(len(tReducer.prop_man.save_format), 2)
 
+    def test_save_tasks_do_not_depend_on_later_property_changes(self):
+        tReducer = self.reducer
+        tws = CreateSampleWorkspace(Function='Flat background', NumBanks=1, BankPixelWidth=1,
+                                    NumEvents=10, XUnit='DeltaE', XMin=-10, XMax=10, BinWidth=0.1)
+
+        tReducer.prop_man.save_format = ['spe', 'nxs']
+        save_tasks = tReducer._get_save_tasks(tws, 'save_tasks_test_file')
+        self.assertEqual(len(save_tasks), 2)
+
+        # the property manager changes when the next chunk is reduced
+        tReducer.prop_man.save_format = None
+        for save_task in save_tasks:
+            save_task()
+
+        for file_name in ['save_tasks_test_file.spe', 'save_tasks_test_file.nxs']:
+            file_name = FileFinder.getFullPath(file_name)
+            self.assertGreater(len(file_name), 0)
+            os.remove(file_name)
+
+    def test_nxspe_save_task_does_not_rename_the_workspace(self):
+        tReducer = self.reducer
+        tws = CreateSampleWorkspace(Function='Flat background', NumBanks=1, BankPixelWidth=1,
+                                    NumEvents=10, XUnit='DeltaE', XMin=-10, XMax=10, BinWidth=0.1,
+                                    OutputWorkspace='save/tasks_ws')
+
+        tReducer.prop_man.save_format = ['nxspe']
+        save_tasks = tReducer._get_save_tasks(tws, 'save_tasks_test_file')
+        # the copy with a name nxspe supports is made when the tasks are created
+        self.assertTrue(mtd.doesExist('saveoftasks_ws'))
+        for save_task in save_tasks:
+            save_task()
+
+        self.assertTrue(mtd.doesExist('save/tasks_ws'))
+        self.assertFalse(mtd.doesExist('saveoftasks_ws'))
+        file_name = FileFinder.getFullPath('save_tasks_test_file.nxspe')
+        self.assertGreater(len(file_name), 0)
+        os.remove(file_name)
+
     def test_diagnostics_wb(self):
         wb_ws = CreateSampleWorkspace(NumBanks=1, BankPixelWidth=4, NumEvents=10000)
         LoadInstrument(wb_ws, InstrumentName='MARI', RewriteSpectraMap=True)
@@ -418,6 +456,46 @@ class DirectEnergyConversionTest(unittest.TestCase):
         rez = CompareWorkspaces(result[1], result2[1])
         self.assertTrue(rez[0])
 
+    def test_multirep_mode_in_processes(self):
+        # create test workspace
+        run_monitors = CreateSampleWorkspace(Function='Multiple Peaks', NumBanks=4, BankPixelWidth=1,
+                                             NumEvents=100000, XUnit='Energy', XMin=3, XMax=200, BinWidth=0.1)
+        LoadInstrument(run_monitors, InstrumentName='MARI', RewriteSpectraMap=True)
+        ConvertUnits(InputWorkspace='run_monitors', OutputWorkspace='run_monitors', Target='TOF')
+        run_monitors = mtd['run_monitors']
+        tof = run_monitors.dataX(3)
+        tMin = tof[0]
+        tMax = tof[-1]
+        run = CreateSampleWorkspace(Function='Multiple Peaks', WorkspaceType='Event', NumBanks=8, BankPixelWidth=1,
+                                    NumEvents=100000, XUnit='TOF', xMin=tMin, xMax=tMax)
+        LoadInstrument(run, InstrumentName='MARI', RewriteSpectraMap=True)
+        MoveInstrumentComponent(Workspace='run', ComponentName='Detector', DetectorID=1102, Z=1)
+
+        run2 = CloneWorkspace(run)
+        CloneWorkspace(run_monitors, OutputWorkspace="run2_monitors")
+
+        wb_ws = Rebin(run, Params=[tMin, 1, tMax], PreserveEvents=False)
+
+        tReducer = DirectEnergyConversion(run.getInstrument())
+        tReducer.prop_man.run_diagnostics = True
+        tReducer.hard_mask_file = None
+        tReducer.map_file = None
+        tReducer.save_format = None
+        tReducer.multirep_tof_specta_list = [4, 5]
+
+        result = tReducer.convert_to_energy(wb_ws, run, [67., 122.], [-2, 0.02, 0.8])
+        # rename samples from previous workspace to avoid deleting them on current run
+        for ind, item in enumerate(result):
+            result[ind] = RenameWorkspace(item, OutputWorkspace='SampleRez#' + str(ind))
+
+        tReducer.multirep_processes = 2
+        result2 = tReducer.convert_to_energy(None, run2, [67., 122.], [-2, 0.02, 0.8])
+
+        self.assertEqual(len(result2), 2)
+        for ws, ws2 in zip(result, result2):
+            rez = CompareWorkspaces(ws, ws2)
+            self.assertTrue(rez[0])
+
     def test_multirep_abs_units_mode(self):
         # create test workspace
         run_monitors = CreateSampleWorkspace(Function='Multiple Peaks', NumBanks=4, BankPixelWidth=1,
@@ -4,6 +4,7 @@
 #   NScD Oak Ridge National Laboratory, European Spallation Source,
 #   Institut Laue - Langevin & CSNS, Institute of High Energy Physics, CAS
 # SPDX - License - Identifier: GPL - 3.0 +
+import threading
 import unittest
 from unittest import mock
 
@@ -711,7 +712,8 @@ class TFAsymmetryFittingModelTest(unittest.TestCase):
 
         self.model._get_sequential_fitting_func_for_normal_fitting_mode.assert_called_once_with()
         self.model._flatten_workspace_names.assert_called_once_with(workspaces)
-        self.model._evaluate_sequential_fit.assert_called_once_with(None, flattened_workspaces, parameter_values, False)
+        self.model._evaluate_sequential_fit.assert_called_once_with(None, flattened_workspaces, parameter_values, False,
+                                                                    None)
         self.model._update_fit_functions_after_sequential_fit.assert_called_once_with(flattened_workspaces, functions)
         self.model._update_fit_statuses_and_chi_squared_after_sequential_fit.assert_called_once_with(
             flattened_workspaces, fit_statuses, chi_squared)
@@ -738,11 +740,81 @@ class TFAsymmetryFittingModelTest(unittest.TestCase):
         self.model._get_sequential_fitting_func_for_tf_asymmetry_fitting_mode.assert_called_once_with()
         self.assertTrue(not self.model._flatten_workspace_names.called)
         self.model._evaluate_sequential_fit.assert_called_once_with(None, workspaces, parameter_values,
-                                                                    use_initial_values)
+                                                                    use_initial_values, None)
         self.model._update_fit_functions_after_sequential_fit.assert_called_once_with(workspaces, functions)
         self.model._update_fit_statuses_and_chi_squared_after_sequential_fit.assert_called_once_with(
             workspaces, fit_statuses, chi_squared)
 
+    def test_that_perform_sequential_fit_will_fit_in_parallel_only_when_using_the_initial_values(self):
+        workspaces = [self.dataset_names[:1], self.dataset_names[1:]]
+        parameter_values = [[0.0], [1.0]]
+        row_fit_finished = mock.Mock()
+        results = (["FakeFunc"], ["Success"], [1.2])
+
+        self.model._get_sequential_fitting_func_for_normal_fitting_mode = mock.Mock(return_value=None)
+        self.model._evaluate_sequential_fit = mock.Mock(return_value=results)
+        self.model._evaluate_sequential_fit_in_parallel = mock.Mock(return_value=results)
+        self.model._update_fit_functions_after_sequential_fit = mock.Mock()
+        self.model._update_fit_statuses_and_chi_squared_after_sequential_fit = mock.Mock()
+
+        self.model.simultaneous_fitting_mode = True
+        self.model.tf_asymmetry_mode = False
+
+        self.model.perform_sequential_fit(workspaces, parameter_values, False, True, row_fit_finished)
+        self.model._evaluate_sequential_fit.assert_called_once_with(None, workspaces, parameter_values, False,
+                                                                    row_fit_finished)
+        self.model._evaluate_sequential_fit_in_parallel.assert_not_called()
+
+        self.model._evaluate_sequential_fit.reset_mock()
+        self.model.perform_sequential_fit(workspaces, parameter_values, True, True, row_fit_finished)
+        self.model._evaluate_sequential_fit_in_parallel.assert_called_once_with(None, workspaces, parameter_values,
+                                                                                row_fit_finished)
+        self.model._evaluate_sequential_fit.assert_not_called()
+
+    def test_that_evaluate_sequential_fit_calls_row_fit_finished_after_each_row(self):
+        fitting_func = mock.Mock(side_effect=[("Func1", "Success", 1.1), ("Func2", "Failed", 2.2)])
+        row_fit_finished = mock.Mock()
+
+        result = self.model._evaluate_sequential_fit(fitting_func, ["ws1", "ws2"], [[0.0], [1.0]], False,
+                                                     row_fit_finished)
+
+        self.assertEqual(result, (["Func1", "Func2"], ["Success", "Failed"], [1.1, 2.2]))
+        row_fit_finished.assert_has_calls([mock.call(0, "Func1", "Success", 1.1),
+                                           mock.call(1, "Func2", "Failed", 2.2)])
+
+    def test_that_evaluate_sequential_fit_in_parallel_adds_the_fit_results_in_the_order_of_the_rows(self):
+        workspace_names = ["ws1", "ws2", "ws3", "ws4"]
+        calling_thread = threading.current_thread()
+        # The results are only added to the ADS and context on the calling thread
+        add_fit_results = mock.Mock(
+            side_effect=lambda name: self.assertIs(threading.current_thread(), calling_thread))
+        row_fit_finished = mock.Mock()
+
+        def fitting_func(row_index, workspace_name, parameter_values, functions, use_initial_values):
+            self.assertEqual(functions, [])
+            self.assertTrue(use_initial_values)
+            self.model._record_fit_results(add_fit_results, workspace_name)
+            return f"Func{row_index}", "Success", parameter_values[0]
+
+        functions, fit_statuses, chi_squared_list = self.model._evaluate_sequential_fit_in_parallel(
+            fitting_func, workspace_names, [[0.0], [1.0], [2.0], [3.0]], row_fit_finished)
+
+        self.assertEqual(functions, ["Func0", "Func1", "Func2", "Func3"])
+        self.assertEqual(fit_statuses, ["Success"] * 4)
+        self.assertEqual(chi_squared_list, [0.0, 1.0, 2.0, 3.0])
+        add_fit_results.assert_has_calls([mock.call(name) for name in workspace_names])
+        row_fit_finished.assert_has_calls([mock.call(i, f"Func{i}", "Success", float(i)) for i in range(4)])
+
+    def test_that_evaluate_sequential_fit_in_parallel_raises_the_error_of_a_failed_fit(self):
+        def fitting_func(row_index, workspace_name, parameter_values, functions, use_initial_values):
+            if row_index == 1:
+                raise RuntimeError("Fit failed")
+            return f"Func{row_index}", "Success", 1.0
+
+        with self.assertRaises(RuntimeError):
+            self.model._evaluate_sequential_fit_in_parallel(fitting_func, ["ws1", "ws2", "ws3"],
+                                                            [[0.0], [1.0], [2.0]])
+
     def test_that_are_same_workspaces_as_the_datasets_returns_true_if_all_the_dataset_names_match(self):
         self.model.dataset_names = self.dataset_names
         self.assertTrue(self.model._are_same_workspaces_as_the_datasets(self.dataset_names))
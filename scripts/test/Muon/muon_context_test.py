@@ -238,6 +238,54 @@ class MuonContextTest(unittest.TestCase):
                                   'EMU19489; Diff; pair_diff; Asymmetry; MA',
                                   'EMU19489; Diff; pair_diff; Asymmetry; Rebin; MA'])
 
+    def test_that_calculate_all_groups_only_recalculates_the_groups_which_have_changed(self):
+        self.context.calculate_all_groups()
+        self.context.calculate_group = mock.Mock(wraps=self.context.calculate_group)
+
+        self.context.calculate_all_groups()
+        self.context.calculate_group.assert_not_called()
+
+        self.group_pair_context['fwd'].detectors = [1, 2, 3]
+        self.context.calculate_all_groups()
+        self.context.calculate_group.assert_called_once_with(self.group_pair_context['fwd'], [self.run_number],
+                                                             rebin=False)
+
+    def test_that_calculate_all_pairs_recalculates_a_pair_when_one_of_its_groups_changes(self):
+        self.populate_ADS()
+        self.context.calculate_pair = mock.Mock(wraps=self.context.calculate_pair)
+
+        self.context.calculate_all_pairs()
+        self.context.calculate_pair.assert_not_called()
+
+        self.group_pair_context['bwd'].detectors = [33, 34, 35]
+        self.context.calculate_all_groups()
+        self.context.calculate_all_pairs()
+        self.assertEqual(self.context.calculate_pair.call_count, 1)
+
+    def test_that_a_deleted_group_workspace_is_recalculated(self):
+        self.populate_ADS()
+        self.context.calculate_group = mock.Mock(wraps=self.context.calculate_group)
+
+        AnalysisDataService.remove('EMU19489; Group; fwd; Counts; MA')
+        self.context.show_all_groups()
+
+        self.context.calculate_group.assert_called_once_with(self.group_pair_context['fwd'], [self.run_number],
+                                                             rebin=False)
+        self._assert_list_in_ADS(['EMU19489; Group; fwd; Counts; MA'])
+
+    def test_that_changing_the_rebinning_only_recalculates_the_rebinned_groups(self):
+        self.gui_context['RebinType'] = 'Fixed'
+        self.gui_context['RebinFixed'] = 2
+        self.context.calculate_all_groups()
+        self.context.calculate_group = mock.Mock(wraps=self.context.calculate_group)
+
+        self.gui_context['RebinFixed'] = 4
+        self.context.calculate_all_groups()
+
+        self.assertEqual(self.context.calculate_group.call_count, 2)
+        for call in self.context.calculate_group.call_args_list:
+            self.assertEqual(call[1], {'rebin': True})
+
     def test_update_current_data_sets_current_run_in_data_context(self):
         self.context.update_current_data()
 
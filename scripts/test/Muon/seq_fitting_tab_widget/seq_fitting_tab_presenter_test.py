@@ -34,6 +34,7 @@ class SeqFittingTabPresenterTest(unittest.TestCase):
         self.presenter = self.widget.seq_fitting_tab_presenter
         self.view.is_plotting_checked.return_value = False
         self.view.use_initial_values_for_fits.return_value = False
+        self.view.fit_rows_in_parallel.return_value = False
         self.presenter.create_thread = mock.MagicMock()
 
         self.view.fit_table.get_workspace_info_from_row = mock.MagicMock(return_value=["2224;2225", "bwd;fwd;top"])
@@ -106,7 +107,8 @@ class SeqFittingTabPresenterTest(unittest.TestCase):
         self.presenter.handle_fit_selected_pressed()
 
         mock_function_tools.partial.assert_called_once_with(self.model.perform_sequential_fit, [[workspace]],
-                                                            [parameter_values], False)
+                                                            [parameter_values], False, False,
+                                                            self.presenter._notify_row_fit_finished)
 
     @mock.patch('Muon.GUI.Common.seq_fitting_tab_widget.seq_fitting_tab_presenter.functools')
     def test_handle_fit_selected_does_nothing_if_fit_function_is_none(self, mock_function_tools):
@@ -156,7 +158,46 @@ class SeqFittingTabPresenterTest(unittest.TestCase):
         self.assertEqual(self.presenter.get_workspaces_for_row_in_fit_table.call_count, number_of_entries)
         mock_function_tools.partial.assert_called_once_with(self.model.perform_sequential_fit,
                                                             [workspaces] * number_of_entries,
-                                                            [parameters_values] * number_of_entries, False)
+                                                            [parameters_values] * number_of_entries, False, False,
+                                                            self.presenter._notify_row_fit_finished)
+
+    @mock.patch('Muon.GUI.Common.seq_fitting_tab_widget.seq_fitting_tab_presenter.functools')
+    def test_handle_sequential_fit_passes_on_the_parallel_fitting_option(self, mock_function_tools):
+        workspaces = ["EMU20884; Group; fwd; Asymmetry"]
+        parameters_values = [0.2, 0.2, 0.1, 0]
+        self._setup_test_fit_function(parameters_values)
+        self.view.use_initial_values_for_fits.return_value = True
+        self.view.fit_rows_in_parallel.return_value = True
+        self.view.fit_table.get_number_of_fits = mock.MagicMock(return_value=2)
+        self.view.fit_table.get_fit_parameter_values_from_row = mock.Mock(return_value=parameters_values)
+        self.presenter.get_workspaces_for_row_in_fit_table = mock.MagicMock(return_value=workspaces)
+        self.model.check_datasets_are_tf_asymmetry_compliant = mock.MagicMock(return_value=(True, ""))
+
+        self.presenter.handle_sequential_fit_pressed()
+
+        mock_function_tools.partial.assert_called_once_with(self.model.perform_sequential_fit, [workspaces] * 2,
+                                                            [parameters_values] * 2, True, True,
+                                                            self.presenter._notify_row_fit_finished)
+
+    def test_notify_row_fit_finished_passes_the_table_row_and_parameter_values_to_the_view(self):
+        fit_values = [0.6, 0.9, 0.1, 1]
+        fit_function = self._setup_test_fit_function(fit_values)
+        self.model.get_all_fit_function_parameter_values_for = mock.Mock(return_value=fit_values)
+        self.presenter.selected_rows = [1, 3]
+
+        self.presenter._notify_row_fit_finished(1, fit_function, 'Success', 1.07)
+
+        self.model.get_all_fit_function_parameter_values_for.assert_called_once_with(fit_function)
+        self.view.notify_row_fit_finished.assert_called_once_with(3, fit_values, 'Success', 1.07)
+
+    def test_handle_row_fit_finished_updates_the_row_and_keeps_the_table_signals_blocked(self):
+        fit_values = [0.6, 0.9, 0.1, 1]
+
+        self.presenter.handle_row_fit_finished(3, fit_values, 'Success', 1.07)
+
+        self.view.fit_table.set_parameter_values_for_row.assert_called_once_with(3, fit_values)
+        self.view.fit_table.set_fit_quality.assert_called_once_with(3, 'Success', 1.07)
+        self.view.fit_table.block_signals.assert_called_once_with(True)
 
     @mock.patch('Muon.GUI.Common.seq_fitting_tab_widget.seq_fitting_tab_presenter.functools')
     def test_handle_sequential_fit_does_nothing_if_fit_function_is_none(self, mock_function_tools):
@@ -0,0 +1,102 @@
+# Mantid Repository : https://github.com/mantidproject/mantid
+#
+# Copyright &copy; 2021 ISIS Rutherford Appleton Laboratory UKRI,
+#   NScD Oak Ridge National Laboratory, European Spallation Source,
+#   Institut Laue - Langevin & CSNS, Institute of High Energy Physics, CAS
+# SPDX - License - Identifier: GPL - 3.0 +
+import threading
+import unittest
+from unittest import mock
+
+from Muon.GUI.Common.utilities.calculation_graph import CalculationGraph, CalculationNode
+
+EXIST_PATH = "Muon.GUI.Common.utilities.calculation_graph.check_if_workspace_exist"
+
+
+class CalculationGraphTest(unittest.TestCase):
+
+    def setUp(self):
+        self.graph = CalculationGraph()
+        self.calculate = mock.Mock(side_effect=lambda name: name)
+        self.update = mock.Mock()
+
+    def _node(self, name, parameters=(), parents=(), input_workspaces=()):
+        return CalculationNode(key=(name,), parameters=parameters, parents=parents,
+                               input_workspaces=input_workspaces,
+                               calculate=lambda: self.calculate(name),
+                               update=lambda result: self.update(name, result))
+
+    @mock.patch(EXIST_PATH, return_value=True)
+    def test_that_evaluate_calculates_a_node_once_if_it_does_not_change(self, _):
+        self.graph.evaluate([self._node("a", parameters=(1,))])
+        self.graph.evaluate([self._node("a", parameters=(1,))])
+
+        self.calculate.assert_called_once_with("a")
+        self.update.assert_has_calls([mock.call("a", "a"), mock.call("a", "a")])
+
+    @mock.patch(EXIST_PATH, return_value=True)
+    def test_that_evaluate_recalculates_a_node_if_its_parameters_change(self, _):
+        self.graph.evaluate([self._node("a", parameters=(1,))])
+        self.graph.evaluate([self._node("a", parameters=(2,))])
+
+        self.assertEqual(self.calculate.call_count, 2)
+
+    @mock.patch(EXIST_PATH, return_value=True)
+    def test_that_evaluate_only_recalculates_the_children_of_a_recalculated_node(self, _):
+        self.graph.evaluate([self._node("a", parameters=(1,)), self._node("b")])
+        self.graph.evaluate([self._node("c", parents=(("a",),)), self._node("d", parents=(("b",),))])
+        self.calculate.reset_mock()
+
+        self.graph.evaluate([self._node("a", parameters=(2,)), self._node("b")])
+        self.graph.evaluate([self._node("c", parents=(("a",),)), self._node("d", parents=(("b",),))])
+
+        self.assertEqual(self.calculate.call_args_list, [mock.call("a"), mock.call("c")])
+
+    def test_that_evaluate_recalculates_a_node_if_its_output_workspace_no_longer_exists(self):
+        with mock.patch(EXIST_PATH, return_value=True):
+            self.graph.evaluate([self._node("a")])
+        with mock.patch(EXIST_PATH, return_value=False):
+            self.graph.evaluate([self._node("a")])
+
+        self.assertEqual(self.calculate.call_count, 2)
+
+    @mock.patch(EXIST_PATH, return_value=True)
+    def test_that_invalidate_workspace_forgets_the_nodes_using_the_workspace(self, _):
+        self.graph.evaluate([self._node("a", input_workspaces=("raw",)), self._node("b", input_workspaces=("table",))])
+        self.calculate.reset_mock()
+
+        self.graph.invalidate_workspace("table")
+        self.graph.evaluate([self._node("a", input_workspaces=("raw",)), self._node("b", input_workspaces=("table",))])
+
+        self.calculate.assert_called_once_with("b")
+
+    @mock.patch(EXIST_PATH, return_value=True)
+    def test_that_clear_forgets_all_nodes(self, _):
+        self.graph.evaluate([self._node("a")])
+        self.graph.clear()
+        self.graph.evaluate([self._node("a")])
+
+        self.assertEqual(self.calculate.call_count, 2)
+        self.assertTrue(self.graph.is_up_to_date(self._node("a")))
+
+    @mock.patch(EXIST_PATH, return_value=True)
+    def test_that_evaluate_updates_the_nodes_in_order_on_the_calling_thread(self, _):
+        calling_thread = threading.current_thread()
+        self.update.side_effect = lambda name, result: self.assertIs(threading.current_thread(), calling_thread)
+        names = [str(i) for i in range(8)]
+
+        self.graph.evaluate([self._node(name) for name in names])
+
+        self.assertEqual(self.update.call_args_list, [mock.call(name, name) for name in names])
+
+    @mock.patch(EXIST_PATH, return_value=True)
+    def test_that_evaluate_raises_the_error_of_a_failed_calculation(self, _):
+        self.calculate.side_effect = RuntimeError("Calculation failed")
+
+        with self.assertRaises(RuntimeError):
+            self.graph.evaluate([self._node("a"), self._node("b")])
+        self.assertFalse(self.graph.is_up_to_date(self._node("a")))
+
+
+if __name__ == '__main__':
+    unittest.main(buffer=False, verbosity=2)
@@ -4,7 +4,9 @@
 #   NScD Oak Ridge National Laboratory, European Spallation Source,
 #   Institut Laue - Langevin & CSNS, Institute of High Energy Physics, CAS
 # SPDX - License - Identifier: GPL - 3.0 +
+import os
 import unittest
+from unittest import mock
 
 from Direct.PropertyManager import PropertyManager
 from Direct.RunDescriptor import *
@@ -477,6 +479,98 @@ class RunDescriptorTest(unittest.TestCase):
         self.assertEqual(ws, None)
         self.assertEqual(n_sums, 0)
 
+    def test_stream_sum_runs(self):
+        propman = self.prop_man
+        propman.sample_run = 11001
+        ws = PropertyManager.sample_run.get_workspace()
+        test_val1 = ws.dataY(3)[0]
+        test_val2 = ws.dataY(50)[200]
+
+        propman.sum_runs = True
+        propman.stream_sum_runs = True
+        propman.sample_run = [11001, 11001, 11001]
+        ws = PropertyManager.sample_run.get_workspace()
+        self.assertEqual(ws.name(), 'SR_MAR011001SumOf3')
+        self.assertEqual(3 * test_val1, ws.dataY(3)[0])
+        self.assertEqual(3 * test_val2, ws.dataY(50)[200])
+        self.assertEqual(PropertyManager.sample_run.get_sum_run_list(ws), [11001, 11001, 11001])
+
+        # the partial sum is removed once all runs are summed
+        for file_name in PropertyManager.sample_run._get_sum_checkpoint_files('MAR'):
+            self.assertFalse(os.path.isfile(file_name))
+
+        propman.stream_sum_runs = False
+        propman.sum_runs = False
+
+    def test_stream_sum_runs_resumes_from_partial_sum(self):
+        propman = self.prop_man
+        propman.sample_run = 11001
+        ws = PropertyManager.sample_run.get_workspace()
+        test_val1 = ws.dataY(3)[0]
+
+        propman.sum_runs = True
+        propman.stream_sum_runs = True
+        propman.sample_run = [11001, 11001, 11001]
+        # a partial sum of the first two runs left by an interrupted summation
+        sum_file, mon_file = PropertyManager.sample_run._get_sum_checkpoint_files('MAR')
+        partial_sum = Plus(LHSWorkspace=ws, RHSWorkspace=ws, OutputWorkspace='partial_sum')
+        AddSampleLog(Workspace=partial_sum, LogName='SumRuns', LogText='11001,11001', LogType='String')
+        SaveNexusProcessed(InputWorkspace=partial_sum, Filename=sum_file)
+        DeleteWorkspace(partial_sum)
+        monitors_name = ws.name() + '_monitors'
+        if mtd.doesExist(monitors_name):
+            partial_sum_monitors = Plus(LHSWorkspace=monitors_name, RHSWorkspace=monitors_name,
+                                        OutputWorkspace='partial_sum_monitors')
+            SaveNexusProcessed(InputWorkspace=partial_sum_monitors, Filename=mon_file)
+            DeleteWorkspace(partial_sum_monitors)
+
+        with mock.patch.object(RunDescriptor, 'load_file', autospec=True,
+                               side_effect=RunDescriptor.load_file) as load_file:
+            ws = PropertyManager.sample_run.get_workspace()
+        # only the remaining run is loaded
+        self.assertEqual(load_file.call_count, 1)
+        self.assertEqual(3 * test_val1, ws.dataY(3)[0])
+        self.assertEqual(PropertyManager.sample_run.get_sum_run_list(ws), [11001, 11001, 11001])
+        for file_name in (sum_file, mon_file):
+            self.assertFalse(os.path.isfile(file_name))
+
+        propman.stream_sum_runs = False
+        propman.sum_runs = False
+
+    def test_stream_sum_runs_does_not_save_a_partly_added_run(self):
+        propman = self.prop_man
+        propman.sum_runs = True
+        propman.stream_sum_runs = True
+        propman.sample_run = [11001, 11001, 11001]
+        data_plus_calls = []
+
+        def interrupted_plus(**kwargs):
+            result = Plus(**kwargs)
+            if not kwargs['OutputWorkspace'].endswith('_monitors'):
+                data_plus_calls.append(kwargs['RHSWorkspace'])
+                if len(data_plus_calls) == 2:
+                    # interrupted after the last run is added to the data
+                    raise KeyboardInterrupt()
+            return result
+
+        try:
+            with mock.patch('Direct.RunDescriptor.Plus', side_effect=interrupted_plus), \
+                    mock.patch.object(RunDescriptor, '_save_sum_checkpoint') as save_sum_checkpoint:
+                self.assertRaises(KeyboardInterrupt, PropertyManager.sample_run.get_workspace)
+            save_sum_checkpoint.assert_not_called()
+        finally:
+            propman.stream_sum_runs = False
+            propman.sum_runs = False
+
+    def test_sum_checkpoint_files_depend_on_the_whole_run_list(self):
+        propman = self.prop_man
+        propman.sample_run = [11001, 11001, 11001]
+        three_runs_files = PropertyManager.sample_run._get_sum_checkpoint_files('MAR')
+        propman.sample_run = [11001, 11001]
+        two_runs_files = PropertyManager.sample_run._get_sum_checkpoint_files('MAR')
+
+        self.assertNotEqual(three_runs_files, two_runs_files)
+
     def test_find_runfiles(self):
         propman = self.prop_man
         propman.sample_run = [11001, 11111]
@@ -4,6 +4,7 @@
 #   NScD Oak Ridge National Laboratory, European Spallation Source,
 #   Institut Laue - Langevin & CSNS, Institute of High Energy Physics, CAS
 # SPDX - License - Identifier: GPL - 3.0 +
+import threading
 import unittest
 import uuid
 from unittest import mock
@@ -12,7 +13,7 @@ from mantid.api import WorkspaceGroup, AnalysisDataService
 from mantid.simpleapi import CreateSampleWorkspace, GroupWorkspaces
 from sans.algorithm_detail.batch_execution import (get_all_names_to_save, get_transmission_names_to_save,
                                                    ReductionPackage, select_reduction_alg, save_workspace_to_file,
-                                                   delete_reduced_workspaces)
+                                                   delete_reduced_workspaces, single_reduction_for_batch)
 from sans.common.enums import SaveType
 
 
@@ -353,5 +354,50 @@ class DeleteMethodsTest(unittest.TestCase):
             self.assertFalse(i)
 
 
+class SingleReductionForBatchTest(unittest.TestCase):
+    def _run_single_reduction_recording_calls(self, publish_lock):
+        calls = mock.Mock()
+        reduction_alg = calls.reduction_alg
+        packages = [mock.Mock(), mock.Mock()]
+        for name, package in zip(["first", "second"], packages):
+            package.name = name
+            package.out_scale_factor = []
+            package.out_shift_factor = []
+        module = "sans.algorithm_detail.batch_execution"
+        with mock.patch(module + ".provide_loaded_data", return_value=({}, {})), \
+                mock.patch(module + ".get_reduction_packages", return_value=packages), \
+                mock.patch(module + ".reduction_packages_require_splitting_for_event_slices", return_value=False), \
+                mock.patch(module + ".select_reduction_alg", return_value=(False, packages)), \
+                mock.patch(module + ".create_managed_non_child_algorithm", return_value=reduction_alg), \
+                mock.patch(module + ".set_properties_for_reduction_algorithm"), \
+                mock.patch(module + "._get_ws_from_alg"), \
+                mock.patch(module + ".set_alg_output_names"), \
+                mock.patch(module + ".get_shift_and_scale_factors_from_algorithm", return_value=([], [])), \
+                mock.patch(module + ".plot_workspace", calls.plot_workspace), \
+                mock.patch(module + ".group_workspaces_if_required", calls.group_workspaces_if_required), \
+                mock.patch(module + "._save_reduction_packages", calls.save):
+            single_reduction_for_batch(mock.Mock(), True, mock.Mock(), True, "graph", publish_lock=publish_lock)
+        return [(call[0], call[1][0].name if call[0] != "reduction_alg.execute" else None)
+                for call in calls.mock_calls if call[0] != "reduction_alg.setChild"
+                and call[0] != "reduction_alg.setAlwaysStoreInADS"]
+
+    def test_that_each_package_is_published_as_soon_as_it_is_reduced(self):
+        calls = self._run_single_reduction_recording_calls(publish_lock=None)
+
+        self.assertEqual(calls[:-1], [("reduction_alg.execute", None), ("plot_workspace", "first"),
+                                      ("group_workspaces_if_required", "first"),
+                                      ("reduction_alg.execute", None), ("plot_workspace", "second"),
+                                      ("group_workspaces_if_required", "second")])
+        self.assertEqual(calls[-1][0], "save")
+
+    def test_that_packages_are_published_together_with_a_publish_lock(self):
+        calls = self._run_single_reduction_recording_calls(publish_lock=threading.Lock())
+
+        self.assertEqual(calls[:-1], [("reduction_alg.execute", None), ("reduction_alg.execute", None),
+                                      ("plot_workspace", "first"), ("group_workspaces_if_required", "first"),
+                                      ("plot_workspace", "second"), ("group_workspaces_if_required", "second")])
+        self.assertEqual(calls[-1][0], "save")
+
+
 if __name__ == '__main__':
     unittest.main()
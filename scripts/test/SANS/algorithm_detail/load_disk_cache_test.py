@@ -0,0 +1,109 @@
+# Mantid Repository : https://github.com/mantidproject/mantid
+#
+# Copyright &copy; 2021 ISIS Rutherford Appleton Laboratory UKRI,
+#   NScD Oak Ridge National Laboratory, European Spallation Source,
+#   Institut Laue - Langevin & CSNS, Institute of High Energy Physics, CAS
+# SPDX - License - Identifier: GPL - 3.0 +
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from mantid.api import FrameworkManager
+from mantid.kernel import config
+from mantid.simpleapi import CreateSampleWorkspace
+from sans.algorithm_detail import load_disk_cache
+from sans.state.StateObjects.StateData import StateData
+
+
+class LoadDiskCacheTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        FrameworkManager.Instance()
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self._cache_directory = os.path.join(self._directory.name, "cache")
+        self._previous_cache_directory = config[load_disk_cache.CACHE_DIRECTORY_KEY]
+        config[load_disk_cache.CACHE_DIRECTORY_KEY] = self._cache_directory
+
+        self._data_file = os.path.join(self._directory.name, "SANS2D00022024.nxs")
+        with open(self._data_file, "w") as data_file:
+            data_file.write("data")
+        self._file_information = mock.Mock()
+        self._file_information.get_file_name.return_value = self._data_file
+
+    def tearDown(self):
+        config[load_disk_cache.CACHE_DIRECTORY_KEY] = self._previous_cache_directory
+        self._directory.cleanup()
+
+    def test_that_key_depends_on_modification_time_and_period(self):
+        key = load_disk_cache.get_disk_cache_key(self._file_information, False, StateData.ALL_PERIODS, "")
+
+        self.assertEqual(key, load_disk_cache.get_disk_cache_key(self._file_information, False,
+                                                                 StateData.ALL_PERIODS, ""))
+        self.assertNotEqual(key, load_disk_cache.get_disk_cache_key(self._file_information, False, 2, ""))
+        self.assertNotEqual(key, load_disk_cache.get_disk_cache_key(self._file_information, True,
+                                                                    StateData.ALL_PERIODS, ""))
+        modification_time = os.path.getmtime(self._data_file)
+        os.utime(self._data_file, (modification_time + 10, modification_time + 10))
+        self.assertNotEqual(key, load_disk_cache.get_disk_cache_key(self._file_information, False,
+                                                                    StateData.ALL_PERIODS, ""))
+
+    def test_that_nothing_is_loaded_if_cache_is_empty(self):
+        workspaces, monitors = load_disk_cache.load_from_disk_cache(self._file_information, False,
+                                                                    StateData.ALL_PERIODS, "", 1, None)
+
+        self.assertEqual([], workspaces)
+        self.assertEqual([], monitors)
+
+    def test_that_saved_workspaces_are_loaded_from_cache(self):
+        workspace = CreateSampleWorkspace(NumBanks=1, BankPixelWidth=2, StoreInADS=False)
+        monitor = CreateSampleWorkspace(NumBanks=1, BankPixelWidth=1, StoreInADS=False)
+
+        load_disk_cache.save_to_disk_cache(self._file_information, False, StateData.ALL_PERIODS, "",
+                                           [workspace], [monitor], None)
+        workspaces, monitors = load_disk_cache.load_from_disk_cache(self._file_information, False,
+                                                                    StateData.ALL_PERIODS, "", 1, None)
+
+        self.assertEqual(1, len(workspaces))
+        self.assertEqual(1, len(monitors))
+        self.assertEqual(workspace.getNumberHistograms(), workspaces[0].getNumberHistograms())
+        self.assertEqual(monitor.getNumberHistograms(), monitors[0].getNumberHistograms())
+
+    def test_that_workspaces_are_loaded_from_a_cache_that_cannot_be_written_to(self):
+        workspace = CreateSampleWorkspace(NumBanks=1, BankPixelWidth=2, StoreInADS=False)
+
+        load_disk_cache.save_to_disk_cache(self._file_information, True, StateData.ALL_PERIODS, "",
+                                           [workspace], [], None)
+        with mock.patch("sans.algorithm_detail.load_disk_cache.os.utime", side_effect=PermissionError):
+            workspaces, _ = load_disk_cache.load_from_disk_cache(self._file_information, True,
+                                                                 StateData.ALL_PERIODS, "", 1, None)
+
+        self.assertEqual(1, len(workspaces))
+
+    def test_that_cache_is_not_used_if_directory_is_not_set(self):
+        config[load_disk_cache.CACHE_DIRECTORY_KEY] = ""
+        workspace = CreateSampleWorkspace(NumBanks=1, BankPixelWidth=1, StoreInADS=False)
+
+        load_disk_cache.save_to_disk_cache(self._file_information, True, StateData.ALL_PERIODS, "",
+                                           [workspace], [], None)
+
+        self.assertFalse(os.path.exists(self._cache_directory))
+
+    def test_that_least_recently_used_files_are_removed_first(self):
+        os.makedirs(self._cache_directory)
+        for index, name in enumerate(["old", "new"]):
+            file_name = os.path.join(self._cache_directory, name + load_disk_cache.CACHE_FILE_EXTENSION)
+            with open(file_name, "w") as cache_file:
+                cache_file.write("x" * 10)
+            os.utime(file_name, (1000 + index, 1000 + index))
+
+        load_disk_cache.limit_disk_cache_size(self._cache_directory, 15)
+
+        self.assertEqual(["new.nxs"], os.listdir(self._cache_directory))
+
+
+if __name__ == '__main__':
+    unittest.main()
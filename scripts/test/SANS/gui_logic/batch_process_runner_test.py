@@ -4,12 +4,15 @@
 #   NScD Oak Ridge National Laboratory, European Spallation Source,
 #   Institut Laue - Langevin & CSNS, Institute of High Energy Physics, CAS
 # SPDX - License - Identifier: GPL - 3.0 +
+import re
+import threading
+import time
 import unittest
 from qtpy.QtCore import QThreadPool
 
 from unittest import mock
 from sans.common.enums import (OutputMode)
-from sans.gui_logic.models.batch_process_runner import BatchProcessRunner
+from sans.gui_logic.models.batch_process_runner import BatchProcessRunner, chain_states_sharing_workspaces
 
 
 class BatchProcessRunnerTest(unittest.TestCase):
@@ -94,6 +97,108 @@ class BatchProcessRunnerTest(unittest.TestCase):
         self.batch_process_runner.row_failed_signal.emit.assert_any_call(2, 'failure')
         self.assertEqual(self.batch_process_runner.row_processed_signal.emit.call_count, 0)
 
+    def test_that_process_states_concurrently_emits_signal_for_each_row(self):
+        self.batch_process_runner.row_processed_signal = mock.MagicMock()
+        self.batch_process_runner.row_failed_signal = mock.MagicMock()
+        get_states_mock = mock.MagicMock()
+        get_states_mock.side_effect = [({0: self._create_state("SANS2D0000{}".format(i))}, {}) for i in range(3)]
+
+        self.batch_process_runner.process_states(row_index_pair=self._mock_rows,
+                                                 get_states_func=get_states_mock,
+                                                 use_optimizations=False, output_mode=OutputMode.BOTH,
+                                                 plot_results=False, output_graph='', max_concurrent_rows=3)
+        QThreadPool.globalInstance().waitForDone()
+
+        self.assertEqual(self.sans_batch_instance.call_count, 3)
+        self.assertEqual(self.batch_process_runner.row_processed_signal.emit.call_count, 3)
+        for i in range(3):
+            self.batch_process_runner.row_processed_signal.emit.assert_any_call(i, [], [])
+        self.assertEqual(self.batch_process_runner.row_failed_signal.emit.call_count, 0)
+
+    def test_that_process_states_concurrently_emits_row_failed_signal_after_each_failed_row(self):
+        self.batch_process_runner.row_processed_signal = mock.MagicMock()
+        self.batch_process_runner.row_failed_signal = mock.MagicMock()
+        self.sans_batch_instance.side_effect = Exception('failure')
+        get_states_mock = mock.MagicMock()
+        get_states_mock.side_effect = [({0: self._create_state("SANS2D0000{}".format(i))}, {}) for i in range(3)]
+
+        self.batch_process_runner.process_states(row_index_pair=self._mock_rows,
+                                                 get_states_func=get_states_mock,
+                                                 use_optimizations=False, output_mode=OutputMode.BOTH,
+                                                 plot_results=False, output_graph='', max_concurrent_rows=3)
+        QThreadPool.globalInstance().waitForDone()
+
+        self.assertEqual(3, self.batch_process_runner.row_failed_signal.emit.call_count)
+        for i in range(3):
+            self.batch_process_runner.row_failed_signal.emit.assert_any_call(i, 'failure')
+        self.assertEqual(self.batch_process_runner.row_processed_signal.emit.call_count, 0)
+
+    def test_that_states_sharing_files_or_output_names_are_chained(self):
+        states = [(0, self._create_state("SANS2D00001", can_scatter="SANS2D00010")),
+                  (1, self._create_state("SANS2D00002")),
+                  (2, self._create_state("SANS2D00003", can_scatter="SANS2D00010")),
+                  (3, self._create_state("SANS2D00004", output_name="sample")),
+                  (4, self._create_state("SANS2D00005", output_name="sample"))]
+
+        chains = chain_states_sharing_workspaces(states)
+
+        self.assertEqual([[0, 2], [1], [3, 4]], [[index for index, _ in chain] for chain in chains])
+
+    def test_that_states_with_workspaces_of_the_same_name_are_chained(self):
+        # Both files are loaded into 22024_sans_nxs, and both rows output workspaces named 22024_...
+        states = [(0, self._create_state("SANS2D00022024")),
+                  (1, self._create_state("SANS2D00022025")),
+                  (2, self._create_state("/data/SANS2D00022024-add.nxs", can_scatter="SANS2D00022026"))]
+
+        chains = chain_states_sharing_workspaces(states)
+
+        self.assertEqual([[0, 2], [1]], [[index for index, _ in chain] for chain in chains])
+
+    def test_that_process_states_concurrently_reduces_states_with_workspaces_of_the_same_name_one_at_a_time(self):
+        rows_being_reduced = []
+        overlapping_rows = []
+        lock = threading.Lock()
+
+        def reduce(states, *args, **kwargs):
+            with lock:
+                rows_being_reduced.append(states[0])
+                if len(rows_being_reduced) > 1:
+                    overlapping_rows.append(list(rows_being_reduced))
+            time.sleep(0.1)
+            with lock:
+                rows_being_reduced.remove(states[0])
+            return mock.MagicMock(), mock.MagicMock()
+
+        self.sans_batch_instance.side_effect = reduce
+        self.batch_process_runner.row_processed_signal = mock.MagicMock()
+        self.batch_process_runner.row_failed_signal = mock.MagicMock()
+        get_states_mock = mock.MagicMock()
+        get_states_mock.side_effect = [({0: self._create_state(sample_scatter)}, {})
+                                       for sample_scatter in ("SANS2D00022024", "SANS2D00022024-add.nxs")]
+
+        self.batch_process_runner.process_states(row_index_pair=self._mock_rows[:2],
+                                                 get_states_func=get_states_mock,
+                                                 use_optimizations=False, output_mode=OutputMode.BOTH,
+                                                 plot_results=False, output_graph='', max_concurrent_rows=2)
+        QThreadPool.globalInstance().waitForDone()
+
+        self.assertEqual(self.sans_batch_instance.call_count, 2)
+        self.assertEqual([], overlapping_rows)
+
+    @staticmethod
+    def _create_state(sample_scatter, can_scatter=None, output_name=""):
+        state = mock.MagicMock()
+        state.all_states.data.sample_scatter = sample_scatter
+        state.all_states.data.sample_scatter_run_number = int(re.search(r"(\d+)(-add)?(\.nxs)?$",
+                                                                        sample_scatter).group(1))
+        state.all_states.data.sample_transmission = None
+        state.all_states.data.sample_direct = None
+        state.all_states.data.can_scatter = can_scatter
+        state.all_states.data.can_transmission = None
+        state.all_states.data.can_direct = None
+        state.all_states.save.user_specified_output_name = output_name
+        return state
+
     def test_that_load_workspaces_emits_row_processed_signal_after_each_row(self):
         self.batch_process_runner.row_processed_signal = mock.MagicMock()
         self.batch_process_runner.row_failed_signal = mock.MagicMock()